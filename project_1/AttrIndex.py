@@ -0,0 +1,437 @@
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+from Profiler import profiler
+from FileIO import read_meta
+
+# 每个字节中 1 的个数
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int32)
+
+
+class RoaringBitmap:
+    """
+    Roaring 风格的位图：按行号高 16 位分块，每块根据基数选择存储方式
+        - 稀疏块（基数 <= ARRAY_LIMIT）：有序 uint16 数组
+        - 稠密块：65536 位的位图（8192 个 uint8）
+    """
+    ARRAY_LIMIT = 4096
+
+    def __init__(self, containers: dict = None):
+        self.containers = containers or {}
+
+    @classmethod
+    def from_array(cls, values):
+        """由行号数组构建位图（不要求有序、可以重复）"""
+        values = np.unique(np.asarray(values, dtype=np.uint32))
+        if len(values) == 0:
+            return cls()
+        highs, starts = np.unique(values >> 16, return_index=True)
+        containers = {}
+        for high, chunk in zip(highs.tolist(), np.split(values, starts[1:])):
+            containers[high] = cls._normalize((chunk & 0xFFFF).astype(np.uint16))
+        return cls(containers)
+
+    @staticmethod
+    def _is_dense(container):
+        return container.dtype == np.uint8
+
+    @classmethod
+    def _to_dense(cls, container):
+        if cls._is_dense(container):
+            return container
+        mask = np.zeros(1 << 16, dtype=bool)
+        mask[container] = True
+        return np.packbits(mask)
+
+    @classmethod
+    def _to_array(cls, container):
+        if cls._is_dense(container):
+            return np.flatnonzero(np.unpackbits(container)).astype(np.uint16)
+        return container
+
+    @classmethod
+    def _cardinality(cls, container):
+        if cls._is_dense(container):
+            return int(_POPCOUNT[container].sum())
+        return len(container)
+
+    @classmethod
+    def _normalize(cls, container):
+        """根据基数在稀疏块与稠密块之间转换，空块返回 None"""
+        cardinality = cls._cardinality(container)
+        if cardinality == 0:
+            return None
+        if cls._is_dense(container) and cardinality <= cls.ARRAY_LIMIT:
+            return cls._to_array(container)
+        if not cls._is_dense(container) and cardinality > cls.ARRAY_LIMIT:
+            return cls._to_dense(container)
+        return container
+
+    @classmethod
+    def _and(cls, a, b):
+        if not cls._is_dense(a) and not cls._is_dense(b):
+            return np.intersect1d(a, b, assume_unique=True).astype(np.uint16)
+        if cls._is_dense(a) and cls._is_dense(b):
+            return a & b
+        array, dense = (a, b) if cls._is_dense(b) else (b, a)
+        return array[np.unpackbits(dense)[array].astype(bool)]
+
+    @classmethod
+    def _or(cls, a, b):
+        if not cls._is_dense(a) and not cls._is_dense(b):
+            return np.union1d(a, b).astype(np.uint16)
+        return cls._to_dense(a) | cls._to_dense(b)
+
+    @classmethod
+    def _andnot(cls, a, b):
+        if not cls._is_dense(a):
+            return a[~np.unpackbits(cls._to_dense(b))[a].astype(bool)]
+        return a & ~cls._to_dense(b)
+
+    def _merge(self, other, op, keep_left_only, keep_right_only):
+        containers = {}
+        for high in self.containers.keys() | other.containers.keys():
+            left, right = self.containers.get(high), other.containers.get(high)
+            if left is not None and right is not None:
+                container = self._normalize(op(left, right))
+            elif left is not None:
+                container = left if keep_left_only else None
+            else:
+                container = right if keep_right_only else None
+            if container is not None:
+                containers[high] = container
+        return RoaringBitmap(containers)
+
+    @classmethod
+    def union_all(cls, bitmaps):
+        """一次合并多个位图：同一块先累积到稠密位图，最后再决定存储方式"""
+        accumulators = {}
+        for bitmap in bitmaps:
+            for high, container in bitmap.containers.items():
+                if high in accumulators:
+                    accumulators[high] |= cls._to_dense(container)
+                else:
+                    accumulators[high] = cls._to_dense(container).copy()
+        return cls({high: cls._normalize(container) for high, container in accumulators.items()})
+
+    def __and__(self, other):
+        return self._merge(other, self._and, False, False)
+
+    def __or__(self, other):
+        return self._merge(other, self._or, True, True)
+
+    def __sub__(self, other):
+        return self._merge(other, self._andnot, True, False)
+
+    def __len__(self):
+        return sum(self._cardinality(container) for container in self.containers.values())
+
+    def to_array(self):
+        """返回有序的行号数组"""
+        if not self.containers:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([
+            (np.int64(high) << 16) | self._to_array(self.containers[high]).astype(np.int64)
+            for high in sorted(self.containers)
+        ])
+
+
+class _Column:
+    # 不同取值数不超过该值时为每个取值建立位图
+    MAX_VALUE_BITMAPS = 1024
+
+    def __init__(self, values, num_buckets: int):
+        """
+        单个属性列：按取值排序的列（行号随之排序），以及每个取值、每个等深区间桶的位图
+
+        Args:
+            values (numpy.ndarray): 第 i 行的属性值
+            num_buckets (int): 等深区间桶的数量
+        """
+        self.is_numeric = np.issubdtype(values.dtype, np.number)
+        order = np.argsort(values, kind="stable")
+        self.sorted_values = values[order]
+        self.sorted_rows = order.astype(np.int64)
+        self.bucket_size = max(1, -(-len(values) // num_buckets))
+        self.buckets = [
+            RoaringBitmap.from_array(self.sorted_rows[sid:sid + self.bucket_size])
+            for sid in range(0, len(values), self.bucket_size)
+        ]
+        self.value_bitmaps = None
+        uniques, starts = np.unique(self.sorted_values, return_index=True)
+        if len(uniques) <= self.MAX_VALUE_BITMAPS:
+            ends = list(starts[1:]) + [len(values)]
+            self.value_bitmaps = {
+                value: RoaringBitmap.from_array(self.sorted_rows[sid:eid])
+                for value, sid, eid in zip(uniques.tolist(), starts, ends)
+            }
+
+    def _coerce(self, value):
+        """把过滤条件中的常量转换为列的类型"""
+        if self.is_numeric:
+            return float(value)
+        return str(value)
+
+    def slice(self, sid: int, eid: int) -> RoaringBitmap:
+        """排序后第 [sid, eid) 个位置对应的行：完整覆盖的桶直接合并位图，两端的零散部分从排序列构建"""
+        if eid <= sid:
+            return RoaringBitmap()
+        first_bucket = -(-sid // self.bucket_size)
+        last_bucket = eid // self.bucket_size
+        if first_bucket >= last_bucket:
+            return RoaringBitmap.from_array(self.sorted_rows[sid:eid])
+        edges = RoaringBitmap.from_array(np.concatenate([
+            self.sorted_rows[sid:first_bucket * self.bucket_size],
+            self.sorted_rows[last_bucket * self.bucket_size:eid],
+        ]))
+        return RoaringBitmap.union_all([edges] + self.buckets[first_bucket:last_bucket])
+
+    def compare(self, op: str, value) -> RoaringBitmap:
+        value = self._coerce(value)
+        if op == "==":
+            if self.value_bitmaps is not None:
+                key = int(value) if self.is_numeric and float(value).is_integer() else value
+                return self.value_bitmaps.get(key, RoaringBitmap())
+            return self.slice(np.searchsorted(self.sorted_values, value, "left"),
+                              np.searchsorted(self.sorted_values, value, "right"))
+        if op == "<":
+            return self.slice(0, np.searchsorted(self.sorted_values, value, "left"))
+        if op == "<=":
+            return self.slice(0, np.searchsorted(self.sorted_values, value, "right"))
+        if op == ">":
+            return self.slice(np.searchsorted(self.sorted_values, value, "right"), len(self.sorted_values))
+        if op == ">=":
+            return self.slice(np.searchsorted(self.sorted_values, value, "left"), len(self.sorted_values))
+        raise ValueError(f"Unsupported operator: {op}")
+
+
+# 过滤表达式的词法单元：括号、比较运算符、列表、带引号的字符串、数字或标识符
+_TOKEN_PATTERN = re.compile(r'\s*(\(|\)|\[|\]|,|==|!=|<=|>=|<|>|=|&&|\|\||"[^"]*"|\'[^\']*\'|[^\s()\[\],=!<>&|"\']+)')
+
+
+class _FilterParser:
+    """递归下降解析：or > and > not > 比较"""
+
+    def __init__(self, filter_expr: str):
+        self.filter_expr = filter_expr
+        self.tokens = _TOKEN_PATTERN.findall(filter_expr)
+        self.pos = 0
+
+    def parse(self):
+        tree = self._parse_or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected token '{self.tokens[self.pos]}' in filter: {self.filter_expr}")
+        return tree
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError(f"Unexpected end of filter: {self.filter_expr}")
+        self.pos += 1
+        return token
+
+    def _expect(self, expected):
+        token = self._next()
+        if token != expected:
+            raise ValueError(f"Expected '{expected}' but got '{token}'")
+
+    def _parse_or(self):
+        tree = self._parse_and()
+        while self._peek() is not None and self._peek().lower() in ("or", "||"):
+            self._next()
+            tree = ("or", tree, self._parse_and())
+        return tree
+
+    def _parse_and(self):
+        tree = self._parse_not()
+        while self._peek() is not None and self._peek().lower() in ("and", "&&"):
+            self._next()
+            tree = ("and", tree, self._parse_not())
+        return tree
+
+    def _parse_not(self):
+        if self._peek() is not None and self._peek().lower() == "not":
+            self._next()
+            return ("not", self._parse_not())
+        return self._parse_primary()
+
+    @staticmethod
+    def _literal(token):
+        if token[0] in "\"'":
+            return token[1:-1]
+        return token
+
+    def _parse_list(self):
+        self._expect("[")
+        values = []
+        while self._peek() != "]":
+            values.append(self._literal(self._next()))
+            if self._peek() == ",":
+                self._next()
+        self._expect("]")
+        return values
+
+    def _parse_primary(self):
+        if self._peek() == "(":
+            self._next()
+            tree = self._parse_or()
+            self._expect(")")
+            return tree
+        name = self._next()
+        op = self._next()
+        if op.lower() == "not":
+            self._expect("in")
+            return ("not", ("in", name, self._parse_list()))
+        if op.lower() == "in":
+            return ("in", name, self._parse_list())
+        value = self._literal(self._next())
+        if op == "=":
+            op = "=="
+        if op == "!=":
+            return ("not", ("cmp", name, "==", value))
+        return ("cmp", name, op, value)
+
+
+def parse_filter(filter_expr: str):
+    """
+    把过滤表达式解析为语法树（元组）：
+        ("or", left, right)、("and", left, right)、("not", child)、
+        ("cmp", 属性名, 运算符, 常量)、("in", 属性名, 常量列表)
+
+    支持的表达式与 Milvus 的过滤表达式一致，例如：
+        size <= 300 and size >= 100
+        label == "Music" or not (label in ["News", "Sports"])
+    """
+    return _FilterParser(filter_expr).parse()
+
+
+class LruCache:
+    def __init__(self, max_entries: int = 1024):
+        """
+        初始化 LruCache 类：按过滤表达式缓存计算结果，超过 max_entries 时淘汰最久未使用的结果；
+        调度器的多个执行线程同时查询时在锁内读写
+
+        Args:
+            max_entries (int): 最多缓存的表达式数，0 表示不缓存
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """缓存的结果，不存在时返回 None"""
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class AttrIndex:
+    def __init__(self, vids, columns: dict, num_buckets: int = 64, cache_size: int = 1024):
+        """
+        初始化 AttrIndex 类：客户端的属性索引，把过滤表达式（见 parse_filter）计算为满足条件的行号集合
+
+        Args:
+            vids (numpy.ndarray): 第 i 行的向量ID
+            columns (dict): 属性名 -> 第 i 行的属性值
+            num_buckets (int): 每列等深区间桶的数量
+            cache_size (int): 最多缓存的过滤表达式结果数（LRU）
+        """
+        self.vids = np.asarray(vids, dtype=np.int64)
+        self.columns = {
+            name: _Column(np.asarray(values), num_buckets)
+            for name, values in columns.items()
+        }
+        self.universe = RoaringBitmap.from_array(np.arange(len(self.vids)))
+        self._cache = LruCache(cache_size)
+
+    @classmethod
+    @profiler.trace("attr_index.build")
+    def from_meta_file(cls, vids, meta_file_path: str, num_buckets: int = 64, cache_size: int = 1024):
+        """
+        从 meta 文件构建属性索引（第 i 行属性对应 .fivecs 中第 i 个向量）
+
+        Args:
+            vids (numpy.ndarray): .fivecs 文件中的向量ID
+            meta_file_path (str): 属性数据文件路径
+            num_buckets (int): 每列等深区间桶的数量
+            cache_size (int): 最多缓存的过滤表达式结果数（LRU）
+        """
+        return cls(vids, read_meta_columns(meta_file_path, len(vids)), num_buckets, cache_size)
+
+    def __len__(self):
+        return len(self.vids)
+
+    def evaluate(self, filter_expr: str) -> RoaringBitmap:
+        """计算过滤表达式，返回满足条件的行号位图（结果按表达式 LRU 缓存）"""
+        bitmap = self._cache.get(filter_expr)
+        if bitmap is None:
+            bitmap = self._evaluate(parse_filter(filter_expr))
+            self._cache.put(filter_expr, bitmap)
+        return bitmap
+
+    def _evaluate(self, tree) -> RoaringBitmap:
+        kind = tree[0]
+        if kind == "or":
+            return self._evaluate(tree[1]) | self._evaluate(tree[2])
+        if kind == "and":
+            return self._evaluate(tree[1]) & self._evaluate(tree[2])
+        if kind == "not":
+            return self.universe - self._evaluate(tree[1])
+        if tree[1] not in self.columns:
+            raise ValueError(f"Unknown attribute '{tree[1]}'")
+        column = self.columns[tree[1]]
+        if kind == "in":
+            return RoaringBitmap.union_all([column.compare("==", value) for value in tree[2]])
+        return column.compare(tree[2], tree[3])
+
+    def select_rows(self, filter_expr: str):
+        """满足条件的行号（有序）"""
+        return self.evaluate(filter_expr).to_array()
+
+    def select_ids(self, filter_expr: str):
+        """满足条件的向量ID"""
+        return self.vids[self.select_rows(filter_expr)]
+
+    def selectivity(self, filter_expr: str) -> float:
+        """满足条件的行所占比例"""
+        return len(self.evaluate(filter_expr)) / max(len(self.vids), 1)
+
+
+def read_meta_columns(meta_file_path: str, num_rows: int = None) -> dict:
+    """
+    读取 meta 文件中的属性列
+
+    Args:
+        meta_file_path (str): 属性数据文件路径
+        num_rows (int): 读取的行数，None 表示全部
+
+    Returns:
+        dict: 属性名 -> 属性值（int 类型为 int64 数组，其余为字符串数组）
+    """
+    with open(meta_file_path, "r", encoding="utf-8") as file:
+        file.readline()
+        attr_name, attr_type = file.readline().split()[:2]
+    # 属性值通过 read_meta 读取（开启 EmbeddingCache 时不再重复解析）
+    values = read_meta(meta_file_path)
+    values = values if num_rows is None else values[:num_rows]
+    if attr_type.startswith("int"):
+        return {attr_name: np.asarray(values, dtype=np.int64)}
+    return {attr_name: np.asarray(values, dtype=str)}
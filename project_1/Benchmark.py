@@ -0,0 +1,1031 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+from FileIO import VECTOR_TYPES, read_fivecs_matrix, read_query, convert_vectors
+from DataLoader import DataLoader, scalar_index_params
+from QueryProcessor import QueryProcessor, create_query_processor
+from SearchScheduler import SearchScheduler
+from ResultCache import SemanticCache
+from SearchResult import hit_ids
+from AttrIndex import AttrIndex, read_meta_columns
+from Partitioning import PartitionLayout
+from BulkImport import BULK_FORMATS, create_object_store
+from BenchmarkStore import BenchmarkStore
+from EmbeddingCache import configure_cache
+from Preprocess import VectorTransform, load_or_fit_transform
+from LazyImport import lazy_from
+
+# pymilvus 在第一次使用时才导入
+MilvusClient, DataType, Collection = lazy_from("pymilvus", "MilvusClient", "DataType", "Collection")
+
+
+def vector_dtype(vector_type):
+    """向量存储类型对应的 Milvus 字段类型"""
+    return {
+        "float32": DataType.FLOAT_VECTOR,
+        "float16": DataType.FLOAT16_VECTOR,
+        "bfloat16": DataType.BFLOAT16_VECTOR,
+        "binary": DataType.BINARY_VECTOR,
+    }[vector_type]
+
+
+def exact_knn(vids, matrix, queries, top_k, metric_type, chunk_size=4096):
+    """
+    使用 NumPy 暴力计算精确的 KNN 结果（作为召回率的 Ground Truth）
+
+    Args:
+        vids (numpy.ndarray): 向量ID
+        matrix (numpy.ndarray): (n, dim) 浮点向量
+        queries (numpy.ndarray): (m, dim) 查询向量
+        top_k (int): 返回最相似的 k 个结果
+        metric_type (str): L2 或 IP
+        chunk_size (int): 每次参与计算的数据向量数，控制内存占用
+
+    Returns:
+        list: 每个查询的 top_k 个向量ID
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    best_scores = np.full((len(queries), 0), 0.0, dtype=np.float32)
+    best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+    for sid in range(0, len(matrix), chunk_size):
+        chunk = np.asarray(matrix[sid:sid + chunk_size], dtype=np.float32)
+        if metric_type == "IP":
+            scores = -(queries @ chunk.T)
+        else:
+            scores = np.sum(chunk ** 2, axis=1)[None, :] - 2.0 * (queries @ chunk.T)
+        scores = np.concatenate([best_scores, scores], axis=1)
+        ids = np.concatenate([best_ids, np.broadcast_to(vids[sid:sid + chunk_size], (len(queries), len(chunk)))], axis=1)
+        keep = np.argsort(scores, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(scores, keep, axis=1)
+        best_ids = np.take_along_axis(ids, keep, axis=1)
+    return best_ids.tolist()
+
+
+def recall_at_k(truth_ids, result_ids):
+    """计算召回率"""
+    truth_set = set(truth_ids)
+    if len(truth_set) == 0:
+        return 0.0
+    return len(truth_set.intersection(result_ids)) * 1.0 / len(truth_set)
+
+
+def vectors_nbytes(vectors):
+    """统计转换后向量占用的字节数"""
+    return sum(len(vec) if isinstance(vec, bytes) else vec.nbytes for vec in vectors)
+
+
+def bench_vector_types(
+    client: MilvusClient,
+    collection_prefix: str,
+    vector_file_path: str,
+    query_file_path: str,
+    metric_type: str,
+    top_k: int = 10,
+    vector_types=VECTOR_TYPES,
+    rerank_factor: int = 4,
+    max_queries: int = 100,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较不同向量存储类型（float32/float16/bfloat16/binary）的内存占用、导入吞吐与召回率
+
+    每种类型导入到单独的集合（精确索引 FLAT/BIN_FLAT），因此召回率的差异只来自向量量化
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_prefix (str): 测试集合名称前缀
+        vector_file_path (str): 向量数据文件路径
+        query_file_path (str): 查询文件路径
+        metric_type (str): L2 或 IP
+        top_k (int): 返回最相似的 k 个结果
+        vector_types: 待比较的向量存储类型
+        rerank_factor (int): binary 模式下的候选倍数
+        max_queries (int): 参与测试的查询数
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每种类型的实验结果
+    """
+    data_loader = DataLoader(client)
+    vids, matrix = read_fivecs_matrix(vector_file_path)
+    query_vector_list, _ = read_query(query_file_path)
+    queries = np.asarray(query_vector_list[:max_queries], dtype=np.float32)
+    truth_list = exact_knn(vids, matrix, queries, top_k, metric_type)
+
+    reports = []
+    for vector_type in vector_types:
+        collection_name = f"{collection_prefix}_{vector_type.upper()}"
+        start_time = time.time()
+        vectors = convert_vectors(matrix, vector_type)
+        convert_time = time.time() - start_time
+
+        fields_config = [
+            {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
+            {"name": "vector", "dtype": vector_dtype(vector_type), "dim": matrix.shape[1], "description": "vector"},
+        ]
+        data_loader.create_schema(collection_name, fields_config, mode="recreate")
+        data_list = [{"id": vid, "vector": vec} for vid, vec in zip(vids.tolist(), vectors)]
+        start_time = time.time()
+        data_loader.load_data(collection_name, data_list, mode="recreate")
+        ingest_time = time.time() - start_time
+
+        if vector_type == "binary":
+            index_params = {"field_name": "vector", "metric_type": "HAMMING", "index_type": "BIN_FLAT", "index_name": "bin_flat_index"}
+        else:
+            index_params = {"field_name": "vector", "metric_type": metric_type, "index_type": "FLAT", "index_name": "flat_index"}
+        data_loader.build_and_load_all([collection_name], [index_params])
+
+        query_processor = QueryProcessor(client, vector_type, metric_type, rerank_factor)
+        if vector_type == "binary":
+            query_processor.set_rerank_vectors(vids, matrix)
+        recalls, latencies = [], []
+        for query_vector, truth_ids in zip(queries, truth_list):
+            result_list, latency = query_processor.knn_search(
+                collection_name, "vector", query_vector.tolist(), top_k, {"metric_type": index_params["metric_type"]})
+            recalls.append(recall_at_k(truth_ids, [hit.id for hit in result_list]))
+            latencies.append(latency)
+
+        report = {
+            "vector_type": vector_type,
+            "memory_bytes": vectors_nbytes(vectors),
+            "convert_time": convert_time,
+            "ingest_rows_per_s": len(data_list) / ingest_time if ingest_time > 0 else 0.0,
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "avg_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("vector_type", collection_name, top_k=top_k, metric_type=metric_type, **report)
+
+    print("=" * 80)
+    print(f"{'type':<10}{'memory(MB)':>12}{'convert(s)':>12}{'ingest(rows/s)':>16}{'recall':>10}{'latency(ms)':>14}")
+    for report in reports:
+        print(f"{report['vector_type']:<10}{report['memory_bytes'] / 2**20:>12.1f}{report['convert_time']:>12.3f}"
+              f"{report['ingest_rows_per_s']:>16.0f}{report['recall'] * 100:>9.1f}%{report['avg_latency_ms']:>14.3f}")
+    print("=" * 80)
+    return reports
+
+
+def bench_preprocess(
+    client: MilvusClient,
+    collection_prefix: str,
+    vector_file_path: str,
+    query_file_path: str,
+    metric_type: str,
+    index_params: dict,
+    search_params: dict,
+    target_dims=(None, 512, 256, 128, 64),
+    method: str = "pca",
+    normalize: bool = False,
+    top_k: int = 10,
+    max_queries: int = 100,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较不同降维维度（PCA/OPQ）下的召回率与查询吞吐，展示维度与精度、速度之间的权衡
+
+    每个维度导入到单独的集合并构建相同的近似索引，召回率以原始维度上的精确结果为 Ground Truth，
+    因此同时包含降维与近似索引带来的误差
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_prefix (str): 测试集合名称前缀
+        vector_file_path (str): 向量数据文件路径
+        query_file_path (str): 查询文件路径
+        metric_type (str): L2 或 IP
+        index_params (dict): 近似索引参数（与 VdbConfig.INDEX_PARAMS[1] 格式相同）
+        search_params (dict): 查询参数（与 VdbConfig.SEARCH_PARAMS[1] 格式相同）
+        target_dims: 待比较的维度，None 表示原始维度
+        method (str): "pca" 或 "opq"
+        normalize (bool): 是否 L2 归一化
+        top_k (int): 返回最相似的 k 个结果
+        max_queries (int): 参与测试的查询数
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每个维度的实验结果
+    """
+    data_loader = DataLoader(client)
+    vids, matrix = read_fivecs_matrix(vector_file_path)
+    query_vector_list, _ = read_query(query_file_path)
+    queries = np.asarray(query_vector_list[:max_queries], dtype=np.float32)
+    truth_list = exact_knn(vids, matrix, queries, top_k, metric_type)
+
+    reports = []
+    for target_dim in target_dims:
+        transform = VectorTransform(normalize, method if target_dim else None, target_dim)
+        start_time = time.time()
+        transform.fit(matrix)
+        vectors = transform.transform(matrix)
+        fit_time = time.time() - start_time
+        dim = vectors.shape[1]
+
+        collection_name = f"{collection_prefix}_DIM{dim}"
+        fields_config = [
+            {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
+            {"name": "vector", "dtype": DataType.FLOAT_VECTOR, "dim": dim, "description": "vector"},
+        ]
+        data_loader.create_schema(collection_name, fields_config, mode="recreate")
+        data_list = [{"id": vid, "vector": vec} for vid, vec in zip(vids.tolist(), convert_vectors(vectors))]
+        data_loader.load_data(collection_name, data_list, mode="recreate")
+        build_results = data_loader.build_and_load_all([collection_name], [index_params])
+
+        query_processor = QueryProcessor(client, "float32", metric_type)
+        query_processor.set_transform(transform)
+        recalls, latencies = [], []
+        for query_vector, truth_ids in zip(queries, truth_list):
+            result_list, latency = query_processor.knn_search(collection_name, "vector", query_vector, top_k, search_params)
+            recalls.append(recall_at_k(truth_ids, [hit.id for hit in result_list]))
+            latencies.append(latency)
+
+        avg_latency = float(np.mean(latencies)) if latencies else 0.0
+        report = {
+            "dim": dim,
+            "method": transform.method or "none",
+            "explained_variance": transform.explained_variance if transform.explained_variance is not None else 1.0,
+            "memory_bytes": int(vectors.nbytes),
+            "fit_time": fit_time,
+            "build_time": build_results.get(collection_name, {}).get("build_time"),
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "avg_latency_ms": avg_latency,
+            "qps": 1000.0 / avg_latency if avg_latency > 0 else 0.0,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("preprocess", collection_name, top_k=top_k, metric_type=metric_type,
+                                   index_type=index_params["index_type"], normalize=normalize, **report)
+
+    print("=" * 80)
+    print(f"{'dim':>6}{'method':>8}{'variance':>10}{'memory(MB)':>12}{'recall':>10}{'latency(ms)':>14}{'QPS':>10}")
+    for report in reports:
+        print(f"{report['dim']:>6}{report['method']:>8}{report['explained_variance']:>10.3f}{report['memory_bytes'] / 2**20:>12.1f}"
+              f"{report['recall'] * 100:>9.1f}%{report['avg_latency_ms']:>14.3f}{report['qps']:>10.1f}")
+    print("=" * 80)
+    return reports
+
+
+def bench_filter_routes(
+    client: MilvusClient,
+    collection_name: str,
+    vector_file_path: str,
+    meta_file_path: str,
+    query_file_path: str,
+    metric_type: str,
+    search_params: dict,
+    vector_type: str = "float32",
+    top_k: int = 10,
+    max_queries: int = 100,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较混合查询全部交给 Milvus 与使用客户端过滤加速（属性索引 + 代价模型路由）的延迟与召回率
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_name (str): 已导入数据并建好索引的集合
+        vector_file_path (str): 向量数据文件路径（暴力计算使用）
+        meta_file_path (str): 属性数据文件路径
+        query_file_path (str): 查询文件路径（包含过滤条件）
+        metric_type (str): L2 或 IP
+        search_params (dict): Milvus 查询参数
+        vector_type (str): 集合中向量的存储类型
+        top_k (int): 返回最相似的 k 个结果
+        max_queries (int): 参与测试的查询数
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 两种方式的实验结果
+    """
+    vids, matrix = read_fivecs_matrix(vector_file_path)
+    start_time = time.time()
+    attr_index = AttrIndex.from_meta_file(vids, meta_file_path)
+    build_time = time.time() - start_time
+    query_vector_list, attr_filter_list = read_query(query_file_path)
+    query_vector_list, attr_filter_list = query_vector_list[:max_queries], attr_filter_list[:max_queries]
+    selectivities = [attr_index.selectivity(attr_filter) for attr_filter in attr_filter_list]
+
+    reports = []
+    server_results = []
+    for mode in ("server", "accelerated"):
+        query_processor = QueryProcessor(client, vector_type, metric_type)
+        if mode == "accelerated" or vector_type == "binary":
+            query_processor.set_rerank_vectors(vids, matrix)
+        if mode == "accelerated":
+            query_processor.set_attr_index(attr_index)
+        latencies, recalls = [], []
+        for i, (query_vector, attr_filter) in enumerate(zip(query_vector_list, attr_filter_list)):
+            result_list, latency = query_processor.hybrid_search(
+                collection_name, "vector", query_vector, attr_filter, top_k, search_params)
+            result_ids = [hit.id for hit in result_list]
+            latencies.append(latency)
+            if mode == "server":
+                server_results.append(result_ids)
+            else:
+                recalls.append(recall_at_k(server_results[i], result_ids) if server_results[i] else 1.0)
+        report = {
+            "mode": mode,
+            "avg_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+            "p99_latency_ms": float(np.percentile(latencies, 99)) if latencies else 0.0,
+            "recall_vs_server": float(np.mean(recalls)) if recalls else 1.0,
+            "routes": dict(query_processor.route_stats),
+            "avg_selectivity": float(np.mean(selectivities)) if selectivities else 0.0,
+            "attr_index_build_s": build_time,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("filter_route", f"{collection_name}_{mode}", top_k=top_k, **report)
+
+    print("=" * 80)
+    print(f"{'mode':<14}{'latency(ms)':>14}{'p99(ms)':>12}{'recall':>10}  routes")
+    for report in reports:
+        print(f"{report['mode']:<14}{report['avg_latency_ms']:>14.3f}{report['p99_latency_ms']:>12.3f}"
+              f"{report['recall_vs_server'] * 100:>9.1f}%  {report['routes']}")
+    print(f"attribute index built in {build_time:.3f} s, average selectivity {reports[0]['avg_selectivity']:.4f}")
+    print("=" * 80)
+    return reports
+
+
+def bench_scalar_index(
+    client: MilvusClient,
+    collection_name: str,
+    fields_config: list,
+    query_file_path: str,
+    metric_type: str,
+    search_params: dict,
+    vector_type: str = "float32",
+    transform=None,
+    top_k: int = 10,
+    max_queries: int = 100,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较属性字段有无标量索引（见 DataLoader.scalar_index_params）时 Milvus 混合查询的延迟：
+    先删除标量索引测量，再重新构建标量索引测量，两次使用相同的查询与过滤条件；结束时集合保留标量索引
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_name (str): 已导入数据并建好向量索引的集合
+        fields_config (list): 该集合的字段配置（VdbConfig.SCHEMA_FIELD_CONFIG 中的一项）
+        query_file_path (str): 查询文件路径（包含过滤条件）
+        metric_type (str): L2 或 IP
+        search_params (dict): Milvus 查询参数
+        vector_type (str): 集合中向量的存储类型
+        transform (VectorTransform): 查询向量的预处理变换，None 表示不变换
+        top_k (int): 返回最相似的 k 个结果
+        max_queries (int): 参与测试的查询数
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 有无标量索引的实验结果
+    """
+    data_loader = DataLoader(client)
+    scalar_params = scalar_index_params(fields_config)
+    query_vector_list, attr_filter_list = read_query(query_file_path)
+    query_vector_list, attr_filter_list = query_vector_list[:max_queries], attr_filter_list[:max_queries]
+    query_processor = QueryProcessor(client, vector_type, metric_type)
+    query_processor.set_transform(transform)
+    collection = Collection(collection_name, using=client._using)
+
+    reports = []
+    for scalar_index in (False, True):
+        # 索引变化后重新加载集合才会生效
+        collection.release()
+        start_time = time.time()
+        for params in scalar_params:
+            exists = collection.has_index(index_name=params["index_name"])
+            if exists and not scalar_index:
+                collection.drop_index(index_name=params["index_name"])
+            elif not exists and scalar_index:
+                collection.create_index(field_name=params["field_name"], index_params=params, index_name=params["index_name"])
+                data_loader.wait_for_index(collection_name, params["index_name"])
+        build_time = time.time() - start_time
+        data_loader.ensure_loaded(collection_name)
+
+        latencies = []
+        for query_vector, attr_filter in zip(query_vector_list, attr_filter_list):
+            _, latency = query_processor._server_search(
+                collection_name, "vector", query_processor.transform_query(query_vector), attr_filter, top_k, search_params)
+            latencies.append(latency)
+        report = {
+            "scalar_index": scalar_index,
+            "indexes": [f"{params['field_name']}:{params['index_type']}" for params in scalar_params] if scalar_index else [],
+            "build_time": build_time if scalar_index else 0.0,
+            "avg_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+            "p99_latency_ms": float(np.percentile(latencies, 99)) if latencies else 0.0,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("scalar_index", f"{collection_name}_{'indexed' if scalar_index else 'scan'}",
+                                   top_k=top_k, num_queries=len(latencies), **report)
+
+    print("=" * 80)
+    print(f"{'scalar index':<14}{'latency(ms)':>14}{'p99(ms)':>12}{'build(s)':>12}  indexes")
+    for report in reports:
+        print(f"{str(report['scalar_index']):<14}{report['avg_latency_ms']:>14.3f}{report['p99_latency_ms']:>12.3f}"
+              f"{report['build_time']:>12.2f}  {report['indexes'] or '-'}")
+    print("=" * 80)
+    return reports
+
+
+def bench_partitions(
+    client: MilvusClient,
+    collection_prefix: str,
+    fields_config: list,
+    vector_file_path: str,
+    meta_file_path: str,
+    query_file_path: str,
+    metric_type: str,
+    index_params: dict,
+    search_params: dict,
+    mode: str = "range",
+    partition_counts=(1, 4, 16, 64),
+    vector_type: str = "float32",
+    top_k: int = 10,
+    max_queries: int = 100,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较按属性列划分不同分区数（见 Partitioning.py）时混合查询的延迟与召回率：
+    每个分区数导入到单独的集合并构建相同的近似索引，查询只检索过滤条件涉及的分区，
+    召回率以满足过滤条件的向量上的精确结果为 Ground Truth
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_prefix (str): 测试集合名称前缀
+        fields_config (list): 字段配置（VdbConfig.SCHEMA_FIELD_CONFIG 中的一项），第三个字段为划分依据的属性
+        vector_file_path (str): 向量数据文件路径
+        meta_file_path (str): 属性数据文件路径
+        query_file_path (str): 查询文件路径（包含过滤条件）
+        metric_type (str): L2 或 IP
+        index_params (dict): 近似索引参数（与 VdbConfig.INDEX_PARAMS[1] 格式相同）
+        search_params (dict): 查询参数
+        mode (str): "partition_key"、"hash" 或 "range"
+        partition_counts: 待比较的分区数，1 表示不划分
+        vector_type (str): 集合中向量的存储类型
+        top_k (int): 返回最相似的 k 个结果
+        max_queries (int): 参与测试的查询数
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每个分区数的实验结果
+    """
+    data_loader = DataLoader(client)
+    field = fields_config[2]["name"]
+    vids, matrix = read_fivecs_matrix(vector_file_path)
+    values = read_meta_columns(meta_file_path, len(vids))[field]
+    data_list = data_loader.read_data(vector_file_path, meta_file_path, vector_type)
+    query_vector_list, attr_filter_list = read_query(query_file_path)
+    query_vector_list, attr_filter_list = query_vector_list[:max_queries], attr_filter_list[:max_queries]
+    attr_index = AttrIndex(vids, {field: values})
+    truth_list = []
+    for query_vector, attr_filter in zip(query_vector_list, attr_filter_list):
+        rows = attr_index.select_rows(attr_filter)
+        truth_list.append(exact_knn(vids[rows], matrix[rows], [query_vector], top_k, metric_type)[0] if len(rows) else [])
+
+    reports = []
+    for num_partitions in partition_counts:
+        layout = PartitionLayout.fit(field, values, mode, num_partitions) if num_partitions > 1 else None
+        collection_name = f"{collection_prefix}_P{num_partitions}"
+        if layout is None:
+            data_loader.create_schema(collection_name, fields_config, mode="recreate")
+        else:
+            data_loader.create_schema(collection_name, layout.schema_fields(fields_config), mode="recreate",
+                                      num_partitions=layout.num_partitions if layout.mode == "partition_key" else None)
+            if layout.explicit:
+                data_loader.create_partitions(collection_name, layout)
+        start_time = time.time()
+        data_loader.load_data(collection_name, data_list, mode="recreate", partition_layout=layout)
+        ingest_time = time.time() - start_time
+        build_results = data_loader.build_and_load_all([collection_name], [index_params])
+
+        query_processor = QueryProcessor(client, vector_type, metric_type)
+        query_processor.set_partition_layout(layout)
+        recalls, latencies, routed = [], [], []
+        for query_vector, attr_filter, truth_ids in zip(query_vector_list, attr_filter_list, truth_list):
+            result_list, latency = query_processor._server_search(
+                collection_name, "vector", query_vector, attr_filter, top_k, search_params)
+            latencies.append(latency)
+            recalls.append(recall_at_k(truth_ids, [hit.id for hit in result_list]) if truth_ids else 1.0)
+            partition_names = layout.route(attr_filter) if layout is not None else None
+            routed.append(len(partition_names) if partition_names is not None else (layout.num_partitions if layout else 1))
+
+        report = {
+            "mode": mode if layout is not None else "none",
+            "num_partitions": layout.num_partitions if layout is not None else 1,
+            "avg_routed_partitions": float(np.mean(routed)) if routed else 0.0,
+            "ingest_rows_per_s": len(data_list) / ingest_time if ingest_time > 0 else 0.0,
+            "build_time": build_results.get(collection_name, {}).get("build_time"),
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "avg_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+            "p99_latency_ms": float(np.percentile(latencies, 99)) if latencies else 0.0,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("partition", collection_name, top_k=top_k, metric_type=metric_type, field=field,
+                                   index_type=index_params["index_type"], **report)
+
+    print("=" * 80)
+    print(f"{'mode':<16}{'partitions':>12}{'routed':>10}{'recall':>10}{'latency(ms)':>14}{'p99(ms)':>12}")
+    for report in reports:
+        print(f"{report['mode']:<16}{report['num_partitions']:>12}{report['avg_routed_partitions']:>10.1f}"
+              f"{report['recall'] * 100:>9.1f}%{report['avg_latency_ms']:>14.3f}{report['p99_latency_ms']:>12.3f}")
+    print("=" * 80)
+    return reports
+
+
+def bench_bulk_import(
+    client: MilvusClient,
+    collection_prefix: str,
+    fields_config: list,
+    vector_file_path: str,
+    meta_file_path: str,
+    object_store_config: dict,
+    formats=BULK_FORMATS,
+    vector_type: str = "float32",
+    rows_per_file: int = 1000000,
+    staging_dir: str = "bulk_staging",
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较逐批 insert 与 utility.do_bulk_insert（见 DataLoader.bulk_import）导入同一份数据的墙钟时间：
+    每种方式导入到单独的新集合，insert 计入读取与构造逐行数据的时间，bulk 计入转换、上传与等待导入任务的时间
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_prefix (str): 测试集合名称前缀
+        fields_config (list): 字段配置（VdbConfig.SCHEMA_FIELD_CONFIG 中的一项）
+        vector_file_path (str): 向量数据文件路径
+        meta_file_path (str): 属性数据文件路径
+        object_store_config (dict): 对象存储配置（VdbConfig.BULK_IMPORT["object_store"]）
+        formats: 待比较的导入文件格式
+        vector_type (str): 集合中向量的存储类型
+        rows_per_file (int): 每个导入任务的行数
+        staging_dir (str): 本地生成导入文件的目录
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每种导入方式的实验结果
+    """
+    data_loader = DataLoader(client)
+    object_store = create_object_store(object_store_config)
+    reports = []
+    for method in ("insert",) + tuple(formats):
+        collection_name = f"{collection_prefix}_{method}"
+        data_loader.create_schema(collection_name, fields_config, mode="recreate")
+        start_time = time.time()
+        if method == "insert":
+            data_list = data_loader.read_data(vector_file_path, meta_file_path, vector_type)
+            data_loader.load_data(collection_name, data_list, mode="recreate")
+            rows = len(data_list)
+            del data_list
+            report = {"method": method, "rows": rows, "jobs": 0}
+        else:
+            results = data_loader.bulk_import(collection_name, vector_file_path, meta_file_path, vector_type,
+                                              object_store=object_store, file_format=method,
+                                              rows_per_file=rows_per_file, staging_dir=staging_dir)
+            report = {"method": method, "rows": results["rows"], "jobs": results["jobs"],
+                      "convert_time": results["convert_time"], "upload_time": results["upload_time"],
+                      "import_time": results["import_time"]}
+        report["total_time"] = time.time() - start_time
+        report["rows_per_s"] = report["rows"] / report["total_time"] if report["total_time"] > 0 else 0.0
+        report["server_rows"] = Collection(collection_name, using=client._using).num_entities
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("bulk_import", collection_name, vector_type=vector_type, rows_per_file=rows_per_file, **report)
+
+    print("=" * 80)
+    print(f"{'method':<10}{'rows':>12}{'jobs':>6}{'convert(s)':>12}{'upload(s)':>11}{'import(s)':>11}{'total(s)':>10}{'rows/s':>12}")
+    for report in reports:
+        print(f"{report['method']:<10}{report['rows']:>12}{report['jobs']:>6}{report.get('convert_time', 0.0):>12.2f}"
+              f"{report.get('upload_time', 0.0):>11.2f}{report.get('import_time', 0.0):>11.2f}"
+              f"{report['total_time']:>10.2f}{report['rows_per_s']:>12.0f}")
+    print("=" * 80)
+    return reports
+
+
+# 启动时不应被导入的重量级依赖
+HEAVY_MODULES = ("pymilvus", "tqdm", "matplotlib", "grpc", "pandas")
+
+
+def bench_startup(
+    commands=None,
+    repeat: int = 5,
+    regression_ratio: float = 1.2,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    测量 VdbCli.py 各个命令的启动时间（子进程墙钟时间）以及启动时导入的重量级依赖
+
+    Args:
+        commands (list): 待测量的命令行参数列表，默认测量几个不需要连接 Milvus 的命令
+        repeat (int): 每个命令重复次数，取最小值
+        regression_ratio (float): 超过上一次记录的该倍数时报告启动时间退化
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每个命令的实验结果
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "VdbCli.py")
+    commands = commands or [["--help"], ["list", "--help"], ["gt", "--help"]]
+    reports = []
+    for args in commands:
+        name = " ".join(["VdbCli.py"] + args)
+        times = []
+        heavy_modules = set()
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            completed = subprocess.run([sys.executable, "-X", "importtime", script] + args,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            times.append((time.perf_counter() - start_time) * 1000.0)
+            for line in completed.stderr.splitlines():
+                # 格式: "import time: self [us] | cumulative | imported package"
+                module = line.rsplit("|", 1)[-1].strip().split(".")[0]
+                if module in HEAVY_MODULES:
+                    heavy_modules.add(module)
+        report = {"best_ms": min(times), "median_ms": float(np.median(times)), "heavy_modules": sorted(heavy_modules)}
+        previous = benchmark_store.latest("startup", name) if benchmark_store is not None else None
+        if previous is not None and report["best_ms"] > previous["best_ms"] * regression_ratio:
+            print(f"[startup regression] {name}: {previous['best_ms']:.1f} ms -> {report['best_ms']:.1f} ms")
+        if benchmark_store is not None:
+            benchmark_store.record("startup", name, **report)
+        reports.append(dict(report, name=name))
+        print(f"{name:<40}{report['best_ms']:>10.1f} ms  heavy imports: {report['heavy_modules'] or '-'}")
+    return reports
+
+
+def compute_ground_truth(vector_file_path: str, query_file_path: str, metric_type: str, top_k: int, output_file: str):
+    """
+    使用 NumPy 暴力计算 KNN 查询的 Ground Truth（不需要 Milvus），写入文件
+
+    文件格式与 project_2 的 ground_truth.dat 相同：第1行为查询数量，之后每行为一个查询的 top_k 个向量ID
+
+    Args:
+        vector_file_path (str): 向量数据文件路径
+        query_file_path (str): 查询文件路径
+        metric_type (str): L2 或 IP
+        top_k (int): 返回最相似的 k 个结果
+        output_file (str): 输出文件路径
+    """
+    vids, matrix = read_fivecs_matrix(vector_file_path)
+    query_vector_list, _ = read_query(query_file_path)
+    truth_list = exact_knn(vids, matrix, query_vector_list, top_k, metric_type)
+    with open(output_file, "w") as fout:
+        fout.write(f"{len(truth_list)}\n")
+        for truth_ids in truth_list:
+            fout.write(" ".join(map(str, truth_ids)))
+            fout.write("\n")
+    print(f"Ground truth of {len(truth_list)} queries written to {output_file}")
+
+
+def bench_scheduler(
+    query_processor: QueryProcessor,
+    collection_name: str,
+    query_file_path: str,
+    search_params: dict,
+    scheduler_config: dict,
+    hybrid: bool = False,
+    top_k: int = 10,
+    num_tenants: int = 4,
+    clients_per_tenant: int = 4,
+    noisy_factor: int = 4,
+    requests_per_client: int = 50,
+    seed: int = 0,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较并发请求直接调用 QueryProcessor（每个请求一次 RPC）与经过 SearchScheduler 合并为微批的吞吐与延迟：
+    每个租户 clients_per_tenant 个客户端线程（第一个租户为 noisy_factor 倍，模拟高负载租户），
+    每个线程从随机位置开始依次发出 requests_per_client 个查询，上一个返回后才发出下一个
+
+    Args:
+        query_processor (QueryProcessor): QueryProcessor 实例
+        collection_name (str): 已导入数据并建好索引的集合
+        query_file_path (str): 查询文件路径
+        search_params (dict): 查询参数
+        scheduler_config (dict): SearchScheduler 的参数（VdbConfig.SEARCH_SCHEDULER）
+        hybrid (bool): True 测试混合查询（只有过滤条件相同的请求会合并），False 测试KNN查询
+        top_k (int): 返回最相似的 k 个结果
+        num_tenants (int): 租户数
+        clients_per_tenant (int): 每个租户的客户端线程数
+        noisy_factor (int): 第一个租户的客户端线程数倍数
+        requests_per_client (int): 每个客户端线程发出的请求数
+        seed (int): 随机种子
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 两种方式的实验结果
+    """
+    query_vector_list, attr_filter_list = read_query(query_file_path)
+    rng = np.random.default_rng(seed)
+    clients = [(f"tenant{t}", int(rng.integers(len(query_vector_list))))
+               for t in range(num_tenants) for _ in range(clients_per_tenant * (noisy_factor if t == 0 else 1))]
+    # 预热：加载集合
+    query_processor.knn_search(collection_name, "vector", query_vector_list[0], top_k, search_params)
+
+    reports = []
+    for mode in ("direct", "scheduler"):
+        scheduler = SearchScheduler(query_processor, **scheduler_config) if mode == "scheduler" else None
+        latencies = {tenant: [] for tenant, _ in clients}
+        errors = []
+
+        def client(tenant, offset):
+            for i in range(requests_per_client):
+                idx = (offset + i) % len(query_vector_list)
+                filter_expr = attr_filter_list[idx] if hybrid else None
+                start_time = time.perf_counter()
+                try:
+                    if scheduler is None and hybrid:
+                        query_processor.hybrid_search(collection_name, "vector", query_vector_list[idx], filter_expr, top_k, search_params)
+                    elif scheduler is None:
+                        query_processor.knn_search(collection_name, "vector", query_vector_list[idx], top_k, search_params)
+                    else:
+                        scheduler.submit(tenant, collection_name, "vector", query_vector_list[idx], top_k, search_params,
+                                         filter_expr=filter_expr, hybrid=hybrid).result()
+                except Exception as exc:
+                    errors.append(exc)
+                    continue
+                latencies[tenant].append((time.perf_counter() - start_time) * 1000.0)
+
+        threads = [threading.Thread(target=client, args=(tenant, offset)) for tenant, offset in clients]
+        start_time = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_time = time.perf_counter() - start_time
+        metrics = scheduler.metrics() if scheduler is not None else {}
+        if scheduler is not None:
+            scheduler.close()
+
+        all_latencies = [latency for tenant_latencies in latencies.values() for latency in tenant_latencies]
+        report = {
+            "mode": mode,
+            "requests": len(all_latencies),
+            "errors": len(errors),
+            "qps": len(all_latencies) / wall_time if wall_time > 0 else 0.0,
+            "avg_latency_ms": float(np.mean(all_latencies)) if all_latencies else 0.0,
+            "p99_latency_ms": float(np.percentile(all_latencies, 99)) if all_latencies else 0.0,
+            "tenant_avg_latency_ms": {tenant: float(np.mean(values)) if values else 0.0 for tenant, values in latencies.items()},
+            "rpcs": metrics.get("rpcs", len(all_latencies)),
+            "batching_efficiency": metrics.get("batching_efficiency", 1.0),
+            "avg_batch_size": metrics.get("avg_batch_size", 1.0),
+            "avg_queue_delay_ms": metrics.get("avg_queue_delay_ms", 0.0),
+            "p99_queue_delay_ms": metrics.get("p99_queue_delay_ms", 0.0),
+            "rejected": metrics.get("rejected", 0),
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("scheduler", f"{collection_name}_{mode}", top_k=top_k, hybrid=hybrid,
+                                   num_clients=len(clients), scheduler_config=scheduler_config, **report)
+
+    print("=" * 80)
+    print(f"{'mode':<11}{'QPS':>9}{'latency(ms)':>13}{'p99(ms)':>10}{'RPCs':>8}{'req/RPC':>9}{'queue(ms)':>11}{'p99 queue':>11}")
+    for report in reports:
+        print(f"{report['mode']:<11}{report['qps']:>9.1f}{report['avg_latency_ms']:>13.2f}{report['p99_latency_ms']:>10.2f}"
+              f"{report['rpcs']:>8}{report['batching_efficiency']:>9.2f}{report['avg_queue_delay_ms']:>11.2f}"
+              f"{report['p99_queue_delay_ms']:>11.2f}")
+    for report in reports:
+        tenants = ", ".join(f"{tenant} {latency:.2f}" for tenant, latency in report["tenant_avg_latency_ms"].items())
+        print(f"{report['mode']:<11}per-tenant latency(ms): {tenants}")
+    print("=" * 80)
+    return reports
+
+
+def bench_result_cache(
+    query_processor: QueryProcessor,
+    collection_name: str,
+    query_file_path: str,
+    search_params: dict,
+    cache_config: dict,
+    tolerances=(0.0, 0.01, 0.05, 0.1),
+    policies=("lru", "lfu"),
+    num_requests: int = 2000,
+    zipf_skew: float = 1.1,
+    exact_repeat_rate: float = 0.5,
+    jitter: float = 0.01,
+    hybrid: bool = False,
+    top_k: int = 10,
+    seed: int = 0,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    测试近似查询结果缓存（见 ResultCache.py）在不同容差与淘汰策略下的命中率、延迟与召回率：
+    请求按 Zipf 分布从查询文件中选择，其中 exact_repeat_rate 的请求与原查询完全相同，
+    其余加上相对范数为 jitter 的高斯扰动（近似重复的查询向量）；召回率以不使用缓存时同一请求的结果为 Ground Truth
+
+    Args:
+        query_processor (QueryProcessor): QueryProcessor 实例
+        collection_name (str): 已导入数据并建好索引的集合
+        query_file_path (str): 查询文件路径
+        search_params (dict): 查询参数
+        cache_config (dict): SemanticCache 的其他参数（VdbConfig.RESULT_CACHE，enabled 与 verify_rate 会被忽略）
+        tolerances: 待比较的命中容差
+        policies: 待比较的淘汰策略
+        num_requests (int): 请求数
+        zipf_skew (float): 查询热度的 Zipf 偏斜
+        exact_repeat_rate (float): 完全重复的请求比例
+        jitter (float): 近似重复请求的扰动大小（相对查询向量的范数）
+        hybrid (bool): True 测试混合查询，False 测试KNN查询
+        top_k (int): 返回最相似的 k 个结果
+        seed (int): 随机种子
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 不使用缓存与每组缓存设置的实验结果
+    """
+    query_vector_list, attr_filter_list = read_query(query_file_path)
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, len(query_vector_list) + 1) ** zipf_skew
+    picks = rng.choice(len(query_vector_list), num_requests, p=popularity / popularity.sum())
+    requests = []
+    for idx in picks.tolist():
+        vector = np.asarray(query_vector_list[idx], dtype=np.float32)
+        if rng.random() >= exact_repeat_rate:
+            noise = rng.standard_normal(len(vector)).astype(np.float32)
+            vector = vector + noise * (jitter * np.linalg.norm(vector) / np.linalg.norm(noise))
+        requests.append((vector.tolist(), attr_filter_list[idx] if hybrid else None))
+
+    def run_requests():
+        results, latencies = [], []
+        for vector, filter_expr in requests:
+            if hybrid:
+                result_list, latency = query_processor.hybrid_search(collection_name, "vector", vector, filter_expr, top_k, search_params)
+            else:
+                result_list, latency = query_processor.knn_search(collection_name, "vector", vector, top_k, search_params)
+            results.append(hit_ids(result_list).tolist())
+            latencies.append(latency)
+        return results, latencies
+
+    original_cache = query_processor.result_cache
+    query_processor.result_cache = None
+    run_requests()  # 预热：加载集合
+    truth_list, baseline_latencies = run_requests()
+    settings = [(None, None)] + [(policy, tolerance) for policy in policies for tolerance in tolerances]
+    reports = []
+    for policy, tolerance in settings:
+        if policy is None:
+            latencies, recalls, metrics = baseline_latencies, [1.0] * len(truth_list), {}
+        else:
+            config = {key: value for key, value in cache_config.items() if key not in ("enabled", "verify_rate", "policy", "tolerance")}
+            query_processor.result_cache = SemanticCache(policy=policy, tolerance=tolerance, seed=seed, **config)
+            results, latencies = run_requests()
+            recalls = [recall_at_k(truth, result) if truth else 1.0 for truth, result in zip(truth_list, results)]
+            metrics = query_processor.result_cache.metrics()
+        report = {
+            "policy": policy or "none",
+            "tolerance": tolerance,
+            "hit_rate": metrics.get("hit_rate", 0.0),
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "avg_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+            "p99_latency_ms": float(np.percentile(latencies, 99)) if latencies else 0.0,
+            "saved_ms": metrics.get("saved_ms", 0.0),
+            "evictions": metrics.get("evictions", 0),
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("result_cache", f"{collection_name}_{report['policy']}_{tolerance}", top_k=top_k,
+                                   hybrid=hybrid, num_requests=num_requests, zipf_skew=zipf_skew,
+                                   exact_repeat_rate=exact_repeat_rate, jitter=jitter, **report)
+    query_processor.result_cache = original_cache
+
+    print("=" * 80)
+    print(f"{'policy':<8}{'tolerance':>10}{'hit rate':>10}{'recall':>10}{'latency(ms)':>13}{'p99(ms)':>10}{'saved(s)':>10}{'evicted':>9}")
+    for report in reports:
+        tolerance = "-" if report["tolerance"] is None else report["tolerance"]
+        print(f"{report['policy']:<8}{tolerance:>10}{report['hit_rate'] * 100:>9.1f}%{report['recall'] * 100:>9.1f}%"
+              f"{report['avg_latency_ms']:>13.3f}{report['p99_latency_ms']:>10.3f}{report['saved_ms'] / 1000.0:>10.2f}"
+              f"{report['evictions']:>9}")
+    print("=" * 80)
+    return reports
+
+
+BENCHMARKS = ("vector_type", "startup", "filter", "preprocess", "scalar_index", "partition", "bulk_import", "scheduler", "result_cache")
+
+
+def run_benchmarks(vdb_config, names=BENCHMARKS):
+    """
+    运行指定的实验，结果记录到 BENCHMARK_STORE_FILE
+
+    Args:
+        vdb_config (VdbConfig): 配置
+        names: 实验名称，取值见 BENCHMARKS
+    """
+    benchmark_store = BenchmarkStore(vdb_config.BENCHMARK_STORE_FILE)
+    if "startup" in names:
+        bench_startup(benchmark_store=benchmark_store)
+    if "vector_type" in names:
+        # 初始化Milvus客户端
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        # 在 VdbConfig.py 中切换 dataset_name（WIT / Youtube_rgb）以比较不同数据集
+        bench_vector_types(
+            client,
+            collection_prefix=f"{vdb_config.DATASET_NAME[0]}_VT",
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[0],
+            query_file_path=vdb_config.QUERY_WORKLOAD[0]["query_file_path"],
+            metric_type=vdb_config.DISTANCE_TYPE,
+            rerank_factor=vdb_config.RERANK_FACTOR,
+            benchmark_store=benchmark_store,
+        )
+    if "filter" in names:
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        bench_filter_routes(
+            client,
+            collection_name=vdb_config.DATASET_NAME[0],
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[0],
+            meta_file_path=vdb_config.DATASET_ATTR_PATH[0],
+            query_file_path=vdb_config.QUERY_WORKLOAD[0]["query_file_path"],
+            metric_type=vdb_config.DISTANCE_TYPE,
+            search_params=vdb_config.SEARCH_PARAMS[0],
+            vector_type=vdb_config.VECTOR_TYPE,
+            benchmark_store=benchmark_store,
+        )
+    if "preprocess" in names:
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        bench_preprocess(
+            client,
+            collection_prefix=f"{vdb_config.DATASET_NAME[1]}_PP",
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[1],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            metric_type=vdb_config.DISTANCE_TYPE,
+            index_params=vdb_config.INDEX_PARAMS[1],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            method=vdb_config.PREPROCESS.get("method") or "pca",
+            normalize=vdb_config.PREPROCESS.get("normalize", False),
+            benchmark_store=benchmark_store,
+        )
+    if "scalar_index" in names:
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        bench_scalar_index(
+            client,
+            collection_name=vdb_config.DATASET_NAME[1],
+            fields_config=vdb_config.SCHEMA_FIELD_CONFIG[1],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            metric_type=vdb_config.DISTANCE_TYPE,
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            vector_type=vdb_config.VECTOR_TYPE,
+            transform=load_or_fit_transform(vdb_config),
+            benchmark_store=benchmark_store,
+        )
+    if "partition" in names:
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        # 整数属性（WIT 的 size）按区间划分，字符串属性（YouTube 的 label）按哈希划分
+        fields_config = vdb_config.SCHEMA_FIELD_CONFIG[1]
+        partition_mode = vdb_config.PARTITION.get("mode", "none")
+        if partition_mode == "none":
+            partition_mode = "range" if fields_config[2]["dtype"] == DataType.INT64 else "hash"
+        bench_partitions(
+            client,
+            collection_prefix=f"{vdb_config.DATASET_NAME[1]}_PT",
+            fields_config=fields_config,
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[1],
+            meta_file_path=vdb_config.DATASET_ATTR_PATH[1],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            metric_type=vdb_config.DISTANCE_TYPE,
+            index_params=vdb_config.INDEX_PARAMS[1],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            mode=partition_mode,
+            vector_type=vdb_config.VECTOR_TYPE,
+            benchmark_store=benchmark_store,
+        )
+    if "bulk_import" in names:
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        bulk_config = vdb_config.BULK_IMPORT
+        bench_bulk_import(
+            client,
+            collection_prefix=f"{vdb_config.DATASET_NAME[1]}_BI",
+            fields_config=vdb_config.SCHEMA_FIELD_CONFIG[1],
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[1],
+            meta_file_path=vdb_config.DATASET_ATTR_PATH[1],
+            object_store_config=bulk_config["object_store"],
+            vector_type=vdb_config.VECTOR_TYPE,
+            rows_per_file=bulk_config.get("rows_per_file", 1000000),
+            staging_dir=bulk_config.get("staging_dir", "bulk_staging"),
+            benchmark_store=benchmark_store,
+        )
+    if "scheduler" in names:
+        bench_scheduler(
+            create_query_processor(vdb_config),
+            collection_name=vdb_config.QUERY_WORKLOAD[1]["collection_name"],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            scheduler_config=vdb_config.SEARCH_SCHEDULER,
+            benchmark_store=benchmark_store,
+        )
+    if "result_cache" in names:
+        bench_result_cache(
+            create_query_processor(vdb_config),
+            collection_name=vdb_config.QUERY_WORKLOAD[1]["collection_name"],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            cache_config=vdb_config.RESULT_CACHE,
+            benchmark_store=benchmark_store,
+        )
+
+
+if __name__ == "__main__":
+    from VdbConfig import vdb_config
+    configure_cache(vdb_config)
+    run_benchmarks(vdb_config)
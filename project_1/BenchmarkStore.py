@@ -0,0 +1,65 @@
+import json
+import os
+import time
+
+
+class BenchmarkStore:
+    def __init__(self, file_name: str = "benchmark.jsonl"):
+        """
+        初始化 BenchmarkStore 类，实验结果以 JSON Lines 的形式追加写入文件
+
+        Args:
+            file_name (str): 结果文件路径
+        """
+        self.file_name = file_name
+
+    def record(self, category: str, name: str, **metrics) -> dict:
+        """
+        追加一条实验记录
+
+        Args:
+            category (str): 实验类别，例如 "index_build"、"search"
+            name (str): 实验对象，例如集合名称
+            **metrics: 实验指标，需可被 JSON 序列化
+
+        Returns:
+            dict: 写入的记录
+        """
+        entry = {"timestamp": time.time(), "category": category, "name": name}
+        entry.update(metrics)
+        with open(self.file_name, "a") as fout:
+            fout.write(json.dumps(entry, ensure_ascii=False))
+            fout.write("\n")
+        return entry
+
+    def query(self, category: str = None, name: str = None) -> list:
+        """
+        按类别与名称读取历史记录（按写入顺序）
+
+        Args:
+            category (str): 实验类别，None 表示不过滤
+            name (str): 实验对象，None 表示不过滤
+
+        Returns:
+            list: 记录列表
+        """
+        if not os.path.exists(self.file_name):
+            return []
+        entries = []
+        with open(self.file_name, "r") as fin:
+            for line in fin:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if category is not None and entry.get("category") != category:
+                    continue
+                if name is not None and entry.get("name") != name:
+                    continue
+                entries.append(entry)
+        return entries
+
+    def latest(self, category: str, name: str):
+        """返回某实验对象最近一次的记录，不存在时返回 None"""
+        entries = self.query(category, name)
+        return entries[-1] if entries else None
@@ -0,0 +1,344 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from FileIO import float32_to_bfloat16_bits, binarize
+from LazyImport import LazyImport
+
+# pyarrow 与 minio 只在选择 Parquet 格式 / MinIO 存储时才导入
+pa = LazyImport("pyarrow")
+pq = LazyImport("pyarrow.parquet")
+Minio = LazyImport("minio", "Minio")
+
+# utility.do_bulk_insert 支持的文件格式：
+#   numpy：每个文件批次是一个目录，每个字段一个 <字段名>.npy（内存映射写入，内存占用与文件大小无关）
+#   parquet：每个文件批次是一个 .parquet 文件，每个数据块写成一个 row group
+BULK_FORMATS = ("numpy", "parquet")
+
+# 导入任务的终止状态（pymilvus BulkInsertState.state_name）
+COMPLETED_STATE = "Completed"
+FAILED_STATES = ("Failed", "Failed and cleaned")
+
+
+def bulk_vector_spec(dim: int, vector_type: str = "float32") -> tuple:
+    """
+    向量列在导入文件中的 (dtype, 每行形状)：float16 / bfloat16 以每个向量 dim * 2 个字节（uint8）表示，
+    binary 以打包后的 dim / 8 个字节表示
+
+    Args:
+        dim (int): 向量维度
+        vector_type (str): 集合中向量的存储类型
+
+    Returns:
+        tuple: (numpy.dtype, 每行形状)
+    """
+    if vector_type == "float32":
+        return np.dtype(np.float32), (dim,)
+    if vector_type in ("float16", "bfloat16"):
+        return np.dtype(np.uint8), (dim * 2,)
+    if vector_type == "binary":
+        return np.dtype(np.uint8), (dim // 8,)
+    raise ValueError(f"Unknown vector type: {vector_type}")
+
+
+def bulk_vector_column(matrix: np.ndarray, vector_type: str = "float32") -> np.ndarray:
+    """把浮点矩阵转换为导入文件中的向量列（格式见 bulk_vector_spec）"""
+    matrix = np.asarray(matrix)
+    if vector_type == "float32":
+        return matrix.astype(np.float32, copy=False)
+    if vector_type == "float16":
+        return np.ascontiguousarray(matrix.astype(np.float16)).view(np.uint8)
+    if vector_type == "bfloat16":
+        return np.ascontiguousarray(float32_to_bfloat16_bits(matrix)).view(np.uint8)
+    if vector_type == "binary":
+        return binarize(matrix)
+    raise ValueError(f"Unknown vector type: {vector_type}")
+
+
+class NumpyFileWriter:
+    def __init__(self, path: str, num_rows: int, columns: dict):
+        """
+        一个文件批次的 NumPy 列文件：预先按行数创建内存映射的 .npy 文件，数据块直接写入对应的位置
+
+        Args:
+            path (str): 文件批次的目录
+            num_rows (int): 文件批次的行数
+            columns (dict): 字段名 -> (dtype, 每行形状)
+        """
+        os.makedirs(path, exist_ok=True)
+        self.files = [os.path.join(path, f"{name}.npy") for name in columns]
+        self.arrays = {
+            name: np.lib.format.open_memmap(file_name, mode="w+", dtype=dtype, shape=(num_rows,) + tuple(shape))
+            for (name, (dtype, shape)), file_name in zip(columns.items(), self.files)
+        }
+        self.count = 0
+
+    def write(self, block: dict) -> None:
+        rows = len(next(iter(block.values())))
+        for name, array in self.arrays.items():
+            array[self.count:self.count + rows] = block[name]
+        self.count += rows
+
+    def close(self) -> list:
+        for array in self.arrays.values():
+            array.flush()
+        self.arrays = {}
+        return self.files
+
+
+class ParquetFileWriter:
+    def __init__(self, path: str, num_rows: int, columns: dict):
+        """
+        一个文件批次的 Parquet 文件：每个数据块写成一个 row group，向量列为 list<float> / list<uint8>
+
+        Args:
+            path (str): 文件路径（不含扩展名）
+            num_rows (int): 文件批次的行数（Parquet 不需要预先分配，仅用于检查）
+            columns (dict): 字段名 -> (dtype, 每行形状)
+        """
+        self.columns = columns
+        self.num_rows = num_rows
+        self.files = [f"{path}.parquet"]
+        self.schema = pa.schema([pa.field(name, self._arrow_type(dtype, shape)) for name, (dtype, shape) in columns.items()])
+        self.writer = pq.ParquetWriter(self.files[0], self.schema)
+        self.count = 0
+
+    @staticmethod
+    def _arrow_type(dtype, shape):
+        dtype = np.dtype(dtype)
+        if dtype.kind == "U":
+            value_type = pa.string()
+        else:
+            value_type = pa.from_numpy_dtype(dtype)
+        return pa.list_(value_type) if shape else value_type
+
+    def write(self, block: dict) -> None:
+        arrays = []
+        for name, (dtype, shape) in self.columns.items():
+            values = np.asarray(block[name])
+            if shape:
+                width = int(np.prod(shape))
+                offsets = np.arange(0, len(values) * width + 1, width, dtype=np.int32)
+                arrays.append(pa.ListArray.from_arrays(pa.array(offsets), pa.array(values.reshape(-1))))
+            else:
+                arrays.append(pa.array(values.tolist() if values.dtype.kind == "U" else values))
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.count += len(arrays[0])
+
+    def close(self) -> list:
+        self.writer.close()
+        if self.count != self.num_rows:
+            raise RuntimeError(f"{self.files[0]}: expected {self.num_rows} rows, wrote {self.count}")
+        return self.files
+
+
+def write_bulk_files(
+    blocks,
+    total_rows: int,
+    columns: dict,
+    output_dir: str,
+    file_format: str = "numpy",
+    rows_per_file: int = 1000000,
+    partition_ids=None,
+    partition_names=None,
+    skip=()
+) -> list:
+    """
+    把按顺序到达的数据块流式写成导入文件：每 rows_per_file 行为一个文件批次，显式分区时每个文件批次再按分区拆分，
+    同一时刻只有当前文件批次的文件处于打开状态
+
+    Args:
+        blocks: 数据块迭代器，每个数据块是 字段名 -> 数组 的字典，行按数据文件中的顺序排列
+        total_rows (int): 总行数
+        columns (dict): 字段名 -> (dtype, 每行形状)
+        output_dir (str): 输出目录
+        file_format (str): "numpy" 或 "parquet"
+        rows_per_file (int): 每个文件批次的行数
+        partition_ids (numpy.ndarray): 每行所属的分区编号，None 表示写入默认分区
+        partition_names (list): 分区编号对应的分区名称
+        skip: 已经导入完成的文件批次名称，不再生成文件
+
+    Returns:
+        list: 文件批次 [{"name": 名称, "files": 本地文件, "partition": 分区名称, "rows": 行数}]
+    """
+    if file_format not in BULK_FORMATS:
+        raise ValueError(f"Unknown bulk import format: {file_format}")
+    writer_class = NumpyFileWriter if file_format == "numpy" else ParquetFileWriter
+    os.makedirs(output_dir, exist_ok=True)
+    batches, writers = [], {}
+
+    def open_file(file_index):
+        sid, eid = file_index * rows_per_file, min((file_index + 1) * rows_per_file, total_rows)
+        if partition_ids is None:
+            counts = {None: eid - sid}
+        else:
+            counts = {pid: int(count) for pid, count in enumerate(np.bincount(partition_ids[sid:eid]).tolist()) if count}
+        for pid, count in counts.items():
+            name = f"{file_index:05d}" if pid is None else f"{file_index:05d}_p{pid}"
+            if name in skip:
+                writers[pid] = None
+                continue
+            batch = {"name": name, "files": [], "rows": count,
+                     "partition": None if pid is None else partition_names[pid]}
+            writers[pid] = (writer_class(os.path.join(output_dir, name), count, columns), batch)
+            batches.append(batch)
+
+    def close_file():
+        for entry in writers.values():
+            if entry is not None:
+                writer, batch = entry
+                batch["files"] = writer.close()
+        writers.clear()
+
+    row, file_index = 0, -1
+    for block in blocks:
+        rows = len(next(iter(block.values())))
+        offset = 0
+        while offset < rows:
+            if row // rows_per_file != file_index:
+                close_file()
+                file_index = row // rows_per_file
+                open_file(file_index)
+            take = min(rows - offset, (file_index + 1) * rows_per_file - row)
+            piece = {name: values[offset:offset + take] for name, values in block.items()}
+            if partition_ids is None:
+                if writers[None] is not None:
+                    writers[None][0].write(piece)
+            else:
+                piece_ids = partition_ids[row:row + take]
+                for pid in np.unique(piece_ids).tolist():
+                    if writers[pid] is not None:
+                        mask = piece_ids == pid
+                        writers[pid][0].write({name: values[mask] for name, values in piece.items()})
+            offset += take
+            row += take
+    close_file()
+    if row != total_rows:
+        raise RuntimeError(f"Expected {total_rows} rows, got {row}")
+    return batches
+
+
+class LocalObjectStore:
+    def __init__(self, root: str):
+        """
+        本地文件系统代替对象存储（用于测试）：文件复制到 root 下，返回相对 root 的路径。
+        root 应为 Milvus 读取导入文件的位置，例如单机版使用本地存储时的 localStorage.path
+
+        Args:
+            root (str): 存储根目录
+        """
+        self.root = root
+
+    def upload(self, local_files: list, prefix: str) -> list:
+        remote_files = []
+        for local_file in local_files:
+            remote_file = f"{prefix}/{os.path.basename(local_file)}"
+            target = os.path.join(self.root, remote_file)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.abspath(local_file) != os.path.abspath(target):
+                shutil.copyfile(local_file, target)
+            remote_files.append(remote_file)
+        return remote_files
+
+
+class MinioObjectStore:
+    def __init__(self, endpoint: str, access_key: str, secret_key: str, bucket: str, secure: bool = False):
+        """
+        上传到 Milvus 使用的 MinIO bucket，返回 bucket 内的对象路径
+
+        Args:
+            endpoint (str): MinIO 地址，例如 "localhost:9000"
+            access_key (str): 访问密钥
+            secret_key (str): 私有密钥
+            bucket (str): Milvus 使用的 bucket（milvus.yaml 中的 minio.bucketName）
+            secure (bool): 是否使用 HTTPS
+        """
+        self.client = Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=secure)
+        self.bucket = bucket
+        if not self.client.bucket_exists(bucket):
+            self.client.make_bucket(bucket)
+
+    def upload(self, local_files: list, prefix: str) -> list:
+        remote_files = []
+        for local_file in local_files:
+            remote_file = f"{prefix}/{os.path.basename(local_file)}"
+            self.client.fput_object(self.bucket, remote_file, local_file)
+            remote_files.append(remote_file)
+        return remote_files
+
+
+def create_object_store(config: dict):
+    """
+    根据 VdbConfig.BULK_IMPORT["object_store"] 创建对象存储
+
+    Args:
+        config (dict): {"type": "local", "root": 目录} 或
+                       {"type": "minio", "endpoint": ..., "access_key": ..., "secret_key": ..., "bucket": ...}
+    """
+    store_type = config.get("type", "local")
+    if store_type == "local":
+        return LocalObjectStore(config.get("root", "bulk_store"))
+    if store_type == "minio":
+        return MinioObjectStore(config["endpoint"], config["access_key"], config["secret_key"],
+                                config.get("bucket", "a-bucket"), config.get("secure", False))
+    raise ValueError(f"Unknown object store: {store_type}")
+
+
+class BulkImportJobs:
+    def __init__(self, checkpoint_dir: str, collection_name: str):
+        """
+        记录某个集合的导入任务，用于跟踪进度与断点续传（只重新提交未完成的文件批次）
+
+        任务文件内容：
+            {
+                "source": 数据源描述（文件、总行数、文件格式、每个文件批次的行数）,
+                "jobs": {文件批次名称: {"task_id", "files", "partition", "rows", "state", "row_count", "failed_reason"}}
+            }
+
+        Args:
+            checkpoint_dir (str): 检查点目录
+            collection_name (str): 集合名称
+        """
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.file_name = os.path.join(checkpoint_dir, f"{collection_name}.bulk.json")
+        self.source = {}
+        self.jobs = {}
+        if os.path.exists(self.file_name):
+            with open(self.file_name, "r") as fin:
+                content = json.load(fin)
+            self.source = content.get("source", {})
+            self.jobs = content.get("jobs", {})
+
+    def reset(self, source: dict) -> None:
+        self.source = source
+        self.jobs = {}
+        self.save()
+
+    def completed(self) -> set:
+        return {name for name, job in self.jobs.items() if job.get("state") == COMPLETED_STATE}
+
+    def completed_rows(self) -> int:
+        return sum(self.jobs[name]["rows"] for name in self.completed())
+
+    def pending(self) -> list:
+        return [name for name, job in self.jobs.items() if job.get("state") not in (COMPLETED_STATE,) + FAILED_STATES]
+
+    def submit(self, batch: dict, task_id: int, remote_files: list) -> None:
+        self.jobs[batch["name"]] = {"task_id": task_id, "files": remote_files, "partition": batch["partition"],
+                                    "rows": batch["rows"], "state": "Pending", "row_count": 0, "failed_reason": ""}
+        self.save()
+
+    def update(self, name: str, state) -> None:
+        """记录 utility.get_bulk_insert_state 返回的任务状态"""
+        job = self.jobs[name]
+        job.update(state=state.state_name, row_count=state.row_count, failed_reason=state.failed_reason)
+        self.save()
+
+    def save(self) -> None:
+        """原子地写入任务文件"""
+        tmp_file_name = self.file_name + ".tmp"
+        with open(tmp_file_name, "w") as fout:
+            json.dump({"source": self.source, "jobs": self.jobs}, fout)
+        os.replace(tmp_file_name, self.file_name)
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+# 合成数据集生成器：按 vector_0.fivecs / meta_0.txt / query.txt 的格式分块流式写出，内存占用与数据规模无关
+ATTR_TYPES = ("int", "string")
+ATTR_DISTRIBUTIONS = ("uniform", "zipf")
+DEFAULT_SELECTIVITIES = (0.001, 0.01, 0.1, 0.5, 1.0)
+
+
+def zipf_weights(num_values: int, skew: float):
+    """第 k 个取值的概率与 1 / (k + 1)^skew 成正比，skew = 0 时为均匀分布"""
+    weights = 1.0 / np.arange(1, num_values + 1, dtype=np.float64) ** skew
+    return weights / weights.sum()
+
+
+class ClusteredGaussian:
+    def __init__(self, dim: int, num_clusters: int = 100, cluster_std: float = 0.5, skew: float = 0.0, seed: int = 0):
+        """
+        初始化 ClusteredGaussian 类：高斯混合分布，聚类中心服从标准正态分布，每个聚类内各维度的标准差为 cluster_std
+
+        Args:
+            dim (int): 向量维度
+            num_clusters (int): 聚类数
+            cluster_std (float): 聚类内的标准差（越小聚类越紧密）
+            skew (float): 聚类大小的 Zipf 偏斜，0 表示各聚类大小相同
+            seed (int): 随机种子（决定聚类中心）
+        """
+        rng = np.random.default_rng(seed)
+        self.dim = dim
+        self.centers = rng.standard_normal((num_clusters, dim), dtype=np.float32)
+        self.weights = zipf_weights(num_clusters, skew)
+        self.cluster_std = cluster_std
+
+    def sample(self, rng, num_vectors: int):
+        """
+        采样一批向量
+
+        Returns:
+            tuple: (所属聚类 (n,), float32 向量 (n, dim))
+        """
+        clusters = rng.choice(len(self.centers), num_vectors, p=self.weights)
+        vectors = rng.standard_normal((num_vectors, self.dim), dtype=np.float32)
+        vectors *= self.cluster_std
+        vectors += self.centers[clusters]
+        return clusters, vectors
+
+
+class AttrDistribution:
+    def __init__(self, name: str = "size", attr_type: str = "int", cardinality: int = 1000,
+                 distribution: str = "uniform", skew: float = 1.0, correlation: float = 0.0):
+        """
+        初始化 AttrDistribution 类：属性取值的分布，取值编码为 0 ~ cardinality - 1（string 类型为 label_{编码}）
+
+        Args:
+            name (str): 属性名称
+            attr_type (str): "int" 或 "string"
+            cardinality (int): 不同取值的个数
+            distribution (str): "uniform" 或 "zipf"（编码越小越常见）
+            skew (float): Zipf 分布的偏斜
+            correlation (float): 属性与向量所属聚类相关的比例，相关的行按聚类编号映射到取值（不改变边缘分布），
+                过滤条件与查询向量所在区域相关，更接近真实负载
+        """
+        if attr_type not in ATTR_TYPES:
+            raise ValueError(f"Unknown attribute type: {attr_type}")
+        if distribution not in ATTR_DISTRIBUTIONS:
+            raise ValueError(f"Unknown attribute distribution: {distribution}")
+        self.name = name
+        self.attr_type = attr_type
+        self.cardinality = cardinality
+        self.distribution = distribution
+        self.correlation = correlation
+        self.pmf = zipf_weights(cardinality, skew if distribution == "zipf" else 0.0)
+        self.cdf = np.cumsum(self.pmf)
+
+    def sample(self, rng, clusters, num_clusters: int):
+        """按分布采样一批属性编码，相关的行取聚类编号对应分位数上的取值"""
+        codes = rng.choice(self.cardinality, len(clusters), p=self.pmf)
+        if self.correlation > 0:
+            correlated = rng.random(len(clusters)) < self.correlation
+            quantiles = (clusters[correlated] + rng.random(int(correlated.sum()))) / num_clusters
+            codes[correlated] = np.minimum(np.searchsorted(self.cdf, quantiles), self.cardinality - 1)
+        return codes
+
+    def format(self, codes) -> list:
+        if self.attr_type == "int":
+            return [str(code) for code in codes.tolist()]
+        return [f"label_{code}" for code in codes.tolist()]
+
+    def condition(self, selectivity: float):
+        """
+        选择率最接近 selectivity 的过滤条件（query.txt 中的写法，多个条件以空格分隔，读取时以 and 连接）
+
+        int 属性选择一个连续的取值区间 (lo, hi]，任意分布下都能接近目标选择率；string 属性选择一个取值
+
+        Returns:
+            tuple: (过滤条件，例如 size<=99、size>9 size<=20 或 label="label_3"；期望选择率)
+        """
+        if self.attr_type == "string":
+            code = int(np.argmin(np.abs(self.pmf - selectivity)))
+            return f'{self.name}="label_{code}"', float(self.pmf[code])
+        # 区间 [lo, hi) 的概率为 cdf0[hi] - cdf0[lo]，对每个 lo 二分查找最接近的 hi
+        cdf0 = np.concatenate([[0.0], self.cdf])
+        lo = np.arange(self.cardinality)
+        hi = np.searchsorted(cdf0, cdf0[lo] + selectivity)
+        candidates = np.stack([np.clip(hi - 1, lo + 1, self.cardinality), np.clip(hi, lo + 1, self.cardinality)])
+        errors = np.abs(cdf0[candidates] - cdf0[lo] - selectivity)
+        best = np.unravel_index(np.argmin(errors), errors.shape)
+        lo, hi = int(best[1]), int(candidates[best])
+        mass = float(cdf0[hi] - cdf0[lo])
+        # query.txt 中的 "=" 会被替换为 "=="，因此下界写成 ">"
+        if lo == 0:
+            return f"{self.name}<={hi - 1}", mass
+        return f"{self.name}>{lo - 1} {self.name}<={hi - 1}", mass
+
+
+def write_fivecs_header(fout, num_vectors: int, dim: int) -> None:
+    """vector_0.fivecs 的文件头：int32 向量数与维度"""
+    np.array([num_vectors, dim], dtype="<i4").tofile(fout)
+
+
+def write_fivecs_chunk(fout, vids, matrix) -> None:
+    """追加一块记录：int32 ID + float32 向量"""
+    record_dtype = np.dtype([("vid", "<i4"), ("vec", "<f4", (matrix.shape[1],))])
+    records = np.empty(len(matrix), dtype=record_dtype)
+    records["vid"] = vids
+    records["vec"] = matrix
+    records.tofile(fout)
+
+
+def generate_dataset(
+    output_dir: str,
+    num_vectors: int,
+    dim: int,
+    num_queries: int = 1000,
+    num_clusters: int = 100,
+    cluster_std: float = 0.5,
+    cluster_skew: float = 0.0,
+    attr: AttrDistribution = None,
+    selectivities=DEFAULT_SELECTIVITIES,
+    chunk_size: int = 65536,
+    seed: int = 0,
+    verbose: bool = True
+) -> dict:
+    """
+    生成合成数据集：vector_0.fivecs、meta_0.txt、query.txt，以及记录生成参数与每个查询期望选择率的 dataset.json
+
+    数据按 chunk_size 分块生成并立即写出，第 i 块使用种子 (seed, i)，结果与分块以外的因素无关，
+    内存占用只与 chunk_size * dim 有关，可以生成上亿条向量
+
+    Args:
+        output_dir (str): 输出目录（放在 DATASET_ROOT 下即可作为数据集名称使用）
+        num_vectors (int): 向量数
+        dim (int): 向量维度
+        num_queries (int): 查询数
+        num_clusters (int): 聚类数
+        cluster_std (float): 聚类内的标准差
+        cluster_skew (float): 聚类大小的 Zipf 偏斜
+        attr (AttrDistribution): 属性分布，None 表示均匀分布的 int 属性 size
+        selectivities: 查询过滤条件的目标选择率，各查询依次循环使用
+        chunk_size (int): 每块生成的向量数
+        seed (int): 随机种子
+        verbose (bool): 是否输出进度
+
+    Returns:
+        dict: 数据集描述（同 dataset.json）
+    """
+    if num_vectors >= 2**31:
+        raise ValueError("vector_0.fivecs stores int32 ids, num_vectors must be < 2^31")
+    attr = attr or AttrDistribution()
+    mixture = ClusteredGaussian(dim, num_clusters, cluster_std, cluster_skew, seed)
+    os.makedirs(output_dir, exist_ok=True)
+    vector_path = os.path.join(output_dir, "vector_0.fivecs")
+    meta_path = os.path.join(output_dir, "meta_0.txt")
+    query_path = os.path.join(output_dir, "query.txt")
+
+    start_time = time.time()
+    with open(vector_path, "wb") as vector_file, open(meta_path, "w", encoding="utf-8") as meta_file:
+        write_fivecs_header(vector_file, num_vectors, dim)
+        meta_file.write(f"{num_vectors} 1\n{attr.name} {attr.attr_type}\n")
+        for chunk_id, sid in enumerate(range(0, num_vectors, chunk_size)):
+            rng = np.random.default_rng([seed, chunk_id])
+            clusters, matrix = mixture.sample(rng, min(chunk_size, num_vectors - sid))
+            write_fivecs_chunk(vector_file, np.arange(sid, sid + len(matrix)), matrix)
+            meta_file.write("\n".join(attr.format(attr.sample(rng, clusters, num_clusters))))
+            meta_file.write("\n")
+            if verbose and (chunk_id + 1) % 64 == 0:
+                elapsed = time.time() - start_time
+                print(f"Generated {sid + len(matrix)}/{num_vectors} vectors "
+                      f"({vector_file.tell() / 2**20 / max(elapsed, 1e-6):.1f} MB/s)")
+
+    # 查询向量来自同一个混合分布（使用数据块不会用到的种子）
+    rng = np.random.default_rng([seed, 2**32 - 1])
+    _, queries = mixture.sample(rng, num_queries)
+    conditions = [attr.condition(selectivities[qid % len(selectivities)]) for qid in range(num_queries)]
+    with open(query_path, "w", encoding="utf-8") as query_file:
+        query_file.write(f"{num_queries} {dim}\n")
+        for query, (condition, _) in zip(queries, conditions):
+            query_file.write(" ".join(f"{value:.6f}" for value in query.tolist()))
+            query_file.write(f" {condition}\n")
+
+    manifest = {
+        "num_vectors": num_vectors,
+        "dim": dim,
+        "num_queries": num_queries,
+        "num_clusters": num_clusters,
+        "cluster_std": cluster_std,
+        "cluster_skew": cluster_skew,
+        "attr": {"name": attr.name, "type": attr.attr_type, "cardinality": attr.cardinality,
+                 "distribution": attr.distribution, "correlation": attr.correlation},
+        "query_selectivity": [selectivity for _, selectivity in conditions],
+        "seed": seed,
+    }
+    with open(os.path.join(output_dir, "dataset.json"), "w") as fout:
+        json.dump(manifest, fout, indent=2)
+    if verbose:
+        print(f"Dataset written to {output_dir}: {num_vectors} x {dim} in {time.time() - start_time:.1f} s")
+    return manifest
+
+
+def add_arguments(parser):
+    """生成器的命令行参数（DataGenerator.py 与 VdbCli.py generate 共用）"""
+    parser.add_argument("--output", required=True, help="输出目录，例如 DATASET_ROOT/Synthetic_1M")
+    parser.add_argument("--num-vectors", type=int, default=1000000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--num-queries", type=int, default=1000)
+    parser.add_argument("--num-clusters", type=int, default=100)
+    parser.add_argument("--cluster-std", type=float, default=0.5)
+    parser.add_argument("--cluster-skew", type=float, default=0.0)
+    parser.add_argument("--attr-name", default="size")
+    parser.add_argument("--attr-type", choices=ATTR_TYPES, default="int")
+    parser.add_argument("--attr-cardinality", type=int, default=1000)
+    parser.add_argument("--attr-distribution", choices=ATTR_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--attr-skew", type=float, default=1.0)
+    parser.add_argument("--attr-correlation", type=float, default=0.0)
+    parser.add_argument("--selectivities", nargs="+", type=float, default=list(DEFAULT_SELECTIVITIES))
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def run(args) -> dict:
+    attr = AttrDistribution(args.attr_name, args.attr_type, args.attr_cardinality,
+                            args.attr_distribution, args.attr_skew, args.attr_correlation)
+    return generate_dataset(args.output, args.num_vectors, args.dim, args.num_queries, args.num_clusters,
+                            args.cluster_std, args.cluster_skew, attr, args.selectivities, args.chunk_size, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成合成数据集（vector_0.fivecs、meta_0.txt、query.txt）")
+    add_arguments(parser)
+    run(parser.parse_args(argv))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+from Profiler import profiler
+
+ENTRY_FILE = "entry.json"
+CACHE_VERSION = 1
+
+
+class EmbeddingCache:
+    def __init__(self):
+        """
+        初始化 EmbeddingCache 类：原始数据文件解析结果的持久化缓存（默认关闭，见 configure）
+
+        每个条目是缓存目录下的一个子目录，目录名由源文件的路径、mtime 与大小计算（源文件变化后自动失效），
+        其中保存 float32 向量、ID 等 .npy 文件，读取时通过 np.load(mmap_mode="r") 内存映射打开，
+        多个进程共享操作系统的页缓存；条目总大小超过配额时按最近访问时间淘汰
+        """
+        self.cache_dir = None
+        self.quota_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_dir is not None
+
+    def configure(self, cache_dir: str, quota_gb: float = 32) -> None:
+        """
+        开启缓存
+
+        Args:
+            cache_dir (str): 缓存目录，空字符串或 None 表示关闭缓存
+            quota_gb (float): 磁盘配额（GB）
+        """
+        self.cache_dir = cache_dir or None
+        self.quota_bytes = int(quota_gb * 2**30)
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(source_path: str, kind: str) -> str:
+        """由源文件的绝对路径、mtime、大小与解析方式计算条目名"""
+        stat = os.stat(source_path)
+        text = f"{CACHE_VERSION}:{kind}:{os.path.abspath(source_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+        return f"{kind}-{hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]}"
+
+    def load(self, source_path: str, kind: str, builder) -> dict:
+        """
+        读取缓存条目，不存在时调用 builder 解析源文件并写入缓存
+
+        Args:
+            source_path (str): 源文件路径
+            kind (str): 解析方式，例如 "fivecs"、"query"
+            builder (callable): 返回 {名称: numpy.ndarray} 的函数
+
+        Returns:
+            dict: 名称 -> 内存映射的只读数组
+        """
+        entry_dir = os.path.join(self.cache_dir, self.key(source_path, kind))
+        entry_file = os.path.join(entry_dir, ENTRY_FILE)
+        cached = self._open(entry_dir, entry_file)
+        if cached is not None:
+            profiler.count("embedding_cache.hit")
+            return cached
+        profiler.count("embedding_cache.miss")
+        with profiler.span("embedding_cache.build", kind=kind):
+            arrays = builder()
+        self._store(entry_dir, source_path, kind, arrays)
+        self.evict(keep=entry_dir)
+        # 刚写入的条目也可能被其他进程淘汰，此时直接返回解析结果
+        cached = self._open(entry_dir, entry_file)
+        return cached if cached is not None else arrays
+
+    @staticmethod
+    def _open(entry_dir: str, entry_file: str):
+        """内存映射打开条目，条目不存在（或在打开过程中被其他进程的 evict 删除）时返回 None"""
+        try:
+            # 以条目文件的 mtime 记录最近访问时间（LRU）
+            os.utime(entry_file)
+            with open(entry_file, "r") as fin:
+                names = json.load(fin)["arrays"]
+            return {name: np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode="r") for name in names}
+        except FileNotFoundError:
+            return None
+
+    def _store(self, entry_dir: str, source_path: str, kind: str, arrays: dict) -> None:
+        """先写入临时目录再重命名，多个进程同时构建同一条目时只保留先完成的一个"""
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+        nbytes = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+            nbytes += array.nbytes
+        with open(os.path.join(tmp_dir, ENTRY_FILE), "w") as fout:
+            json.dump({
+                "source": os.path.abspath(source_path),
+                "kind": kind,
+                "arrays": list(arrays),
+                "bytes": nbytes,
+                "created": time.time(),
+            }, fout)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def entries(self) -> list:
+        """所有条目：(目录, 最近访问时间, 字节数)，按最近访问时间从旧到新排序"""
+        result = []
+        if not self.enabled or not os.path.isdir(self.cache_dir):
+            return result
+        for name in os.listdir(self.cache_dir):
+            entry_file = os.path.join(self.cache_dir, name, ENTRY_FILE)
+            try:
+                with open(entry_file, "r") as fin:
+                    nbytes = json.load(fin)["bytes"]
+                result.append((os.path.join(self.cache_dir, name), os.path.getmtime(entry_file), nbytes))
+            except (OSError, ValueError, KeyError):
+                continue
+        result.sort(key=lambda entry: entry[1])
+        return result
+
+    def evict(self, keep: str = None) -> int:
+        """
+        按最近访问时间淘汰条目直到总大小不超过配额（已经打开的内存映射在 Linux 上仍然有效）
+
+        Args:
+            keep (str): 不淘汰的条目目录（刚写入的条目）
+
+        Returns:
+            int: 淘汰的条目数
+        """
+        entries = self.entries()
+        total = sum(nbytes for _, _, nbytes in entries)
+        evicted = 0
+        for entry_dir, _, nbytes in entries:
+            if total <= self.quota_bytes:
+                break
+            if entry_dir == keep:
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= nbytes
+            evicted += 1
+        if evicted:
+            profiler.count("embedding_cache.evict", evicted)
+        return evicted
+
+    def clear(self) -> None:
+        for entry_dir, _, _ in self.entries():
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+
+# 全局唯一的缓存实例，由 configure_cache 根据 VdbConfig 开启
+embedding_cache = EmbeddingCache()
+
+
+def configure_cache(vdb_config) -> EmbeddingCache:
+    """根据 VdbConfig.EMBEDDING_CACHE_DIR / EMBEDDING_CACHE_QUOTA_GB 开启缓存"""
+    embedding_cache.configure(vdb_config.EMBEDDING_CACHE_DIR, vdb_config.EMBEDDING_CACHE_QUOTA_GB)
+    return embedding_cache
@@ -0,0 +1,159 @@
+import hashlib
+import itertools
+import json
+import numpy as np
+from BenchmarkStore import BenchmarkStore
+from VdbConfig import load_config_file
+
+# 作业的执行阶段
+STAGES = ("load", "index", "search")
+# [settings] 中不影响实验结果的配置项，不参与计算作业ID
+NON_RESULT_SETTINGS = ("ENABLE_PROFILER", "PROFILE_TRACE_FILE", "BENCHMARK_STORE_FILE", "RESULT_LOG_RATE", "METRICS")
+
+
+def job_id(spec: dict) -> str:
+    """由作业内容计算确定性的作业ID，同样的配置总是得到同样的ID"""
+    content = json.dumps(spec, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+
+def settings_digest(settings: dict):
+    """
+    配置文件 [settings] 中影响实验结果的覆盖项（例如 PREPROCESS、PARTITION、SCALAR_INDEX、INGEST_MODE）的摘要
+
+    Returns:
+        str: 没有覆盖项时为 None，作业ID与不使用配置文件时相同
+    """
+    settings = {key: value for key, value in (settings or {}).items() if key not in NON_RESULT_SETTINGS}
+    return job_id(settings) if settings else None
+
+
+def expand_jobs(matrix: dict, settings: dict = None) -> list:
+    """
+    把实验矩阵（数据集 × 距离 × 向量存储类型 × 索引 × 查询参数）展开成作业列表
+
+    矩阵格式（TOML）：
+        [matrix]
+        datasets = ["WIT", "Youtube_audio", "Youtube_rgb"]
+        metrics = ["L2", "IP"]
+        vector_types = ["float32"]
+        top_k = 10
+
+        [[matrix.index]]
+        index_type = "HNSW"
+        params = {M = 32, efConstruction = 512}
+        search = [{ef = 32}, {ef = 64}]
+
+    没有 [[matrix.index]] 时使用 VdbConfig 的默认索引与查询参数；[settings] 的摘要是构建配置的一部分，
+    修改影响结果的配置项后作业ID与集合名称都会变化，不会误用旧配置下的集合与结果
+
+    Args:
+        matrix (dict): 配置文件中的 [matrix] 部分
+        settings (dict): 配置文件中的 [settings] 部分
+
+    Returns:
+        list: 作业列表，同一个索引（build_id 相同）的作业相邻，只需导入并构建一次
+    """
+    index_list = matrix.get("index") or [{"index_type": None}]
+    digest = settings_digest(settings)
+    jobs = []
+    for dataset, metric, vector_type, index in itertools.product(
+        matrix.get("datasets", []),
+        matrix.get("metrics", ["L2"]),
+        matrix.get("vector_types", ["float32"]),
+        index_list,
+    ):
+        index_params = None
+        if index.get("index_type") is not None:
+            index_params = {"index_type": index["index_type"], "params": index.get("params", {})}
+        build = {"dataset": dataset, "metric": metric, "vector_type": vector_type, "index": index_params}
+        if digest is not None:
+            build["settings"] = digest
+        build_id = job_id(build)
+        for search_params in index.get("search") or [None]:
+            spec = dict(build, search=search_params, top_k=matrix.get("top_k", 1), hybrid=matrix.get("hybrid", False))
+            jobs.append(dict(spec, build_id=build_id, job_id=job_id(spec)))
+    return jobs
+
+
+def configure_job(vdb_config, job: dict) -> None:
+    """按作业修改 VdbConfig，集合名称带上后缀以免不同作业互相覆盖（EXACT 集合也随 [settings] 的摘要变化）"""
+    vdb_config.configure(
+        job["dataset"],
+        distance_type=job["metric"],
+        vector_type=job["vector_type"],
+        index_params=job["index"],
+        search_params=job["search"],
+        exact_suffix=f"_{job['metric']}_{job['vector_type']}" + (f"_{job['settings']}" if job.get("settings") else ""),
+        approx_suffix=f"_{job['build_id']}",
+    )
+
+
+def run_matrix(vdb_config, matrix: dict = None, stages=STAGES, force: bool = False, dry_run: bool = False) -> list:
+    """
+    依次执行实验矩阵中的所有作业，结果以作业ID为名称记录到 BENCHMARK_STORE_FILE（类别 "matrix"）
+
+    已有记录的作业直接跳过（force=True 时重新执行），因此中断后重新运行只会执行剩下的作业
+
+    Args:
+        vdb_config (VdbConfig): 配置
+        matrix (dict): 实验矩阵，None 表示读取 VdbConfig.CONFIG_FILE 中的 [matrix]
+        stages: 执行的阶段，取值见 STAGES
+        force (bool): 忽略已缓存的结果
+        dry_run (bool): 只打印作业列表
+
+    Returns:
+        list: 每个作业的实验结果（包括缓存的结果）
+    """
+    content = load_config_file(vdb_config.CONFIG_FILE) if vdb_config.CONFIG_FILE else {}
+    if matrix is None:
+        if not vdb_config.CONFIG_FILE:
+            raise ValueError("VDB_CONFIG_FILE is not set")
+        matrix = content.get("matrix", {})
+    jobs = expand_jobs(matrix, content.get("settings", {}))
+    benchmark_store = BenchmarkStore(vdb_config.BENCHMARK_STORE_FILE)
+    cached = {entry["name"]: entry for entry in benchmark_store.query("matrix")}
+    pending = [job for job in jobs if force or job["job_id"] not in cached]
+    print(f"{len(jobs)} jobs in matrix, {len(jobs) - len(pending)} cached, {len(pending)} to run")
+    if dry_run:
+        for job in jobs:
+            state = "cached" if job["job_id"] in cached else "pending"
+            print(f"{job['job_id']}  {state:<8}{job['dataset']:<15}{job['metric']:<4}{job['vector_type']:<10}"
+                  f"{(job['index'] or {}).get('index_type', 'default'):<14}{job['search']}")
+        return [cached[job["job_id"]] for job in jobs if job["job_id"] in cached]
+
+    # 延迟导入，dry_run 时不需要连接 Milvus
+    from DataLoader import DataLoader, MilvusClient, load_all, index_all
+    from QueryProcessor import create_query_processor, run_search
+
+    data_loader = None
+    for build_id, build_jobs in itertools.groupby(pending, key=lambda job: job["build_id"]):
+        build_jobs = list(build_jobs)
+        configure_job(vdb_config, build_jobs[0])
+        print(f"[{build_id}] {vdb_config.DATASET_NAME} {vdb_config.INDEX_PARAMS[1]}")
+        if vdb_config.LOCAL_ENGINE and ("load" in stages or "index" in stages):
+            # 本地引擎在导入时直接构建索引
+            from LocalEngine import build_local_collections
+            build_local_collections(vdb_config)
+        elif "load" in stages or "index" in stages:
+            data_loader = data_loader or DataLoader(MilvusClient(uri = vdb_config.VDB_URI), vdb_config.CHECKPOINT_DIR)
+            if "load" in stages:
+                load_all(vdb_config, data_loader)
+            if "index" in stages:
+                index_all(vdb_config, data_loader)
+        if "search" not in stages:
+            continue
+
+        query_processor = create_query_processor(vdb_config)
+        for job in build_jobs:
+            configure_job(vdb_config, job)
+            query_time_list, query_recall_list = run_search(vdb_config, query_processor, job["hybrid"], job["top_k"])
+            metrics = {key: job.get(key) for key in ("dataset", "metric", "vector_type", "index", "search", "top_k", "hybrid", "settings")}
+            metrics.update(
+                collection_name=vdb_config.DATASET_NAME[1],
+                num_queries=len(query_time_list),
+                avg_latency_ms=float(np.mean(query_time_list)) if query_time_list else 0.0,
+                recall=float(np.mean(query_recall_list)) if query_recall_list else 0.0,
+            )
+            cached[job["job_id"]] = benchmark_store.record("matrix", job["job_id"], **metrics)
+    return [cached[job["job_id"]] for job in jobs if job["job_id"] in cached]
@@ -1,5 +1,11 @@
 import numpy as np
 import struct
+import os
+import time
+import queue
+import threading
+from Profiler import profiler
+from EmbeddingCache import embedding_cache
 
 
 class VectorDataType:
@@ -44,6 +50,151 @@ def read_ibin(filename, start_idx=0, chunk_size=None):
     return arr.reshape(nvecs, dim)
 
 
+class PrefetchReader:
+    """ Sequential reader that issues large aligned reads on a background thread.
+
+    Two buffers are recycled (double buffering): while the caller parses one block,
+    the thread fills the other one, so parsing overlaps with disk / network latency.
+    """
+    ALIGNMENT = 4096
+
+    def __init__(self, filename, start=0, end=None, block_size=8 << 20, num_buffers=2):
+        """
+        Args:
+            :param filename (str): path to the file
+            :param start (int): first byte to return
+            :param end (int): stop before this byte, None means end of file
+            :param block_size (int): bytes per read, rounded up to ALIGNMENT
+            :param num_buffers (int): number of recycled buffers (2 = double buffering)
+        """
+        self.filename = filename
+        self.start = start
+        self.end = os.path.getsize(filename) if end is None else end
+        self.block_size = max(self.ALIGNMENT, -(-block_size // self.ALIGNMENT) * self.ALIGNMENT)
+        self.num_buffers = num_buffers
+        self.bytes_read = 0
+        self.read_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def _fill(self, free_buffers, full_buffers, stop):
+        try:
+            with open(self.filename, "rb", buffering=0) as f:
+                # 从对齐的位置开始读取，第一块跳过 start 之前的字节
+                offset = self.start - self.start % self.ALIGNMENT
+                f.seek(offset)
+                while offset < self.end and not stop.is_set():
+                    buffer = free_buffers.get()
+                    view = memoryview(buffer)
+                    begin = time.perf_counter()
+                    nbytes = f.readinto(view)
+                    self.read_seconds += time.perf_counter() - begin
+                    if not nbytes:
+                        break
+                    self.bytes_read += nbytes
+                    head = max(0, self.start - offset)
+                    tail = min(nbytes, self.end - offset)
+                    full_buffers.put((buffer, head, tail))
+                    offset += nbytes
+            full_buffers.put(None)
+        except Exception as exc:
+            full_buffers.put(exc)
+
+    def blocks(self):
+        """ Yield memoryviews of consecutive blocks in [start, end).
+        A view is only valid until the next block is requested: copy what must be kept.
+        """
+        free_buffers, full_buffers = queue.Queue(), queue.Queue()
+        for _ in range(self.num_buffers):
+            free_buffers.put(bytearray(self.block_size))
+        stop = threading.Event()
+        thread = threading.Thread(target=self._fill, args=(free_buffers, full_buffers, stop), daemon=True)
+        begin = time.perf_counter()
+        thread.start()
+        try:
+            while True:
+                item = full_buffers.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                buffer, head, tail = item
+                if tail > head:
+                    yield memoryview(buffer)[head:tail]
+                free_buffers.put(buffer)
+        finally:
+            stop.set()
+            free_buffers.put(bytearray(0))
+            thread.join()
+            self.wall_seconds = time.perf_counter() - begin
+            profiler.count("io.bytes", self.bytes_read)
+
+    def records(self, record_size, max_records=None):
+        """ Yield numpy uint8 arrays of shape (k, record_size) holding whole fixed-size records """
+        carry = b""
+        remaining = max_records
+        for block in self.blocks():
+            data = carry + bytes(block) if carry else block
+            count = len(data) // record_size
+            if remaining is not None:
+                count = min(count, remaining)
+                remaining -= count
+            if count:
+                yield np.frombuffer(data, dtype=np.uint8, count=count * record_size).reshape(count, record_size)
+            carry = bytes(data[count * record_size:])
+            if remaining == 0:
+                break
+
+    def bandwidth(self):
+        """ Achieved bandwidth in MB/s (bytes read / wall time, including parsing) """
+        return self.bytes_read / 2**20 / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def report(self, name):
+        print(f"{name}: read {self.bytes_read / 2**20:.1f} MB in {self.wall_seconds:.3f} s "
+              f"({self.bandwidth():.1f} MB/s, disk wait {self.read_seconds:.3f} s)")
+
+
+_FVECS_INDEX = {}
+
+
+def fvecs_offsets(filename):
+    """ Byte offset of every record of a *.fvecs file (records may have different dimensions)
+    Args:
+        :param filename (str): path to *.fvecs file
+    Returns:
+        Array of int64 offsets with length nvecs + 1 (numpy.ndarray), the last one is the file size
+    """
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+    if key in _FVECS_INDEX:
+        return _FVECS_INDEX[key]
+    if embedding_cache.enabled:
+        offsets = embedding_cache.load(filename, "fvecs_index", lambda: {"offsets": _build_fvecs_offsets(filename)})["offsets"]
+    else:
+        offsets = _build_fvecs_offsets(filename)
+    _FVECS_INDEX[key] = offsets
+    return offsets
+
+
+@profiler.trace("fvecs_index")
+def _build_fvecs_offsets(filename):
+    size = os.path.getsize(filename)
+    if size == 0:
+        return np.zeros(1, dtype=np.int64)
+    words = np.memmap(filename, dtype=np.int32, mode="r")
+    dim = int(words[0])
+    # 所有向量维度相同时直接计算
+    if dim > 0 and size % (4 + 4 * dim) == 0 and np.all(words[::dim + 1] == dim):
+        return np.arange(size // (4 + 4 * dim) + 1, dtype=np.int64) * (4 + 4 * dim)
+    offsets, pos = [], 0
+    while pos < len(words):
+        offsets.append(pos * 4)
+        pos += 1 + int(words[pos])
+    if pos != len(words):
+        raise RuntimeError("Error reading file")
+    offsets.append(size)
+    return np.asarray(offsets, dtype=np.int64)
+
+
 def read_fvecs(filename, start_idx=0, chunk_size=None):
     """ Read *.fvecs file that contains float32 vectors
     Args:
@@ -54,76 +205,208 @@ def read_fvecs(filename, start_idx=0, chunk_size=None):
     Returns:
         Array of float32 vectors (numpy.ndarray)
     """
-    idx = start_idx
-    vectors = []
-    with open(filename, "rb") as f:
-        # 跳过前面的向量，直到到达 start_idx
-        for _ in range(start_idx):
-            dim_bytes = f.read(4)
-            if not dim_bytes:
-                break  # 文件结束
-            dim = struct.unpack('i', dim_bytes)[0]
-            f.seek(dim * 4, 1)  # 跳过 dim 个浮点数
-
-        # 读取指定数量的向量或所有向量
-        if chunk_size is None:
-            while True:
-                dim_bytes = f.read(4)
-                if not dim_bytes:
-                    break  # 文件结束
-                dim = struct.unpack('i', dim_bytes)[0]
-                vec_bytes = f.read(dim * 4)
-                if len(vec_bytes) != dim * 4:
-                    raise RuntimeError("Error reading file")
-                vec = list(struct.unpack(f'{dim}f', vec_bytes))
-                # vectors.append({"vector": vec})
-                vectors.append({"id": idx, "vector": vec})
-                idx += 1
-        else:
-            for _ in range(chunk_size):
-                dim_bytes = f.read(4)
-                if not dim_bytes:
-                    break  # 文件结束
-                dim = struct.unpack('i', dim_bytes)[0]
-                vec_bytes = f.read(dim * 4)
-                if len(vec_bytes) != dim * 4:
-                    raise RuntimeError("Error reading file")
-                vec = list(struct.unpack(f'{dim}f', vec_bytes))
-                # vectors.append({"vector": vec})
-                vectors.append({"id": idx, "vector": vec})
-                idx += 1
+    # 偏移索引：直接定位到 start_idx，再以预读方式读取所需的字节范围
+    offsets = fvecs_offsets(filename)
+    nvecs = len(offsets) - 1
+    start_idx = min(start_idx, nvecs)
+    end_idx = nvecs if chunk_size is None else min(nvecs, start_idx + chunk_size)
+    reader = PrefetchReader(filename, int(offsets[start_idx]), int(offsets[end_idx]))
+    data = bytearray()
+    for block in reader.blocks():
+        data += block
+    reader.report("read_fvecs")
 
+    base = int(offsets[start_idx])
+    words = np.frombuffer(data, dtype=np.int32)
+    vectors = []
+    for idx in range(start_idx, end_idx):
+        pos = (int(offsets[idx]) - base) // 4
+        dim = int(words[pos])
+        vec = words[pos + 1:pos + 1 + dim].view(np.float32)
+        if len(vec) != dim:
+            raise RuntimeError("Error reading file")
+        vectors.append({"id": idx, "vector": vec.tolist()})
     return vectors
 
 
-def read_fivecs(file_name, data_list):
+VECTOR_TYPES = ("float32", "float16", "bfloat16", "binary")
+
+
+def float32_to_bfloat16_bits(matrix):
+    """ Convert float32 matrix to bfloat16 bit patterns (round to nearest even)
+    Args:
+        :param matrix (numpy.ndarray): float32 matrix
+    Returns:
+        Array of uint16 bfloat16 bit patterns (numpy.ndarray)
+    """
+    bits = np.ascontiguousarray(matrix, dtype=np.float32).view(np.uint32)
+    rounding_bias = ((bits >> 16) & 1) + np.uint32(0x7FFF)
+    return ((bits + rounding_bias) >> 16).astype(np.uint16)
+
+
+def bfloat16_bits_to_float32(bits):
+    """ Convert uint16 bfloat16 bit patterns back to float32 """
+    return (np.asarray(bits, dtype=np.uint16).astype(np.uint32) << 16).view(np.float32)
+
+
+def binarize(matrix):
+    """ Sign-binarize float matrix into packed bits (bit = 1 if value > 0)
+    Args:
+        :param matrix (numpy.ndarray): (n, dim) float matrix, dim must be a multiple of 8
+    Returns:
+        Array of packed uint8 codes with shape (n, dim / 8) (numpy.ndarray)
+    """
+    if matrix.shape[1] % 8 != 0:
+        raise ValueError("Binary vectors require dimension to be a multiple of 8")
+    return np.packbits(matrix > 0, axis=1)
+
+
+def convert_vectors(matrix, vector_type="float32"):
+    """ Convert a float matrix into the per-row representation pymilvus expects
+    Args:
+        :param matrix (numpy.ndarray): (n, dim) float matrix
+        :param vector_type (str): one of VECTOR_TYPES
+    Returns:
+        List of vectors: float32/float16 rows (numpy.ndarray), bfloat16 rows
+        (ml_dtypes.bfloat16 numpy.ndarray if available, else bytes) or binary rows (bytes)
+    """
+    matrix = np.asarray(matrix)
+    if vector_type == "float32":
+        return list(matrix.astype(np.float32, copy=False))
+    if vector_type == "float16":
+        return list(matrix.astype(np.float16))
+    if vector_type == "bfloat16":
+        bits = float32_to_bfloat16_bits(matrix)
+        try:
+            import ml_dtypes
+            return list(bits.view(ml_dtypes.bfloat16))
+        except ImportError:
+            return [row.tobytes() for row in bits]
+    if vector_type == "binary":
+        return [row.tobytes() for row in binarize(matrix)]
+    raise ValueError(f"Unknown vector type: {vector_type}")
+
+
+def read_fivecs_matrix(file_name):
+    """ Read *.fivecs file into numpy arrays in a single vectorized pass
+        (memory-mapped from the embedding cache when it is enabled)
+    Args:
+        :param file_name (str): path to *.fivecs file
+    Returns:
+        (vector ids (numpy.ndarray int32), vectors (numpy.ndarray float32, shape (n, dim)))
+    """
+    if embedding_cache.enabled:
+        arrays = embedding_cache.load(file_name, "fivecs", lambda: dict(zip(("vids", "vectors"), _parse_fivecs_matrix(file_name))))
+        return arrays["vids"], arrays["vectors"]
+    return _parse_fivecs_matrix(file_name)
+
+
+def _parse_fivecs_matrix(file_name):
+    with open(file_name, 'rb') as file:
+        nvecs, dim = np.fromfile(file, count=2, dtype=np.int32)
+    record_dtype = np.dtype([("vid", "<i4"), ("vec", "<f4", (int(dim),))])
+    records = np.empty(nvecs, dtype=record_dtype)
+    out = records.view(np.uint8).reshape(nvecs, record_dtype.itemsize)
+    count = 0
+    reader = PrefetchReader(file_name, start=8)
+    for chunk in reader.records(record_dtype.itemsize, nvecs):
+        out[count:count + len(chunk)] = chunk
+        count += len(chunk)
+    reader.report("read_fivecs")
+    if count != nvecs:
+        raise RuntimeError("Error reading file")
+    return records["vid"], records["vec"]
+
+
+def read_fivecs_header(file_name):
+    """ Number of vectors and dimension of a *.fivecs file """
+    with open(file_name, 'rb') as file:
+        nvecs, dim = struct.unpack('<2i', file.read(8))
+    return nvecs, dim
+
+
+def iter_fivecs_blocks(file_name, block_size=8 << 20):
+    """ Stream a *.fivecs file block by block without holding the whole file in memory
+    Args:
+        :param file_name (str): path to *.fivecs file
+        :param block_size (int): bytes per background read (see PrefetchReader)
+    Returns:
+        Iterator of (vector ids (numpy.ndarray int32), vectors (numpy.ndarray float32, shape (k, dim))),
+        the arrays are copies and stay valid after the next block is read
+    """
+    nvecs, dim = read_fivecs_header(file_name)
+    record_dtype = np.dtype([("vid", "<i4"), ("vec", "<f4", (dim,))])
+    reader = PrefetchReader(file_name, start=8, block_size=block_size)
+    count = 0
+    for chunk in reader.records(record_dtype.itemsize, nvecs):
+        records = chunk.view(record_dtype).reshape(-1)
+        count += len(records)
+        yield records["vid"].copy(), records["vec"].copy()
+    reader.report("iter_fivecs_blocks")
+    if count != nvecs:
+        raise RuntimeError("Error reading file")
+
+
+@profiler.trace("read_fivecs")
+def read_fivecs(file_name, data_list, vector_type="float32"):
+    if vector_type != "float32" or embedding_cache.enabled:
+        # 非 float32 存储或开启缓存：整体读入后向量化转换
+        vids, matrix = read_fivecs_matrix(file_name)
+        print(f"Read data: size = {len(vids)}, dimension = {matrix.shape[1]}, type = {vector_type}")
+        data_list.clear()
+        for vid, vec in zip(vids.tolist(), convert_vectors(matrix, vector_type)):
+            data_list.append(VectorDataType(vid, vec))
+        profiler.count("read_fivecs.vectors", len(data_list))
+        return
+
     with open(file_name, 'rb') as file:
         # Read the number of vectors and dimension
         nvecs, = struct.unpack('i', file.read(4))
         dim, = struct.unpack('i', file.read(4))
         print(f"Read data: size = {nvecs}, dimension = {dim}")
 
-        data_list.clear()
-
-        for _ in range(nvecs):
-            # Read the vector ID
-            vid, = struct.unpack('i', file.read(4))
-            # Read the vector data
-            vec = struct.unpack(f'{dim}f', file.read(dim * 4))
-            if len(vec) != dim:
-                raise RuntimeError("Error reading file")
+    data_list.clear()
+    # 后台线程预读大块数据，逐块解析完整的记录
+    record_dtype = np.dtype([("vid", "<i4"), ("vec", "<f4", (dim,))])
+    reader = PrefetchReader(file_name, start=8)
+    for chunk in reader.records(record_dtype.itemsize, nvecs):
+        records = chunk.view(record_dtype).reshape(-1)
+        for vid, vec in zip(records["vid"].tolist(), records["vec"].tolist()):
+            data_list.append(VectorDataType(vid, tuple(vec)))
+    reader.report("read_fivecs")
+    if len(data_list) != nvecs:
+        raise RuntimeError("Error reading file")
 
-            data_list.append(VectorDataType(vid, vec))
+    profiler.count("read_fivecs.vectors", len(data_list))
 
 
+@profiler.trace("read_meta")
 def read_meta(file_path):
+    if embedding_cache.enabled:
+        arrays = embedding_cache.load(file_path, "meta", lambda: {"values": np.asarray(_parse_meta(file_path), dtype=str)})
+        return arrays["values"].tolist()
+    return _parse_meta(file_path)
+
+
+def _parse_meta(file_path):
     with open(file_path, 'r', encoding='utf-8') as file:
         content = file.read().splitlines()
         content = content[2:]
     return content
 
 
+@profiler.trace("read_query")
 def read_query(file_path):
+    if embedding_cache.enabled:
+        def build():
+            data_list, meta_list = _parse_query(file_path)
+            return {"vectors": np.asarray(data_list, dtype=np.float32), "filters": np.asarray(meta_list, dtype=str)}
+        arrays = embedding_cache.load(file_path, "query", build)
+        return arrays["vectors"].tolist(), arrays["filters"].tolist()
+    return _parse_query(file_path)
+
+
+def _parse_query(file_path):
     data_list = []
     meta_list = []
     with open(file_path, 'r', encoding='utf-8') as file:
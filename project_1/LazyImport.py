@@ -0,0 +1,41 @@
+import importlib
+
+
+class LazyImport:
+    def __init__(self, module_name: str, attr_name: str = None):
+        """
+        延迟导入：第一次访问属性或调用时才真正导入模块，用于缩短命令行的启动时间
+
+        Args:
+            module_name (str): 模块名，例如 "pymilvus"
+            attr_name (str): 模块中的对象名，例如 "Collection"；None 表示模块本身
+        """
+        self._module_name = module_name
+        self._attr_name = attr_name
+        self._target = None
+
+    def _load(self):
+        if self._target is None:
+            module = importlib.import_module(self._module_name)
+            self._target = module if self._attr_name is None else getattr(module, self._attr_name)
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        target = self._module_name if self._attr_name is None else f"{self._module_name}.{self._attr_name}"
+        return f"<LazyImport {target}{'' if self._target is None else ' (loaded)'}>"
+
+
+def lazy_from(module_name: str, *attr_names: str):
+    """
+    等价于 from module_name import attr_names，但推迟到第一次使用时才导入
+
+    Returns:
+        tuple: 与 attr_names 一一对应的 LazyImport 对象
+    """
+    return tuple(LazyImport(module_name, attr_name) for attr_name in attr_names)
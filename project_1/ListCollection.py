@@ -1,7 +1,9 @@
-from pymilvus import MilvusClient, Collection
-from VdbConfig import vdb_config
+from LazyImport import lazy_from
 
-def vdb_list_collections(client):
+# pymilvus 在第一次使用时才导入
+MilvusClient, Collection = lazy_from("pymilvus", "MilvusClient", "Collection")
+
+def vdb_list_collections(client, milvus_client_uri=""):
     # 获取所有集合列表
     collections = client.list_collections()
     collections = filter(lambda x:x.startswith("ZYX"), collections)
@@ -14,10 +16,10 @@ def vdb_list_collections(client):
         print(f"Collection #{idx}: {collection_name} with {cnt} entities")
 
 if __name__ == "__main__":
+    from VdbConfig import vdb_config
     # 初始化Milvus客户端
     milvus_client_uri = vdb_config.VDB_URI
     client = MilvusClient(
         uri = milvus_client_uri
     )
-    vdb_list_collections(client)
-
+    vdb_list_collections(client, milvus_client_uri)
@@ -0,0 +1,392 @@
+import os
+import json
+import time
+import warnings
+import numpy as np
+from FileIO import read_fivecs_matrix, float32_to_bfloat16_bits, bfloat16_bits_to_float32
+from AttrIndex import AttrIndex, read_meta_columns
+from Preprocess import kmeans, load_or_fit_transform
+from BenchmarkStore import BenchmarkStore
+from Profiler import profiler
+
+# 进程内的近似最近邻引擎：不需要 Milvus 服务器，提供与 pymilvus Collection 相同的 load/search/query 接口，
+# QueryProcessor 设置 LOCAL_ENGINE 后直接使用，便于在笔记本上离线运行全部实验
+
+
+# 本地引擎只有 IVF-Flat 的查询参数 nprobe；Milvus HNSW 的 ef 按 nprobe = ef / 2 换算（默认 ef = 32 对应默认 nprobe = 16），
+# 其他查询参数不起作用，每个参数第一次出现时给出警告
+DEFAULT_NPROBE = 16
+_ignored_params = set()
+
+
+def local_nprobe(params: dict) -> int:
+    """由查询参数（search_params["params"]）得到本地索引的 nprobe，nprobe 优先于 ef"""
+    ignored = sorted(set(params) - {"nprobe", "ef"} - _ignored_params)
+    if ignored:
+        _ignored_params.update(ignored)
+        warnings.warn(f"Local engine ignores search params {ignored}", stacklevel=3)
+    if "nprobe" in params:
+        return int(params["nprobe"])
+    if "ef" in params:
+        return max(1, int(params["ef"]) // 2)
+    return DEFAULT_NPROBE
+
+
+class LocalIndex:
+    def __init__(self, metric_type: str = "L2", index_type: str = "FLAT", nlist: int = 1):
+        """
+        初始化 LocalIndex 类：IVF-Flat 索引，向量按所属的倒排列表连续存放
+        FLAT 等价于只有一个倒排列表的 IVF-Flat（精确检索）
+
+        Args:
+            metric_type (str): L2 或 IP
+            index_type (str): FLAT 或 IVF_FLAT
+            nlist (int): 倒排列表（k-means 聚类中心）的数量
+        """
+        if metric_type not in ("L2", "IP"):
+            raise ValueError(f"Local engine supports L2 and IP, got {metric_type}")
+        self.metric_type = metric_type
+        self.index_type = index_type
+        self.nlist = nlist
+        self.centroids = None
+        self.vectors = None         # 按倒排列表排列的向量
+        self.norms = None           # 每个向量的 L2 范数平方（L2 距离使用）
+        self.row_ids = None         # 存放位置 -> 原始行号
+        self.list_offsets = None    # 第 i 个倒排列表为 [list_offsets[i], list_offsets[i + 1])
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    @profiler.trace("local_index.build")
+    def build(self, matrix, sample_size: int = 262144, niter: int = 10, seed: int = 0):
+        """
+        构建索引：在采样的向量上训练 k-means，再把所有向量分配到最近的聚类中心
+
+        Args:
+            matrix (numpy.ndarray): (n, dim) 向量，float32 或 float16
+            sample_size (int): 参与 k-means 训练的最大向量数
+            niter (int): k-means 迭代次数
+            seed (int): 随机种子
+        """
+        num_rows = len(matrix)
+        if self.index_type == "FLAT" or self.nlist <= 1:
+            self.nlist = 1
+            self.centroids = np.zeros((1, matrix.shape[1]), dtype=np.float32)
+            assign = np.zeros(num_rows, dtype=np.int64)
+        else:
+            rng = np.random.default_rng(seed)
+            sample = matrix if num_rows <= sample_size else matrix[np.sort(rng.choice(num_rows, sample_size, replace=False))]
+            self.centroids, _ = kmeans(np.asarray(sample, dtype=np.float32), self.nlist, niter=niter, seed=seed)
+            self.nlist = len(self.centroids)
+            assign = self._nearest_centroids(np.asarray(matrix, dtype=np.float32), 1)[:, 0]
+        order = np.argsort(assign, kind="stable")
+        self.row_ids = order.astype(np.int64)
+        self.vectors = np.ascontiguousarray(matrix[order])
+        self.norms = np.sum(self.vectors.astype(np.float32) ** 2, axis=1)
+        self.list_offsets = np.searchsorted(assign[order], np.arange(self.nlist + 1)).astype(np.int64)
+        return self
+
+    def _nearest_centroids(self, queries, nprobe: int, chunk_size: int = 65536):
+        """每个查询最近的 nprobe 个聚类中心（k-means 以 L2 距离聚类，IP 也按 L2 选择倒排列表）"""
+        nprobe = min(nprobe, len(self.centroids))
+        centroid_norms = np.sum(self.centroids ** 2, axis=1)
+        result = np.empty((len(queries), nprobe), dtype=np.int64)
+        for sid in range(0, len(queries), chunk_size):
+            distances = centroid_norms[None, :] - 2.0 * (queries[sid:sid + chunk_size] @ self.centroids.T)
+            if nprobe < distances.shape[1]:
+                probe = np.argpartition(distances, nprobe - 1, axis=1)[:, :nprobe]
+            else:
+                probe = np.broadcast_to(np.arange(nprobe), distances.shape).copy()
+            result[sid:sid + chunk_size] = probe
+        return result
+
+    def search(self, queries, top_k: int, nprobe: int = DEFAULT_NPROBE, row_mask=None):
+        """
+        查询
+
+        Args:
+            queries (numpy.ndarray): (m, dim) 浮点查询向量
+            top_k (int): 返回最相似的 k 个结果
+            nprobe (int): 探查的倒排列表数（FLAT 忽略）
+            row_mask (numpy.ndarray): 按原始行号的布尔掩码，只返回掩码为 True 的行；None 表示不过滤
+
+        Returns:
+            list: 每个查询的 (原始行号, 距离)，L2 按距离升序，IP 按内积降序
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        probes = self._nearest_centroids(queries, nprobe)
+        results = []
+        for query, probe in zip(queries, probes):
+            positions = np.concatenate([
+                np.arange(self.list_offsets[c], self.list_offsets[c + 1]) for c in np.sort(probe)
+            ]) if self.nlist > 1 else np.arange(len(self.row_ids))
+            if row_mask is not None:
+                positions = positions[row_mask[self.row_ids[positions]]]
+            if len(positions) == 0:
+                results.append((np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)))
+                continue
+            candidates = np.asarray(self.vectors[positions], dtype=np.float32)
+            if self.metric_type == "IP":
+                keys = -(candidates @ query)
+            else:
+                keys = self.norms[positions] - 2.0 * (candidates @ query) + float(query @ query)
+            k = min(top_k, len(positions))
+            best = np.argpartition(keys, k - 1)[:k] if k < len(keys) else np.arange(len(keys))
+            best = best[np.argsort(keys[best], kind="stable")]
+            distances = -keys[best] if self.metric_type == "IP" else np.maximum(keys[best], 0.0)
+            results.append((self.row_ids[positions[best]], distances.astype(np.float32)))
+        profiler.count("local_index.queries", len(queries))
+        return results
+
+    def save(self, directory: str) -> None:
+        """以 .npy 文件保存到目录，load 时通过内存映射打开"""
+        os.makedirs(directory, exist_ok=True)
+        for name in ("centroids", "vectors", "norms", "row_ids", "list_offsets"):
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "index.json"), "w") as fout:
+            json.dump({"metric_type": self.metric_type, "index_type": self.index_type, "nlist": self.nlist}, fout)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True):
+        with open(os.path.join(directory, "index.json"), "r") as fin:
+            meta = json.load(fin)
+        index = cls(meta["metric_type"], meta["index_type"], meta["nlist"])
+        for name in ("centroids", "vectors", "norms", "row_ids", "list_offsets"):
+            setattr(index, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None))
+        # 聚类中心与列表边界很小，直接读入内存
+        index.centroids = np.asarray(index.centroids)
+        index.list_offsets = np.asarray(index.list_offsets)
+        return index
+
+
+class LocalHit:
+    """查询结果，与 pymilvus 的 Hit 一样提供 id、distance 与 entity 属性"""
+    def __init__(self, id, distance, entity):
+        self.id = id
+        self.distance = distance
+        self.entity = entity
+
+    def __str__(self):
+        return f"id: {self.id}, distance: {self.distance}, entity: {self.entity}"
+
+
+class LocalHits:
+    """一个查询的结果：ID与距离保存为数组（ids / distances，与 pymilvus 的 Hits 相同），迭代时才生成 LocalHit"""
+    def __init__(self, collection, rows, distances, output_fields):
+        self.collection = collection
+        self.rows = rows
+        self.ids = np.asarray(collection.ids[rows], dtype=np.int64)
+        self.distances = distances
+        self.output_fields = output_fields
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        for i in range(len(self.rows)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        row = int(self.rows[i])
+        return LocalHit(int(self.ids[i]), float(self.distances[i]), self.collection._entity(row, self.output_fields))
+
+
+class LocalCollection:
+    def __init__(self, name: str, directory: str):
+        """
+        初始化 LocalCollection 类：本地引擎中的一个集合，接口与 pymilvus 的 Collection 相同
+        数据保存在 directory 中（ids.npy、column_<属性名>.npy 与索引文件），load 时通过内存映射打开
+
+        Args:
+            name (str): 集合名称
+            directory (str): 集合目录
+        """
+        self.name = name
+        self.directory = directory
+        self.index = None
+        self.ids = None
+        self.columns = None
+        self.attr_index = None
+
+    @classmethod
+    def create(cls, name: str, directory: str, ids, matrix, columns: dict, index_params: dict):
+        """
+        构建索引并保存集合
+
+        Args:
+            name (str): 集合名称
+            directory (str): 集合目录
+            ids (numpy.ndarray): 向量ID（主键）
+            matrix (numpy.ndarray): (n, dim) 向量
+            columns (dict): 属性名 -> 第 i 行的属性值
+            index_params (dict): 与 VdbConfig.INDEX_PARAMS 格式相同，FLAT 精确检索，其余索引类型使用 IVF-Flat
+        """
+        index_type = "FLAT" if index_params["index_type"] == "FLAT" else "IVF_FLAT"
+        nlist = index_params.get("params", {}).get("nlist", int(4 * np.sqrt(len(ids))))
+        index = LocalIndex(index_params["metric_type"], index_type, nlist).build(matrix)
+        index.save(directory)
+        np.save(os.path.join(directory, "ids.npy"), np.asarray(ids, dtype=np.int64))
+        for column_name, values in columns.items():
+            np.save(os.path.join(directory, f"column_{column_name}.npy"), np.asarray(values))
+        with open(os.path.join(directory, "collection.json"), "w") as fout:
+            json.dump({"name": name, "columns": list(columns), "index_params": index_params}, fout)
+        return cls(name, directory)
+
+    @property
+    def num_entities(self) -> int:
+        self.load()
+        return len(self.ids)
+
+    def load(self, **kwargs) -> None:
+        """通过内存映射打开集合，多个进程共享操作系统的页缓存"""
+        if self.index is not None:
+            return
+        with open(os.path.join(self.directory, "collection.json"), "r") as fin:
+            meta = json.load(fin)
+        self.index = LocalIndex.load(self.directory)
+        self.ids = np.load(os.path.join(self.directory, "ids.npy"), mmap_mode="r")
+        self.columns = {
+            column_name: np.load(os.path.join(self.directory, f"column_{column_name}.npy"), mmap_mode="r")
+            for column_name in meta["columns"]
+        }
+
+    def _row_mask(self, expr):
+        """过滤条件对应的行掩码（第一次使用时由属性列构建 AttrIndex）"""
+        if not expr:
+            return None
+        if self.attr_index is None:
+            columns = {"id": np.asarray(self.ids)}
+            columns.update({name: np.asarray(values) for name, values in self.columns.items()})
+            self.attr_index = AttrIndex(self.ids, columns)
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[self.attr_index.select_rows(expr)] = True
+        return mask
+
+    def _entity(self, row, output_fields):
+        entity = {}
+        for field in output_fields or []:
+            if field == "id":
+                entity["id"] = int(self.ids[row])
+            elif field in self.columns:
+                value = self.columns[field][row]
+                entity[field] = value.item() if hasattr(value, "item") else value
+        return entity
+
+    def search(self, data, anns_field: str, param: dict, limit: int, expr: str = None, output_fields=None, **kwargs):
+        """
+        与 Collection.search 相同的接口
+
+        Args:
+            data (list): 查询向量（float32/float16/bfloat16）
+            anns_field (str): 向量字段（本地引擎每个集合只有一个向量字段）
+            param (dict): {"metric_type": ..., "params": {"nprobe": ...}}，HNSW 的 ef 换算为 nprobe（见 local_nprobe）
+            limit (int): 返回最相似的 limit 个结果
+            expr (str): 过滤条件
+            output_fields (list): 返回的属性字段
+
+        Returns:
+            list: 每个查询的 LocalHits
+        """
+        self.load()
+        metric_type = param.get("metric_type", self.index.metric_type)
+        if metric_type != self.index.metric_type:
+            raise ValueError(f"Metric type {metric_type} does not match index metric type {self.index.metric_type}")
+        if any(isinstance(vec, (bytes, bytearray)) for vec in data):
+            raise ValueError("Local engine does not support binary query vectors")
+        queries = np.asarray([np.asarray(vec).astype(np.float32) for vec in data], dtype=np.float32)
+        nprobe = local_nprobe(param.get("params", {}))
+        with profiler.span("local_engine.search", nq=len(queries)):
+            results = self.index.search(queries, limit, nprobe, self._row_mask(expr))
+        return [LocalHits(self, rows, distances, output_fields) for rows, distances in results]
+
+    def query(self, expr: str, output_fields=None, limit: int = None, **kwargs):
+        """与 Collection.query 相同的接口"""
+        self.load()
+        mask = self._row_mask(expr)
+        rows = np.arange(len(self.ids)) if mask is None else np.flatnonzero(mask)
+        if limit is not None:
+            rows = rows[:limit]
+        return [self._entity(row, ["id"] + list(output_fields or [])) for row in rows.tolist()]
+
+
+class LocalEngine:
+    def __init__(self, root_dir: str):
+        """
+        初始化 LocalEngine 类：root_dir 下每个子目录为一个集合
+
+        Args:
+            root_dir (str): 本地引擎的数据目录
+        """
+        self.root_dir = root_dir
+        self.collections = {}
+
+    def has_collection(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self.root_dir, name, "collection.json"))
+
+    def collection(self, name: str) -> LocalCollection:
+        """打开集合（同一个集合只打开一次）"""
+        if name not in self.collections:
+            if not self.has_collection(name):
+                raise ValueError(f"Local collection {name} does not exist, run 'python3 VdbCli.py load' with LOCAL_ENGINE = True")
+            self.collections[name] = LocalCollection(name, os.path.join(self.root_dir, name))
+        return self.collections[name]
+
+    def list_collections(self) -> list:
+        if not os.path.isdir(self.root_dir):
+            return []
+        return sorted(name for name in os.listdir(self.root_dir) if self.has_collection(name))
+
+    def create_collection(self, name: str, ids, matrix, columns: dict, index_params: dict) -> LocalCollection:
+        self.collections.pop(name, None)
+        collection = LocalCollection.create(name, os.path.join(self.root_dir, name), ids, matrix, columns, index_params)
+        self.collections[name] = collection
+        return collection
+
+
+def local_vectors(matrix, vector_type: str = "float32"):
+    """按存储类型量化后的向量（与导入 Milvus 时的精度一致），binary 不支持"""
+    if vector_type == "float32":
+        return np.asarray(matrix, dtype=np.float32)
+    if vector_type == "float16":
+        return np.asarray(matrix, dtype=np.float16)
+    if vector_type == "bfloat16":
+        return bfloat16_bits_to_float32(float32_to_bfloat16_bits(matrix))
+    raise ValueError(f"Local engine does not support vector type {vector_type}")
+
+
+def build_local_collections(vdb_config, engine: LocalEngine = None) -> LocalEngine:
+    """
+    在本地引擎中为 VdbConfig 中的所有集合导入数据并构建索引（已存在的集合会被重建）
+
+    Args:
+        vdb_config (VdbConfig): 配置
+        engine (LocalEngine): 本地引擎，None 表示使用 LOCAL_ENGINE_DIR
+
+    Returns:
+        LocalEngine: 本地引擎
+    """
+    engine = engine or LocalEngine(vdb_config.LOCAL_ENGINE_DIR)
+    benchmark_store = BenchmarkStore(vdb_config.BENCHMARK_STORE_FILE)
+    transform = load_or_fit_transform(vdb_config)
+    for i, collection_name in enumerate(vdb_config.DATASET_NAME):
+        vids, matrix = read_fivecs_matrix(vdb_config.DATASET_VECTOR_PATH[i])
+        if transform is not None:
+            matrix = transform.transform(matrix)
+        columns = read_meta_columns(vdb_config.DATASET_ATTR_PATH[i], len(vids))
+        index_params = vdb_config.INDEX_PARAMS[i]
+        start_time = time.time()
+        collection = engine.create_collection(
+            collection_name, vids, local_vectors(matrix, vdb_config.VECTOR_TYPE), columns, index_params)
+        build_time = time.time() - start_time
+        collection.load()
+        print(f"Local collection {collection_name}: {len(vids)} vectors, {collection.index.index_type} "
+              f"(nlist = {collection.index.nlist}), build time = {build_time:.3f} s")
+        benchmark_store.record(
+            "index_build",
+            collection_name,
+            index_type=index_params.get("index_type"),
+            params=index_params.get("params", {}),
+            engine="local",
+            build_time=build_time,
+        )
+    return engine
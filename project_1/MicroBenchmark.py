@@ -0,0 +1,209 @@
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+import numpy as np
+from FileIO import read_fivecs, read_fivecs_matrix, read_meta, read_query
+from DataLoader import DataLoader
+from QueryProcessor import QueryProcessor
+from Benchmark import exact_knn
+from SearchResult import HitList
+from BenchmarkStore import BenchmarkStore
+from DataGenerator import generate_dataset
+
+# 微基准测试：在合成数据上测量 FileIO / DataLoader / 召回率计算等热点路径，不需要 Milvus 与真实数据集
+MICRO_DIMS = (128, 1024, 2048)
+MICRO_SIZES = (1000, 10000)
+
+
+def make_dataset(data_dir: str, num_vectors: int, dim: int, num_queries: int = 100, seed: int = 0) -> dict:
+    """
+    生成（已存在时直接复用）一组合成数据（见 DataGenerator.py）：vector_0.fivecs、meta_0.txt 与 query.txt
+
+    Args:
+        data_dir (str): 数据目录，每组 (num_vectors, dim) 一个子目录
+        num_vectors (int): 向量数
+        dim (int): 向量维度
+        num_queries (int): 查询数
+        seed (int): 随机种子
+
+    Returns:
+        dict: 文件路径与规模
+    """
+    dataset_dir = os.path.join(data_dir, f"n{num_vectors}_d{dim}")
+    dataset = {
+        "num_vectors": num_vectors,
+        "dim": dim,
+        "num_queries": num_queries,
+        "vector_path": os.path.join(dataset_dir, "vector_0.fivecs"),
+        "meta_path": os.path.join(dataset_dir, "meta_0.txt"),
+        "query_path": os.path.join(dataset_dir, "query.txt"),
+    }
+    if not all(os.path.exists(dataset[key]) for key in ("vector_path", "meta_path", "query_path")):
+        generate_dataset(dataset_dir, num_vectors, dim, num_queries, seed=seed, verbose=False)
+    return dataset
+
+
+def measure(func, repeat: int = 5, min_sample_ms: float = 20.0) -> list:
+    """
+    重复执行 func，返回每次调用的耗时（毫秒）；被测函数的输出被丢弃
+
+    与 asv / timeit 相同，先预热一次并确定每个样本的调用次数，使单个样本不少于 min_sample_ms，
+    耗时很短的用例不会被计时误差淹没
+    """
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        start_time = time.perf_counter()
+        func()
+        warmup_ms = (time.perf_counter() - start_time) * 1000.0
+        number = max(1, int(min_sample_ms / max(warmup_ms, 1e-3)))
+        times = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            for _ in range(number):
+                func()
+            times.append((time.perf_counter() - start_time) * 1000.0 / number)
+    return times
+
+
+def _recall_cases(dataset, top_k=10):
+    """召回率计算：逐查询求集合交集（calculate_recall）与 (n, k) 数组批量计算（search_performance）"""
+    rng = np.random.default_rng(1)
+    num_queries = max(dataset["num_vectors"] // 10, 1)
+    truth_ids = rng.integers(0, dataset["num_vectors"], (num_queries, top_k))
+    result_ids = np.where(rng.random((num_queries, top_k)) < 0.8, truth_ids, -1)
+    truth_list = [[HitList(ids, np.zeros(top_k)), 0.0] for ids in truth_ids]
+    result_list = [[HitList(ids, np.zeros(top_k)), 0.0] for ids in result_ids]
+    query_processor = QueryProcessor(None)
+
+    def per_query():
+        for truth, result in zip(truth_list, result_list):
+            query_processor.calculate_recall(truth[0], result[0])
+
+    return {
+        "recall.per_query": (per_query, num_queries),
+        "recall.batch": (lambda: query_processor.search_performance(result_list, truth_list), num_queries),
+    }
+
+
+def micro_cases(dataset) -> dict:
+    """
+    一组数据上的所有测试用例
+
+    Returns:
+        dict: 用例名称 -> (无参数的被测函数, 处理的条目数)
+    """
+    num_vectors = dataset["num_vectors"]
+    data_loader = DataLoader(None)
+    cases = {
+        "read_fivecs": (lambda: read_fivecs(dataset["vector_path"], []), num_vectors),
+        "read_fivecs_matrix": (lambda: read_fivecs_matrix(dataset["vector_path"]), num_vectors),
+        "read_meta": (lambda: read_meta(dataset["meta_path"]), num_vectors),
+        "read_query": (lambda: read_query(dataset["query_path"]), dataset["num_queries"]),
+        "read_data": (lambda: data_loader.read_data(dataset["vector_path"], dataset["meta_path"]), num_vectors),
+        "read_data.float16": (lambda: data_loader.read_data(dataset["vector_path"], dataset["meta_path"], "float16"), num_vectors),
+    }
+    vids, matrix = read_fivecs_matrix(dataset["vector_path"])
+    queries = np.asarray(read_query(dataset["query_path"])[0], dtype=np.float32)
+    cases["exact_knn"] = (lambda: exact_knn(vids, matrix, queries, 10, "L2"), len(queries))
+    cases.update(_recall_cases(dataset))
+    return cases
+
+
+def check_regression(benchmark_store: BenchmarkStore, name: str, best_ms: float, threshold: float, window: int = 5):
+    """
+    与历史记录比较：以最近 window 次记录的 best_ms 中位数为基线
+
+    Returns:
+        tuple: (基线耗时，没有历史记录时为 None；是否退化)
+    """
+    history = [entry["best_ms"] for entry in benchmark_store.query("micro", name)[-window:]]
+    if not history:
+        return None, False
+    baseline = float(np.median(history))
+    return baseline, best_ms > baseline * (1.0 + threshold)
+
+
+def run_micro_benchmarks(
+    data_dir: str = "micro_data",
+    sizes=MICRO_SIZES,
+    dims=MICRO_DIMS,
+    cases=None,
+    repeat: int = 5,
+    threshold: float = 0.2,
+    benchmark_store: BenchmarkStore = None
+) -> list:
+    """
+    运行微基准测试，结果记录到 benchmark_store（类别 "micro"），与历史记录比较检查性能退化
+
+    Args:
+        data_dir (str): 合成数据目录
+        sizes: 向量数
+        dims: 向量维度
+        cases: 只运行这些用例，None 表示全部
+        repeat (int): 每个用例重复次数（另有一次预热）
+        threshold (float): best_ms 超过历史基线 (1 + threshold) 倍时判定为退化
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录也不比较
+
+    Returns:
+        list: 退化的用例
+    """
+    regressions = []
+    print(f"{'case':<44}{'best ms':>10}{'median ms':>12}{'items/s':>14}{'baseline':>12}")
+    for num_vectors in sizes:
+        for dim in dims:
+            dataset = make_dataset(data_dir, num_vectors, dim)
+            with contextlib.redirect_stdout(io.StringIO()):
+                dataset_cases = micro_cases(dataset)
+            for case_name, (func, num_items) in dataset_cases.items():
+                if cases and case_name not in cases:
+                    continue
+                name = f"{case_name}[n={num_vectors},d={dim}]"
+                times = measure(func, repeat)
+                report = {"best_ms": min(times), "median_ms": float(np.median(times)),
+                          "items_per_sec": num_items / max(min(times), 1e-6) * 1000.0,
+                          "num_vectors": num_vectors, "dim": dim, "repeat": repeat}
+                baseline, regressed = None, False
+                if benchmark_store is not None:
+                    baseline, regressed = check_regression(benchmark_store, name, report["best_ms"], threshold)
+                    benchmark_store.record("micro", name, **report)
+                baseline_text = f"{baseline:.2f}" if baseline is not None else "-"
+                print(f"{name:<44}{report['best_ms']:>10.2f}{report['median_ms']:>12.2f}"
+                      f"{report['items_per_sec']:>14.0f}{baseline_text:>12}{'  REGRESSION' if regressed else ''}")
+                if regressed:
+                    regressions.append(dict(report, name=name, baseline_ms=baseline))
+    return regressions
+
+
+def add_arguments(parser):
+    """微基准测试的命令行参数（MicroBenchmark.py 与 VdbCli.py micro 共用）"""
+    parser.add_argument("--data-dir", default="micro_data", help="合成数据目录（已存在的数据直接复用）")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(MICRO_SIZES))
+    parser.add_argument("--dims", nargs="+", type=int, default=list(MICRO_DIMS))
+    parser.add_argument("--cases", nargs="+", help="只运行这些用例")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.2, help="超过历史基线的比例，超过时返回非零退出码")
+    parser.add_argument("--store", default="benchmark.jsonl", help="实验结果记录文件")
+    parser.add_argument("--no-record", action="store_true", help="不记录结果也不检查退化")
+
+
+def run(args) -> int:
+    """运行微基准测试，有用例退化时返回 1"""
+    benchmark_store = None if args.no_record else BenchmarkStore(args.store)
+    regressions = run_micro_benchmarks(args.data_dir, args.sizes, args.dims, args.cases,
+                                       args.repeat, args.threshold, benchmark_store)
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold * 100:.0f}%")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FileIO / DataLoader / 召回率计算的微基准测试（合成数据）")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
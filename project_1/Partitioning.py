@@ -0,0 +1,180 @@
+import os
+import json
+import zlib
+import numpy as np
+from AttrIndex import parse_filter, read_meta_columns
+
+# 按属性列划分集合：
+#   partition_key：属性字段设为 Milvus 的 partition key，服务端按哈希分区并根据过滤条件自动裁剪分区
+#   hash / range：显式创建分区（按取值哈希 / 按等深区间），导入时按分区写入，查询时根据过滤条件只检索相关分区
+PARTITION_MODES = ("none", "partition_key", "hash", "range")
+
+
+class PartitionLayout:
+    def __init__(self, field: str, mode: str = "hash", num_partitions: int = 16, boundaries=None, value_type: str = "int"):
+        """
+        初始化 PartitionLayout 类
+
+        Args:
+            field (str): 划分依据的属性字段
+            mode (str): "partition_key"、"hash" 或 "range"
+            num_partitions (int): 分区数（range 模式下为 len(boundaries) + 1）
+            boundaries (list): range 模式下各分区的上界（含），第 i 个分区为 (boundaries[i - 1], boundaries[i]]
+            value_type (str): 属性值类型，"int" 或 "str"
+        """
+        if mode not in PARTITION_MODES or mode == "none":
+            raise ValueError(f"Unknown partition mode: {mode}")
+        if mode == "range" and value_type != "int":
+            raise ValueError("Range partitions require an integer attribute")
+        self.field = field
+        self.mode = mode
+        self.boundaries = np.asarray(boundaries if boundaries is not None else [], dtype=np.int64)
+        self.num_partitions = len(self.boundaries) + 1 if mode == "range" else num_partitions
+        self.value_type = value_type
+
+    @classmethod
+    def fit(cls, field: str, values, mode: str = "hash", num_partitions: int = 16):
+        """
+        根据属性值确定划分方式：range 模式按分位数选择边界，使各分区的行数大致相同（重复值较多时分区数可能减少）
+
+        Args:
+            field (str): 属性字段
+            values (numpy.ndarray): 每行的属性值
+            mode (str): "partition_key"、"hash" 或 "range"
+            num_partitions (int): 分区数
+        """
+        values = np.asarray(values)
+        value_type = "int" if np.issubdtype(values.dtype, np.integer) else "str"
+        boundaries = None
+        if mode == "range":
+            quantiles = np.linspace(0.0, 1.0, num_partitions + 1)[1:-1]
+            boundaries = np.unique(np.quantile(values, quantiles, method="lower")) if len(quantiles) else []
+        return cls(field, mode, num_partitions, boundaries, value_type)
+
+    @property
+    def explicit(self) -> bool:
+        """是否需要显式创建分区并在查询时指定 partition_names"""
+        return self.mode in ("hash", "range")
+
+    def schema_fields(self, fields_config: list) -> list:
+        """partition_key 模式下把划分字段标记为 partition key（见 DataLoader.create_schema），其余模式原样返回"""
+        if self.mode != "partition_key":
+            return fields_config
+        return [dict(config, is_partition_key=True) if config["name"] == self.field else config for config in fields_config]
+
+    def partition_names(self) -> list:
+        return [f"{self.field}_{i}" for i in range(self.num_partitions)]
+
+    def _coerce(self, value):
+        return int(value) if self.value_type == "int" else str(value)
+
+    def _hash(self, value) -> int:
+        if self.value_type == "int":
+            return int(value) % self.num_partitions
+        return zlib.crc32(str(value).encode("utf-8")) % self.num_partitions
+
+    def assign(self, values):
+        """
+        每行所属的分区编号
+
+        Args:
+            values: 每行的属性值
+
+        Returns:
+            numpy.ndarray: 分区编号
+        """
+        if self.mode == "range":
+            return np.searchsorted(self.boundaries, np.asarray(values, dtype=np.int64), side="left")
+        if self.value_type == "int":
+            return np.asarray(values, dtype=np.int64) % self.num_partitions
+        return np.asarray([self._hash(value) for value in values], dtype=np.int64)
+
+    def _route(self, tree) -> set:
+        """可能包含满足条件的行的分区编号（不确定时返回全部分区）"""
+        everything = set(range(self.num_partitions))
+        kind = tree[0]
+        if kind == "or":
+            return self._route(tree[1]) | self._route(tree[2])
+        if kind == "and":
+            return self._route(tree[1]) & self._route(tree[2])
+        if kind == "not" or tree[1] != self.field:
+            return everything
+        if kind == "in":
+            return set().union(*[self._route(("cmp", self.field, "==", value)) for value in tree[2]])
+        op, value = tree[2], self._coerce(tree[3])
+        if self.mode != "range":
+            return {self._hash(value)} if op == "==" else everything
+        # 第 i 个分区的取值范围为 (boundaries[i - 1], boundaries[i]]
+        position = int(np.searchsorted(self.boundaries, value, side="left"))
+        if op == "==":
+            return {position}
+        if op in ("<", "<="):
+            return set(range(position + 1))
+        if op == ">":
+            return set(range(int(np.searchsorted(self.boundaries, value, side="right")), self.num_partitions))
+        return set(range(position, self.num_partitions))
+
+    def route(self, filter_expr: str):
+        """
+        过滤条件涉及的分区名称
+
+        Returns:
+            list: 分区名称；None 表示检索全部分区（partition_key 由服务端裁剪、没有过滤条件或无法排除任何分区）
+        """
+        if not self.explicit or not filter_expr:
+            return None
+        partitions = self._route(parse_filter(filter_expr))
+        if len(partitions) == self.num_partitions:
+            return None
+        names = self.partition_names()
+        return [names[i] for i in sorted(partitions)]
+
+    def config(self) -> dict:
+        return {"field": self.field, "mode": self.mode, "num_partitions": self.num_partitions,
+                "boundaries": self.boundaries.tolist(), "value_type": self.value_type}
+
+    def save(self, file_name: str, **extra) -> None:
+        """保存划分方式，extra 为额外记录的信息（例如数据来源）"""
+        with open(file_name, "w") as fout:
+            json.dump(dict(self.config(), **extra), fout)
+
+    @classmethod
+    def load(cls, file_name: str):
+        """
+        Returns:
+            tuple: (PartitionLayout, 文件中的全部内容)
+        """
+        with open(file_name, "r") as fin:
+            content = json.load(fin)
+        layout = cls(content["field"], content["mode"], content["num_partitions"], content["boundaries"], content["value_type"])
+        return layout, content
+
+
+def load_or_fit_layout(vdb_config):
+    """
+    根据 VdbConfig.PARTITION 获取集合的划分方式：PARTITION_FILE 中保存的划分方式与配置一致时直接复用，
+    否则在 DATASET_ATTR_PATH[0] 的属性列上重新确定并保存，保证导入与查询使用相同的分区
+
+    Args:
+        vdb_config (VdbConfig): 配置
+
+    Returns:
+        PartitionLayout: 未开启分区时返回 None
+    """
+    config = vdb_config.PARTITION
+    mode = config.get("mode", "none")
+    if mode == "none":
+        return None
+    # 默认按数据集的属性字段（SCHEMA_FIELD_CONFIG 中主键与向量之后的字段）划分
+    field = config.get("field") or vdb_config.SCHEMA_FIELD_CONFIG[0][2]["name"]
+    requested = {"source": vdb_config.DATASET_ATTR_PATH[0], "requested_partitions": config.get("num_partitions", 16)}
+    if os.path.exists(vdb_config.PARTITION_FILE):
+        layout, content = PartitionLayout.load(vdb_config.PARTITION_FILE)
+        saved = {key: content.get(key) for key in requested}
+        if (layout.field, layout.mode) == (field, mode) and saved == requested:
+            return layout
+    values = read_meta_columns(requested["source"])[field]
+    layout = PartitionLayout.fit(field, values, mode, requested["requested_partitions"])
+    layout.save(vdb_config.PARTITION_FILE, **requested)
+    print(f"Partition layout {layout.config()} written to {vdb_config.PARTITION_FILE}")
+    return layout
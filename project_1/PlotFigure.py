@@ -1,7 +1,10 @@
 import os
 import numpy as np
-import matplotlib.pyplot as plt
 from collections import defaultdict
+from LazyImport import LazyImport
+
+# matplotlib 在第一次画图时才导入
+plt = LazyImport("matplotlib.pyplot")
 
 color = dict()
 color["HNSW"] = '#80BFFF'
@@ -0,0 +1,243 @@
+import os
+import json
+import numpy as np
+from Profiler import profiler
+
+PREPROCESS_METHODS = (None, "pca", "opq")
+
+
+def l2_normalize(matrix):
+    """按行 L2 归一化（零向量保持不变）"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def kmeans(matrix, num_centroids: int, niter: int = 10, seed: int = 0, chunk_size: int = 65536):
+    """
+    NumPy 实现的 k-means（Lloyd 迭代）
+
+    Args:
+        matrix (numpy.ndarray): (n, dim) 浮点向量
+        num_centroids (int): 聚类中心数
+        niter (int): 迭代次数
+        seed (int): 随机种子
+        chunk_size (int): 每次计算距离的向量数，控制内存占用
+
+    Returns:
+        tuple: (聚类中心 (num_centroids, dim), 每个向量所属的聚类 (n,))
+    """
+    rng = np.random.default_rng(seed)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    num_centroids = min(num_centroids, len(matrix))
+    centroids = matrix[rng.choice(len(matrix), num_centroids, replace=False)].copy()
+    assign = np.zeros(len(matrix), dtype=np.int64)
+    for _ in range(niter):
+        centroid_norms = np.sum(centroids ** 2, axis=1)
+        for sid in range(0, len(matrix), chunk_size):
+            chunk = matrix[sid:sid + chunk_size]
+            assign[sid:sid + chunk_size] = np.argmin(centroid_norms[None, :] - 2.0 * (chunk @ centroids.T), axis=1)
+        counts = np.bincount(assign, minlength=num_centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, matrix)
+        nonempty = counts > 0
+        centroids[nonempty] = sums[nonempty] / counts[nonempty, None]
+        # 空聚类重新随机选择中心
+        empty = np.flatnonzero(~nonempty)
+        if len(empty) > 0:
+            centroids[empty] = matrix[rng.choice(len(matrix), len(empty), replace=False)]
+    return centroids, assign
+
+
+class VectorTransform:
+    def __init__(self, normalize: bool = False, method: str = None, target_dim: int = None, opq_subspaces: int = 8):
+        """
+        初始化 VectorTransform 类：导入前的向量预处理（数据与查询向量使用同一个变换）
+            1. normalize：L2 归一化（IP / 余弦相似度）
+            2. method = "pca"：中心化后投影到方差最大的 target_dim 个主成分
+               method = "opq"：PCA 之后再学习一个正交旋转，使各子空间的乘积量化误差最小（配合 IVF_PQ 索引使用）
+            3. 降维后再次归一化（normalize 为 True 时）
+
+        Args:
+            normalize (bool): 是否 L2 归一化
+            method (str): None、"pca" 或 "opq"
+            target_dim (int): 降维后的维度，None 表示保持原维度
+            opq_subspaces (int): OPQ 的子空间数，target_dim 需能被整除
+        """
+        if method not in PREPROCESS_METHODS:
+            raise ValueError(f"Unknown preprocess method: {method}")
+        self.normalize = normalize
+        self.method = method
+        self.target_dim = target_dim
+        self.opq_subspaces = opq_subspaces
+        self.mean = None
+        self.components = None
+        self.rotation = None
+        self.explained_variance = None
+        # 学习变换所用的数据文件（见 load_or_fit_transform）
+        self.source = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.normalize or self.method is not None
+
+    def config(self) -> dict:
+        """变换的配置，用于判断已保存的变换是否可以复用"""
+        return {"normalize": self.normalize, "method": self.method, "target_dim": self.target_dim,
+                "opq_subspaces": self.opq_subspaces if self.method == "opq" else None}
+
+    def output_dim(self, input_dim: int) -> int:
+        if self.method is None or self.target_dim is None:
+            return input_dim
+        return min(self.target_dim, input_dim)
+
+    @profiler.trace("preprocess.fit")
+    def fit(self, matrix, sample_size: int = 100000, seed: int = 0):
+        """
+        在（采样的）数据向量上学习变换
+
+        Args:
+            matrix (numpy.ndarray): (n, dim) 浮点向量
+            sample_size (int): 参与训练的最大向量数
+            seed (int): 随机种子
+        """
+        if self.method is None:
+            return self
+        rng = np.random.default_rng(seed)
+        if len(matrix) > sample_size:
+            matrix = matrix[np.sort(rng.choice(len(matrix), sample_size, replace=False))]
+        matrix = l2_normalize(matrix) if self.normalize else np.asarray(matrix, dtype=np.float32)
+        target_dim = self.output_dim(matrix.shape[1])
+
+        self.mean = matrix.mean(axis=0)
+        centered = (matrix - self.mean).astype(np.float64)
+        # 协方差矩阵的特征分解，按特征值从大到小取 target_dim 个主成分
+        eigenvalues, eigenvectors = np.linalg.eigh(centered.T @ centered / max(len(centered) - 1, 1))
+        order = np.argsort(eigenvalues)[::-1][:target_dim]
+        self.components = eigenvectors[:, order].astype(np.float32)
+        self.explained_variance = float(eigenvalues[order].sum() / max(eigenvalues.sum(), 1e-12))
+
+        if self.method == "opq":
+            self.rotation = self._train_opq((centered @ self.components).astype(np.float32), seed)
+        return self
+
+    def _train_opq(self, projected, seed: int, num_centroids: int = 256, niter: int = 8):
+        """
+        非参数 OPQ：交替训练各子空间的 k-means 码本，再用正交 Procrustes 求使量化误差最小的旋转
+        """
+        dim = projected.shape[1]
+        if dim % self.opq_subspaces != 0:
+            raise ValueError(f"OPQ requires target_dim ({dim}) to be a multiple of opq_subspaces ({self.opq_subspaces})")
+        sub_dim = dim // self.opq_subspaces
+        rotation = np.eye(dim, dtype=np.float32)
+        for it in range(niter):
+            rotated = projected @ rotation
+            reconstructed = np.empty_like(rotated)
+            for m in range(self.opq_subspaces):
+                block = rotated[:, m * sub_dim:(m + 1) * sub_dim]
+                centroids, assign = kmeans(block, num_centroids, niter=5, seed=seed + it)
+                reconstructed[:, m * sub_dim:(m + 1) * sub_dim] = centroids[assign]
+            u, _, vt = np.linalg.svd(projected.T.astype(np.float64) @ reconstructed.astype(np.float64))
+            rotation = (u @ vt).astype(np.float32)
+        return rotation
+
+    @profiler.trace("preprocess.transform")
+    def transform(self, matrix, chunk_size: int = 65536):
+        """
+        对数据或查询向量应用变换
+
+        Args:
+            matrix (numpy.ndarray): (n, dim) 或 (dim,) 浮点向量
+
+        Returns:
+            numpy.ndarray: float32 变换结果，形状与输入对应
+        """
+        matrix = np.asarray(matrix, dtype=np.float32)
+        single = matrix.ndim == 1
+        if single:
+            matrix = matrix[None, :]
+        if not self.enabled:
+            return matrix[0] if single else matrix
+        if self.method is not None and self.components is None:
+            raise RuntimeError("VectorTransform must be fitted before transform")
+        outputs = []
+        for sid in range(0, len(matrix), chunk_size):
+            chunk = matrix[sid:sid + chunk_size]
+            if self.normalize:
+                chunk = l2_normalize(chunk)
+            if self.method is not None:
+                chunk = (chunk - self.mean) @ self.components
+                if self.rotation is not None:
+                    chunk = chunk @ self.rotation
+                if self.normalize:
+                    chunk = l2_normalize(chunk)
+            outputs.append(chunk.astype(np.float32, copy=False))
+        result = np.concatenate(outputs) if outputs else np.zeros((0, self.output_dim(matrix.shape[1])), dtype=np.float32)
+        return result[0] if single else result
+
+    def save(self, file_name: str) -> None:
+        """保存到 .npz 文件（包括学习变换所用的数据文件）"""
+        arrays = {"config": np.array(json.dumps(self.config())), "source": np.array(json.dumps(self.source))}
+        for name in ("mean", "components", "rotation"):
+            value = getattr(self, name)
+            if value is not None:
+                arrays[name] = value
+        if self.explained_variance is not None:
+            arrays["explained_variance"] = np.array(self.explained_variance)
+        np.savez(file_name, **arrays)
+
+    @classmethod
+    def load(cls, file_name: str):
+        with np.load(file_name, allow_pickle=False) as content:
+            config = json.loads(str(content["config"]))
+            transform = cls(config["normalize"], config["method"], config["target_dim"], config["opq_subspaces"] or 8)
+            for name in ("mean", "components", "rotation"):
+                if name in content:
+                    setattr(transform, name, content[name])
+            if "explained_variance" in content:
+                transform.explained_variance = float(content["explained_variance"])
+            if "source" in content:
+                transform.source = json.loads(str(content["source"]))
+        return transform
+
+
+def describe_source(file_name: str) -> dict:
+    """数据文件的路径、修改时间、大小与向量维度，任何一项变化时已保存的变换都需要重新学习"""
+    from FileIO import read_fivecs_header
+    stat = os.stat(file_name)
+    return {"source": file_name, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+            "input_dim": read_fivecs_header(file_name)[1]}
+
+
+def load_or_fit_transform(vdb_config, vids=None, matrix=None):
+    """
+    根据 VdbConfig.PREPROCESS 获取预处理变换：PREPROCESS_FILE 中保存的变换配置与学习所用的数据文件
+    （DATASET_VECTOR_PATH[0] 的路径、修改时间、大小与维度）都一致时直接复用，否则重新学习并保存，
+    保证数据与查询向量使用同一个变换，切换数据集后不会误用其他数据上学习的变换
+
+    Args:
+        vdb_config (VdbConfig): 配置
+        vids, matrix: 已读入的数据向量（可选，避免重复读取）
+
+    Returns:
+        VectorTransform: 未开启预处理时返回 None
+    """
+    transform = VectorTransform(**vdb_config.PREPROCESS)
+    if not transform.enabled:
+        return None
+    if transform.method is None:
+        return transform
+    source = describe_source(vdb_config.DATASET_VECTOR_PATH[0])
+    if os.path.exists(vdb_config.PREPROCESS_FILE):
+        saved = VectorTransform.load(vdb_config.PREPROCESS_FILE)
+        if saved.config() == transform.config() and saved.source == source:
+            return saved
+    if matrix is None:
+        from FileIO import read_fivecs_matrix
+        vids, matrix = read_fivecs_matrix(vdb_config.DATASET_VECTOR_PATH[0])
+    transform.fit(matrix)
+    transform.source = source
+    transform.save(vdb_config.PREPROCESS_FILE)
+    print(f"Preprocess transform {transform.config()} written to {vdb_config.PREPROCESS_FILE}, "
+          f"explained variance = {transform.explained_variance:.3f}")
+    return transform
@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+from collections import defaultdict
+
+
+class _NullSpan:
+    """关闭性能分析时返回的空计时区间，进入/退出均不做任何事"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """可嵌套的计时区间，退出时把耗时记录到 Profiler 中"""
+    __slots__ = ("profiler", "name", "args", "start_ns", "child_ns")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+        self.child_ns = 0
+
+    def __enter__(self):
+        self.profiler._stack().append(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end_ns = time.perf_counter_ns()
+        stack = self.profiler._stack()
+        stack.pop()
+        duration_ns = end_ns - self.start_ns
+        if stack:
+            # 父区间的自身耗时需要扣除子区间
+            stack[-1].child_ns += duration_ns
+        self.profiler._record(self, duration_ns, len(stack))
+        return False
+
+
+class Profiler:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.init_profiler()
+        return cls._instance
+
+    def init_profiler(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin_ns = time.perf_counter_ns()
+        self.events = []
+        self.counters = defaultdict(int)
+        self.counter_events = []
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._origin_ns = time.perf_counter_ns()
+            self.events = []
+            self.counters = defaultdict(int)
+            self.counter_events = []
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span, duration_ns, depth):
+        event = (
+            span.name,
+            span.start_ns - self._origin_ns,
+            duration_ns,
+            duration_ns - span.child_ns,
+            threading.get_ident(),
+            depth,
+            span.args,
+        )
+        with self._lock:
+            self.events.append(event)
+
+    def span(self, name, **args):
+        """
+        创建一个计时区间，用法：with profiler.span("knn_search.rpc"): ...
+
+        Args:
+            name (str): 区间名称（建议使用 "阶段.子阶段" 的形式）
+            **args: 附加到 Chrome trace 事件上的参数
+
+        Returns:
+            上下文管理器；关闭性能分析时返回共享的空区间，几乎没有开销
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def trace(self, name=None):
+        """
+        函数装饰器，每次调用时包裹一个计时区间
+
+        Args:
+            name (str): 区间名称，默认使用函数的 __qualname__
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, span_name, {}):
+                    return func(*args, **kwargs)
+
+            wrapper.__name__ = func.__name__
+            wrapper.__qualname__ = func.__qualname__
+            wrapper.__doc__ = func.__doc__
+            wrapper.__wrapped__ = func
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1):
+        """
+        累加计数器（例如读取的向量数、插入的行数）
+
+        Args:
+            name (str): 计数器名称
+            value (int): 增量
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] += value
+            self.counter_events.append((name, time.perf_counter_ns() - self._origin_ns, self.counters[name]))
+
+    def export_chrome_trace(self, file_name):
+        """
+        导出 Chrome trace JSON（可在 chrome://tracing 或 Perfetto 中打开）
+
+        Args:
+            file_name (str): 输出文件路径
+        """
+        trace_events = []
+        with self._lock:
+            for name, start_ns, duration_ns, _, tid, _, args in self.events:
+                trace_events.append({
+                    "name": name,
+                    "cat": name.split(".")[0],
+                    "ph": "X",
+                    "ts": start_ns / 1000.0,
+                    "dur": duration_ns / 1000.0,
+                    "pid": 0,
+                    "tid": tid,
+                    "args": args,
+                })
+            for name, ts_ns, value in self.counter_events:
+                trace_events.append({
+                    "name": name,
+                    "ph": "C",
+                    "ts": ts_ns / 1000.0,
+                    "pid": 0,
+                    "args": {name: value},
+                })
+        with open(file_name, "w") as fout:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, fout)
+        print(f"Chrome trace written to {file_name} ({len(trace_events)} events)")
+
+    def summary(self):
+        """
+        按区间名称汇总耗时
+
+        Returns:
+            list: [(name, calls, total_ms, self_ms, avg_ms, max_ms)]，按自身耗时降序排列
+        """
+        stats = defaultdict(lambda: [0, 0, 0, 0])
+        with self._lock:
+            for name, _, duration_ns, self_ns, _, _, _ in self.events:
+                item = stats[name]
+                item[0] += 1
+                item[1] += duration_ns
+                item[2] += self_ns
+                item[3] = max(item[3], duration_ns)
+        rows = []
+        for name, (calls, total_ns, self_ns, max_ns) in stats.items():
+            rows.append((name, calls, total_ns / 1e6, self_ns / 1e6, total_ns / 1e6 / calls, max_ns / 1e6))
+        rows.sort(key=lambda x: x[3], reverse=True)
+        return rows
+
+    def print_summary(self):
+        """打印每个阶段的耗时汇总表以及计数器"""
+        rows = self.summary()
+        total_self_ms = sum(row[3] for row in rows)
+        print("=" * 96)
+        print(f"{'stage':<36}{'calls':>8}{'total(ms)':>12}{'self(ms)':>12}{'self%':>8}{'avg(ms)':>10}{'max(ms)':>10}")
+        print("-" * 96)
+        for name, calls, total_ms, self_ms, avg_ms, max_ms in rows:
+            ratio = self_ms / total_self_ms * 100.0 if total_self_ms > 0 else 0.0
+            print(f"{name:<36}{calls:>8}{total_ms:>12.3f}{self_ms:>12.3f}{ratio:>7.1f}%{avg_ms:>10.3f}{max_ms:>10.3f}")
+        if self.counters:
+            print("-" * 96)
+            for name, value in sorted(self.counters.items()):
+                print(f"{name:<36}{value:>8}")
+        print("=" * 96)
+
+
+# 单例模式保证全局唯一
+profiler = Profiler()
@@ -0,0 +1,345 @@
+import json
+import os
+import numpy as np
+from AttrIndex import parse_filter, read_meta_columns, LruCache
+from FileIO import read_query
+
+# filtered 策略调整的查询参数：HNSW 为 ef，IVF 系列（IVF_FLAT、IVF_SQ8、BIN_IVF_FLAT 等）为 nprobe
+FILTERED_PARAMS = {
+    "ef": [32, 64, 128, 256],
+    "nprobe": [8, 16, 32, 64],
+}
+
+
+def candidates_for(index_type: str) -> list:
+    """
+    近似索引类型对应的候选策略与参数：prefilter（本地暴力计算）、filtered（Milvus 过滤查询，调整该索引的查询参数）、
+    postfilter（多取结果后本地过滤）；没有可调查询参数的索引（例如 FLAT）只有一个 filtered 候选
+    """
+    if index_type == "HNSW":
+        key = "ef"
+    elif "IVF" in index_type:
+        key = "nprobe"
+    else:
+        key = None
+    filtered = [("filtered", {key: value}) for value in FILTERED_PARAMS[key]] if key else [("filtered", {})]
+    return [("prefilter", {})] + filtered + [("postfilter", {"oversample": 4}), ("postfilter", {"oversample": 16})]
+
+
+DEFAULT_CANDIDATES = candidates_for("HNSW")
+
+# 选择率分桶的边界
+SELECTIVITY_EDGES = [0.0, 0.001, 0.01, 0.05, 0.2, 0.5, 1.0]
+
+
+class _Histogram:
+    # 不同取值数不超过该值时记录每个取值的频率
+    MAX_FREQUENT_VALUES = 1024
+
+    def __init__(self, values, num_bins: int):
+        """
+        单个属性的直方图：数值列为等深直方图，取值较少时另外记录每个取值的频率
+
+        Args:
+            values (numpy.ndarray): 属性值
+            num_bins (int): 等深直方图的桶数
+        """
+        self.is_numeric = np.issubdtype(values.dtype, np.number)
+        uniques, counts = np.unique(values, return_counts=True)
+        self.num_distinct = max(len(uniques), 1)
+        self.frequencies = None
+        if len(uniques) <= self.MAX_FREQUENT_VALUES:
+            self.frequencies = dict(zip(uniques.tolist(), (counts / len(values)).tolist()))
+        if self.is_numeric:
+            self.bounds = np.quantile(values.astype(np.float64), np.linspace(0.0, 1.0, num_bins + 1))
+
+    def _cdf(self, value: float, inclusive: bool) -> float:
+        """P(x < value) 或 P(x <= value)，桶内按均匀分布插值"""
+        bounds = self.bounds
+        if value < bounds[0] or (value == bounds[0] and not inclusive):
+            return 0.0
+        if value > bounds[-1] or (value == bounds[-1] and inclusive):
+            return 1.0
+        num_bins = len(bounds) - 1
+        b = min(int(np.searchsorted(bounds, value, "right")) - 1, num_bins - 1)
+        width = bounds[b + 1] - bounds[b]
+        fraction = (value - bounds[b]) / width if width > 0 else 1.0
+        return (b + fraction) / num_bins
+
+    def equal(self, value) -> float:
+        if self.is_numeric:
+            value = float(value)
+            key = int(value) if value.is_integer() else value
+        else:
+            key = str(value)
+        if self.frequencies is not None:
+            return self.frequencies.get(key, 0.0)
+        return 1.0 / self.num_distinct
+
+    def compare(self, op: str, value) -> float:
+        if op == "==":
+            return self.equal(value)
+        if not self.is_numeric:
+            # 字符串的范围比较很少见，按均匀分布粗略估计
+            return 0.5
+        value = float(value)
+        if op == "<":
+            return self._cdf(value, False)
+        if op == "<=":
+            return self._cdf(value, True)
+        if op == ">":
+            return 1.0 - self._cdf(value, True)
+        if op == ">=":
+            return 1.0 - self._cdf(value, False)
+        raise ValueError(f"Unsupported operator: {op}")
+
+
+class SelectivityEstimator:
+    def __init__(self, columns: dict, num_bins: int = 64, cache_size: int = 1024):
+        """
+        初始化 SelectivityEstimator 类：用属性直方图估计过滤条件的选择率（假设不同条件相互独立）
+
+        Args:
+            columns (dict): 属性名 -> 属性值
+            num_bins (int): 等深直方图的桶数
+            cache_size (int): 最多缓存的过滤表达式选择率数（LRU）
+        """
+        self.histograms = {name: _Histogram(np.asarray(values), num_bins) for name, values in columns.items()}
+        self._cache = LruCache(cache_size)
+
+    @classmethod
+    def from_meta_file(cls, meta_file_path: str, num_bins: int = 64, cache_size: int = 1024):
+        return cls(read_meta_columns(meta_file_path), num_bins, cache_size)
+
+    def estimate(self, filter_expr: str) -> float:
+        """估计满足过滤条件的行所占比例"""
+        selectivity = self._cache.get(filter_expr)
+        if selectivity is None:
+            selectivity = self._estimate(parse_filter(filter_expr))
+            self._cache.put(filter_expr, selectivity)
+        return selectivity
+
+    def _estimate(self, tree) -> float:
+        kind = tree[0]
+        if kind == "or":
+            left, right = self._estimate(tree[1]), self._estimate(tree[2])
+            return left + right - left * right
+        if kind == "and":
+            return self._estimate(tree[1]) * self._estimate(tree[2])
+        if kind == "not":
+            return 1.0 - self._estimate(tree[1])
+        if tree[1] not in self.histograms:
+            raise ValueError(f"Unknown attribute '{tree[1]}'")
+        histogram = self.histograms[tree[1]]
+        if kind == "in":
+            return min(1.0, sum(histogram.equal(value) for value in set(tree[2])))
+        return histogram.compare(tree[2], tree[3])
+
+
+class QueryPlanner:
+    def __init__(self, estimator: SelectivityEstimator, table: dict = None, brute_force_ratio: float = 0.01):
+        """
+        初始化 QueryPlanner 类：根据估计的选择率，从校准表中为每个混合查询选择策略与参数
+
+        校准表内容：
+            {
+                "edges": 选择率分桶的边界,
+                "target_recall": 目标召回率,
+                "plans": 每个分桶选择的 [策略, 参数],
+                "stats": 每个分桶中每个候选的召回率与延迟
+            }
+
+        Args:
+            estimator (SelectivityEstimator): 选择率估计
+            table (dict): 校准表，None 表示尚未校准
+            brute_force_ratio (float): 没有校准表时，选择率不超过该值使用 prefilter，否则使用 filtered
+        """
+        self.estimator = estimator
+        self.table = table
+        self.brute_force_ratio = brute_force_ratio
+
+    @classmethod
+    def load(cls, estimator: SelectivityEstimator, file_name: str, brute_force_ratio: float = 0.01):
+        """读取校准表，文件不存在时使用默认规则"""
+        table = None
+        if os.path.exists(file_name):
+            with open(file_name, "r") as fin:
+                table = json.load(fin)
+        return cls(estimator, table, brute_force_ratio)
+
+    def save(self, file_name: str) -> None:
+        with open(file_name, "w") as fout:
+            json.dump(self.table, fout, indent=2)
+
+    @staticmethod
+    def bucket_of(selectivity: float, edges) -> int:
+        return min(max(int(np.searchsorted(edges, selectivity, "right")) - 1, 0), len(edges) - 2)
+
+    def plan(self, filter_expr: str):
+        """
+        为过滤条件选择策略
+
+        Returns:
+            tuple: (策略, 参数, 估计的选择率)
+        """
+        selectivity = self.estimator.estimate(filter_expr)
+        if self.table is None:
+            if selectivity <= self.brute_force_ratio:
+                return "prefilter", {}, selectivity
+            return "filtered", {}, selectivity
+        strategy, params = self.table["plans"][self.bucket_of(selectivity, self.table["edges"])]
+        return strategy, params, selectivity
+
+    def calibrate(
+        self,
+        query_processor,
+        collection_name: str,
+        search_field_name: str,
+        query_vector_list: list,
+        filter_list: list,
+        top_k: int,
+        search_params: dict,
+        candidates=DEFAULT_CANDIDATES,
+        edges=SELECTIVITY_EDGES,
+        target_recall: float = 0.95
+    ) -> dict:
+        """
+        离线校准：对工作负载中的每个查询运行所有候选策略，按估计的选择率分桶统计召回率与延迟，
+        每个分桶选择召回率达到 target_recall 的候选中延迟最低的一个（都达不到时选召回率最高的）
+
+        Ground Truth 为 prefilter（满足条件的向量上的精确结果），因此 query_processor 需要设置 set_attr_index
+
+        Args:
+            query_processor (QueryProcessor): QueryProcessor 实例
+            collection_name (str): 近似索引集合名称
+            search_field_name (str): 向量字段
+            query_vector_list (list): 查询向量
+            filter_list (list): 过滤条件
+            top_k (int): 返回最相似的 k 个结果
+            search_params (dict): Milvus 查询参数
+            candidates: 候选 (策略, 参数)
+            edges: 选择率分桶的边界
+            target_recall (float): 目标召回率
+
+        Returns:
+            dict: 校准表
+        """
+        num_buckets = len(edges) - 1
+        # stats[b][c] = [召回率之和, 延迟之和, 查询数]
+        stats = [[[0.0, 0.0, 0] for _ in candidates] for _ in range(num_buckets)]
+        for query_vector, filter_expr in zip(query_vector_list, filter_list):
+            bucket = self.bucket_of(self.estimator.estimate(filter_expr), edges)
+            truth_list, _ = query_processor.search_with_strategy(
+                "prefilter", {}, collection_name, search_field_name, query_vector, filter_expr, top_k, search_params)
+            truth_ids = set(hit.id for hit in truth_list)
+            for c, (strategy, params) in enumerate(candidates):
+                result_list, latency = query_processor.search_with_strategy(
+                    strategy, params, collection_name, search_field_name, query_vector, filter_expr, top_k, search_params)
+                recall = len(truth_ids.intersection(hit.id for hit in result_list)) / len(truth_ids) if truth_ids else 1.0
+                stats[bucket][c][0] += recall
+                stats[bucket][c][1] += latency
+                stats[bucket][c][2] += 1
+
+        plans, table_stats = [], []
+        for b in range(num_buckets):
+            bucket_stats = [
+                {
+                    "strategy": strategy,
+                    "params": params,
+                    "recall": recall_sum / count if count else None,
+                    "latency_ms": latency_sum / count if count else None,
+                    "queries": count,
+                }
+                for (strategy, params), (recall_sum, latency_sum, count) in zip(candidates, stats[b])
+            ]
+            table_stats.append(bucket_stats)
+            measured = [entry for entry in bucket_stats if entry["queries"] > 0]
+            if not measured:
+                # 没有查询落在该分桶：沿用默认规则
+                default = "prefilter" if edges[b + 1] <= self.brute_force_ratio else "filtered"
+                plans.append([default, {}])
+                continue
+            qualified = [entry for entry in measured if entry["recall"] >= target_recall]
+            if qualified:
+                best = min(qualified, key=lambda entry: entry["latency_ms"])
+            else:
+                best = max(measured, key=lambda entry: (entry["recall"], -entry["latency_ms"]))
+            plans.append([best["strategy"], best["params"]])
+
+        self.table = {"edges": list(edges), "target_recall": target_recall, "plans": plans, "stats": table_stats}
+        print_calibration(self.table)
+        return self.table
+
+
+def print_calibration(table: dict) -> None:
+    """打印校准表：每个选择率分桶中每个候选的召回率与延迟，* 表示选中的候选"""
+    edges = table["edges"]
+    print("=" * 80)
+    print(f"{'selectivity':<18}{'strategy':<12}{'params':<20}{'queries':>8}{'recall':>10}{'latency(ms)':>14}")
+    for b, bucket_stats in enumerate(table["stats"]):
+        chosen = table["plans"][b]
+        for entry in bucket_stats:
+            if entry["queries"] == 0:
+                continue
+            mark = "*" if [entry["strategy"], entry["params"]] == chosen else " "
+            print(f"{f'[{edges[b]}, {edges[b + 1]})':<18}{mark}{entry['strategy']:<11}{json.dumps(entry['params']):<20}"
+                  f"{entry['queries']:>8}{entry['recall'] * 100:>9.1f}%{entry['latency_ms']:>14.3f}")
+    print("=" * 80)
+
+
+def strategy_report(strategy_list: list, query_time_list: list, query_recall_list: list) -> dict:
+    """
+    按实际使用的策略汇总召回率与延迟
+
+    Args:
+        strategy_list (list): 每个查询使用的策略
+        query_time_list (list): 每个查询的耗时（毫秒）
+        query_recall_list (list): 每个查询的召回率
+
+    Returns:
+        dict: 策略 -> {"queries", "recall", "latency_ms"}
+    """
+    report = {}
+    for strategy in sorted(set(strategy_list)):
+        positions = [i for i, used in enumerate(strategy_list) if used == strategy]
+        report[strategy] = {
+            "queries": len(positions),
+            "recall": float(np.mean([query_recall_list[i] for i in positions])),
+            "latency_ms": float(np.mean([query_time_list[i] for i in positions])),
+        }
+    print(f"{'strategy':<12}{'queries':>8}{'recall':>10}{'latency(ms)':>14}")
+    for strategy, entry in report.items():
+        print(f"{strategy:<12}{entry['queries']:>8}{entry['recall'] * 100:>9.1f}%{entry['latency_ms']:>14.3f}")
+    return report
+
+
+def run_calibration(vdb_config, query_processor, top_k: int = 10, max_queries: int = None) -> dict:
+    """
+    在 QUERY_WORKLOAD 的近似索引集合上校准查询规划器（filtered 候选按 INDEX_PARAMS 中近似索引的类型选择查询参数），
+    校准表写入 PLANNER_TABLE_FILE
+
+    Args:
+        vdb_config (VdbConfig): 配置
+        query_processor (QueryProcessor): 已设置属性索引与规划器的 QueryProcessor（见 create_query_processor）
+        top_k (int): 返回最相似的 k 个结果
+        max_queries (int): 参与校准的查询数，None 表示全部
+    """
+    query_dict = vdb_config.QUERY_WORKLOAD[1]
+    query_vector_list, attr_filter_list = read_query(query_dict["query_file_path"])
+    if max_queries is not None:
+        query_vector_list, attr_filter_list = query_vector_list[:max_queries], attr_filter_list[:max_queries]
+    query_vector_list = [query_processor.transform_query(query_vector) for query_vector in query_vector_list]
+    table = query_processor.planner.calibrate(
+        query_processor,
+        query_dict["collection_name"],
+        "vector",
+        query_vector_list,
+        attr_filter_list,
+        top_k,
+        vdb_config.SEARCH_PARAMS[1],
+        candidates=candidates_for(vdb_config.INDEX_PARAMS[1]["index_type"]),
+        target_recall=vdb_config.TARGET_RECALL,
+    )
+    query_processor.planner.save(vdb_config.PLANNER_TABLE_FILE)
+    print(f"Calibration table written to {vdb_config.PLANNER_TABLE_FILE}")
+    return table
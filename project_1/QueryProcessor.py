@@ -1,21 +1,234 @@
-from pymilvus import MilvusClient
-from FileIO import read_query, dump2json
-import time, sys
-from pymilvus import connections, Collection, utility
-from VdbConfig import vdb_config
+import numpy as np
+from FileIO import read_query, dump2json, convert_vectors, read_fivecs_matrix
+from AttrIndex import AttrIndex
+from QueryPlanner import SelectivityEstimator, QueryPlanner, strategy_report
+from Preprocess import load_or_fit_transform
+from Partitioning import load_or_fit_layout
+from LocalEngine import LocalEngine
+from ResultCache import file_version, create_result_cache
+from SearchResult import HitList, extract_hits, hit_ids, stack_hits, batch_recall, SampledLogger
+import os, time, sys, threading
+from Profiler import profiler
+from Metrics import metrics, start_metrics
+from EmbeddingCache import configure_cache
+from LazyImport import lazy_from
+
+# pymilvus 在第一次使用时才导入
+Collection, MilvusClient = lazy_from("pymilvus", "Collection", "MilvusClient")
 
 
 class QueryProcessor:
-    def __init__(self, milvus_client: MilvusClient):
+    def __init__(self, milvus_client: MilvusClient, vector_type: str = "float32", metric_type: str = "L2", rerank_factor: int = 4):
         """
         初始化 QueryProcessor 类
         
         Args:
             milvus_client (MilvusClient): Milvus 客户端实例
+            vector_type (str): 集合中向量的存储类型（float32/float16/bfloat16/binary），查询向量按相同方式转换
+            metric_type (str): 浮点重排使用的距离（L2/IP）
+            rerank_factor (int): binary 模式下汉明距离检索 top_k * rerank_factor 个候选再重排
         """
         self.client = milvus_client
+        self.vector_type = vector_type
+        self.metric_type = metric_type
+        self.rerank_factor = rerank_factor
+        self.rerank_matrix = None
+        self.rerank_position = None
+        # 客户端过滤加速：属性索引与代价模型（服务器查询延迟、暴力计算每个元素耗时的滑动平均）
+        self.attr_index = None
+        self.brute_force_ratio = 0.01
+        self.server_latency_ms = None
+        self.brute_force_ns = 1.0
+        self.route_stats = {"filtered": 0, "prefilter": 0, "postfilter": 0}
+        # 查询规划器（见 QueryPlanner.py）与每次混合查询使用的策略
+        self.planner = None
+        self.strategy_log = []
+        # 调度器的多个执行线程会同时执行混合查询，以上统计（代价模型的滑动平均、route_stats、strategy_log）在锁内更新
+        self.stats_lock = threading.Lock()
+        # 导入前的向量预处理（见 Preprocess.py），查询向量使用同一个变换
+        self.transform = None
+        # 进程内的本地引擎（见 LocalEngine.py），设置后不再访问 Milvus
+        self.local_engine = None
+        # 抽样输出查询结果（默认不输出）
+        self.result_logger = SampledLogger()
+        # 集合的分区划分方式（见 Partitioning.py），过滤查询只检索相关分区
+        self.partition_layout = None
+        # 近似查询结果缓存（见 ResultCache.py）与判断集合版本的导入检查点目录
+        self.result_cache = None
+        self.checkpoint_dir = "checkpoints"
+
+    def set_rerank_vectors(self, vids, matrix):
+        """
+        设置用于重排的浮点向量（binary 模式下必须设置，否则直接返回汉明距离的结果）
+        
+        Args:
+            vids (numpy.ndarray): 向量ID
+            matrix (numpy.ndarray): 与 vids 对应的 (n, dim) 浮点向量
+        """
+        self.rerank_matrix = np.asarray(matrix, dtype=np.float32)
+        self.rerank_position = dict(zip(np.asarray(vids).tolist(), range(len(vids))))
+
+    def set_transform(self, transform):
+        """
+        设置导入时使用的预处理变换，查询向量在检索前按同样方式变换
+        重排与暴力计算使用的向量（set_rerank_vectors）也应当是变换后的向量
+
+        Args:
+            transform (VectorTransform): Preprocess.load_or_fit_transform 返回的变换
+        """
+        self.transform = transform
+
+    def transform_query(self, query_vector):
+        """对查询向量应用预处理变换（未设置变换时原样返回）"""
+        if self.transform is None:
+            return query_vector
+        return self.transform.transform(query_vector)
+
+    def set_local_engine(self, local_engine):
+        """
+        使用进程内的本地引擎代替 Milvus（集合由 LocalEngine.build_local_collections 构建）
+
+        Args:
+            local_engine (LocalEngine): 本地引擎
+        """
+        self.local_engine = local_engine
+
+    def _collection(self, collection_name):
+        """打开集合：本地引擎中的 LocalCollection 或 Milvus 的 Collection，二者的 load/search 接口相同"""
+        if self.local_engine is not None:
+            return self.local_engine.collection(collection_name)
+        return Collection(collection_name, using=self.client._using)
+
+    def set_partition_layout(self, partition_layout):
+        """
+        设置集合的分区划分方式，带过滤条件的查询通过 partition_names 只检索可能包含结果的分区
+
+        Args:
+            partition_layout (PartitionLayout): Partitioning.load_or_fit_layout 返回的划分方式
+        """
+        self.partition_layout = partition_layout
+
+    def _partition_names(self, filter_expr):
+        """过滤条件涉及的分区，None 表示检索全部分区"""
+        if self.partition_layout is None:
+            return None
+        partition_names = self.partition_layout.route(filter_expr)
+        if partition_names is not None:
+            profiler.count("hybrid_search.partitions", len(partition_names))
+        return partition_names
+
+    def set_result_cache(self, result_cache, checkpoint_dir: str = "checkpoints"):
+        """
+        设置查询结果缓存：knn_search / hybrid_search 先查缓存，集合版本（collection_version）变化时该集合的缓存失效
+
+        Args:
+            result_cache (SemanticCache): 结果缓存，None 表示关闭
+            checkpoint_dir (str): DataLoader 的检查点目录（VdbConfig.CHECKPOINT_DIR）
+        """
+        self.result_cache = result_cache
+        self.checkpoint_dir = checkpoint_dir
+
+    def collection_version(self, collection_name):
+        """
+        集合的版本：本地引擎为集合描述文件，Milvus 为 DataLoader 每次写入都会更新的导入检查点与批量导入任务记录
+        （文件名见 IngestCheckpoint / BulkImportJobs）；在其他地方写入集合时调用 result_cache.invalidate
+        """
+        if self.local_engine is not None:
+            return file_version(os.path.join(self.local_engine.root_dir, collection_name, "collection.json"))
+        return file_version(os.path.join(self.checkpoint_dir, f"{collection_name}.ckpt.json"),
+                            os.path.join(self.checkpoint_dir, f"{collection_name}.bulk.json"))
+
+    def set_attr_index(self, attr_index: AttrIndex, brute_force_ratio: float = 0.01):
+        """
+        设置客户端属性索引：hybrid_search 先在本地计算过滤条件，满足条件的向量很少时直接暴力计算，否则交给 Milvus
+
+        需要先调用 set_rerank_vectors 提供浮点向量，且行号与 attr_index 一致（来自同一个 .fivecs 文件）
+        
+        Args:
+            attr_index (AttrIndex): 属性索引
+            brute_force_ratio (float): 尚未观测到服务器延迟时，选择率不超过该值的过滤条件使用暴力计算
+        """
+        if self.rerank_matrix is None or len(self.rerank_matrix) != len(attr_index):
+            raise ValueError("Attribute index does not match the vectors set by set_rerank_vectors")
+        self.attr_index = attr_index
+        self.brute_force_ratio = brute_force_ratio
+
+    def set_planner(self, planner):
+        """
+        设置查询规划器：hybrid_search 根据过滤条件的估计选择率选择策略与参数
+
+        prefilter / postfilter 策略需要先调用 set_attr_index
+        """
+        if self.attr_index is None:
+            raise ValueError("set_attr_index must be called before set_planner")
+        self.planner = planner
+
+    def _choose_route(self, num_rows):
+        """代价模型：估计暴力计算的耗时，与服务器查询延迟的滑动平均比较"""
+        if self.server_latency_ms is None:
+            if num_rows <= self.brute_force_ratio * len(self.rerank_matrix):
+                return "brute_force"
+            return "server"
+        estimated_ms = num_rows * self.rerank_matrix.shape[1] * self.brute_force_ns / 1e6
+        return "brute_force" if estimated_ms < self.server_latency_ms else "server"
+
+    def _brute_force(self, query_vector, rows, top_k):
+        """在满足过滤条件的行上精确计算 top_k"""
+        if len(rows) == 0:
+            return HitList([], [])
+        start_time = time.perf_counter_ns()
+        candidates = self.rerank_matrix[rows]
+        query = np.asarray(query_vector, dtype=np.float32)
+        if self.metric_type == "IP":
+            distances = candidates @ query
+            order = np.argsort(-distances)[:top_k]
+        else:
+            distances = np.sum((candidates - query) ** 2, axis=1)
+            order = np.argsort(distances)[:top_k]
+        elapsed_ns = time.perf_counter_ns() - start_time
+        with self.stats_lock:
+            self.brute_force_ns = 0.8 * self.brute_force_ns + 0.2 * elapsed_ns / candidates.size
+        return HitList(self.attr_index.vids[rows[order]], distances[order])
+
+    def _need_rerank(self):
+        return self.vector_type == "binary" and self.rerank_matrix is not None
+
+    def _prepare_query(self, query_vector):
+        """把浮点查询向量转换为集合中向量的存储类型"""
+        if self.vector_type == "float32":
+            return query_vector
+        return convert_vectors(np.asarray([query_vector], dtype=np.float32), self.vector_type)[0]
+
+    @metrics.timed("rerank")
+    def _rerank(self, query_vector, result_list, top_k):
+        """
+        用浮点向量对候选结果精确重排
+        
+        Args:
+            query_vector: 浮点查询向量
+            result_list: 汉明距离检索返回的候选
+            top_k (int): 返回的结果数
+            
+        Returns:
+            HitList: 重排后的结果（L2 按距离升序，IP 按内积降序）
+        """
+        candidate_ids = hit_ids(result_list)
+        if len(candidate_ids) == 0:
+            return HitList([], [])
+        positions = [self.rerank_position[vid] for vid in candidate_ids.tolist()]
+        candidates = self.rerank_matrix[positions]
+        query = np.asarray(query_vector, dtype=np.float32)
+        if self.metric_type == "IP":
+            distances = candidates @ query
+            order = np.argsort(-distances)[:top_k]
+        else:
+            distances = np.sum((candidates - query) ** 2, axis=1)
+            order = np.argsort(distances)[:top_k]
+        return HitList(candidate_ids[order], distances[order])
         
 
+    @metrics.timed("search")
+    @profiler.trace("knn_search")
     def knn_search(self, collection_name, search_field_name, query_vector, top_k, search_params):
         """
         KNN查询
@@ -26,27 +239,154 @@ class QueryProcessor:
         :param search_params: 搜索参数 (可选)
         :return: (结果列表, 耗时(毫秒))
         """
-        collection = Collection(collection_name, using=self.client._using)
-        collection.load()
+        if self.result_cache is not None:
+            return self.result_cache.search(
+                collection_name, search_field_name, None, search_params, query_vector, top_k,
+                lambda: self._knn_search(collection_name, search_field_name, query_vector, top_k, search_params),
+                self.collection_version(collection_name))
+        return self._knn_search(collection_name, search_field_name, query_vector, top_k, search_params)
+
+    def _knn_search(self, collection_name, search_field_name, query_vector, top_k, search_params):
+        query_vector = self.transform_query(query_vector)
+        with profiler.span("knn_search.load"):
+            collection = self._collection(collection_name)
+            collection.load()
         # print(f"top = {top_k}")
 
         # 执行搜索
         start_time = time.time()
-        result_list = collection.search(
-            data=[query_vector],
-            anns_field=search_field_name,
-            param=search_params,
-            limit=top_k,
-            output_fields=["id"],
-        )
-        result_list = result_list[0]
+        limit = top_k * self.rerank_factor if self._need_rerank() else top_k
+        with profiler.span("knn_search.rpc", top_k=top_k):
+            result_list = collection.search(
+                data=[self._prepare_query(query_vector)],
+                anns_field=search_field_name,
+                param=search_params,
+                limit=limit,
+                output_fields=[],
+            )
+        # 主键总是随结果返回，不再额外请求输出字段；ID与距离批量取出
+        result_list = extract_hits(result_list)[0]
+        if self._need_rerank():
+            with profiler.span("knn_search.rerank", candidates=len(result_list)):
+                result_list = self._rerank(query_vector, result_list, top_k)
         latency = (time.time() - start_time) * 1000.0
-        for result in result_list:
-            print(f"result = {{ {result} }}")
-        
+        self.result_logger.log("knn result", result_list)
+
         return result_list, latency
     
 
+    def _server_search(self, collection_name, search_field_name, query_vector, filter_expr, top_k, search_params):
+        """
+        在 Milvus 上执行查询（filter_expr 为 None 时不带过滤条件）
+        :return: (结果列表, 耗时(毫秒))，耗时不包括加载集合
+        """
+        with profiler.span("hybrid_search.load"):
+            collection = self._collection(collection_name)
+            collection.load()
+        # print(f"top = {top_k}")
+
+        # 执行搜索
+        start_time = time.time()
+        limit = top_k * self.rerank_factor if self._need_rerank() else top_k
+        with profiler.span("hybrid_search.rpc", top_k=top_k):
+            result_list = collection.search(
+                data=[self._prepare_query(query_vector)],
+                anns_field=search_field_name,
+                param=search_params,
+                expr=filter_expr,
+                limit=limit,
+                output_fields=[],
+                partition_names=self._partition_names(filter_expr),
+            )
+        result_list = extract_hits(result_list)[0]
+        if self._need_rerank():
+            with profiler.span("hybrid_search.rerank", candidates=len(result_list)):
+                result_list = self._rerank(query_vector, result_list, top_k)
+        latency = (time.time() - start_time) * 1000.0
+        with self.stats_lock:
+            if self.server_latency_ms is None:
+                self.server_latency_ms = latency
+            else:
+                self.server_latency_ms = 0.8 * self.server_latency_ms + 0.2 * latency
+        return result_list, latency
+
+    @metrics.timed("search_batch")
+    @profiler.trace("search_batch")
+    def search_batch(self, collection_name, search_field_name, query_vector_list, filter_expr, top_k, search_params):
+        """
+        一次 RPC 执行多个集合、过滤条件与查询参数都相同的查询（SearchScheduler 合并请求时使用），
+        不经过查询规划器与客户端过滤加速
+        :param query_vector_list: 查询向量列表
+        :param filter_expr: 关系型属性过滤条件，None 表示 KNN 查询
+        :return: (每个查询的结果列表, 耗时(毫秒))，耗时不包括加载集合
+        """
+        query_vector_list = [self.transform_query(query_vector) for query_vector in query_vector_list]
+        with profiler.span("search_batch.load"):
+            collection = self._collection(collection_name)
+            collection.load()
+
+        start_time = time.time()
+        limit = top_k * self.rerank_factor if self._need_rerank() else top_k
+        with profiler.span("search_batch.rpc", nq=len(query_vector_list), top_k=top_k):
+            result = collection.search(
+                data=[self._prepare_query(query_vector) for query_vector in query_vector_list],
+                anns_field=search_field_name,
+                param=search_params,
+                expr=filter_expr,
+                limit=limit,
+                output_fields=[],
+                partition_names=self._partition_names(filter_expr),
+            )
+        result_lists = extract_hits(result)
+        if self._need_rerank():
+            with profiler.span("search_batch.rerank", candidates=sum(len(result_list) for result_list in result_lists)):
+                result_lists = [self._rerank(query_vector, result_list, top_k)
+                                for query_vector, result_list in zip(query_vector_list, result_lists)]
+        latency = (time.time() - start_time) * 1000.0
+        return result_lists, latency
+
+    def search_with_strategy(self, strategy, params, collection_name, search_field_name, query_vector, filter_expr, top_k, search_params):
+        """
+        按指定策略执行混合查询
+        :param strategy: prefilter（本地暴力计算满足条件的向量）、
+                         filtered（Milvus 过滤查询，params 合并到查询参数中，例如 {"ef": 128}）、
+                         postfilter（Milvus 不带过滤条件取 top_k * params["oversample"] 个结果，再在本地过滤）
+        :param params: 策略参数
+        :return: (结果列表, 耗时(毫秒))
+        """
+        if strategy == "prefilter":
+            start_time = time.time()
+            rows = self.attr_index.select_rows(filter_expr)
+            with profiler.span("hybrid_search.brute_force", rows=len(rows)):
+                result_list = self._brute_force(query_vector, rows, top_k)
+            return result_list, (time.time() - start_time) * 1000.0
+
+        if strategy == "postfilter":
+            rows = self.attr_index.select_rows(filter_expr)
+            oversample = params.get("oversample", 4)
+            candidates, latency = self._server_search(
+                collection_name, search_field_name, query_vector, None, top_k * oversample, search_params)
+            start_time = time.time()
+            with profiler.span("hybrid_search.postfilter", candidates=len(candidates)):
+                positions = np.array([self.rerank_position[vid] for vid in hit_ids(candidates).tolist()], dtype=np.int64)
+                matched = np.isin(positions, rows)
+                result_list = candidates[np.flatnonzero(matched)[:top_k]]
+            latency += (time.time() - start_time) * 1000.0
+            if len(result_list) >= min(top_k, len(rows)):
+                return result_list, latency
+            # 过滤后不足 top_k 个结果，退回到带过滤条件的查询
+            profiler.count("hybrid_search.postfilter_fallback")
+            result_list, fallback_latency = self._server_search(
+                collection_name, search_field_name, query_vector, filter_expr, top_k, search_params)
+            return result_list, latency + fallback_latency
+
+        if params:
+            search_params = dict(search_params, params=dict(search_params.get("params", {}), **params))
+        return self._server_search(collection_name, search_field_name, query_vector, filter_expr, top_k, search_params)
+
+
+    @metrics.timed("hybrid_search")
+    @profiler.trace("hybrid_search")
     def hybrid_search(self, collection_name, search_field_name, query_vector, filter_expr, top_k, search_params):
         """
         混合查询
@@ -58,40 +398,56 @@ class QueryProcessor:
         :param search_params: 搜索参数 (可选)
         :return: (结果列表, 耗时(毫秒))
         """
-        collection = Collection(collection_name, using=self.client._using)
-        collection.load()
-        # print(f"top = {top_k}")
+        # 记录本次查询实际执行的策略，命中缓存时没有执行任何策略
+        strategies = []
 
-        # 执行搜索
+        def search_fn():
+            result_list, latency, strategy = self._hybrid_search(
+                collection_name, search_field_name, query_vector, filter_expr, top_k, search_params)
+            strategies.append(strategy)
+            return result_list, latency
+
+        if self.result_cache is not None:
+            result = self.result_cache.search(
+                collection_name, search_field_name, filter_expr, search_params, query_vector, top_k,
+                search_fn, self.collection_version(collection_name))
+        else:
+            result = search_fn()
+        with self.stats_lock:
+            self.strategy_log.append(strategies[0] if strategies else "cached")
+        return result
+
+    def _hybrid_search(self, collection_name, search_field_name, query_vector, filter_expr, top_k, search_params):
+        query_vector = self.transform_query(query_vector)
+        strategy, params = "filtered", {}
         start_time = time.time()
-        result_list = collection.search(
-            data=[query_vector],
-            anns_field=search_field_name,
-            param=search_params,
-            expr=filter_expr,
-            limit=top_k,
-            output_fields=["id"],
-        )
-        result_list = result_list[0]
-        latency = (time.time() - start_time) * 1000.0
-        print(f"filter condition: ${filter_expr}")
-        for result in result_list:
-            print(f"result = {{ {result} }}")
-        
-        return result_list, latency
+        if self.planner is not None:
+            with profiler.span("hybrid_search.plan"):
+                strategy, params, _ = self.planner.plan(filter_expr)
+        elif self.attr_index is not None:
+            with profiler.span("hybrid_search.filter"):
+                rows = self.attr_index.select_rows(filter_expr)
+            if self._choose_route(len(rows)) == "brute_force":
+                strategy = "prefilter"
+        plan_latency = (time.time() - start_time) * 1000.0
+        with self.stats_lock:
+            self.route_stats[strategy] += 1
+        profiler.count(f"hybrid_search.{strategy}")
+
+        result_list, latency = self.search_with_strategy(
+            strategy, params, collection_name, search_field_name, query_vector, filter_expr, top_k, search_params)
+        latency += plan_latency
+        self.result_logger.log(f"hybrid result ({filter_expr})", result_list)
+
+        return result_list, latency, strategy
 
 
     def calculate_recall(self, true_list, result_list):
         """计算召回率"""
-        true_ids, result_ids = [], []
-        for entity_dict in true_list:
-            true_ids.append(entity_dict.id)
-        for entity_dict in result_list:
-            result_ids.append(entity_dict.id)
-        true_set = set(true_ids)
+        true_set = set(hit_ids(true_list).tolist())
         if len(true_set)==0:
             return 0.0
-        result_set = set(result_ids)
+        result_set = set(hit_ids(result_list).tolist())
         intersection = true_set.intersection(result_set)
         return len(intersection)*1.0 / len(true_set)
     
@@ -102,23 +458,14 @@ class QueryProcessor:
         :param result_list: [[result_ids, time]]
         :param truth_list: [[truth_ids, time]]
         """   
-        query_time_list, query_recall_list = [], []     
-        avg_query_time,avg_query_recall = 0.0, 0.0
-        for query_id in range(len(result_list)):
-            result_ids = result_list[query_id][0]
-            truth_ids = truth_list[query_id][0]
-            query_time = result_list[query_id][1]
-            query_recall = self.calculate_recall(truth_ids, result_ids)
-
-            avg_query_time += query_time
-            avg_query_recall += query_recall
+        # 所有查询的结果拼成 (n, k) 数组后批量计算召回率
+        query_time_list = [float(result[1]) for result in result_list]
+        truth_ids, _ = stack_hits([truth[0] for truth in truth_list[:len(result_list)]])
+        result_ids, _ = stack_hits([result[0] for result in result_list])
+        query_recall_list = batch_recall(truth_ids, result_ids).tolist() if len(result_list) > 0 else []
 
-            query_time_list.append(query_time)
-            query_recall_list.append(query_recall)
-
-        if len(result_list) > 0:
-            avg_query_time /= len(result_list)
-            avg_query_recall /= len(result_list)
+        avg_query_time = float(np.mean(query_time_list)) if query_time_list else 0.0
+        avg_query_recall = float(np.mean(query_recall_list)) if query_recall_list else 0.0
 
         print(f"(Average) search time: {avg_query_time:.3f} ms, result recall: {avg_query_recall*100:.1f}%")
         return query_time_list, query_recall_list
@@ -132,17 +479,52 @@ def DumpResult(filename, query_time_list, query_recall_list):
         fout.write("\n")
 
 
-if __name__ == "__main__":
-    # 初始化Milvus客户端
-    milvus_client_uri = vdb_config.VDB_URI
-    client = MilvusClient(uri = milvus_client_uri)
-    query_processor = QueryProcessor(client)
-    top_k = 1
+def create_query_processor(vdb_config) -> QueryProcessor:
+    """根据 VdbConfig 创建 QueryProcessor（binary 模式下加载用于重排的浮点向量）"""
+    # 本地引擎不需要连接 Milvus
+    client = None if vdb_config.LOCAL_ENGINE else MilvusClient(uri = vdb_config.VDB_URI)
+    query_processor = QueryProcessor(client, vdb_config.VECTOR_TYPE, vdb_config.DISTANCE_TYPE, vdb_config.RERANK_FACTOR)
+    if vdb_config.LOCAL_ENGINE:
+        query_processor.set_local_engine(LocalEngine(vdb_config.LOCAL_ENGINE_DIR))
+    query_processor.result_logger = SampledLogger(vdb_config.RESULT_LOG_RATE)
+    transform = load_or_fit_transform(vdb_config)
+    query_processor.set_transform(transform)
+    query_processor.set_partition_layout(load_or_fit_layout(vdb_config))
+    query_processor.set_result_cache(create_result_cache(vdb_config), vdb_config.CHECKPOINT_DIR)
+    use_attr_index = vdb_config.FILTER_ACCELERATOR or vdb_config.QUERY_PLANNER
+    if vdb_config.VECTOR_TYPE == "binary" or use_attr_index:
+        # 二值化检索后用原始浮点向量重排；过滤加速也在这些向量上暴力计算
+        vids, matrix = read_fivecs_matrix(vdb_config.DATASET_VECTOR_PATH[0])
+        if transform is not None:
+            matrix = transform.transform(matrix)
+        query_processor.set_rerank_vectors(vids, matrix)
+        if use_attr_index:
+            attr_index = AttrIndex.from_meta_file(vids, vdb_config.DATASET_ATTR_PATH[0], cache_size=vdb_config.FILTER_CACHE_SIZE)
+            query_processor.set_attr_index(attr_index, vdb_config.BRUTE_FORCE_RATIO)
+        if vdb_config.QUERY_PLANNER:
+            estimator = SelectivityEstimator.from_meta_file(vdb_config.DATASET_ATTR_PATH[0], cache_size=vdb_config.FILTER_CACHE_SIZE)
+            planner = QueryPlanner.load(estimator, vdb_config.PLANNER_TABLE_FILE, vdb_config.BRUTE_FORCE_RATIO)
+            query_processor.set_planner(planner)
+    return query_processor
+
+
+def run_search(vdb_config, query_processor: QueryProcessor, hybrid: bool = False, top_k: int = 1):
+    """
+    在 QUERY_WORKLOAD 上测试查询性能：第一个集合（FLAT）的结果作为 Ground Truth
     
-    ## 测试KNN查询
-    print("Test KNN Search")
+    Args:
+        vdb_config (VdbConfig): 配置
+        query_processor (QueryProcessor): QueryProcessor 实例
+        hybrid (bool): True 测试混合查询，False 测试KNN查询
+        top_k (int): 返回最相似的 k 个结果
+
+    Returns:
+        tuple: 近似索引每个查询的查询时间与召回率
+    """
+    print("Test Hybrid Search" if hybrid else "Test KNN Search")
     result_list = []
     truth_list = []
+    strategy_list = []
     for idx,query_dict in enumerate(vdb_config.QUERY_WORKLOAD):
         collection_name = query_dict["collection_name"]
         query_file_path = query_dict["query_file_path"]
@@ -154,48 +536,49 @@ if __name__ == "__main__":
         for i in range(len(query_vector_list)):
             query_vector, attr_filter = query_vector_list[i], attr_filter_list[i]
             search_field_name = "vector"
-            result = query_processor.knn_search(collection_name, search_field_name, query_vector, top_k, search_params)
+            if hybrid:
+                result = query_processor.hybrid_search(collection_name, search_field_name, query_vector, attr_filter, top_k, search_params)
+            else:
+                result = query_processor.knn_search(collection_name, search_field_name, query_vector, top_k, search_params)
             if idx==0:
                 truth_list.append(result)
             else:
                 result_list.append(result)
+                if hybrid:
+                    strategy_list.append(query_processor.strategy_log[-1])
 
+    if query_processor.attr_index is not None:
+        print(f"Filter routes: {query_processor.route_stats}")
     print("Search performance of Index FLAT:")
     flat_query_time_list, flat_query_recall_list = query_processor.search_performance(truth_list, truth_list)
     DumpResult("flat.log", flat_query_time_list, flat_query_recall_list)
 
+    index_type = vdb_config.INDEX_PARAMS[1]["index_type"]
     print("="*64)
-    print("Search performance of Index HNSW:")
-    hnsw_query_time_list, hnsw_query_recall_list = query_processor.search_performance(result_list, truth_list)
-    DumpResult("hnsw.log", hnsw_query_time_list, hnsw_query_recall_list)
-    sys.exit(0)
-
-    ## 测试混合查询
-    print("Test Hybrid Search")
-    result_list = []
-    truth_list = []
-    for idx,query_dict in enumerate(vdb_config.QUERY_WORKLOAD):
-        collection_name = query_dict["collection_name"]
-        query_file_path = query_dict["query_file_path"]
-        query_vector_list, attr_filter_list = read_query(query_file_path)
-
-        search_params = vdb_config.SEARCH_PARAMS[idx]
-        print(f"search_params = {search_params}")
+    print(f"Search performance of Index {index_type}:")
+    approx_query_time_list, approx_query_recall_list = query_processor.search_performance(result_list, truth_list)
+    DumpResult(f"{index_type.lower()}.log", approx_query_time_list, approx_query_recall_list)
+    if query_processor.planner is not None and strategy_list:
+        print("Search performance per strategy:")
+        strategy_report(strategy_list, approx_query_time_list, approx_query_recall_list)
+    return approx_query_time_list, approx_query_recall_list
 
-        for i in range(len(query_vector_list)):
-            query_vector, attr_filter = query_vector_list[i], attr_filter_list[i]
-            search_field_name = "vector"
-            result = query_processor.hybrid_search(collection_name, search_field_name, query_vector, attr_filter, top_k, search_params)
-            if idx==0:
-                truth_list.append(result)
-            else:
-                result_list.append(result)
 
-    print("Search performance of Index FLAT:")
-    flat_query_time_list, flat_query_recall_list = query_processor.search_performance(truth_list, truth_list)
-    DumpResult("flat.log", flat_query_time_list, flat_query_recall_list)
+if __name__ == "__main__":
+    from VdbConfig import vdb_config
+    if vdb_config.ENABLE_PROFILER:
+        profiler.enable()
+    configure_cache(vdb_config)
+    start_metrics(vdb_config)
+    # 初始化Milvus客户端
+    query_processor = create_query_processor(vdb_config)
+    top_k = 1
+    
+    ## 测试KNN查询（将 hybrid 设为 True 测试混合查询）
+    run_search(vdb_config, query_processor, hybrid=False, top_k=top_k)
 
-    print("="*64)
-    print("Search performance of Index HNSW:")
-    hnsw_query_time_list, hnsw_query_recall_list = query_processor.search_performance(result_list, truth_list)
-    DumpResult("hnsw.log", hnsw_query_time_list, hnsw_query_recall_list)
\ No newline at end of file
+    if profiler.enabled:
+        profiler.export_chrome_trace(f"QueryProcessor_{vdb_config.PROFILE_TRACE_FILE}")
+        profiler.print_summary()
+    if metrics.enabled:
+        metrics.print_summary()
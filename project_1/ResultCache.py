@@ -0,0 +1,304 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from Profiler import profiler
+from SearchResult import hit_ids
+
+# 近似查询结果缓存：查询向量经随机超平面 LSH 得到签名，与 (集合, 向量字段, 过滤条件, 查询参数) 一起定位桶，
+# 桶内与缓存的查询向量距离不超过容差时直接返回缓存的 top_k
+CACHE_POLICIES = ("lru", "lfu")
+
+
+def file_version(*file_names):
+    """一组文件的版本（修改时间与大小），不存在的文件记为 None；文件被重写后版本随之变化"""
+    version = []
+    for file_name in file_names:
+        try:
+            stat = os.stat(file_name)
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+
+class CacheEntry:
+    __slots__ = ("entry_id", "collection_name", "bucket", "vector", "top_k", "result_list", "created", "freq")
+
+    def __init__(self, entry_id, collection_name, bucket, vector, top_k, result_list):
+        self.entry_id = entry_id
+        self.collection_name = collection_name
+        self.bucket = bucket
+        self.vector = vector
+        self.top_k = top_k
+        self.result_list = result_list
+        self.created = time.monotonic()
+        self.freq = 1
+
+
+class SemanticCache:
+    def __init__(self, max_entries: int = 10000, ttl_s: float = 300, policy: str = "lru", tolerance: float = 0.01,
+                 num_bits: int = 16, probes: int = 1, verify_rate: float = 0.0, seed: int = 0):
+        """
+        初始化 SemanticCache 类
+
+        Args:
+            max_entries (int): 最多缓存的查询数，超出时按 policy 淘汰
+            ttl_s (float): 缓存结果的有效期（秒），None 表示不过期
+            policy (str): "lru"（最久未使用）或 "lfu"（使用次数最少，次数相同时最久未使用）
+            tolerance (float): 命中条件 ||q - c|| <= tolerance * ||q||（c 为缓存的查询向量），0 表示只命中完全相同的向量
+            num_bits (int): LSH 签名的位数（随机超平面数）
+            probes (int): 除签名所在的桶外，再检查翻转投影绝对值最小的 probes 个位得到的桶
+            verify_rate (float): 命中时按该比例仍然执行查询，用返回的结果估计缓存结果的召回率（并返回新结果）
+            seed (int): 随机超平面的种子
+        """
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy: {policy}")
+        if not 1 <= num_bits <= 62:
+            raise ValueError("num_bits must be between 1 and 62")
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.policy = policy
+        self.tolerance = tolerance
+        self.num_bits = num_bits
+        self.probes = min(probes, num_bits)
+        self.verify_rate = verify_rate
+        self.seed = seed
+        self.random = random.Random(seed)
+        # 每种向量维度的随机超平面，第一次查询时生成
+        self.planes = {}
+        self.lock = threading.Lock()
+        self.clear()
+        self.reset_stats()
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+            self.buckets = {}
+            self.collection_entries = {}
+            self.versions = {}
+            # LRU：entry_id 按访问顺序排列；LFU：使用次数 -> 按访问顺序排列的 entry_id
+            self.lru_order = OrderedDict()
+            self.freq_lists = {}
+            self.min_freq = 1
+            self.next_id = 0
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"lookups": 0, "hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0,
+                          "verified": 0, "verified_recall": 0.0, "hit_latency_ms": 0.0, "miss_latency_ms": 0.0}
+
+    @staticmethod
+    def scope_key(search_field_name, filter_expr, search_params):
+        return (search_field_name, filter_expr, json.dumps(search_params, sort_keys=True))
+
+    def _signatures(self, vector):
+        """签名所在的桶与多探测的桶（翻转离超平面最近的位）"""
+        if len(vector) not in self.planes:
+            self.planes[len(vector)] = np.random.default_rng(self.seed).standard_normal((self.num_bits, len(vector))).astype(np.float32)
+        projections = self.planes[len(vector)] @ vector
+        signature = int((projections > 0) @ np.left_shift(1, np.arange(self.num_bits, dtype=np.int64)))
+        return [signature] + [signature ^ (1 << bit) for bit in np.argsort(np.abs(projections))[:self.probes].tolist()]
+
+    def search(self, collection_name, search_field_name, filter_expr, search_params, query_vector, top_k,
+               search_fn, version=None):
+        """
+        查询缓存，未命中时执行 search_fn() 并写入缓存
+
+        Args:
+            collection_name (str): 集合名称
+            search_field_name (str): 向量字段
+            filter_expr (str): 过滤条件，None 表示 KNN 查询
+            search_params (dict): 查询参数
+            query_vector: 查询向量
+            top_k (int): 返回的结果数，缓存中 top_k 不小于它的结果可以命中
+            search_fn: 执行查询的函数，返回 (结果列表, 耗时(毫秒))
+            version: 集合的版本，与缓存结果时的版本不同时该集合的缓存全部失效，None 表示不检查
+
+        Returns:
+            tuple: (结果列表, 耗时(毫秒))
+        """
+        start_time = time.perf_counter()
+        vector = np.asarray(query_vector, dtype=np.float32).ravel()
+        scope = self.scope_key(search_field_name, filter_expr, search_params)
+        with self.lock:
+            signatures, cached = self._find(collection_name, scope, vector, top_k, version)
+            verify = cached is not None and self.verify_rate > 0 and self.random.random() < self.verify_rate
+            if cached is not None and not verify:
+                return cached, self._hit(start_time)
+
+        result_list, latency = search_fn()
+        with self.lock:
+            if verify:
+                # 命中但抽样验证：记录缓存结果相对新结果的召回率，返回新结果
+                truth = set(hit_ids(result_list)[:top_k].tolist())
+                if truth:
+                    self.stats["verified"] += 1
+                    self.stats["verified_recall"] += len(truth.intersection(hit_ids(cached).tolist())) / len(truth)
+                self.stats["hits"] += 1
+                return result_list, latency
+            self._miss(collection_name, scope, signatures[0], vector, top_k, result_list, latency)
+        return result_list, latency
+
+    def lookup(self, collection_name, search_field_name, filter_expr, search_params, query_vector, top_k, version=None):
+        """
+        只查询缓存，不执行查询（SearchScheduler 合并请求时使用：命中的请求直接返回，未命中的合并为一次查询后调用 store）；
+        不做 verify_rate 抽样验证
+
+        Returns:
+            命中时返回结果列表，未命中返回 None
+        """
+        start_time = time.perf_counter()
+        vector = np.asarray(query_vector, dtype=np.float32).ravel()
+        scope = self.scope_key(search_field_name, filter_expr, search_params)
+        with self.lock:
+            _, cached = self._find(collection_name, scope, vector, top_k, version)
+            if cached is not None:
+                self._hit(start_time)
+            return cached
+
+    def store(self, collection_name, search_field_name, filter_expr, search_params, query_vector, top_k, result_list, latency):
+        """写入 lookup 未命中后查询得到的结果，latency 为该次查询的耗时（毫秒）"""
+        vector = np.asarray(query_vector, dtype=np.float32).ravel()
+        scope = self.scope_key(search_field_name, filter_expr, search_params)
+        with self.lock:
+            self._miss(collection_name, scope, self._signatures(vector)[0], vector, top_k, result_list, latency)
+
+    def _find(self, collection_name, scope, vector, top_k, version):
+        """检查集合版本并查找缓存（调用方持有锁），返回 (签名与多探测的桶, 缓存的结果列表或 None)"""
+        self.stats["lookups"] += 1
+        if version is not None and self.versions.get(collection_name, version) != version:
+            self._invalidate(collection_name)
+        self.versions[collection_name] = version
+        signatures = self._signatures(vector)
+        return signatures, self._lookup(collection_name, scope, signatures, vector, top_k)
+
+    def _hit(self, start_time):
+        latency = (time.perf_counter() - start_time) * 1000.0
+        self.stats["hits"] += 1
+        self.stats["hit_latency_ms"] += latency
+        profiler.count("result_cache.hit")
+        return latency
+
+    def _miss(self, collection_name, scope, signature, vector, top_k, result_list, latency):
+        self.stats["misses"] += 1
+        self.stats["miss_latency_ms"] += latency
+        profiler.count("result_cache.miss")
+        self._insert(collection_name, (collection_name, scope, signature), vector, top_k, result_list)
+
+    def _lookup(self, collection_name, scope, signatures, vector, top_k):
+        norm = float(np.linalg.norm(vector))
+        now = time.monotonic()
+        for signature in signatures:
+            for entry_id in list(self.buckets.get((collection_name, scope, signature), ())):
+                entry = self.entries[entry_id]
+                if self.ttl_s is not None and now - entry.created > self.ttl_s:
+                    self.stats["expired"] += 1
+                    self._remove(entry_id)
+                    continue
+                if entry.top_k < top_k:
+                    continue
+                if self.tolerance <= 0:
+                    matched = np.array_equal(entry.vector, vector)
+                else:
+                    matched = float(np.linalg.norm(entry.vector - vector)) <= self.tolerance * norm
+                if matched:
+                    self._touch(entry)
+                    return entry.result_list[:top_k]
+        return None
+
+    def _insert(self, collection_name, bucket, vector, top_k, result_list):
+        while len(self.entries) >= self.max_entries:
+            self._evict()
+        entry = CacheEntry(self.next_id, collection_name, bucket, vector, top_k, result_list)
+        self.next_id += 1
+        self.entries[entry.entry_id] = entry
+        self.buckets.setdefault(bucket, []).append(entry.entry_id)
+        self.collection_entries.setdefault(collection_name, set()).add(entry.entry_id)
+        if self.policy == "lru":
+            self.lru_order[entry.entry_id] = None
+        else:
+            self.freq_lists.setdefault(1, OrderedDict())[entry.entry_id] = None
+            self.min_freq = 1
+
+    def _touch(self, entry):
+        if self.policy == "lru":
+            self.lru_order.move_to_end(entry.entry_id)
+            return
+        freq_list = self.freq_lists[entry.freq]
+        del freq_list[entry.entry_id]
+        if not freq_list:
+            del self.freq_lists[entry.freq]
+            if self.min_freq == entry.freq:
+                self.min_freq += 1
+        entry.freq += 1
+        self.freq_lists.setdefault(entry.freq, OrderedDict())[entry.entry_id] = None
+
+    def _evict(self):
+        if self.policy == "lru":
+            entry_id = next(iter(self.lru_order))
+        else:
+            if self.min_freq not in self.freq_lists:
+                self.min_freq = min(self.freq_lists)
+            entry_id = next(iter(self.freq_lists[self.min_freq]))
+        self.stats["evictions"] += 1
+        self._remove(entry_id)
+
+    def _remove(self, entry_id):
+        entry = self.entries.pop(entry_id)
+        bucket = self.buckets[entry.bucket]
+        bucket.remove(entry_id)
+        if not bucket:
+            del self.buckets[entry.bucket]
+        self.collection_entries[entry.collection_name].discard(entry_id)
+        if self.policy == "lru":
+            del self.lru_order[entry_id]
+        else:
+            freq_list = self.freq_lists[entry.freq]
+            del freq_list[entry_id]
+            if not freq_list:
+                del self.freq_lists[entry.freq]
+
+    def _invalidate(self, collection_name):
+        for entry_id in list(self.collection_entries.get(collection_name, ())):
+            self._remove(entry_id)
+        self.collection_entries.pop(collection_name, None)
+        self.stats["invalidations"] += 1
+        profiler.count("result_cache.invalidation")
+
+    def invalidate(self, collection_name=None):
+        """使某个集合（None 表示所有集合）的缓存失效，例如在本进程之外写入了集合"""
+        with self.lock:
+            for name in [collection_name] if collection_name is not None else list(self.collection_entries):
+                self._invalidate(name)
+
+    def metrics(self) -> dict:
+        """
+        缓存统计
+
+        Returns:
+            dict: 命中率、平均命中 / 未命中延迟（毫秒）、估计节省的查询时间（毫秒）、
+                  抽样验证的缓存结果召回率，以及条目数、过期、淘汰与失效次数
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self.entries)
+        verified_hits = stats["verified"]
+        served_hits = stats["hits"] - verified_hits
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        stats["avg_hit_latency_ms"] = stats.pop("hit_latency_ms") / served_hits if served_hits else 0.0
+        stats["avg_miss_latency_ms"] = stats.pop("miss_latency_ms") / stats["misses"] if stats["misses"] else 0.0
+        stats["saved_ms"] = served_hits * max(stats["avg_miss_latency_ms"] - stats["avg_hit_latency_ms"], 0.0)
+        stats["verified_recall"] = stats["verified_recall"] / verified_hits if verified_hits else None
+        return stats
+
+
+def create_result_cache(vdb_config):
+    """根据 VdbConfig.RESULT_CACHE 创建 SemanticCache，未开启时返回 None"""
+    cache_config = dict(vdb_config.RESULT_CACHE)
+    if not cache_config.pop("enabled", False):
+        return None
+    return SemanticCache(**cache_config)
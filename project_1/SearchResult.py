@@ -0,0 +1,145 @@
+import numpy as np
+
+
+class SearchHit:
+    """单个查询结果，与 pymilvus 的 Hit 一样提供 id 与 distance 属性"""
+    def __init__(self, id, distance):
+        self.id = id
+        self.distance = distance
+
+    def __str__(self):
+        return f"id: {self.id}, distance: {self.distance}"
+
+
+class HitList:
+    def __init__(self, ids, distances):
+        """
+        初始化 HitList 类：一个查询的结果，以 NumPy 数组保存ID与距离，不为每个结果创建对象
+        迭代时才按需生成 SearchHit，因此可以直接替代 pymilvus 的 Hits
+
+        Args:
+            ids (numpy.ndarray): 结果ID（int64）
+            distances (numpy.ndarray): 结果距离（float32）
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.distances = np.asarray(distances, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        for vid, distance in zip(self.ids.tolist(), self.distances.tolist()):
+            yield SearchHit(vid, distance)
+
+    def __getitem__(self, index):
+        if isinstance(index, (slice, np.ndarray, list)):
+            return HitList(self.ids[index], self.distances[index])
+        return SearchHit(int(self.ids[index]), float(self.distances[index]))
+
+    def __str__(self):
+        return f"ids: {self.ids.tolist()}, distances: {self.distances.tolist()}"
+
+
+def extract_hits(result) -> list:
+    """
+    把 Collection.search 的返回值批量转换为 HitList：优先使用 Hits 的 ids / distances 属性，
+    不支持时才逐个读取 Hit
+
+    Args:
+        result: Collection.search 的返回值（每个查询一组结果）
+
+    Returns:
+        list: 每个查询的 HitList
+    """
+    hit_lists = []
+    for hits in result:
+        ids, distances = getattr(hits, "ids", None), getattr(hits, "distances", None)
+        if ids is None or distances is None:
+            ids = [hit.id for hit in hits]
+            distances = [hit.distance for hit in hits]
+        hit_lists.append(HitList(ids, distances))
+    return hit_lists
+
+
+def hit_ids(hits):
+    """结果ID数组（HitList、pymilvus Hits 或 SearchHit 列表）"""
+    ids = getattr(hits, "ids", None)
+    if ids is None:
+        ids = [hit.id for hit in hits]
+    return np.asarray(ids, dtype=np.int64)
+
+
+def stack_hits(hit_lists, k: int = None):
+    """
+    把多个查询的结果拼成 (n, k) 数组，结果不足 k 个时ID补 -1、距离补 NaN
+
+    Args:
+        hit_lists (list): 每个查询的结果
+        k (int): 列数，None 表示最多的结果数
+
+    Returns:
+        tuple: (ids (n, k) int64, distances (n, k) float32)
+    """
+    if k is None:
+        k = max((len(hits) for hits in hit_lists), default=0)
+    ids = np.full((len(hit_lists), k), -1, dtype=np.int64)
+    distances = np.full((len(hit_lists), k), np.nan, dtype=np.float32)
+    for row, hits in enumerate(hit_lists):
+        row_ids = hit_ids(hits)[:k]
+        ids[row, :len(row_ids)] = row_ids
+        row_distances = getattr(hits, "distances", None)
+        if row_distances is None:
+            row_distances = [hit.distance for hit in hits]
+        distances[row, :len(row_ids)] = np.asarray(row_distances, dtype=np.float32)[:k]
+    return ids, distances
+
+
+def batch_recall(truth_ids, result_ids):
+    """
+    按行计算召回率（-1 表示空位）
+
+    Args:
+        truth_ids (numpy.ndarray): (n, k1) Ground Truth
+        result_ids (numpy.ndarray): (n, k2) 查询结果
+
+    Returns:
+        numpy.ndarray: (n,) 召回率，Ground Truth 为空的行为 0
+    """
+    valid_truth = truth_ids >= 0
+    matched = (truth_ids[:, :, None] == result_ids[:, None, :]) & valid_truth[:, :, None] & (result_ids >= 0)[:, None, :]
+    num_truth = valid_truth.sum(axis=1)
+    return np.where(num_truth > 0, matched.any(axis=2).sum(axis=1) / np.maximum(num_truth, 1), 0.0)
+
+
+class SampledLogger:
+    def __init__(self, rate: float = 0.0, max_hits: int = 10):
+        """
+        初始化 SampledLogger 类：按比例抽样输出查询结果，代替逐个结果的 print
+
+        Args:
+            rate (float): 输出结果的查询比例，0 表示不输出，1 表示每个查询都输出
+            max_hits (int): 每个查询最多输出的结果数
+        """
+        self.rate = rate
+        self.max_hits = max_hits
+        self.credit = 0.0
+
+    def sample(self) -> bool:
+        """确定性抽样：每 1 / rate 个查询输出一次"""
+        if self.rate <= 0:
+            return False
+        self.credit += self.rate
+        if self.credit >= 1.0:
+            self.credit -= 1.0
+            return True
+        return False
+
+    def log(self, label: str, hits) -> None:
+        if not self.sample():
+            return
+        ids = hit_ids(hits)[:self.max_hits]
+        distances = getattr(hits, "distances", None)
+        if distances is None:
+            distances = [hit.distance for hit in hits]
+        distances = np.asarray(distances, dtype=np.float32)[:self.max_hits]
+        print(f"{label}: ids = {ids.tolist()}, distances = {[round(d, 4) for d in distances.tolist()]}")
@@ -0,0 +1,301 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from Profiler import profiler
+
+# 多租户查询调度：在 QueryProcessor 前把短时间内到达的请求按 (集合, 向量字段, 过滤条件, 查询参数) 合并为微批，
+# 每批只发起一次 search RPC（相同的查询向量只发送一次），再把结果分发回各个请求
+
+
+class SearchRequest:
+    __slots__ = ("tenant", "key", "collection_name", "search_field_name", "query_vector", "filter_expr",
+                 "top_k", "search_params", "hybrid", "future", "enqueue_time")
+
+    def __init__(self, tenant, collection_name, search_field_name, query_vector, filter_expr, top_k, search_params, hybrid):
+        self.tenant = tenant
+        self.collection_name = collection_name
+        self.search_field_name = search_field_name
+        self.query_vector = query_vector
+        self.filter_expr = filter_expr
+        self.top_k = top_k
+        self.search_params = search_params
+        self.hybrid = hybrid
+        # 不同 top_k 的请求可以合并（按最大的 top_k 查询后截断）
+        self.key = (collection_name, search_field_name, filter_expr, hybrid, json.dumps(search_params, sort_keys=True))
+        self.future = Future()
+        self.enqueue_time = time.perf_counter()
+
+
+class SearchScheduler:
+    def __init__(self, query_processor, max_batch_size: int = 32, max_wait_ms: float = 2.0,
+                 max_queue_per_tenant: int = 256, num_workers: int = 2, submit_timeout_ms: float = None):
+        """
+        初始化 SearchScheduler 类：后台调度线程收集请求组成微批，交给 num_workers 个线程执行
+
+        公平性：每批以轮到的租户的最早请求为种子，再按租户轮询、每轮每个租户最多取一个同组请求，
+        高负载的租户不会占满批次，也不会让其他租户的请求一直等待
+        背压：每个租户最多 max_queue_per_tenant 个等待中的请求，队列满时 submit 等待 submit_timeout_ms
+        后抛出 queue.Full；所有执行线程都忙时调度线程暂停组批，请求在队列中继续合并
+
+        Args:
+            query_processor (QueryProcessor): 执行查询的 QueryProcessor
+            max_batch_size (int): 每批最多的请求数
+            max_wait_ms (float): 种子请求最多等待的时间（毫秒），同组请求达到 max_batch_size 时立即发出
+            max_queue_per_tenant (int): 每个租户等待中的请求数上限
+            num_workers (int): 同时执行的批次数
+            submit_timeout_ms (float): 队列满时 submit 的最长等待时间（毫秒），None 表示一直等待，0 表示立即拒绝
+        """
+        self.query_processor = query_processor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_per_tenant = max_queue_per_tenant
+        self.submit_timeout_ms = submit_timeout_ms
+        self.queues = {}
+        # 有等待中请求的租户，按轮询顺序排列
+        self.active_tenants = deque()
+        self.key_counts = {}
+        self.num_pending = 0
+        self.closed = False
+        self.cond = threading.Condition()
+        self.worker_slots = threading.Semaphore(num_workers)
+        self.executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="search-batch")
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, name="search-scheduler", daemon=True)
+        self.dispatcher.start()
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {"requests": 0, "rejected": 0, "batches": 0, "rpcs": 0, "queries_sent": 0, "cache_hits": 0, "errors": 0}
+            self.queue_delays = deque(maxlen=65536)
+            self.tenant_stats = {}
+
+    def submit(self, tenant, collection_name, search_field_name, query_vector, top_k, search_params,
+               filter_expr=None, hybrid: bool = False) -> Future:
+        """
+        提交一个查询请求
+
+        Args:
+            tenant: 租户标识
+            filter_expr (str): 关系型属性过滤条件（hybrid = True 时使用）
+            hybrid (bool): True 为混合查询，False 为 KNN 查询
+            其余参数与 QueryProcessor.knn_search / hybrid_search 相同
+
+        Returns:
+            Future: 结果为 (结果列表, 从提交到完成的耗时(毫秒))
+        """
+        request = SearchRequest(tenant, collection_name, search_field_name, query_vector,
+                                filter_expr if hybrid else None, top_k, search_params, hybrid)
+        timeout = None if self.submit_timeout_ms is None else self.submit_timeout_ms / 1000.0
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("SearchScheduler is closed")
+            tenant_queue = self.queues.setdefault(tenant, deque())
+            if len(tenant_queue) >= self.max_queue_per_tenant:
+                full = not self.cond.wait_for(lambda: self.closed or len(tenant_queue) < self.max_queue_per_tenant, timeout)
+                if full or self.closed:
+                    with self.stats_lock:
+                        self.stats["rejected"] += 1
+                        self._tenant_stat(tenant)["rejected"] += 1
+                    profiler.count("scheduler.rejected")
+                    raise queue.Full(f"Search queue of tenant {tenant} is full")
+            request.enqueue_time = time.perf_counter()
+            if not tenant_queue:
+                self.active_tenants.append(tenant)
+            tenant_queue.append(request)
+            self.key_counts[request.key] = self.key_counts.get(request.key, 0) + 1
+            self.num_pending += 1
+            self.cond.notify_all()
+        return request.future
+
+    def knn_search(self, collection_name, search_field_name, query_vector, top_k, search_params, tenant="default"):
+        """与 QueryProcessor.knn_search 相同的接口，阻塞到结果返回"""
+        return self.submit(tenant, collection_name, search_field_name, query_vector, top_k, search_params).result()
+
+    def hybrid_search(self, collection_name, search_field_name, query_vector, filter_expr, top_k, search_params, tenant="default"):
+        """与 QueryProcessor.hybrid_search 相同的接口，阻塞到结果返回"""
+        return self.submit(tenant, collection_name, search_field_name, query_vector, top_k, search_params,
+                           filter_expr=filter_expr, hybrid=True).result()
+
+    def _tenant_stat(self, tenant):
+        """租户的统计（调用方持有 stats_lock）"""
+        return self.tenant_stats.setdefault(tenant, {"requests": 0, "rejected": 0, "queue_delay_ms": 0.0})
+
+    def _dispatch_loop(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.closed or self.num_pending > 0)
+                if self.num_pending == 0:
+                    return
+                seed = self.queues[self.active_tenants[0]][0]
+                deadline = seed.enqueue_time + self.max_wait
+                # 等到种子请求的等待时间用完，或同组请求已经足够组成一批（关闭时立即发出）
+                while not self.closed and self.key_counts[seed.key] < self.max_batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                batch = self._take_batch(seed.key)
+                # 队列有空位，唤醒等待中的 submit
+                self.cond.notify_all()
+            self.worker_slots.acquire()
+            self.executor.submit(self._run_batch, batch)
+
+    def _take_batch(self, key):
+        """按租户轮询取出同组的请求（从轮到的租户开始），之后把该租户移到轮询顺序的末尾"""
+        batch = []
+        while len(batch) < self.max_batch_size:
+            progressed = False
+            for tenant in self.active_tenants:
+                tenant_queue = self.queues[tenant]
+                for i, request in enumerate(tenant_queue):
+                    if request.key == key:
+                        del tenant_queue[i]
+                        batch.append(request)
+                        progressed = True
+                        break
+                if len(batch) >= self.max_batch_size:
+                    break
+            if not progressed:
+                break
+        self.active_tenants.rotate(-1)
+        self.active_tenants = deque(tenant for tenant in self.active_tenants if self.queues[tenant])
+        self.key_counts[key] -= len(batch)
+        if self.key_counts[key] == 0:
+            del self.key_counts[key]
+        self.num_pending -= len(batch)
+        return batch
+
+    def _run_batch(self, batch):
+        dispatch_time = time.perf_counter()
+        try:
+            self._execute(batch)
+        except Exception as exc:
+            with self.stats_lock:
+                self.stats["errors"] += 1
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(exc)
+        finally:
+            self.worker_slots.release()
+        with self.stats_lock:
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            for request in batch:
+                queue_delay_ms = (dispatch_time - request.enqueue_time) * 1000.0
+                self.queue_delays.append(queue_delay_ms)
+                tenant_stat = self._tenant_stat(request.tenant)
+                tenant_stat["requests"] += 1
+                tenant_stat["queue_delay_ms"] += queue_delay_ms
+        profiler.count("scheduler.batch_size", len(batch))
+
+    def _execute(self, batch):
+        query_processor = self.query_processor
+        first = batch[0]
+        if first.hybrid and (query_processor.planner is not None or query_processor.attr_index is not None):
+            # 混合查询由查询规划器 / 客户端过滤加速逐个选择策略，不合并
+            for request in batch:
+                result_list, _ = query_processor.hybrid_search(
+                    request.collection_name, request.search_field_name, request.query_vector,
+                    request.filter_expr, request.top_k, request.search_params)
+                self._complete(request, result_list)
+            with self.stats_lock:
+                self.stats["rpcs"] += len(batch)
+                self.stats["queries_sent"] += len(batch)
+            return
+
+        # 开启结果缓存时每个请求先查缓存，命中的直接返回，只合并未命中的请求
+        result_cache = query_processor.result_cache
+        if result_cache is not None:
+            version = query_processor.collection_version(first.collection_name)
+            misses = []
+            for request in batch:
+                cached = result_cache.lookup(first.collection_name, first.search_field_name, first.filter_expr,
+                                             first.search_params, request.query_vector, request.top_k, version)
+                if cached is None:
+                    misses.append(request)
+                else:
+                    self._complete(request, cached)
+            with self.stats_lock:
+                self.stats["cache_hits"] += len(batch) - len(misses)
+            batch = misses
+            if not batch:
+                return
+
+        # 相同的查询向量只发送一次
+        positions, unique_vectors, request_positions = {}, [], []
+        for request in batch:
+            vector_key = np.asarray(request.query_vector, dtype=np.float32).tobytes()
+            if vector_key not in positions:
+                positions[vector_key] = len(unique_vectors)
+                unique_vectors.append(request.query_vector)
+            request_positions.append(positions[vector_key])
+        top_k = max(request.top_k for request in batch)
+        with profiler.span("scheduler.batch", requests=len(batch), nq=len(unique_vectors)):
+            result_lists, latency = query_processor.search_batch(
+                first.collection_name, first.search_field_name, unique_vectors, first.filter_expr, top_k, first.search_params)
+        with self.stats_lock:
+            self.stats["rpcs"] += 1
+            self.stats["queries_sent"] += len(unique_vectors)
+        if result_cache is not None:
+            for query_vector, result_list in zip(unique_vectors, result_lists):
+                result_cache.store(first.collection_name, first.search_field_name, first.filter_expr, first.search_params,
+                                   query_vector, top_k, result_list, latency)
+        for request, position in zip(batch, request_positions):
+            self._complete(request, result_lists[position][:request.top_k])
+
+    @staticmethod
+    def _complete(request, result_list):
+        request.future.set_result((result_list, (time.perf_counter() - request.enqueue_time) * 1000.0))
+
+    def metrics(self) -> dict:
+        """
+        调度统计
+
+        Returns:
+            dict: 请求数、批次数、RPC 数、平均批大小、每次 RPC 服务的请求数（batching_efficiency）、
+                  去重后实际发送的查询数、命中结果缓存的请求数（cache_hits）、排队延迟（平均 / p50 / p99，毫秒）、拒绝数与每个租户的统计
+        """
+        with self.stats_lock:
+            stats = dict(self.stats)
+            delays = np.fromiter(self.queue_delays, dtype=np.float64)
+            tenants = {
+                tenant: {
+                    "requests": tenant_stat["requests"],
+                    "rejected": tenant_stat["rejected"],
+                    "avg_queue_delay_ms": tenant_stat["queue_delay_ms"] / tenant_stat["requests"] if tenant_stat["requests"] else 0.0,
+                }
+                for tenant, tenant_stat in self.tenant_stats.items()
+            }
+        with self.cond:
+            stats["pending"] = self.num_pending
+        stats["avg_batch_size"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        stats["batching_efficiency"] = stats["requests"] / stats["rpcs"] if stats["rpcs"] else 0.0
+        stats["avg_queue_delay_ms"] = float(delays.mean()) if len(delays) else 0.0
+        stats["p50_queue_delay_ms"] = float(np.percentile(delays, 50)) if len(delays) else 0.0
+        stats["p99_queue_delay_ms"] = float(np.percentile(delays, 99)) if len(delays) else 0.0
+        stats["tenants"] = tenants
+        return stats
+
+    def close(self):
+        """发出所有等待中的请求并等待执行完毕"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.dispatcher.join()
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def create_search_scheduler(vdb_config, query_processor) -> SearchScheduler:
+    """根据 VdbConfig.SEARCH_SCHEDULER 创建 SearchScheduler"""
+    return SearchScheduler(query_processor, **vdb_config.SEARCH_SCHEDULER)
@@ -0,0 +1,206 @@
+import argparse
+import os
+import sys
+
+# 统一的命令行入口：所有重量级依赖（pymilvus、tqdm、matplotlib）以及配置都在具体命令中才导入/创建
+
+
+def _profiled(func):
+    """--profile 或 ENABLE_PROFILER 时开启性能分析，命令结束后导出 Chrome trace 与分阶段耗时汇总表；
+    同时按配置开启 EmbeddingCache 与运行时指标（METRICS）"""
+    def wrapper(args):
+        from VdbConfig import vdb_config
+        from Profiler import profiler
+        from Metrics import metrics, start_metrics
+        from EmbeddingCache import configure_cache
+        configure_cache(vdb_config)
+        if args.profile or vdb_config.ENABLE_PROFILER:
+            profiler.enable()
+        start_metrics(vdb_config)
+        func(args)
+        if profiler.enabled:
+            profiler.export_chrome_trace(f"{args.command}_{vdb_config.PROFILE_TRACE_FILE}")
+            profiler.print_summary()
+        if metrics.enabled:
+            metrics.print_summary()
+    return wrapper
+
+
+@_profiled
+def cmd_load(args):
+    from VdbConfig import vdb_config
+    if vdb_config.LOCAL_ENGINE:
+        # 本地引擎在导入时直接构建索引
+        from LocalEngine import build_local_collections
+        build_local_collections(vdb_config)
+        return
+    from DataLoader import DataLoader, MilvusClient, load_all, index_all
+    data_loader = DataLoader(MilvusClient(uri = vdb_config.VDB_URI), vdb_config.CHECKPOINT_DIR)
+    load_all(vdb_config, data_loader)
+    if args.index:
+        index_all(vdb_config, data_loader)
+
+
+@_profiled
+def cmd_index(args):
+    from VdbConfig import vdb_config
+    if vdb_config.LOCAL_ENGINE:
+        from LocalEngine import build_local_collections
+        build_local_collections(vdb_config)
+        return
+    from DataLoader import DataLoader, MilvusClient, index_all
+    data_loader = DataLoader(MilvusClient(uri = vdb_config.VDB_URI), vdb_config.CHECKPOINT_DIR)
+    index_all(vdb_config, data_loader)
+
+
+@_profiled
+def cmd_search(args):
+    from VdbConfig import vdb_config
+    from QueryProcessor import create_query_processor, run_search
+    run_search(vdb_config, create_query_processor(vdb_config), hybrid=args.hybrid, top_k=args.top_k)
+
+
+@_profiled
+def cmd_calibrate(args):
+    from VdbConfig import vdb_config
+    from QueryProcessor import create_query_processor
+    from QueryPlanner import run_calibration
+    vdb_config.QUERY_PLANNER = True
+    run_calibration(vdb_config, create_query_processor(vdb_config), args.top_k, args.max_queries)
+
+
+@_profiled
+def cmd_bench(args):
+    from VdbConfig import vdb_config
+    from Benchmark import run_benchmarks
+    run_benchmarks(vdb_config, args.name)
+
+
+@_profiled
+def cmd_gt(args):
+    from VdbConfig import vdb_config
+    from Benchmark import compute_ground_truth
+    compute_ground_truth(
+        vdb_config.DATASET_VECTOR_PATH[0],
+        vdb_config.QUERY_WORKLOAD[0]["query_file_path"],
+        vdb_config.DISTANCE_TYPE,
+        args.top_k,
+        args.output,
+    )
+
+
+@_profiled
+def cmd_matrix(args):
+    from VdbConfig import vdb_config
+    from ExperimentMatrix import run_matrix
+    run_matrix(vdb_config, stages=args.stages, force=args.force, dry_run=args.dry_run)
+
+
+def cmd_plot(args):
+    from PlotFigure import PlotFigure
+    PlotFigure()
+
+
+def cmd_generate(args):
+    # 生成器不创建 VdbConfig，也不需要 Milvus
+    from DataGenerator import run
+    run(args)
+
+
+def cmd_micro(args):
+    # 微基准测试只使用合成数据，不创建 VdbConfig，也不需要 Milvus
+    from MicroBenchmark import run
+    sys.exit(run(args))
+
+
+def cmd_list(args):
+    from VdbConfig import vdb_config
+    if vdb_config.LOCAL_ENGINE:
+        from LocalEngine import LocalEngine
+        for name in LocalEngine(vdb_config.LOCAL_ENGINE_DIR).list_collections():
+            print(name)
+        return
+    from ListCollection import MilvusClient, vdb_list_collections
+    vdb_list_collections(MilvusClient(uri = vdb_config.VDB_URI), vdb_config.VDB_URI)
+
+
+def _command(argv):
+    """命令行中的子命令名称：只解析全局选项与第一个位置参数，不导入任何模块"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--config")
+    parser.add_argument("command", nargs="?")
+    return parser.parse_known_args(argv)[0].command
+
+
+def main(argv=None):
+    # 参数定义（choices 等）来自其他模块的子命令只在执行该命令时才注册，其他命令（包括 --help）不导入这些模块
+    command = _command(argv)
+    parser = argparse.ArgumentParser(description="Milvus 向量数据库实验命令行")
+    parser.add_argument("--profile", action="store_true", help="开启性能分析")
+    parser.add_argument("--config", help="TOML/YAML 配置文件（等价于设置环境变量 VDB_CONFIG_FILE）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sub = subparsers.add_parser("load", help="创建集合并导入数据")
+    sub.add_argument("--index", action="store_true", help="导入后构建索引并加载")
+    sub.set_defaults(func=cmd_load)
+
+    sub = subparsers.add_parser("index", help="并发构建所有集合的索引并加载")
+    sub.set_defaults(func=cmd_index)
+
+    sub = subparsers.add_parser("search", help="测试查询性能（FLAT 结果作为 Ground Truth）")
+    sub.add_argument("--hybrid", action="store_true", help="测试混合查询")
+    sub.add_argument("--top-k", type=int, default=1)
+    sub.set_defaults(func=cmd_search)
+
+    sub = subparsers.add_parser("calibrate", help="离线校准混合查询的规划器（各选择率下的策略与参数）")
+    sub.add_argument("--top-k", type=int, default=10)
+    sub.add_argument("--max-queries", type=int, default=None)
+    sub.set_defaults(func=cmd_calibrate)
+
+    sub = subparsers.add_parser("bench", help="运行性能对比实验")
+    if command == "bench":
+        from Benchmark import BENCHMARKS
+        sub.add_argument("--name", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    sub.set_defaults(func=cmd_bench)
+
+    sub = subparsers.add_parser("gt", help="使用 NumPy 计算KNN查询的 Ground Truth")
+    sub.add_argument("--top-k", type=int, default=10)
+    sub.add_argument("--output", default="ground_truth.dat")
+    sub.set_defaults(func=cmd_gt)
+
+    sub = subparsers.add_parser("matrix", help="执行配置文件中的实验矩阵，已完成的作业直接使用缓存结果")
+    if command == "matrix":
+        from ExperimentMatrix import STAGES
+        sub.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    sub.add_argument("--force", action="store_true", help="忽略缓存重新执行所有作业")
+    sub.add_argument("--dry-run", action="store_true", help="只打印作业列表")
+    sub.set_defaults(func=cmd_matrix)
+
+    sub = subparsers.add_parser("plot", help="画实验图")
+    sub.set_defaults(func=cmd_plot)
+
+    sub = subparsers.add_parser("generate", help="流式生成合成数据集（聚类高斯分布，规模与维度可调）")
+    if command == "generate":
+        from DataGenerator import add_arguments
+        add_arguments(sub)
+    sub.set_defaults(func=cmd_generate)
+
+    sub = subparsers.add_parser("micro", help="在合成数据上运行微基准测试，性能退化时返回非零退出码")
+    if command == "micro":
+        from MicroBenchmark import add_arguments
+        add_arguments(sub)
+    sub.set_defaults(func=cmd_micro)
+
+    sub = subparsers.add_parser("list", help="查询当前向量数据库中的集合")
+    sub.set_defaults(func=cmd_list)
+
+    args = parser.parse_args(argv)
+    if args.config:
+        # 必须在第一次访问 vdb_config 之前设置
+        os.environ["VDB_CONFIG_FILE"] = args.config
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
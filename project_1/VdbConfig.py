@@ -1,6 +1,50 @@
-from pymilvus import MilvusClient, DataType
-
 # VdbConfig.py
+import os
+import struct
+
+# 数据集维度
+DATASET_DIM = {
+    "Youtube_audio": 128,
+    "Youtube_rgb": 1024,
+    "WIT": 2048,
+}
+
+
+def load_config_file(file_name: str) -> dict:
+    """
+    读取 TOML 或 YAML 格式的配置文件（YAML 需要安装 PyYAML）
+
+    Args:
+        file_name (str): 配置文件路径，扩展名为 .toml、.yaml 或 .yml
+
+    Returns:
+        dict: 配置内容
+    """
+    if file_name.endswith((".yaml", ".yml")):
+        import yaml
+        with open(file_name, "r") as fin:
+            return yaml.safe_load(fin) or {}
+    import tomllib
+    with open(file_name, "rb") as fin:
+        return tomllib.load(fin)
+
+
+def read_dataset_info(dataset_dir: str):
+    """
+    读取不在 DATASET_DIM 中的数据集（例如 DataGenerator.py 生成的合成数据集）的维度与属性：
+    vector_0.fivecs 文件头中的维度，meta_0.txt 第2行的属性名称与类型
+
+    Returns:
+        tuple: (维度, 属性名称, 属性类型)
+    """
+    with open(f"{dataset_dir}/vector_0.fivecs", "rb") as fin:
+        _, dim = struct.unpack("<2i", fin.read(8))
+    with open(f"{dataset_dir}/meta_0.txt", "r", encoding="utf-8") as fin:
+        fin.readline()
+        attr_name, attr_type = fin.readline().split()[:2]
+    return dim, attr_name, attr_type
+
+
 class VdbConfig:
     _instance = None
 
@@ -12,84 +56,221 @@ class VdbConfig:
 
     def init_config(self):
         # 修改为你自己的前缀
-        YOUR_PREFIX = "ZYX"             
-        # 修改为不同的数据集名称 ["WIT", "Youtube_audio", "Youtube_rgb"]
-        dataset_name = "Youtube_rgb"            
-        # 在 L2 和 IP 之间切换
-        DISTANCE_TYPE = "L2"            
-        # 根据数据集名称确定数据集维度
-        if dataset_name == "Youtube_audio":
-            dataset_dim = 128
-        elif dataset_name == "Youtube_rgb":
-            dataset_dim = 1024
-        elif dataset_name == "WIT":
-            dataset_dim = 2048
+        self.YOUR_PREFIX = "ZYX"
+        self.DATASET_ROOT = "/home/dataset/Seminar2025Fall"
+        self.VDB_URI = "http://localhost:50055"
+        # binary 模式下汉明距离检索的候选数 = top_k * RERANK_FACTOR，再用浮点向量重排
+        self.RERANK_FACTOR = 4
+        # 性能分析：开启后输出 Chrome trace 文件与分阶段耗时汇总表
+        self.ENABLE_PROFILER = False
+        self.PROFILE_TRACE_FILE = "trace.json"
+        # 实验结果（索引构建时间、索引大小等）的记录文件
+        self.BENCHMARK_STORE_FILE = "benchmark.jsonl"
+        # 数据导入模式：recreate（删除并重建集合）、resume（断点续传，只插入缺失的批次）、upsert（更新变化的向量）、
+        # bulk（转换为列文件后通过 utility.do_bulk_insert 导入，见 BulkImport.py）
+        self.INGEST_MODE = "resume"
+        self.CHECKPOINT_DIR = "checkpoints"
+        # bulk 模式：format 为 "numpy" 或 "parquet"，每 rows_per_file 行一个导入任务；
+        # object_store 为 Milvus 读取导入文件的位置，local 为本地目录（测试用），minio 需填写 endpoint / access_key / secret_key / bucket
+        self.BULK_IMPORT = {
+            "format": "numpy",
+            "rows_per_file": 1000000,
+            "staging_dir": "bulk_staging",
+            "object_store": {"type": "local", "root": "bulk_store"},
+        }
+        # 客户端过滤加速：由 meta 文件建立属性索引，选择率低的混合查询直接在本地暴力计算
+        self.FILTER_ACCELERATOR = False
+        self.BRUTE_FORCE_RATIO = 0.01
+        # 属性索引的位图与查询规划器的选择率按过滤表达式 LRU 缓存，每种最多缓存的表达式数
+        self.FILTER_CACHE_SIZE = 1024
+        # 查询规划器：按直方图估计的选择率从校准表中选择策略（prefilter / filtered + ef 或 nprobe / postfilter），
+        # 校准表由 python3 VdbCli.py calibrate 离线生成
+        self.QUERY_PLANNER = False
+        self.PLANNER_TABLE_FILE = "planner_table.json"
+        self.TARGET_RECALL = 0.95
+        # 导入前的向量预处理：normalize 为 L2 归一化（IP / 余弦），method 为 None、"pca" 或 "opq"，
+        # target_dim 为降维后的维度；学习到的变换保存在 PREPROCESS_FILE 中，查询向量使用同一个变换
+        self.PREPROCESS = {"normalize": False, "method": None, "target_dim": None}
+        self.PREPROCESS_FILE = "transform.npz"
+        # 进程内的本地引擎（IVF-Flat / FLAT）：导入、查询都不需要 Milvus 服务器，集合以 .npy 文件保存在 LOCAL_ENGINE_DIR 中
+        self.LOCAL_ENGINE = False
+        self.LOCAL_ENGINE_DIR = "local_engine"
+        # 原始数据文件（.fivecs / query.txt / meta.txt）解析结果的持久化缓存，以源文件路径、mtime 与大小为键，
+        # 通过内存映射读取；总大小超过 EMBEDDING_CACHE_QUOTA_GB 时淘汰最久未访问的条目，空字符串表示关闭
+        self.EMBEDDING_CACHE_DIR = "embedding_cache"
+        self.EMBEDDING_CACHE_QUOTA_GB = 32
+        # 为过滤条件中的属性字段创建标量索引（整数 STL_SORT、字符串 INVERTED，字段配置中的 index_type 可以覆盖），
+        # 与向量索引并发构建
+        self.SCALAR_INDEX = True
+        # 按属性列划分集合（见 Partitioning.py）：mode 为 "none"、"partition_key"（服务端按哈希分区）、
+        # "hash" 或 "range"（显式分区，查询时只检索过滤条件涉及的分区）；field 为 None 时使用数据集的属性字段
+        self.PARTITION = {"mode": "none", "field": None, "num_partitions": 16}
+        self.PARTITION_FILE = "partitions.json"
+        # 多租户查询调度（见 SearchScheduler.py）：请求在 max_wait_ms 内按 (集合, 过滤条件, 查询参数) 合并为最多
+        # max_batch_size 个请求的微批，每批一次 RPC；每个租户最多 max_queue_per_tenant 个等待中的请求，
+        # 队列满时 submit 等待 submit_timeout_ms 后拒绝（None 表示一直等待）
+        self.SEARCH_SCHEDULER = {
+            "max_batch_size": 32,
+            "max_wait_ms": 2.0,
+            "max_queue_per_tenant": 256,
+            "num_workers": 2,
+            "submit_timeout_ms": 100,
+        }
+        # 近似查询结果缓存（见 ResultCache.py）：查询向量的 LSH 签名 + 过滤条件 + 查询参数定位缓存，
+        # ||q - c|| <= tolerance * ||q|| 时直接返回缓存的 top_k；ttl_s 秒后过期，超过 max_entries 时按 policy（lru / lfu）淘汰，
+        # 集合重新导入后自动失效；verify_rate 为命中时仍然查询、估计缓存结果召回率的比例
+        self.RESULT_CACHE = {
+            "enabled": False,
+            "max_entries": 10000,
+            "ttl_s": 300,
+            "policy": "lru",
+            "tolerance": 0.01,
+            "num_bits": 16,
+            "probes": 1,
+            "verify_rate": 0.01,
+        }
+        # 运行时指标（见 Metrics.py）：每种操作的延迟直方图、导入行数与 RPC 错误计数、进行中的请求数；
+        # port 不为 None 时在 host:port/metrics 提供 Prometheus 文本格式的指标（0 表示随机端口），
+        # snapshot_file 不为 None 时每 snapshot_interval_s 秒写出一次 JSON 快照
+        self.METRICS = {
+            "enabled": False,
+            "host": "127.0.0.1",
+            "port": 9108,
+            "prefix": "vdb",
+            "snapshot_file": "metrics_snapshot.json",
+            "snapshot_interval_s": 10,
+        }
+        # 抽样输出查询结果的比例（0 表示不输出，1 表示输出每个查询的结果）
+        self.RESULT_LOG_RATE = 0.0
+
+        # 外部配置文件（TOML/YAML），通过环境变量 VDB_CONFIG_FILE 指定
+        #   [settings] 覆盖上面的大写配置项，例如 VDB_URI、YOUR_PREFIX
+        #   [defaults] 单次运行使用的 dataset、metric、vector_type
+        #   [matrix]   实验矩阵，见 ExperimentMatrix.py
+        self.CONFIG_FILE = os.environ.get("VDB_CONFIG_FILE", "")
+        content = load_config_file(self.CONFIG_FILE) if self.CONFIG_FILE else {}
+        for key, value in content.get("settings", {}).items():
+            setattr(self, key, value)
+        defaults = content.get("defaults", {})
+
+        self.configure(
+            # 修改为不同的数据集名称 ["WIT", "Youtube_audio", "Youtube_rgb"]
+            dataset_name=defaults.get("dataset", "Youtube_rgb"),
+            # 在 L2 和 IP 之间切换
+            distance_type=defaults.get("metric", "L2"),
+            # 向量存储类型 ["float32", "float16", "bfloat16", "binary"]
+            # binary 按符号二值化，使用汉明距离检索候选后再用浮点向量重排
+            vector_type=defaults.get("vector_type", "float32"),
+        )
+
+    def configure(
+        self,
+        dataset_name: str,
+        distance_type: str = "L2",
+        vector_type: str = "float32",
+        index_params: dict = None,
+        search_params: dict = None,
+        exact_suffix: str = "",
+        approx_suffix: str = ""
+    ):
+        """
+        根据数据集、距离与向量存储类型生成集合、索引与查询配置，实验矩阵中的每个作业都会调用一次
+
+        Args:
+            dataset_name (str): 数据集名称 ["WIT", "Youtube_audio", "Youtube_rgb"]，或 DATASET_ROOT 下的合成数据集目录名
+            distance_type (str): L2 或 IP
+            vector_type (str): 向量存储类型 ["float32", "float16", "bfloat16", "binary"]
+            index_params (dict): 近似索引，例如 {"index_type": "HNSW", "params": {"M": 32}}；None 表示默认索引
+            search_params (dict): 近似索引的查询参数，例如 {"ef": 32}；None 表示默认参数
+            exact_suffix (str): 精确索引（FLAT）集合名称的后缀
+            approx_suffix (str): 近似索引集合名称的后缀
+        """
+        # 只有在真正需要配置时才导入 pymilvus
+        from pymilvus import DataType
+        vector_dtype = {
+            "float32": DataType.FLOAT_VECTOR,
+            "float16": DataType.FLOAT16_VECTOR,
+            "bfloat16": DataType.BFLOAT16_VECTOR,
+            "binary": DataType.BINARY_VECTOR,
+        }[vector_type]
+        dataset_dir = f"{self.DATASET_ROOT}/{dataset_name}"
+        # 根据数据集名称确定数据集维度，其他数据集（合成数据集）从数据文件中读取
+        if dataset_name in DATASET_DIM:
+            dataset_dim = DATASET_DIM[dataset_name]
+            if dataset_name == "WIT":
+                attr_field = {"name": "size", "dtype": DataType.INT64, "description": "image size"}
+            else:
+                # 类别只有几十种，位图索引更合适
+                attr_field = {"name": "label", "dtype": DataType.VARCHAR, "max_length": 50, "description": "YouTube category",
+                              "index_type": "BITMAP"}
+        elif os.path.exists(f"{dataset_dir}/vector_0.fivecs"):
+            dataset_dim, attr_name, attr_type = read_dataset_info(dataset_dir)
+            if attr_type.startswith("int"):
+                attr_field = {"name": attr_name, "dtype": DataType.INT64, "description": "synthetic attribute"}
+            else:
+                attr_field = {"name": attr_name, "dtype": DataType.VARCHAR, "max_length": 50, "description": "synthetic attribute"}
         else:
             # 若数据集名称未知，抛出异常
             raise ValueError("Unknown dataset")
-        
-        self.VDB_URI = "http://localhost:50055"
-        self.DATASET_NAME = [
-            f"{YOUR_PREFIX}_EXACT_{dataset_name}",
-            f"{YOUR_PREFIX}_APPROX_{dataset_name}",
-        ]
+        # 开启降维时集合中存储的是降维后的向量
+        if self.PREPROCESS.get("method") and self.PREPROCESS.get("target_dim"):
+            dataset_dim = min(dataset_dim, self.PREPROCESS["target_dim"])
+        exact_name = f"{self.YOUR_PREFIX}_EXACT_{dataset_name}{exact_suffix}"
+        approx_name = f"{self.YOUR_PREFIX}_APPROX_{dataset_name}{approx_suffix}"
+
+        self.DATASET_NAME = [exact_name, approx_name]
         self.DATASET_VECTOR_PATH = [
-            f"/home/dataset/Seminar2025Fall/{dataset_name}/vector_0.fivecs",
-            f"/home/dataset/Seminar2025Fall/{dataset_name}/vector_0.fivecs",
+            f"{dataset_dir}/vector_0.fivecs",
+            f"{dataset_dir}/vector_0.fivecs",
         ]
         self.DATASET_ATTR_PATH = [
-            f"/home/dataset/Seminar2025Fall/{dataset_name}/meta_0.txt",
-            f"/home/dataset/Seminar2025Fall/{dataset_name}/meta_0.txt",
+            f"{dataset_dir}/meta_0.txt",
+            f"{dataset_dir}/meta_0.txt",
         ]
-        if dataset_name == "WIT":
-            self.SCHEMA_FIELD_CONFIG = [
-                [
-                    {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
-                    {"name": "vector", "dtype": DataType.FLOAT_VECTOR, "dim": dataset_dim, "description": "vector"},
-                    {"name": "size", "dtype": DataType.INT64, "description": "image size"},
-                ],
-                [
-                    {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
-                    {"name": "vector", "dtype": DataType.FLOAT_VECTOR, "dim": dataset_dim, "description": "vector"},
-                    {"name": "size", "dtype": DataType.INT64, "description": "image size"},
-                ],
+        self.SCHEMA_FIELD_CONFIG = [
+            [
+                {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
+                {"name": "vector", "dtype": vector_dtype, "dim": dataset_dim, "description": "vector"},
+                dict(attr_field),
             ]
+            for _ in self.DATASET_NAME
+        ]
+
+        if vector_type == "binary":
+            metric_type = "HAMMING"
+            exact_index = {"index_type": "BIN_FLAT"}
+            index_params = index_params or {"index_type": "BIN_IVF_FLAT", "params": {"nlist": 128}}
+            search_params = search_params or {"nprobe": 16}
         else:
-            self.SCHEMA_FIELD_CONFIG = [
-                [
-                    {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
-                    {"name": "vector", "dtype": DataType.FLOAT_VECTOR, "dim": dataset_dim, "description": "vector"},
-                    {"name": "label", "dtype": DataType.VARCHAR, "max_length": 50, "description": "YouTube category"},
-                ],
-                [
-                    {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
-                    {"name": "vector", "dtype": DataType.FLOAT_VECTOR, "dim": dataset_dim, "description": "vector"},
-                    {"name": "label", "dtype": DataType.VARCHAR, "max_length": 50, "description": "YouTube category"},
-                ],
-            ]
-        self.INDEX_PARAMS = [
-            {
+            metric_type = distance_type
+            exact_index = {"index_type": "FLAT"}
+            index_params = index_params or {"index_type": "HNSW", "params": {"M": 32, "efConstruction": 512}}
+            search_params = search_params or {"ef": 32}
+        self.INDEX_PARAMS = []
+        for index in (exact_index, index_params):
+            index_config = {
                 "field_name": "vector",
-                "metric_type": DISTANCE_TYPE,
-                "index_type": "FLAT",
-                "index_name": "flat_index",
-            },
-            {
-                "field_name": "vector",
-                "metric_type": DISTANCE_TYPE,
-                "index_type": "HNSW",
-                "index_name": "hnsw_index",
-                "params": {"M": 32, "efConstruction": 512},
-            },
-        ]
+                "metric_type": metric_type,
+                "index_type": index["index_type"],
+                "index_name": f"{index['index_type'].lower()}_index",
+            }
+            if index.get("params"):
+                index_config["params"] = dict(index["params"])
+            self.INDEX_PARAMS.append(index_config)
+
         self.QUERY_WORKLOAD = [
-            {"collection_name": f"{YOUR_PREFIX}_EXACT_{dataset_name}", "query_file_path": f"/home/dataset/Seminar2025Fall/{dataset_name}/query.txt"},
-            {"collection_name": f"{YOUR_PREFIX}_APPROX_{dataset_name}", "query_file_path": f"/home/dataset/Seminar2025Fall/{dataset_name}/query.txt"},
+            {"collection_name": exact_name, "query_file_path": f"{dataset_dir}/query.txt"},
+            {"collection_name": approx_name, "query_file_path": f"{dataset_dir}/query.txt"},
         ]
         self.SEARCH_PARAMS = [
-            {"metric_type": DISTANCE_TYPE},
-            {"metric_type": DISTANCE_TYPE, "params": {"ef": 32}},
+            {"metric_type": metric_type},
+            {"metric_type": metric_type, "params": dict(search_params)},
         ]
+        self.DISTANCE_TYPE = distance_type
+        self.VECTOR_TYPE = vector_type
 
-# 单例模式保证全局唯一
-vdb_config = VdbConfig()
\ No newline at end of file
+# 单例模式保证全局唯一，在第一次访问 vdb_config 时才创建
+def __getattr__(name):
+    if name == "vdb_config":
+        return VdbConfig()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,999 @@
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+from FileIO import VECTOR_TYPES, read_fivecs_matrix, convert_vectors
+from DataLoader import DataLoader, scalar_index_params
+from BenchmarkStore import BenchmarkStore
+from EmbeddingCache import configure_cache
+from MultiVectorSearch import MultiVectorSearcher, create_searcher, read_ground_truth
+from LocalEngine import LocalEngine, local_vectors
+from Partitioning import PartitionLayout
+from BulkImport import BULK_FORMATS, create_object_store
+from TokenPooling import pool_fivecs
+from LazyImport import lazy_from
+
+# pymilvus 在第一次使用时才导入
+MilvusClient, DataType, Collection = lazy_from("pymilvus", "MilvusClient", "DataType", "Collection")
+
+
+def vector_dtype(vector_type):
+    """向量存储类型对应的 Milvus 字段类型"""
+    return {
+        "float32": DataType.FLOAT_VECTOR,
+        "float16": DataType.FLOAT16_VECTOR,
+        "bfloat16": DataType.BFLOAT16_VECTOR,
+        "binary": DataType.BINARY_VECTOR,
+    }[vector_type]
+
+
+def exact_knn(matrix, queries, top_k, metric_type, chunk_size=4096):
+    """
+    使用 NumPy 暴力计算精确的 KNN 结果（返回向量在 matrix 中的行号）
+
+    Args:
+        matrix (numpy.ndarray): (n, dim) 浮点向量
+        queries (numpy.ndarray): (m, dim) 查询向量
+        top_k (int): 返回最相似的 k 个结果
+        metric_type (str): L2 或 IP
+        chunk_size (int): 每次参与计算的数据向量数，控制内存占用
+
+    Returns:
+        numpy.ndarray: (m, top_k) 行号
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+    best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+    for sid in range(0, len(matrix), chunk_size):
+        chunk = matrix[sid:sid + chunk_size]
+        if metric_type == "IP":
+            scores = -(queries @ chunk.T)
+        else:
+            scores = np.sum(chunk ** 2, axis=1)[None, :] - 2.0 * (queries @ chunk.T)
+        scores = np.concatenate([best_scores, scores], axis=1)
+        rows = np.concatenate([best_rows, np.broadcast_to(np.arange(sid, sid + len(chunk)), (len(queries), len(chunk)))], axis=1)
+        keep = np.argsort(scores, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(scores, keep, axis=1)
+        best_rows = np.take_along_axis(rows, keep, axis=1)
+    return best_rows
+
+
+def bench_vector_types(
+    client: MilvusClient,
+    collection_prefix: str,
+    vector_file_path: str,
+    query_file_path: str,
+    metric_type: str,
+    top_k: int = 10,
+    vector_types=VECTOR_TYPES,
+    rerank_factor: int = 4,
+    max_queries: int = 320,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    在 LoTTE 上比较不同向量存储类型的内存占用、导入吞吐与 token 级别的 KNN 召回率
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_prefix (str): 测试集合名称前缀
+        vector_file_path (str): 向量数据文件路径
+        query_file_path (str): 查询文件路径（每个查询 token 作为一个 KNN 查询）
+        metric_type (str): L2 或 IP
+        top_k (int): 返回最相似的 k 个结果
+        vector_types: 待比较的向量存储类型
+        rerank_factor (int): binary 模式下的候选倍数
+        max_queries (int): 参与测试的查询 token 数
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每种类型的实验结果
+    """
+    data_loader = DataLoader(client)
+    vids, docs, matrix = read_fivecs_matrix(vector_file_path)
+    _, _, queries = read_fivecs_matrix(query_file_path)
+    queries = queries[:max_queries]
+    truth_rows = exact_knn(matrix, queries, top_k, metric_type)
+    truth_list = [set(vids[rows].tolist()) for rows in truth_rows]
+    position = dict(zip(vids.tolist(), range(len(vids))))
+
+    reports = []
+    for vector_type in vector_types:
+        collection_name = f"{collection_prefix}_{vector_type.upper()}"
+        start_time = time.time()
+        vectors = convert_vectors(matrix, vector_type)
+        convert_time = time.time() - start_time
+
+        fields_config = [
+            {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
+            {"name": "vector", "dtype": vector_dtype(vector_type), "dim": matrix.shape[1], "description": "vector"},
+            {"name": "doc", "dtype": DataType.INT64, "description": "Doc id"},
+        ]
+        data_loader.create_schema(collection_name, fields_config, mode="recreate")
+        data_list = [
+            {"id": vid, "vector": vec, "doc": doc}
+            for vid, doc, vec in zip(vids.tolist(), docs.tolist(), vectors)
+        ]
+        start_time = time.time()
+        data_loader.load_data(collection_name, data_list, mode="recreate")
+        ingest_time = time.time() - start_time
+
+        search_metric = "HAMMING" if vector_type == "binary" else metric_type
+        index_params = {
+            "field_name": "vector",
+            "metric_type": search_metric,
+            "index_type": "BIN_FLAT" if vector_type == "binary" else "FLAT",
+            "index_name": "flat_index",
+        }
+        data_loader.build_and_load_all([collection_name], [index_params])
+
+        collection = Collection(collection_name, using=client._using)
+        limit = top_k * rerank_factor if vector_type == "binary" else top_k
+        query_data = convert_vectors(queries, vector_type)
+        start_time = time.time()
+        result_list = collection.search(
+            data=query_data,
+            anns_field="vector",
+            param={"metric_type": search_metric},
+            limit=limit,
+        )
+        search_time = time.time() - start_time
+
+        recalls = []
+        for query, hits, truth_ids in zip(queries, result_list, truth_list):
+            result_ids = [hit.id for hit in hits]
+            if vector_type == "binary" and result_ids:
+                # 用浮点向量重排汉明距离的候选
+                candidates = matrix[[position[vid] for vid in result_ids]]
+                if metric_type == "IP":
+                    order = np.argsort(-(candidates @ query))
+                else:
+                    order = np.argsort(np.sum((candidates - query) ** 2, axis=1))
+                result_ids = [result_ids[i] for i in order[:top_k]]
+            recalls.append(len(truth_ids.intersection(result_ids)) / len(truth_ids))
+
+        report = {
+            "vector_type": vector_type,
+            "memory_bytes": sum(len(vec) if isinstance(vec, bytes) else vec.nbytes for vec in vectors),
+            "convert_time": convert_time,
+            "ingest_rows_per_s": len(data_list) / ingest_time if ingest_time > 0 else 0.0,
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "avg_latency_ms": search_time * 1000.0 / max(len(queries), 1),
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("vector_type", collection_name, top_k=top_k, metric_type=metric_type, **report)
+
+    print("=" * 80)
+    print(f"{'type':<10}{'memory(MB)':>12}{'convert(s)':>12}{'ingest(rows/s)':>16}{'recall':>10}{'latency(ms)':>14}")
+    for report in reports:
+        print(f"{report['vector_type']:<10}{report['memory_bytes'] / 2**20:>12.1f}{report['convert_time']:>12.3f}"
+              f"{report['ingest_rows_per_s']:>16.0f}{report['recall'] * 100:>9.1f}%{report['avg_latency_ms']:>14.3f}")
+    print("=" * 80)
+    return reports
+
+
+# 启动时不应被导入的重量级依赖
+HEAVY_MODULES = ("pymilvus", "tqdm", "matplotlib", "grpc", "pandas")
+
+
+def bench_startup(
+    commands=None,
+    repeat: int = 5,
+    regression_ratio: float = 1.2,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    测量 VdbCli.py 各个命令的启动时间（子进程墙钟时间）以及启动时导入的重量级依赖
+
+    Args:
+        commands (list): 待测量的命令行参数列表，默认测量几个不需要连接 Milvus 的命令
+        repeat (int): 每个命令重复次数，取最小值
+        regression_ratio (float): 超过上一次记录的该倍数时报告启动时间退化
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每个命令的实验结果
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "VdbCli.py")
+    commands = commands or [["--help"], ["list", "--help"], ["gt", "--help"]]
+    reports = []
+    for args in commands:
+        name = " ".join(["VdbCli.py"] + args)
+        times = []
+        heavy_modules = set()
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            completed = subprocess.run([sys.executable, "-X", "importtime", script] + args,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            times.append((time.perf_counter() - start_time) * 1000.0)
+            for line in completed.stderr.splitlines():
+                # 格式: "import time: self [us] | cumulative | imported package"
+                module = line.rsplit("|", 1)[-1].strip().split(".")[0]
+                if module in HEAVY_MODULES:
+                    heavy_modules.add(module)
+        report = {"best_ms": min(times), "median_ms": float(np.median(times)), "heavy_modules": sorted(heavy_modules)}
+        previous = benchmark_store.latest("startup", name) if benchmark_store is not None else None
+        if previous is not None and report["best_ms"] > previous["best_ms"] * regression_ratio:
+            print(f"[startup regression] {name}: {previous['best_ms']:.1f} ms -> {report['best_ms']:.1f} ms")
+        if benchmark_store is not None:
+            benchmark_store.record("startup", name, **report)
+        reports.append(dict(report, name=name))
+        print(f"{name:<40}{report['best_ms']:>10.1f} ms  heavy imports: {report['heavy_modules'] or '-'}")
+    return reports
+
+
+def bench_multi_vector_modes(
+    client: MilvusClient,
+    collection_name: str,
+    vector_file_path: str,
+    query_file_path: str,
+    search_params: dict,
+    top_k: int = 20,
+    candidate_factors=(1, 2, 4, 8),
+    max_queries: int = 20,
+    local_engine=None,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    在同一个按 token 存储的集合（每行一个向量，doc 字段为文档ID）上比较两种多向量查询方式的召回率与延迟：
+    scan（每个文档一次 doc == {id} 的过滤查询）与 group（每个查询一次 group_by_field="doc" 的分组查询，
+    不同候选倍数，以及是否用本地向量精确重排），Ground Truth 为 NumPy 精确计算的 MaxSim
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例（使用本地引擎时为 None）
+        collection_name (str): 集合名称
+        vector_file_path (str): 导入该集合的向量数据文件路径
+        query_file_path (str): 查询文件路径
+        search_params (dict): 查询参数
+        top_k (int): 每个查询返回的文档数
+        candidate_factors: group 模式的候选倍数
+        max_queries (int): 参与测试的查询数
+        local_engine (LocalEngine): 本地引擎，None 表示使用 Milvus
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每种查询方式的实验结果
+    """
+    _, doc_ids, matrix = read_fivecs_matrix(vector_file_path)
+    metric_type = search_params.get("metric_type", "IP")
+    exact = MultiVectorSearcher(None)
+    exact.enable_local_scan(doc_ids, matrix)
+    # 与 multi_vector_search 相同，每个查询为向量列表
+    queries = exact._process_vectors(query_file_path)[:max_queries]
+    doc_list = np.unique(doc_ids)
+    truth_list = []
+    for query in queries:
+        scores = exact._local_doc_scores(doc_list, query, metric_type)
+        order = np.argsort(scores if metric_type == "L2" else -scores, kind="stable")[:top_k]
+        truth_list.append(set(doc_list[order].tolist()))
+
+    searcher = MultiVectorSearcher(client)
+    if local_engine is not None:
+        searcher.set_local_engine(local_engine)
+    collection = searcher._collection(collection_name)
+    collection.load()
+
+    def run_mode(search):
+        recalls, latencies = [], []
+        for query, truth_docs in zip(queries, truth_list):
+            start_time = time.perf_counter()
+            result_docs = search(query)
+            latencies.append((time.perf_counter() - start_time) * 1000.0)
+            recalls.append(len(truth_docs.intersection(result_docs)) / len(truth_docs))
+        return {"recall": float(np.mean(recalls)), "avg_latency_ms": float(np.mean(latencies)),
+                "qps": len(latencies) * 1000.0 / max(sum(latencies), 1e-6)}
+
+    modes = {"scan": lambda query: [doc_list[idx] for idx in searcher._scan_all_doc(collection, doc_list.tolist(), query, top_k, search_params)]}
+    for factor in candidate_factors:
+        modes[f"group x{factor}"] = (factor, False)
+        modes[f"group x{factor} + rerank"] = (factor, True)
+
+    reports = []
+    for mode, config in modes.items():
+        if callable(config):
+            report = run_mode(config)
+        else:
+            factor, rerank = config
+            searcher.set_search_mode("group", factor)
+            # 重排时共享精确计算用的本地向量
+            searcher.local_starts, searcher.local_docs, searcher.local_matrix = (
+                (exact.local_starts, exact.local_docs, exact.local_matrix) if rerank else (None, None, None))
+            report = run_mode(lambda query: searcher._group_search(collection, query, top_k, search_params))
+        report["mode"] = mode
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("multi_vector", f"{collection_name}/{mode}", top_k=top_k,
+                                   num_queries=len(queries), search_params=search_params, **report)
+
+    print("=" * 60)
+    print(f"{'mode':<24}{'recall':>10}{'latency(ms)':>14}{'QPS':>12}")
+    for report in reports:
+        print(f"{report['mode']:<24}{report['recall'] * 100:>9.1f}%{report['avg_latency_ms']:>14.2f}{report['qps']:>12.1f}")
+    print("=" * 60)
+    return reports
+
+
+def bench_adaptive_search(
+    client: MilvusClient,
+    collection_name: str,
+    vector_file_path: str,
+    query_file_path: str,
+    search_params: dict,
+    top_k: int = 20,
+    latency_budgets=(1, 5, 20, 50),
+    target_recalls=(0.9, 1.0),
+    proxy: str = "auto",
+    refine_batch_docs: int = 64,
+    max_queries: int = 20,
+    local_engine=None,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    测试 adaptive 多向量查询（见 MultiVectorSearcher._adaptive_search）在不同延迟预算与目标召回率下的表现：
+    每个查询的延迟是否在预算内、召回率、精确计算的文档数与 exact 比例，Ground Truth 为 NumPy 精确计算的 MaxSim
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例（使用本地引擎时为 None）
+        collection_name (str): 集合名称
+        vector_file_path (str): 导入该集合的向量数据文件路径（centroid 代理分数与精确计算使用其中的本地向量）
+        query_file_path (str): 查询文件路径
+        search_params (dict): 查询参数
+        top_k (int): 每个查询返回的文档数
+        latency_budgets: 待测试的延迟预算（毫秒），只设置预算
+        target_recalls: 待测试的目标召回率，只设置目标召回率
+        proxy (str): 代理分数，"centroid"、"ann" 或 "auto"
+        refine_batch_docs (int): 每批精确计算的文档数
+        max_queries (int): 参与测试的查询数
+        local_engine (LocalEngine): 本地引擎，None 表示使用 Milvus
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每组停止条件的实验结果
+    """
+    _, doc_ids, matrix = read_fivecs_matrix(vector_file_path)
+    metric_type = search_params.get("metric_type", "IP")
+    searcher = MultiVectorSearcher(client)
+    searcher.enable_local_scan(doc_ids, matrix)
+    if local_engine is not None:
+        searcher.set_local_engine(local_engine)
+    queries = searcher._process_vectors(query_file_path)[:max_queries]
+    truth_list = []
+    for query in queries:
+        scores = searcher._local_doc_scores(searcher.local_docs, query, metric_type)
+        order = np.argsort(scores if metric_type == "L2" else -scores, kind="stable")[:top_k]
+        truth_list.append(set(searcher.local_docs[order].tolist()))
+    collection = searcher._collection(collection_name)
+    collection.load()
+
+    settings = [(budget, None) for budget in latency_budgets] + [(None, target) for target in target_recalls] + [(None, None)]
+    reports = []
+    for budget, target in settings:
+        searcher.set_adaptive_params(budget, target, proxy, refine_batch_docs)
+        recalls, latencies, infos = [], [], []
+        for query, truth_docs in zip(queries, truth_list):
+            start_time = time.perf_counter()
+            result_docs, info = searcher._adaptive_search(collection, query, top_k, search_params)
+            latencies.append((time.perf_counter() - start_time) * 1000.0)
+            recalls.append(len(truth_docs.intersection(result_docs)) / len(truth_docs))
+            infos.append(info)
+        report = {
+            "latency_budget_ms": budget,
+            "target_recall": target,
+            "proxy": infos[0]["proxy"] if infos else proxy,
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "within_budget": float(np.mean([latency <= budget for latency in latencies])) if budget is not None else 1.0,
+            "avg_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+            "p99_latency_ms": float(np.percentile(latencies, 99)) if latencies else 0.0,
+            "avg_scored_docs": float(np.mean([info["scored_docs"] for info in infos])) if infos else 0.0,
+            "exact_ratio": float(np.mean([info["exact"] for info in infos])) if infos else 0.0,
+            "avg_confidence": float(np.mean([info["confidence"] for info in infos])) if infos else 0.0,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("adaptive_search", f"{collection_name}/budget={budget}/target={target}", top_k=top_k,
+                                   num_queries=len(queries), search_params=search_params, **report)
+
+    print("=" * 80)
+    print(f"{'budget(ms)':>12}{'target':>8}{'recall':>10}{'in budget':>11}{'latency(ms)':>13}{'p99(ms)':>10}{'scored':>10}{'exact':>8}")
+    for report in reports:
+        budget = "-" if report["latency_budget_ms"] is None else report["latency_budget_ms"]
+        target = "-" if report["target_recall"] is None else report["target_recall"]
+        print(f"{budget:>12}{target:>8}{report['recall'] * 100:>9.1f}%{report['within_budget'] * 100:>10.1f}%"
+              f"{report['avg_latency_ms']:>13.2f}{report['p99_latency_ms']:>10.2f}{report['avg_scored_docs']:>10.1f}"
+              f"{report['exact_ratio'] * 100:>7.0f}%")
+    print("=" * 80)
+    return reports
+
+
+def bench_query_reduction(
+    searcher: MultiVectorSearcher,
+    collection_name: str,
+    query_file_path: str,
+    search_params: dict,
+    truth_file: str = "ground_truth.dat",
+    settings=((None, None), (0.99, None), (0.95, None), (0.9, None), (0.8, None)),
+    top_k: int = 20,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较不同查询 token 精简设置（见 QueryReduction.py）下每个查询的 token 数、延迟与召回率，
+    召回率以 run_ground_truth 写出的 ground_truth.dat 为 Ground Truth
+
+    Args:
+        searcher (MultiVectorSearcher): 已设置查询方式的 MultiVectorSearcher（见 create_searcher）
+        collection_name (str): 集合名称
+        query_file_path (str): 查询文件路径
+        search_params (dict): 查询参数
+        truth_file (str): Ground Truth 文件（python3 VdbCli.py ground-truth 生成）
+        settings: 待比较的 (dedup_threshold, min_norm)，(None, None) 为不精简的基线
+        top_k (int): 每个查询返回的文档数
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每组设置的实验结果
+    """
+    truth_list = [set(docs[:top_k]) for docs in read_ground_truth(truth_file)]
+    reports = []
+    for dedup_threshold, min_norm in settings:
+        searcher.set_query_reduction(dedup_threshold, min_norm)
+        result = searcher.multi_vector_search(collection_name, query_file_path, top_k, search_params)
+        recalls = [len(truth_docs.intersection(docs)) / len(truth_docs) if truth_docs else 0.0
+                   for truth_docs, docs in zip(truth_list, result)]
+        original_tokens, reduced_tokens = searcher.token_counts
+        report = {
+            "dedup_threshold": dedup_threshold,
+            "min_norm": min_norm,
+            "avg_tokens": reduced_tokens / max(len(result), 1),
+            "token_ratio": reduced_tokens / max(original_tokens, 1),
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "avg_latency_ms": float(np.mean(searcher.latency_list)) if searcher.latency_list else 0.0,
+            "p99_latency_ms": float(np.percentile(searcher.latency_list, 99)) if searcher.latency_list else 0.0,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("query_reduction", f"{collection_name}/dedup={dedup_threshold}/min_norm={min_norm}",
+                                   top_k=top_k, search_mode=searcher.search_mode, num_queries=len(result),
+                                   search_params=search_params, **report)
+    searcher.set_query_reduction(None, None)
+
+    print("=" * 80)
+    print(f"{'dedup':>8}{'min_norm':>10}{'tokens':>9}{'ratio':>9}{'recall':>10}{'latency(ms)':>14}{'p99(ms)':>12}")
+    for report in reports:
+        dedup = "-" if report["dedup_threshold"] is None else report["dedup_threshold"]
+        min_norm = "-" if report["min_norm"] is None else report["min_norm"]
+        print(f"{dedup:>8}{min_norm:>10}{report['avg_tokens']:>9.1f}{report['token_ratio'] * 100:>8.1f}%"
+              f"{report['recall'] * 100:>9.1f}%{report['avg_latency_ms']:>14.2f}{report['p99_latency_ms']:>12.2f}")
+    print("=" * 80)
+    return reports
+
+
+def _dir_size(directory):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+
+def bench_token_pooling(
+    client: MilvusClient,
+    collection_prefix: str,
+    fields_config: list,
+    vector_file_path: str,
+    query_file_path: str,
+    index_params: dict,
+    search_params: dict,
+    factors=(1, 2, 4),
+    output_dir: str = "pooled",
+    normalize: bool = True,
+    workers: int = 0,
+    vector_type: str = "float32",
+    group_candidate_factor: int = 4,
+    top_k: int = 20,
+    max_queries: int = 20,
+    local_engine=None,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较文档端 token 池化（见 TokenPooling.py）不同倍数下的向量数、索引大小、导入时间、查询延迟与召回率：
+    每个倍数池化后导入到单独的集合并构建相同的近似索引，用 group 模式查询；
+    Ground Truth 为未池化向量上 NumPy 精确计算的 MaxSim，factor = 1 即未池化的基线
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例（使用本地引擎时为 None）
+        collection_prefix (str): 测试集合名称前缀
+        fields_config (list): 字段配置（VdbConfig.SCHEMA_FIELD_CONFIG 中的一项）
+        vector_file_path (str): 未池化的向量数据文件路径
+        query_file_path (str): 查询文件路径
+        index_params (dict): 近似索引参数（与 VdbConfig.INDEX_PARAMS[1] 格式相同）
+        search_params (dict): 查询参数
+        factors: 待比较的池化倍数
+        output_dir (str): 池化文件的输出目录
+        normalize (bool): 是否把合并后的向量重新 L2 归一化
+        workers (int): 池化进程数，0 表示 CPU 核数
+        vector_type (str): 集合中向量的存储类型
+        group_candidate_factor (int): group 模式的候选倍数
+        top_k (int): 每个查询返回的文档数
+        max_queries (int): 参与测试的查询数
+        local_engine (LocalEngine): 本地引擎，None 表示使用 Milvus
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每个池化倍数的实验结果
+    """
+    _, doc_ids, matrix = read_fivecs_matrix(vector_file_path)
+    metric_type = search_params.get("metric_type", "IP")
+    exact = MultiVectorSearcher(None)
+    exact.enable_local_scan(doc_ids, matrix)
+    queries = exact._process_vectors(query_file_path)[:max_queries]
+    truth_list = []
+    for query in queries:
+        scores = exact._local_doc_scores(exact.local_docs, query, metric_type)
+        order = np.argsort(scores if metric_type == "L2" else -scores, kind="stable")[:top_k]
+        truth_list.append(set(exact.local_docs[order].tolist()))
+    del exact, doc_ids, matrix
+
+    data_loader = DataLoader(client) if local_engine is None else None
+    stem = os.path.splitext(os.path.basename(vector_file_path))[0]
+    reports = []
+    for factor in factors:
+        if factor > 1:
+            pooled_file = os.path.join(output_dir, f"{stem}.pool{factor:g}.fivecs")
+            pool_time = pool_fivecs(vector_file_path, pooled_file, factor, normalize, workers)["pool_time"]
+        else:
+            pooled_file, pool_time = vector_file_path, 0.0
+        vids, pooled_docs, pooled_matrix = read_fivecs_matrix(pooled_file)
+        collection_name = f"{collection_prefix}_POOL{factor:g}"
+
+        if local_engine is not None:
+            start_time = time.time()
+            local_engine.create_collection(collection_name, vids, local_vectors(pooled_matrix, vector_type),
+                                           {"doc": pooled_docs}, index_params)
+            ingest_time = time.time() - start_time
+            build_time = None
+            index_size = _dir_size(os.path.join(local_engine.root_dir, collection_name))
+        else:
+            data_loader.create_schema(collection_name, fields_config, mode="recreate")
+            data_list = data_loader.read_data(pooled_file, vector_type)
+            start_time = time.time()
+            data_loader.load_data(collection_name, data_list, mode="recreate")
+            ingest_time = time.time() - start_time
+            del data_list
+            build_results = data_loader.build_and_load_all([collection_name], [index_params]).get(collection_name, {})
+            build_time = build_results.get("build_time")
+            index_size = build_results.get("index_size")
+
+        searcher = MultiVectorSearcher(client, vector_type)
+        if local_engine is not None:
+            searcher.set_local_engine(local_engine)
+        if vector_type == "binary":
+            searcher.set_rerank_vectors(pooled_docs, pooled_matrix)
+        searcher.set_search_mode("group", group_candidate_factor)
+        collection = searcher._collection(collection_name)
+        collection.load()
+        recalls, latencies = [], []
+        for query, truth_docs in zip(queries, truth_list):
+            start_time = time.perf_counter()
+            result_docs = searcher._group_search(collection, query, top_k, search_params)
+            latencies.append((time.perf_counter() - start_time) * 1000.0)
+            recalls.append(len(truth_docs.intersection(result_docs)) / len(truth_docs))
+
+        report = {
+            "factor": factor,
+            "vectors": len(vids),
+            "pool_time": pool_time,
+            "ingest_time": ingest_time,
+            "build_time": build_time,
+            "index_size": index_size,
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "avg_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+            "p99_latency_ms": float(np.percentile(latencies, 99)) if latencies else 0.0,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("token_pooling", collection_name, top_k=top_k, num_queries=len(queries),
+                                   vector_type=vector_type, index_type=index_params["index_type"],
+                                   search_params=search_params, **report)
+        del vids, pooled_docs, pooled_matrix
+
+    print("=" * 80)
+    print(f"{'factor':>8}{'vectors':>11}{'index(MB)':>11}{'pool(s)':>9}{'ingest(s)':>11}{'recall':>10}{'latency(ms)':>13}{'p99(ms)':>10}")
+    for report in reports:
+        index_mb = "-" if report["index_size"] is None else f"{report['index_size'] / 2**20:.1f}"
+        print(f"{report['factor']:>8g}{report['vectors']:>11}{index_mb:>11}{report['pool_time']:>9.1f}{report['ingest_time']:>11.2f}"
+              f"{report['recall'] * 100:>9.1f}%{report['avg_latency_ms']:>13.2f}{report['p99_latency_ms']:>10.2f}")
+    print("=" * 80)
+    return reports
+
+
+def bench_scalar_index(
+    client: MilvusClient,
+    collection_name: str,
+    fields_config: list,
+    query_file_path: str,
+    search_params: dict,
+    vector_type: str = "float32",
+    num_docs: int = 100,
+    seed: int = 0,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较 doc 字段有无标量索引（见 DataLoader.scalar_index_params）时逐文档查询的延迟：
+    _scan_all_doc 中 doc == {id} 的过滤查询（top_k = 1，与 MaxSim 计算相同）以及 multi_vector_search 中取全部文档ID的 id >= 0 查询；
+    先删除标量索引测量，再重新构建标量索引测量；结束时集合保留标量索引
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_name (str): 已导入数据并建好向量索引的集合
+        fields_config (list): 该集合的字段配置（VdbConfig.SCHEMA_FIELD_CONFIG 中的一项）
+        query_file_path (str): 查询文件路径（使用第一个查询）
+        search_params (dict): 查询参数
+        vector_type (str): 集合中向量的存储类型
+        num_docs (int): 随机抽取的文档数
+        seed (int): 随机种子
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 有无标量索引的实验结果
+    """
+    data_loader = DataLoader(client)
+    scalar_params = scalar_index_params(fields_config)
+    searcher = MultiVectorSearcher(client, vector_type)
+    query_vectors = searcher._process_vectors(query_file_path)[0]
+    collection = Collection(collection_name, using=client._using)
+    data_loader.ensure_loaded(collection_name)
+    doc_list = sorted({item["doc"] for item in collection.query(expr="id >= 0", output_fields=["doc"])})
+    rng = np.random.default_rng(seed)
+    sample_docs = rng.choice(doc_list, min(num_docs, len(doc_list)), replace=False).tolist()
+
+    reports = []
+    for scalar_index in (False, True):
+        # 索引变化后重新加载集合才会生效
+        collection.release()
+        start_time = time.time()
+        for params in scalar_params:
+            exists = collection.has_index(index_name=params["index_name"])
+            if exists and not scalar_index:
+                collection.drop_index(index_name=params["index_name"])
+            elif not exists and scalar_index:
+                collection.create_index(field_name=params["field_name"], index_params=params, index_name=params["index_name"])
+                data_loader.wait_for_index(collection_name, params["index_name"])
+        build_time = time.time() - start_time
+        data_loader.ensure_loaded(collection_name)
+
+        latencies = []
+        for doc_id in sample_docs:
+            start_time = time.perf_counter()
+            searcher._hybrid_search(collection, "vector", query_vectors, f"doc == {doc_id}", 1, search_params)
+            latencies.append((time.perf_counter() - start_time) * 1000.0)
+        start_time = time.perf_counter()
+        collection.query(expr="id >= 0", output_fields=["doc"])
+        doc_list_ms = (time.perf_counter() - start_time) * 1000.0
+        report = {
+            "scalar_index": scalar_index,
+            "indexes": [f"{params['field_name']}:{params['index_type']}" for params in scalar_params] if scalar_index else [],
+            "build_time": build_time if scalar_index else 0.0,
+            "avg_latency_ms": float(np.mean(latencies)),
+            "p99_latency_ms": float(np.percentile(latencies, 99)),
+            "doc_list_ms": doc_list_ms,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("scalar_index", f"{collection_name}_{'indexed' if scalar_index else 'scan'}",
+                                   num_docs=len(sample_docs), **report)
+
+    print("=" * 80)
+    print(f"{'scalar index':<14}{'doc filter(ms)':>16}{'p99(ms)':>12}{'doc list(ms)':>14}{'build(s)':>10}")
+    for report in reports:
+        print(f"{str(report['scalar_index']):<14}{report['avg_latency_ms']:>16.3f}{report['p99_latency_ms']:>12.3f}"
+              f"{report['doc_list_ms']:>14.1f}{report['build_time']:>10.2f}")
+    print("=" * 80)
+    return reports
+
+
+def bench_partitions(
+    client: MilvusClient,
+    collection_prefix: str,
+    fields_config: list,
+    vector_file_path: str,
+    query_file_path: str,
+    index_params: dict,
+    search_params: dict,
+    mode: str = "hash",
+    partition_counts=(1, 4, 16, 64),
+    vector_type: str = "float32",
+    top_k: int = 20,
+    num_docs: int = 200,
+    max_queries: int = 5,
+    seed: int = 0,
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较按文档ID划分不同分区数（见 Partitioning.py）时逐文档查询的延迟与召回率：
+    每个分区数导入到单独的集合并构建相同的近似索引，_scan_all_doc 中 doc == {id} 的过滤查询只检索一个分区；
+    召回率为随机抽取的 num_docs 个文档上 MaxSim 排序的 top_k 与 NumPy 精确计算的重合比例
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_prefix (str): 测试集合名称前缀
+        fields_config (list): 字段配置（VdbConfig.SCHEMA_FIELD_CONFIG 中的一项）
+        vector_file_path (str): 向量数据文件路径
+        query_file_path (str): 查询文件路径
+        index_params (dict): 近似索引参数（与 VdbConfig.INDEX_PARAMS[1] 格式相同）
+        search_params (dict): 查询参数
+        mode (str): "partition_key"、"hash" 或 "range"
+        partition_counts: 待比较的分区数，1 表示不划分
+        vector_type (str): 集合中向量的存储类型
+        top_k (int): 每个查询返回的文档数
+        num_docs (int): 随机抽取的文档数
+        max_queries (int): 参与测试的查询数
+        seed (int): 随机种子
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每个分区数的实验结果
+    """
+    data_loader = DataLoader(client)
+    _, doc_ids, matrix = read_fivecs_matrix(vector_file_path)
+    data_list = data_loader.read_data(vector_file_path, vector_type)
+    metric_type = search_params.get("metric_type", "IP")
+    exact = MultiVectorSearcher(None)
+    exact.enable_local_scan(doc_ids, matrix)
+    queries = exact._process_vectors(query_file_path)[:max_queries]
+    rng = np.random.default_rng(seed)
+    doc_list = np.unique(doc_ids)
+    sample_docs = np.sort(rng.choice(doc_list, min(num_docs, len(doc_list)), replace=False))
+    truth_list = []
+    for query in queries:
+        scores = exact._local_doc_scores(sample_docs, query, metric_type)
+        order = np.argsort(scores if metric_type == "L2" else -scores, kind="stable")[:top_k]
+        truth_list.append(set(sample_docs[order].tolist()))
+
+    reports = []
+    for num_partitions in partition_counts:
+        layout = PartitionLayout.fit(doc_ids, mode, num_partitions) if num_partitions > 1 else None
+        collection_name = f"{collection_prefix}_P{num_partitions}"
+        if layout is None:
+            data_loader.create_schema(collection_name, fields_config, mode="recreate")
+        else:
+            data_loader.create_schema(collection_name, layout.schema_fields(fields_config), mode="recreate",
+                                      num_partitions=layout.num_partitions if layout.mode == "partition_key" else None)
+            if layout.explicit:
+                data_loader.create_partitions(collection_name, layout)
+        start_time = time.time()
+        data_loader.load_data(collection_name, data_list, mode="recreate", partition_layout=layout)
+        ingest_time = time.time() - start_time
+        build_results = data_loader.build_and_load_all([collection_name], [index_params])
+
+        searcher = MultiVectorSearcher(client, vector_type)
+        searcher.set_partition_layout(layout)
+        collection = Collection(collection_name, using=client._using)
+        recalls, latencies = [], []
+        for query, truth_docs in zip(queries, truth_list):
+            start_time = time.perf_counter()
+            answer_idx_list = searcher._scan_all_doc(collection, sample_docs.tolist(), query, top_k, search_params)
+            # 每个文档一次过滤查询
+            latencies.append((time.perf_counter() - start_time) * 1000.0 / len(sample_docs))
+            recalls.append(len(truth_docs.intersection(sample_docs[answer_idx_list].tolist())) / len(truth_docs))
+
+        report = {
+            "mode": mode if layout is not None else "none",
+            "num_partitions": layout.num_partitions if layout is not None else 1,
+            "ingest_rows_per_s": len(data_list) / ingest_time if ingest_time > 0 else 0.0,
+            "build_time": build_results.get(collection_name, {}).get("build_time"),
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "doc_filter_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+        }
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("partition", collection_name, top_k=top_k, num_docs=len(sample_docs),
+                                   index_type=index_params["index_type"], **report)
+
+    print("=" * 80)
+    print(f"{'mode':<16}{'partitions':>12}{'recall':>10}{'doc filter(ms)':>16}{'ingest(rows/s)':>16}")
+    for report in reports:
+        print(f"{report['mode']:<16}{report['num_partitions']:>12}{report['recall'] * 100:>9.1f}%"
+              f"{report['doc_filter_latency_ms']:>16.3f}{report['ingest_rows_per_s']:>16.0f}")
+    print("=" * 80)
+    return reports
+
+
+def bench_bulk_import(
+    client: MilvusClient,
+    collection_prefix: str,
+    fields_config: list,
+    vector_file_path: str,
+    object_store_config: dict,
+    formats=BULK_FORMATS,
+    vector_type: str = "float32",
+    rows_per_file: int = 1000000,
+    staging_dir: str = "bulk_staging",
+    benchmark_store: BenchmarkStore = None
+):
+    """
+    比较逐批 insert 与 utility.do_bulk_insert（见 DataLoader.bulk_import）导入同一份数据的墙钟时间：
+    每种方式导入到单独的新集合，insert 计入读取与构造逐行数据的时间，bulk 计入转换、上传与等待导入任务的时间
+
+    Args:
+        client (MilvusClient): Milvus 客户端实例
+        collection_prefix (str): 测试集合名称前缀
+        fields_config (list): 字段配置（VdbConfig.SCHEMA_FIELD_CONFIG 中的一项）
+        vector_file_path (str): 向量数据文件路径
+        object_store_config (dict): 对象存储配置（VdbConfig.BULK_IMPORT["object_store"]）
+        formats: 待比较的导入文件格式
+        vector_type (str): 集合中向量的存储类型
+        rows_per_file (int): 每个导入任务的行数
+        staging_dir (str): 本地生成导入文件的目录
+        benchmark_store (BenchmarkStore): 记录实验结果，None 表示不记录
+
+    Returns:
+        list: 每种导入方式的实验结果
+    """
+    data_loader = DataLoader(client)
+    object_store = create_object_store(object_store_config)
+    reports = []
+    for method in ("insert",) + tuple(formats):
+        collection_name = f"{collection_prefix}_{method}"
+        data_loader.create_schema(collection_name, fields_config, mode="recreate")
+        start_time = time.time()
+        if method == "insert":
+            data_list = data_loader.read_data(vector_file_path, vector_type)
+            data_loader.load_data(collection_name, data_list, mode="recreate")
+            rows = len(data_list)
+            del data_list
+            report = {"method": method, "rows": rows, "jobs": 0}
+        else:
+            results = data_loader.bulk_import(collection_name, vector_file_path, vector_type,
+                                              object_store=object_store, file_format=method,
+                                              rows_per_file=rows_per_file, staging_dir=staging_dir)
+            report = {"method": method, "rows": results["rows"], "jobs": results["jobs"],
+                      "convert_time": results["convert_time"], "upload_time": results["upload_time"],
+                      "import_time": results["import_time"]}
+        report["total_time"] = time.time() - start_time
+        report["rows_per_s"] = report["rows"] / report["total_time"] if report["total_time"] > 0 else 0.0
+        report["server_rows"] = Collection(collection_name, using=client._using).num_entities
+        reports.append(report)
+        if benchmark_store is not None:
+            benchmark_store.record("bulk_import", collection_name, vector_type=vector_type, rows_per_file=rows_per_file, **report)
+
+    print("=" * 80)
+    print(f"{'method':<10}{'rows':>12}{'jobs':>6}{'convert(s)':>12}{'upload(s)':>11}{'import(s)':>11}{'total(s)':>10}{'rows/s':>12}")
+    for report in reports:
+        print(f"{report['method']:<10}{report['rows']:>12}{report['jobs']:>6}{report.get('convert_time', 0.0):>12.2f}"
+              f"{report.get('upload_time', 0.0):>11.2f}{report.get('import_time', 0.0):>11.2f}"
+              f"{report['total_time']:>10.2f}{report['rows_per_s']:>12.0f}")
+    print("=" * 80)
+    return reports
+
+
+BENCHMARKS = ("vector_type", "startup", "multi_vector", "adaptive", "query_reduction", "token_pooling", "scalar_index", "partition", "bulk_import")
+
+
+def run_benchmarks(vdb_config, names=BENCHMARKS):
+    """
+    运行指定的实验，结果记录到 BENCHMARK_STORE_FILE
+
+    Args:
+        vdb_config (VdbConfig): 配置
+        names: 实验名称，取值见 BENCHMARKS
+    """
+    benchmark_store = BenchmarkStore(vdb_config.BENCHMARK_STORE_FILE)
+    if "startup" in names:
+        bench_startup(benchmark_store=benchmark_store)
+    if "vector_type" in names:
+        # 初始化Milvus客户端
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        bench_vector_types(
+            client,
+            collection_prefix=f"{vdb_config.DATASET_NAME[0]}_VT",
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[0],
+            query_file_path=vdb_config.QUERY_WORKLOAD[0]["query_file_path"],
+            metric_type=vdb_config.DISTANCE_TYPE,
+            rerank_factor=vdb_config.RERANK_FACTOR,
+            benchmark_store=benchmark_store,
+        )
+    if "multi_vector" in names:
+        # 近似索引集合，使用本地引擎时不需要连接 Milvus
+        local_engine = LocalEngine(vdb_config.LOCAL_ENGINE_DIR) if vdb_config.LOCAL_ENGINE else None
+        client = None if vdb_config.LOCAL_ENGINE else MilvusClient(uri = vdb_config.VDB_URI)
+        bench_multi_vector_modes(
+            client,
+            collection_name=vdb_config.QUERY_WORKLOAD[1]["collection_name"],
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[0],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            local_engine=local_engine,
+            benchmark_store=benchmark_store,
+        )
+    if "adaptive" in names:
+        local_engine = LocalEngine(vdb_config.LOCAL_ENGINE_DIR) if vdb_config.LOCAL_ENGINE else None
+        client = None if vdb_config.LOCAL_ENGINE else MilvusClient(uri = vdb_config.VDB_URI)
+        bench_adaptive_search(
+            client,
+            collection_name=vdb_config.QUERY_WORKLOAD[1]["collection_name"],
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[0],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            proxy=vdb_config.ADAPTIVE_SEARCH.get("proxy", "auto"),
+            refine_batch_docs=vdb_config.ADAPTIVE_SEARCH.get("refine_batch_docs", 64),
+            local_engine=local_engine,
+            benchmark_store=benchmark_store,
+        )
+    if "query_reduction" in names:
+        settings = [(None, None), (0.99, None), (0.95, None), (0.9, None), (0.8, None)]
+        configured = (vdb_config.QUERY_REDUCTION.get("dedup_threshold"), vdb_config.QUERY_REDUCTION.get("min_norm"))
+        if configured not in settings:
+            settings.append(configured)
+        bench_query_reduction(
+            create_searcher(vdb_config),
+            collection_name=vdb_config.QUERY_WORKLOAD[1]["collection_name"],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            settings=settings,
+            benchmark_store=benchmark_store,
+        )
+    if "token_pooling" in names:
+        local_engine = LocalEngine(vdb_config.LOCAL_ENGINE_DIR) if vdb_config.LOCAL_ENGINE else None
+        client = None if vdb_config.LOCAL_ENGINE else MilvusClient(uri = vdb_config.VDB_URI)
+        pooling = vdb_config.TOKEN_POOLING
+        factors = sorted({1, 2, 4, pooling.get("factor", 1)})
+        bench_token_pooling(
+            client,
+            collection_prefix=f"{vdb_config.DATASET_NAME[0]}_TP",
+            fields_config=vdb_config.SCHEMA_FIELD_CONFIG[1],
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[0],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            index_params=vdb_config.INDEX_PARAMS[1],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            factors=factors,
+            output_dir=os.path.join(pooling.get("output_dir", "pooled"), "bench"),
+            normalize=pooling.get("normalize", True),
+            workers=pooling.get("workers", 0),
+            vector_type=vdb_config.VECTOR_TYPE,
+            group_candidate_factor=vdb_config.GROUP_CANDIDATE_FACTOR,
+            local_engine=local_engine,
+            benchmark_store=benchmark_store,
+        )
+    if "scalar_index" in names:
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        bench_scalar_index(
+            client,
+            collection_name=vdb_config.QUERY_WORKLOAD[1]["collection_name"],
+            fields_config=vdb_config.SCHEMA_FIELD_CONFIG[1],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            vector_type=vdb_config.VECTOR_TYPE,
+            benchmark_store=benchmark_store,
+        )
+    if "partition" in names:
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        partition_mode = vdb_config.PARTITION.get("mode", "none")
+        bench_partitions(
+            client,
+            collection_prefix=f"{vdb_config.DATASET_NAME[1]}_PT",
+            fields_config=vdb_config.SCHEMA_FIELD_CONFIG[1],
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[1],
+            query_file_path=vdb_config.QUERY_WORKLOAD[1]["query_file_path"],
+            index_params=vdb_config.INDEX_PARAMS[1],
+            search_params=vdb_config.SEARCH_PARAMS[1],
+            mode="hash" if partition_mode == "none" else partition_mode,
+            vector_type=vdb_config.VECTOR_TYPE,
+            benchmark_store=benchmark_store,
+        )
+    if "bulk_import" in names:
+        client = MilvusClient(uri = vdb_config.VDB_URI)
+        bulk_config = vdb_config.BULK_IMPORT
+        bench_bulk_import(
+            client,
+            collection_prefix=f"{vdb_config.DATASET_NAME[1]}_BI",
+            fields_config=vdb_config.SCHEMA_FIELD_CONFIG[1],
+            vector_file_path=vdb_config.DATASET_VECTOR_PATH[1],
+            object_store_config=bulk_config["object_store"],
+            vector_type=vdb_config.VECTOR_TYPE,
+            rows_per_file=bulk_config.get("rows_per_file", 1000000),
+            staging_dir=bulk_config.get("staging_dir", "bulk_staging"),
+            benchmark_store=benchmark_store,
+        )
+
+
+if __name__ == "__main__":
+    from VdbConfig import vdb_config
+    configure_cache(vdb_config)
+    run_benchmarks(vdb_config)
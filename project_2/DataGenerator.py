@@ -0,0 +1,265 @@
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+import numpy as np
+
+# 合成多向量数据集生成器：按 .fivecs（<3q 文件头，int64 向量ID + int64 文档ID + float64 向量）格式分块流式写出，
+# 内存占用与数据规模无关
+DOC_LENGTH_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+def zipf_weights(num_values: int, skew: float):
+    """第 k 个取值的概率与 1 / (k + 1)^skew 成正比，skew = 0 时为均匀分布"""
+    weights = 1.0 / np.arange(1, num_values + 1, dtype=np.float64) ** skew
+    return weights / weights.sum()
+
+
+class DocLengthDistribution:
+    def __init__(self, kind: str = "lognormal", mean: float = 32, sigma: float = 0.5, min_len: int = 1, max_len: int = 256):
+        """
+        初始化 DocLengthDistribution 类：每个文档的向量数（token 数）的分布
+
+        Args:
+            kind (str): "fixed"（均为 mean）、"uniform"（[min_len, 2 * mean - min_len] 上均匀）或 "lognormal"（长尾）
+            mean (float): 平均长度
+            sigma (float): lognormal 的形状参数，越大长尾越明显
+            min_len (int): 最小长度
+            max_len (int): 最大长度
+        """
+        if kind not in DOC_LENGTH_DISTRIBUTIONS:
+            raise ValueError(f"Unknown doc length distribution: {kind}")
+        self.kind = kind
+        self.mean = mean
+        self.sigma = sigma
+        self.min_len = min_len
+        self.max_len = max_len
+
+    def sample(self, rng, num_docs: int):
+        if self.kind == "fixed":
+            lengths = np.full(num_docs, round(self.mean))
+        elif self.kind == "uniform":
+            lengths = rng.integers(self.min_len, max(2 * round(self.mean) - self.min_len, self.min_len) + 1, num_docs)
+        else:
+            # 对数正态分布的均值为 exp(mu + sigma^2 / 2)
+            mu = np.log(self.mean) - self.sigma ** 2 / 2
+            lengths = np.rint(rng.lognormal(mu, self.sigma, num_docs))
+        return np.clip(lengths, self.min_len, self.max_len).astype(np.int64)
+
+    def config(self) -> dict:
+        return {"kind": self.kind, "mean": self.mean, "sigma": self.sigma, "min_len": self.min_len, "max_len": self.max_len}
+
+
+class TopicMixture:
+    def __init__(self, dim: int, num_topics: int = 100, doc_std: float = 0.5, token_std: float = 0.5,
+                 skew: float = 0.0, normalize: bool = False, seed: int = 0):
+        """
+        初始化 TopicMixture 类：分层高斯混合分布，每个文档（查询）属于一个主题，
+        文档中心 = 主题中心 + doc_std 噪声，token 向量 = 文档中心 + token_std 噪声
+
+        Args:
+            dim (int): 向量维度
+            num_topics (int): 主题（聚类）数
+            doc_std (float): 同一主题内文档中心的标准差
+            token_std (float): 同一文档内 token 向量的标准差
+            skew (float): 主题大小的 Zipf 偏斜，0 表示各主题大小相同
+            normalize (bool): 是否对 token 向量 L2 归一化（IP 距离下等价于余弦相似度，与 ColBERT 向量一致）
+            seed (int): 随机种子（决定主题中心）
+        """
+        rng = np.random.default_rng(seed)
+        self.dim = dim
+        self.centers = rng.standard_normal((num_topics, dim), dtype=np.float32)
+        self.weights = zipf_weights(num_topics, skew)
+        self.doc_std = doc_std
+        self.token_std = token_std
+        self.normalize = normalize
+
+    def sample(self, rng, lengths):
+        """
+        采样一批文档的 token 向量
+
+        Args:
+            lengths (numpy.ndarray): 每个文档的向量数
+
+        Returns:
+            numpy.ndarray: (lengths.sum(), dim) float32 向量，按文档连续存放
+        """
+        topics = rng.choice(len(self.centers), len(lengths), p=self.weights)
+        doc_centers = self.centers[topics] + self.doc_std * rng.standard_normal((len(lengths), self.dim), dtype=np.float32)
+        vectors = rng.standard_normal((int(lengths.sum()), self.dim), dtype=np.float32)
+        vectors *= self.token_std
+        vectors += np.repeat(doc_centers, lengths, axis=0)
+        if self.normalize:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+
+class FivecsWriter:
+    def __init__(self, file_name: str, dim: int):
+        """
+        初始化 FivecsWriter 类：分块追加写入 .fivecs 文件，关闭时回写文件头中的向量数与文档数
+
+        Args:
+            file_name (str): 输出文件路径
+            dim (int): 向量维度
+        """
+        self.fout = open(file_name, "wb")
+        self.dim = dim
+        self.num_vectors = 0
+        self.num_docs = 0
+        self.record_dtype = np.dtype([("vid", "<i8"), ("doc", "<i8"), ("vec", "<f8", (dim,))])
+        self.fout.write(struct.pack('<3q', 0, 0, dim))
+
+    def write(self, lengths, matrix, doc_ids=None) -> None:
+        """追加一批文档（doc_ids 为 None 时第一个文档的ID紧接上一批）"""
+        if doc_ids is None:
+            doc_ids = np.arange(self.num_docs, self.num_docs + len(lengths))
+        records = np.empty(len(matrix), dtype=self.record_dtype)
+        records["vid"] = np.arange(self.num_vectors, self.num_vectors + len(matrix))
+        records["doc"] = np.repeat(doc_ids, lengths)
+        records["vec"] = matrix
+        records.tofile(self.fout)
+        self.num_vectors += len(matrix)
+        self.num_docs += len(lengths)
+
+    def close(self) -> None:
+        self.fout.seek(0)
+        self.fout.write(struct.pack('<3q', self.num_vectors, self.num_docs, self.dim))
+        self.fout.close()
+
+
+def generate_dataset(
+    output_dir: str,
+    num_vectors: int,
+    dim: int,
+    num_queries: int = 100,
+    query_len: int = 32,
+    doc_length: DocLengthDistribution = None,
+    num_topics: int = 100,
+    doc_std: float = 0.5,
+    token_std: float = 0.5,
+    topic_skew: float = 0.0,
+    normalize: bool = False,
+    chunk_size: int = 65536,
+    seed: int = 0,
+    verbose: bool = True
+) -> dict:
+    """
+    生成合成多向量数据集：data.fivecs（文档）、query.fivecs（每个查询 query_len 个向量），
+    以及记录生成参数的 dataset.json
+
+    文档按块生成并立即写出（每块约 chunk_size 个向量，第 i 块使用种子 (seed, i)），
+    内存占用只与 chunk_size * dim 有关，可以生成上亿条向量；最后一个文档截断使向量数恰好为 num_vectors
+
+    Args:
+        output_dir (str): 输出目录（放在 DATASET_ROOT 下即可作为数据集名称使用）
+        num_vectors (int): 数据向量数
+        dim (int): 向量维度
+        num_queries (int): 查询数
+        query_len (int): 每个查询的向量数
+        doc_length (DocLengthDistribution): 文档长度分布，None 表示均值 32 的对数正态分布
+        num_topics (int): 主题数
+        doc_std (float): 同一主题内文档中心的标准差
+        token_std (float): 同一文档内 token 向量的标准差
+        topic_skew (float): 主题大小的 Zipf 偏斜
+        normalize (bool): 是否对向量 L2 归一化
+        chunk_size (int): 每块生成的向量数
+        seed (int): 随机种子
+        verbose (bool): 是否输出进度
+
+    Returns:
+        dict: 数据集描述（同 dataset.json）
+    """
+    doc_length = doc_length or DocLengthDistribution()
+    mixture = TopicMixture(dim, num_topics, doc_std, token_std, topic_skew, normalize, seed)
+    os.makedirs(output_dir, exist_ok=True)
+    docs_per_chunk = max(1, int(chunk_size / doc_length.mean))
+
+    start_time = time.time()
+    writer = FivecsWriter(os.path.join(output_dir, "data.fivecs"), dim)
+    chunk_id = 0
+    while writer.num_vectors < num_vectors:
+        rng = np.random.default_rng([seed, chunk_id])
+        lengths = doc_length.sample(rng, docs_per_chunk)
+        # 截断到剩余的向量数
+        ends = np.cumsum(lengths)
+        keep = int(np.searchsorted(ends, num_vectors - writer.num_vectors)) + 1
+        lengths = lengths[:keep]
+        lengths[-1] -= max(int(lengths.sum()) - (num_vectors - writer.num_vectors), 0)
+        writer.write(lengths, mixture.sample(rng, lengths))
+        chunk_id += 1
+        if verbose and chunk_id % 64 == 0:
+            elapsed = time.time() - start_time
+            print(f"Generated {writer.num_vectors}/{num_vectors} vectors in {writer.num_docs} docs "
+                  f"({writer.num_vectors * writer.record_dtype.itemsize / 2**20 / max(elapsed, 1e-6):.1f} MB/s)")
+    writer.close()
+
+    # 查询与文档来自同一个主题分布（使用数据块不会用到的种子）
+    rng = np.random.default_rng([seed, 2**32 - 1])
+    query_lengths = np.full(num_queries, query_len)
+    query_writer = FivecsWriter(os.path.join(output_dir, "query.fivecs"), dim)
+    query_writer.write(query_lengths, mixture.sample(rng, query_lengths))
+    query_writer.close()
+
+    manifest = {
+        "num_vectors": writer.num_vectors,
+        "num_docs": writer.num_docs,
+        "dim": dim,
+        "num_queries": num_queries,
+        "query_len": query_len,
+        "doc_length": doc_length.config(),
+        "num_topics": num_topics,
+        "doc_std": doc_std,
+        "token_std": token_std,
+        "topic_skew": topic_skew,
+        "normalize": normalize,
+        "seed": seed,
+    }
+    with open(os.path.join(output_dir, "dataset.json"), "w") as fout:
+        json.dump(manifest, fout, indent=2)
+    if verbose:
+        print(f"Dataset written to {output_dir}: {writer.num_vectors} x {dim} in {writer.num_docs} docs, "
+              f"{time.time() - start_time:.1f} s")
+    return manifest
+
+
+def add_arguments(parser):
+    """生成器的命令行参数（DataGenerator.py 与 VdbCli.py generate 共用）"""
+    parser.add_argument("--output", required=True, help="输出目录，例如 DATASET_ROOT/Synthetic_1M")
+    parser.add_argument("--num-vectors", type=int, default=1000000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--num-queries", type=int, default=100)
+    parser.add_argument("--query-len", type=int, default=32)
+    parser.add_argument("--doc-length", choices=DOC_LENGTH_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--doc-length-mean", type=float, default=32)
+    parser.add_argument("--doc-length-sigma", type=float, default=0.5)
+    parser.add_argument("--doc-length-min", type=int, default=1)
+    parser.add_argument("--doc-length-max", type=int, default=256)
+    parser.add_argument("--num-topics", type=int, default=100)
+    parser.add_argument("--doc-std", type=float, default=0.5)
+    parser.add_argument("--token-std", type=float, default=0.5)
+    parser.add_argument("--topic-skew", type=float, default=0.0)
+    parser.add_argument("--normalize", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def run(args) -> dict:
+    doc_length = DocLengthDistribution(args.doc_length, args.doc_length_mean, args.doc_length_sigma,
+                                       args.doc_length_min, args.doc_length_max)
+    return generate_dataset(args.output, args.num_vectors, args.dim, args.num_queries, args.query_len, doc_length,
+                            args.num_topics, args.doc_std, args.token_std, args.topic_skew, args.normalize,
+                            args.chunk_size, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成合成多向量数据集（data.fivecs、query.fivecs）")
+    add_arguments(parser)
+    run(parser.parse_args(argv))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,47 @@
-from pymilvus import MilvusClient, DataType
-from FileIO import read_fivecs
-from VdbConfig import vdb_config
-from pymilvus import (
-    Collection,
-    CollectionSchema,
-    FieldSchema,
-    DataType,
-    utility,
-    MilvusClient
-)
-from typing import Dict, List, Optional, Any
-from tqdm import tqdm
+from FileIO import read_fivecs, read_fivecs_matrix, read_fivecs_header, fivecs_records, iter_fivecs_blocks, convert_vectors
+from Profiler import profiler
+from Metrics import metrics, start_metrics
+from EmbeddingCache import embedding_cache, configure_cache
+from LazyImport import LazyImport, lazy_from
+from typing import Callable, Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from BenchmarkStore import BenchmarkStore
+from IngestCheckpoint import IngestCheckpoint
+from Partitioning import PartitionLayout, load_or_fit_layout
+from BulkImport import (BulkImportJobs, COMPLETED_STATE, FAILED_STATES, bulk_vector_spec, bulk_vector_column,
+                        create_object_store, write_bulk_files)
+import os
+import time
+import numpy as np
+
+# pymilvus 与 tqdm 在第一次使用时才导入
+Collection, CollectionSchema, FieldSchema, DataType, utility, MilvusClient = lazy_from(
+    "pymilvus", "Collection", "CollectionSchema", "FieldSchema", "DataType", "utility", "MilvusClient")
+LoadState, = lazy_from("pymilvus.client.types", "LoadState")
+tqdm = LazyImport("tqdm", "tqdm")
 
 class DataLoader:
-    def __init__(self, milvus_client: MilvusClient):
+    INGEST_MODES = ("recreate", "resume", "upsert", "bulk")
+
+    def __init__(self, milvus_client: MilvusClient, checkpoint_dir: str = "checkpoints"):
         """
         初始化 DataLoader 类
         
         Args:
             milvus_client (MilvusClient): Milvus 客户端实例
+            checkpoint_dir (str): 增量导入检查点的目录
         """
         self.client = milvus_client
+        self.checkpoint_dir = checkpoint_dir
 
-    def read_data(self, vector_file_path: str) -> List[Dict[str, Any]]:
+    @profiler.trace("read_data")
+    def read_data(self, vector_file_path: str, vector_type: str = "float32") -> List[Dict[str, Any]]:
         """
         读取向量数据文件（支持 .fivecs）
         
         Args:
             vector_file_path (str): 向量数据文件路径
+            vector_type (str): 向量存储类型（float32/float16/bfloat16/binary），读取时向量化转换
             
         Returns:
             list: 读取的数据，三元组字典组成的列表 (Vector_ID, Embedding, Doc_ID)
@@ -35,21 +49,33 @@ class DataLoader:
         if not vector_file_path.endswith('.fivecs'):
             raise ValueError("向量数据仅支持 .fivecs 文件")
 
+        if vector_type != "float32" or embedding_cache.enabled:
+            # 磁盘上是 <f8，整体读入（或从缓存内存映射）后一次性转换为目标类型
+            vids, docs, matrix = read_fivecs_matrix(vector_file_path)
+            vectors = convert_vectors(matrix, vector_type)
+            del matrix
+            with profiler.span("read_data.build_rows", rows=len(vids)):
+                return [
+                    {"id": vid, "vector": vec, "doc": doc}
+                    for vid, doc, vec in zip(vids.tolist(), docs.tolist(), vectors)
+                ]
+
         multivector_data_list = read_fivecs(vector_file_path)
-        vector_data_list, attr_data_list = [], []
-        for vector_id, doc_id, embedding in multivector_data_list:
-            vector_data_list.append([vector_id, embedding])
-            attr_data_list.append(doc_id)
-        del multivector_data_list
-            
-        data_list = []
-        for i in range(len(vector_data_list)):
-            element = {
-                "id": vector_data_list[i][0],
-                "vector": vector_data_list[i][1],
-                "doc": int(attr_data_list[i])
-            }
-            data_list.append(element)        
+        with profiler.span("read_data.build_rows", rows=len(multivector_data_list)):
+            vector_data_list, attr_data_list = [], []
+            for vector_id, doc_id, embedding in multivector_data_list:
+                vector_data_list.append([vector_id, embedding])
+                attr_data_list.append(doc_id)
+            del multivector_data_list
+                
+            data_list = []
+            for i in range(len(vector_data_list)):
+                element = {
+                    "id": vector_data_list[i][0],
+                    "vector": vector_data_list[i][1],
+                    "doc": int(attr_data_list[i])
+                }
+                data_list.append(element)        
 
         return data_list
 
@@ -58,6 +84,8 @@ class DataLoader:
         collection_name: str,
         fields_config: List[Dict],
         description: str = "",
+        mode: str = "recreate",
+        num_partitions: Optional[int] = None,
         **kwargs
     ) -> CollectionSchema:
         """
@@ -71,10 +99,16 @@ class DataLoader:
                     {"name": "embedding", "type": DataType.FLOAT_VECTOR, "dim": 128}
                 ]
             description (str): 集合描述
+            mode (str): "recreate" 总是删除并重建集合；"resume"/"upsert"/"bulk" 在已有集合的
+                        Schema 与配置一致时保留集合，以便增量导入
+            num_partitions (int): 字段配置中有 "is_partition_key": True 时，服务端按该字段哈希划分的分区数
             
         Returns:
             CollectionSchema: 创建的 Schema
         """
+        if mode not in self.INGEST_MODES:
+            raise ValueError(f"未知的导入模式: {mode}")
+
         fields = []
         for config in fields_config:
             if "dim" in config:
@@ -82,14 +116,25 @@ class DataLoader:
                     name=config["name"],
                     dtype=config["dtype"],
                     is_primary=config.get("is_primary", False),
+                    is_partition_key=config.get("is_partition_key", False),
                     dim=config["dim"],
                     description=config.get("description", ""),
                 )
+            elif "max_length" in config:
+                field = FieldSchema(
+                    name=config["name"],
+                    dtype=config["dtype"],
+                    is_primary=config.get("is_primary", False),
+                    is_partition_key=config.get("is_partition_key", False),
+                    max_length=config["max_length"],
+                    description=config.get("description", ""),
+                )
             else:
                 field = FieldSchema(
                     name=config["name"],
                     dtype=config["dtype"],
                     is_primary=config.get("is_primary", False),
+                    is_partition_key=config.get("is_partition_key", False),
                     description=config.get("description", ""),
                 )
             print(field.to_dict())
@@ -103,27 +148,92 @@ class DataLoader:
         
         # 创建集合
         if utility.has_collection(collection_name, using=self.client._using):
+            if mode != "recreate":
+                existing = Collection(collection_name, using=self.client._using)
+                if self._schema_matches(existing.schema, schema):
+                    print(f"集合 {collection_name} 已存在且 Schema 一致，保留已有数据")
+                    return existing.schema
+                print(f"集合 {collection_name} 的 Schema 与配置不一致")
             print(f"集合 {collection_name} 已存在，正在删除...")
             utility.drop_collection(collection_name, using=self.client._using)
             print("删除完成")
         else:
             print(f"集合 {collection_name} 不存在，正在创建...")
+        # 集合重建后旧的检查点与导入任务记录失效
+        for checkpoint_file in (IngestCheckpoint(self.checkpoint_dir, collection_name).file_name,
+                                BulkImportJobs(self.checkpoint_dir, collection_name).file_name):
+            if os.path.exists(checkpoint_file):
+                os.remove(checkpoint_file)
         
+        partition_kwargs = {"num_partitions": num_partitions} if num_partitions else {}
         collection = Collection(
             name=collection_name,
             schema=schema,
-            using=self.client._using
+            using=self.client._using,
+            **partition_kwargs
         )
         print(f"集合 {collection_name} 创建成功")
         
         return schema
 
+    @staticmethod
+    def _schema_matches(existing_schema: CollectionSchema, schema: CollectionSchema) -> bool:
+        """
+        比较两个 Schema 的字段名、类型、主键以及维度/长度参数是否一致
+        """
+        def signature(collection_schema):
+            return [
+                (field.name, field.dtype, field.is_primary, getattr(field, "is_partition_key", False),
+                 field.params.get("dim"), field.params.get("max_length"))
+                for field in collection_schema.fields
+            ]
+        return signature(existing_schema) == signature(schema)
+
+
+    def create_partitions(self, collection_name: str, partition_layout: PartitionLayout) -> None:
+        """
+        按划分方式（见 Partitioning.py）显式创建分区，已存在的分区保留
+
+        Args:
+            collection_name (str): 集合名称
+            partition_layout (PartitionLayout): hash / range 划分方式
+        """
+        collection = Collection(collection_name, using=self.client._using)
+        names = partition_layout.partition_names()
+        existing = sorted(partition.name for partition in collection.partitions if partition.name != "_default")
+        if existing and existing != sorted(names) and collection.num_entities > 0:
+            raise ValueError(f"集合 {collection_name} 已有的分区与划分方式不一致，请使用 INGEST_MODE = \"recreate\" 重新导入")
+        for name in names:
+            if not collection.has_partition(name):
+                collection.create_partition(name)
+        print(f"{collection_name} 分区: {partition_layout.mode} {partition_layout.field} x {len(names)}")
+
+    def _write_partitions(self, write, rows, partition_ids, partition_names) -> None:
+        """
+        按分区写入一段数据：数据已按分区排序，每个分区是连续的一段，按顺序写入保证服务端的数据仍是前 n 行
 
+        Args:
+            write: collection.insert 或 collection.upsert
+            rows (list): 待写入的数据
+            partition_ids (numpy.ndarray): 每行所属的分区编号，None 表示写入默认分区
+            partition_names (list): 分区编号对应的分区名称
+        """
+        if partition_ids is None:
+            write(rows)
+            return
+        bounds = (np.flatnonzero(np.diff(partition_ids)) + 1).tolist()
+        for sid, eid in zip([0] + bounds, bounds + [len(rows)]):
+            write(rows[sid:eid], partition_name=partition_names[partition_ids[sid]])
+
+    @profiler.trace("load_data")
     def load_data(
         self,
         collection_name: str,
         data_list: List[Dict[str, Any]],
-        batch_size: int = 1000
+        batch_size: int = 1000,
+        mode: str = "recreate",
+        source_files: Optional[List[str]] = None,
+        partition_layout: Optional[PartitionLayout] = None
     ) -> None:
         """
         将数据加载到 Milvus 集合中
@@ -132,20 +242,234 @@ class DataLoader:
             collection_name (str): 目标集合名称
             data_list (List[Dict[str, Any]]): 要插入的数据
             batch_size (int): 批量插入的大小
+            mode (str): "recreate" 插入全部数据；"resume" 从检查点的主键水位线继续，
+                        只插入缺失的批次；"upsert" 对内容发生变化的批次执行 upsert
+            source_files (List[str]): 数据源文件，用于判断检查点是否仍然有效
+            partition_layout (PartitionLayout): hash / range 划分方式，数据按分区排序后写入对应的分区（见 create_partitions）
         """
+        if mode not in self.INGEST_MODES or mode == "bulk":
+            raise ValueError(f"load_data 不支持导入模式: {mode}（bulk 模式使用 bulk_import）")
         collection = Collection(collection_name, using=self.client._using)
+        total_size = len(data_list)
+        max_id = max((row["id"] for row in data_list), default=None)
+
+        partition_ids, partition_names = None, None
+        if partition_layout is not None and partition_layout.explicit:
+            partition_ids = partition_layout.assign([row[partition_layout.field] for row in data_list])
+            order = np.argsort(partition_ids, kind="stable")
+            data_list = [data_list[i] for i in order.tolist()]
+            partition_ids = partition_ids[order]
+            partition_names = partition_layout.partition_names()
+
+        checkpoint = IngestCheckpoint(self.checkpoint_dir, collection_name)
+        source = IngestCheckpoint.describe_source(source_files or [], total_size)
+        previous_rows = checkpoint.source.get("total_rows", 0)
+        if mode == "recreate":
+            checkpoint.reset(source, batch_size)
+        elif mode == "resume":
+            if not checkpoint.matches(source, batch_size) or \
+                    self._count_rows(collection) != checkpoint.committed_row_count(total_size):
+                # 检查点缺失、数据源已变化，或服务端行数与检查点不一致（少于检查点：数据丢失；多于检查点：
+                # insert 成功后、检查点保存前进程退出）：以服务端已有的数据为准重新建立检查点，避免重复插入主键
+                checkpoint.reset(source, batch_size)
+                self._recover_checkpoint(collection, data_list, checkpoint)
+            if checkpoint.committed_rows == total_size:
+                print(f"{collection_name} 的数据已是最新（{total_size} 行），跳过导入")
+                return
+        elif mode == "upsert" and checkpoint.batch_size != batch_size:
+            # 批次划分不同，无法按批次比较哈希，所有批次都需要 upsert
+            checkpoint.reset(source, batch_size)
+
+        print(f"{collection_name} 主键水位线: {checkpoint.watermark}，已提交 {len(checkpoint.batches)} 个批次")
 
         # 分批插入
-        total_size = len(data_list)
         with tqdm(total=total_size, desc="插入数据进度") as pbar:
             for sid in range(0, total_size, batch_size):
                 eid = min(sid+batch_size, total_size)
                 batch_data = data_list[sid:eid]
-                collection.insert(batch_data)
+                if mode == "upsert":
+                    digest = IngestCheckpoint.batch_digest(batch_data)
+                    if checkpoint.batches.get(sid) != digest:
+                        with profiler.span("load_data.upsert", rows=eid - sid), metrics.time("insert_batch"):
+                            self._write_partitions(collection.upsert, batch_data,
+                                                   None if partition_ids is None else partition_ids[sid:eid], partition_names)
+                        profiler.count("load_data.rows", eid - sid)
+                        metrics.inc("rows_ingested_total", eid - sid, op="upsert")
+                    checkpoint.commit(sid, digest, data_list)
+                elif sid not in checkpoint.batches:
+                    # 恢复出的水位线可能落在批次中间，只插入水位线之后的部分
+                    insert_sid = max(sid, checkpoint.committed_rows)
+                    insert_data = data_list[insert_sid:eid]
+                    with profiler.span("load_data.insert", rows=len(insert_data)), metrics.time("insert_batch"):
+                        self._write_partitions(collection.insert, insert_data,
+                                               None if partition_ids is None else partition_ids[insert_sid:eid], partition_names)
+                    profiler.count("load_data.rows", len(insert_data))
+                    metrics.inc("rows_ingested_total", len(insert_data), op="insert")
+                    checkpoint.commit(sid, IngestCheckpoint.batch_digest(batch_data), data_list)
                 pbar.update(eid - sid)  # 更新已插入的数据条数
 
+        if mode == "upsert":
+            # 数据源变短时删除多余的旧数据
+            if previous_rows > total_size and total_size > 0:
+                collection.delete(expr=f"id > {max_id}")
+            for sid in [sid for sid in checkpoint.batches if sid >= total_size]:
+                del checkpoint.batches[sid]
+            checkpoint.source = source
+            checkpoint.save()
+
+        with profiler.span("load_data.flush"):
+            collection.flush()
+
+    def _recover_checkpoint(
+        self,
+        collection: Collection,
+        data_list: List[Dict[str, Any]],
+        checkpoint: IngestCheckpoint
+    ) -> None:
+        """
+        在没有可用检查点时，根据服务端已持久化的行数恢复主键水位线
+        
+        批次按顺序插入且每次 insert 是原子的，因此服务端的 n 行恰好是数据的前 n 行
+        
+        Args:
+            collection (Collection): 目标集合
+            data_list (List[Dict[str, Any]]): 要插入的数据
+            checkpoint (IngestCheckpoint): 已重置的检查点
+        """
+        committed_rows = min(self._count_rows(collection), len(data_list))
+        if committed_rows == 0:
+            return
+        checkpoint.committed_rows = committed_rows
+        checkpoint.watermark = data_list[committed_rows - 1]["id"]
+        for sid in range(0, committed_rows - checkpoint.batch_size + 1, checkpoint.batch_size):
+            eid = sid + checkpoint.batch_size
+            checkpoint.batches[sid] = IngestCheckpoint.batch_digest(data_list[sid:eid])
+        checkpoint.save()
+
+    @staticmethod
+    def _count_rows(collection: Collection) -> int:
+        """统计服务端已持久化的行数（先 flush，保证 num_entities 包含所有已确认的插入）"""
         collection.flush()
+        return collection.num_entities
+
+    @profiler.trace("bulk_import")
+    def bulk_import(
+        self,
+        collection_name: str,
+        vector_file_path: str,
+        vector_type: str = "float32",
+        object_store=None,
+        file_format: str = "numpy",
+        rows_per_file: int = 1000000,
+        staging_dir: str = "bulk_staging",
+        partition_layout: Optional[PartitionLayout] = None,
+        timeout: int = 3600
+    ) -> Dict[str, Any]:
+        """
+        通过 utility.do_bulk_insert 导入数据：流式地把 .fivecs 文件转换为 NumPy / Parquet 列文件，
+        上传到对象存储后提交导入任务，由服务端直接生成 segment，不经过逐批 insert 的 RPC 与 WAL
+        
+        导入任务记录在检查点目录的 {collection_name}.bulk.json 中，数据源不变时再次运行只重新提交未完成的文件批次
+        
+        Args:
+            collection_name (str): 目标集合名称（需已创建，见 create_schema）
+            vector_file_path (str): 向量数据文件路径
+            vector_type (str): 集合中向量的存储类型
+            object_store: 对象存储（见 BulkImport.create_object_store），None 表示以 staging_dir 作为本地存储
+            file_format (str): "numpy" 或 "parquet"
+            rows_per_file (int): 每个文件批次（一个导入任务）的行数
+            staging_dir (str): 本地生成导入文件的目录
+            partition_layout (PartitionLayout): hash / range 划分方式，每个文件批次按分区拆分后导入对应的分区
+            timeout (int): 等待导入任务完成的超时时间（秒）
+            
+        Returns:
+            dict: 各阶段耗时（秒）与导入的行数、任务数
+        """
+        start_time = time.time()
+        collection = Collection(collection_name, using=self.client._using)
+        nvecs, _, dim = read_fivecs_header(vector_file_path)
+        columns = {"id": (np.dtype(np.int64), ()), "vector": bulk_vector_spec(dim, vector_type),
+                   "doc": (np.dtype(np.int64), ())}
 
+        partition_ids, partition_names = None, None
+        if partition_layout is not None and partition_layout.explicit:
+            # 每个文件批次需要预先知道各分区的行数，先只读取文档ID一列
+            partition_ids = partition_layout.assign(np.array(fivecs_records(vector_file_path)["doc"]))
+            partition_names = partition_layout.partition_names()
+
+        jobs = BulkImportJobs(self.checkpoint_dir, collection_name)
+        source = dict(IngestCheckpoint.describe_source([vector_file_path], nvecs), format=file_format,
+                      rows_per_file=rows_per_file, vector_type=vector_type,
+                      partitions=partition_layout.config() if partition_layout is not None else None)
+        self._resume_bulk_jobs(collection, jobs, source)
+        if jobs.completed_rows() == nvecs:
+            print(f"{collection_name} 的数据已是最新（{nvecs} 行），跳过导入")
+            return {"rows": nvecs, "jobs": 0, "convert_time": 0.0, "upload_time": 0.0, "import_time": 0.0, "total_time": 0.0}
+        # 已完成与仍在进行中的文件批次都不再生成与提交，失败的文件批次重新提交
+        in_flight = jobs.completed() | set(jobs.pending())
+
+        def blocks():
+            for vids, docs, matrix in iter_fivecs_blocks(vector_file_path):
+                yield {"id": vids, "vector": bulk_vector_column(matrix, vector_type), "doc": docs}
+
+        output_dir = os.path.join(staging_dir, collection_name)
+        with profiler.span("bulk_import.convert", rows=nvecs):
+            batches = write_bulk_files(blocks(), nvecs, columns, output_dir, file_format, rows_per_file,
+                                       partition_ids, partition_names, skip=in_flight)
+        convert_time = time.time() - start_time
+
+        upload_start = time.time()
+        object_store = object_store if object_store is not None else create_object_store({"type": "local", "root": staging_dir})
+        with profiler.span("bulk_import.upload", files=len(batches)):
+            for batch in batches:
+                remote_files = object_store.upload(batch["files"], f"{collection_name}/{batch['name']}")
+                with metrics.time("bulk_insert_submit"):
+                    task_id = utility.do_bulk_insert(collection_name, files=remote_files, partition_name=batch["partition"],
+                                                     using=self.client._using)
+                jobs.submit(batch, task_id, remote_files)
+        upload_time = time.time() - upload_start
+        print(f"{collection_name} 已提交 {len(batches)} 个导入任务（{file_format}，{nvecs - jobs.completed_rows()} 行）")
+
+        import_start = time.time()
+        with profiler.span("bulk_import.wait", jobs=len(jobs.pending())):
+            finished = self._poll_with_backoff(lambda: self._check_bulk_jobs(collection_name, jobs), timeout)
+        if not finished:
+            raise TimeoutError(f"{collection_name} 的导入任务未在 {timeout} 秒内完成: {jobs.pending()}")
+        collection.flush()
+        import_time = time.time() - import_start
+        profiler.count("bulk_import.rows", sum(batch["rows"] for batch in batches))
+        metrics.inc("rows_ingested_total", sum(batch["rows"] for batch in batches), op="bulk_import")
+
+        return {"rows": nvecs, "jobs": len(batches), "convert_time": convert_time, "upload_time": upload_time,
+                "import_time": import_time, "total_time": time.time() - start_time}
+
+    def _resume_bulk_jobs(self, collection: Collection, jobs: BulkImportJobs, source: dict) -> None:
+        """
+        判断导入任务记录能否续传：数据源、格式或划分方式变化时记录失效；服务端的行数必须介于已完成的任务
+        与已完成加进行中的任务的行数之间，否则集合中的数据与记录不一致
+        """
+        server_rows = self._count_rows(collection)
+        completed_rows = jobs.completed_rows()
+        in_flight_rows = sum(jobs.jobs[name]["rows"] for name in jobs.pending())
+        if jobs.source == source and completed_rows <= server_rows <= completed_rows + in_flight_rows:
+            return
+        if server_rows > 0:
+            raise ValueError(f"集合 {collection.name} 已有 {server_rows} 行且与导入任务记录不一致，"
+                             f"请使用 INGEST_MODE = \"recreate\" 重新创建集合")
+        jobs.reset(source)
+
+    def _check_bulk_jobs(self, collection_name: str, jobs: BulkImportJobs) -> bool:
+        """查询未完成的导入任务的状态，全部完成时返回 True，有任务失败时抛出异常"""
+        for name in jobs.pending():
+            state = utility.get_bulk_insert_state(jobs.jobs[name]["task_id"], using=self.client._using)
+            if state.state_name != jobs.jobs[name]["state"]:
+                print(f"{collection_name} 导入任务 {name}: {state.state_name}，{state.row_count} 行")
+            jobs.update(name, state)
+            if state.state_name in FAILED_STATES:
+                raise RuntimeError(f"{collection_name} 导入任务 {name} 失败: {state.failed_reason}")
+        return all(job["state"] == COMPLETED_STATE for job in jobs.jobs.values())
+
+    @profiler.trace("create_index")
     def create_index(
         self,
         collection_name: str,
@@ -161,10 +485,12 @@ class DataLoader:
         collection = Collection(collection_name, using=self.client._using)
         
         index_field_name = index_params["field_name"]
-        collection.create_index(field_name=index_field_name, index_params=index_params)
+        with profiler.span("create_index.build", index_type=index_params.get("index_type")):
+            collection.create_index(field_name=index_field_name, index_params=index_params)
         print(f"{collection_name} 向量索引创建完成")
         
-        collection.flush()
+        with profiler.span("create_index.flush"):
+            collection.flush()
 
 
     def is_loaded(self, collection_name: str) -> bool:
@@ -180,8 +506,7 @@ class DataLoader:
         if not utility.has_collection(collection_name, using=self.client._using):
             return False
         
-        collection = Collection(collection_name, using=self.client._using)
-        return collection.get_load_state() == utility.LoadState.Loaded
+        return utility.load_state(collection_name, using=self.client._using) == LoadState.Loaded
 
 
     def ensure_loaded(self, collection_name: str, timeout: int = 300) -> bool:
@@ -200,38 +525,330 @@ class DataLoader:
         
         print(f"开始加载集合 {collection_name}...")
         collection = Collection(collection_name, using=self.client._using)
-        collection.load()
+        collection.load(_async=True)
         
         # 等待加载完成
-        import time
-        start = time.time()
-        while time.time() - start < timeout:
-            if self.is_loaded(collection_name):
-                print("集合加载完成")
-                return True
-            time.sleep(1)
+        if self._poll_with_backoff(lambda: self.is_loaded(collection_name), timeout):
+            print("集合加载完成")
+            return True
         
         print("加载超时")
         return False
 
-if __name__ == "__main__":
-    # 初始化Milvus客户端
-    milvus_client_uri = vdb_config.VDB_URI
-    client = MilvusClient(uri = milvus_client_uri)
-    data_loader = DataLoader(client)
+    @staticmethod
+    def _poll_with_backoff(
+        check: Callable[[], bool],
+        timeout: float,
+        initial_interval: float = 0.1,
+        max_interval: float = 5.0,
+        factor: float = 2.0
+    ) -> bool:
+        """
+        以指数退避的间隔轮询，直到 check() 返回 True 或超时
+        
+        Args:
+            check (Callable[[], bool]): 轮询条件
+            timeout (float): 超时时间（秒）
+            initial_interval (float): 首次轮询间隔（秒）
+            max_interval (float): 最大轮询间隔（秒）
+            factor (float): 间隔增长倍数
+            
+        Returns:
+            bool: 是否在超时前满足条件
+        """
+        deadline = time.time() + timeout
+        interval = initial_interval
+        while True:
+            if check():
+                return True
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+            interval = min(interval * factor, max_interval)
+
+    def index_progress(self, collection_name: str, index_name: str = "") -> Dict[str, int]:
+        """
+        查询索引构建进度
+        
+        Args:
+            collection_name (str): 集合名称
+            index_name (str): 索引名称
+            
+        Returns:
+            dict: {"total_rows": ..., "indexed_rows": ..., "pending_index_rows": ...}
+        """
+        return utility.index_building_progress(collection_name, index_name=index_name, using=self.client._using)
+
+    def wait_for_index(self, collection_name: str, index_name: str = "", timeout: int = 3600) -> bool:
+        """
+        以指数退避轮询 utility.index_building_progress，等待索引构建完成
+        
+        Args:
+            collection_name (str): 集合名称
+            index_name (str): 索引名称
+            timeout (int): 超时时间（秒）
+            
+        Returns:
+            bool: 是否构建完成
+        """
+        last_reported = -1
+
+        def check():
+            nonlocal last_reported
+            progress = self.index_progress(collection_name, index_name)
+            total_rows = progress.get("total_rows", 0)
+            indexed_rows = progress.get("indexed_rows", 0)
+            if indexed_rows != last_reported:
+                print(f"{collection_name} 索引构建进度: {indexed_rows}/{total_rows}")
+                last_reported = indexed_rows
+            return progress.get("pending_index_rows", 0) == 0 and indexed_rows >= total_rows
+
+        return self._poll_with_backoff(check, timeout)
+
+    def estimate_index_size(self, collection_name: str, index_params: Dict[str, Any]) -> int:
+        """
+        根据索引类型估算索引占用的内存（字节）
+        
+        Args:
+            collection_name (str): 集合名称
+            index_params (Dict[str, Any]): 索引配置的参数
+            
+        Returns:
+            int: 估算的索引大小（字节）
+        """
+        collection = Collection(collection_name, using=self.client._using)
+        num_entities = collection.num_entities
+        dim, bytes_per_vector = 0, 0
+        for field in collection.schema.fields:
+            if field.name == index_params["field_name"]:
+                dim = int(field.params.get("dim", 0))
+                if field.dtype == DataType.BINARY_VECTOR:
+                    bytes_per_vector = dim // 8
+                elif field.dtype in (DataType.FLOAT16_VECTOR, DataType.BFLOAT16_VECTOR):
+                    bytes_per_vector = dim * 2
+                else:
+                    bytes_per_vector = dim * 4
+        vector_bytes = num_entities * bytes_per_vector
+
+        index_type = index_params.get("index_type", "FLAT")
+        params = index_params.get("params", {})
+        if index_type == "HNSW":
+            # 底层每个节点 2M 个邻居，上层平均约占 1/M 的额外开销
+            M = params.get("M", 16)
+            return vector_bytes + num_entities * (2 * M + M // 2) * 4
+        if index_type in ("IVF_FLAT", "BIN_IVF_FLAT"):
+            nlist = params.get("nlist", 128)
+            return vector_bytes + nlist * bytes_per_vector + num_entities * 8
+        return vector_bytes
+
+    def build_and_load_all(
+        self,
+        collection_names: List[str],
+        index_params_list: List[Dict[str, Any]],
+        benchmark_store: Optional[BenchmarkStore] = None,
+        timeout: int = 3600,
+        max_workers: Optional[int] = None,
+        scalar_index_params_list: Optional[List[List[Dict[str, Any]]]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        并发地为所有集合创建索引并加载到内存，不阻塞在单个集合的索引构建上
+        
+        Args:
+            collection_names (List[str]): 集合名称列表
+            index_params_list (List[Dict[str, Any]]): 与集合一一对应的索引配置
+            benchmark_store (BenchmarkStore): 记录索引构建时间与索引大小，None 表示不记录
+            timeout (int): 每个集合的超时时间（秒）
+            max_workers (int): 并发线程数，默认等于集合数
+            scalar_index_params_list (List[List[Dict[str, Any]]]): 与集合一一对应的标量索引配置（见 scalar_index_params），
+                                                                 与向量索引同时提交、并发构建；None 表示不创建
+            
+        Returns:
+            dict: {collection_name: {"build_time": 秒, "load_time": 秒, "index_size": 字节, "scalar_indexes": [...], "success": bool}}
+        """
+        def build_and_load(collection_name, index_params, scalar_params):
+            collection = Collection(collection_name, using=self.client._using)
+            index_name = index_params.get("index_name", "")
+
+            start_time = time.time()
+            with profiler.span("create_index.build", collection=collection_name):
+                # 标量索引先提交，服务端与向量索引并发构建
+                index_futures = [
+                    collection.create_index(
+                        field_name=params["field_name"],
+                        index_params=params,
+                        index_name=params["index_name"],
+                        _async=True,
+                    )
+                    for params in scalar_params
+                ]
+                index_futures.append(collection.create_index(
+                    field_name=index_params["field_name"],
+                    index_params=index_params,
+                    index_name=index_name,
+                    _async=True,
+                ))
+                # 等待 create_index RPC 返回，服务端拒绝（例如参数错误）时直接抛出异常
+                for index_future in index_futures:
+                    index_future.result()
+                built = all(
+                    self.wait_for_index(collection_name, params.get("index_name", ""), timeout)
+                    for params in [index_params] + scalar_params
+                )
+            build_time = time.time() - start_time
+            print(f"{collection_name} 向量索引创建{'完成' if built else '超时'}，耗时 {build_time:.2f}s")
+            if scalar_params:
+                print(f"{collection_name} 标量索引: "
+                      + ", ".join(f"{params['field_name']}({params['index_type']})" for params in scalar_params))
+
+            start_time = time.time()
+            with profiler.span("create_index.load", collection=collection_name):
+                loaded = built and self.ensure_loaded(collection_name, timeout)
+            load_time = time.time() - start_time
+
+            return {
+                "build_time": build_time,
+                "load_time": load_time,
+                "index_size": self.estimate_index_size(collection_name, index_params),
+                "scalar_indexes": [f"{params['field_name']}:{params['index_type']}" for params in scalar_params],
+                "success": built and loaded,
+            }
+
+        scalar_index_params_list = scalar_index_params_list or [[] for _ in collection_names]
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers or len(collection_names)) as executor:
+            futures = {
+                collection_name: executor.submit(build_and_load, collection_name, index_params, scalar_params)
+                for collection_name, index_params, scalar_params
+                in zip(collection_names, index_params_list, scalar_index_params_list)
+            }
+            for collection_name, future in futures.items():
+                results[collection_name] = future.result()
+                if benchmark_store is not None:
+                    index_params = index_params_list[collection_names.index(collection_name)]
+                    benchmark_store.record(
+                        "index_build",
+                        collection_name,
+                        index_type=index_params.get("index_type"),
+                        params=index_params.get("params", {}),
+                        **results[collection_name],
+                    )
+        return results
+
+def scalar_index_params(fields_config: List[Dict]) -> List[Dict[str, Any]]:
+    """
+    由 SCHEMA_FIELD_CONFIG 中的字段配置生成标量索引配置：除主键与向量字段外的每个属性字段都会出现在过滤条件中，
+    整数字段使用 STL_SORT（等值与范围过滤都是二分查找），字符串字段使用 INVERTED，布尔字段使用 BITMAP；
+    字段配置中的 "index_type" 可以指定其他类型（例如取值很少的字段使用 BITMAP），设为 None 表示不建索引
     
+    Args:
+        fields_config (List[Dict]): 一个集合的字段配置
+        
+    Returns:
+        list: 与 INDEX_PARAMS 格式相同的索引配置
+    """
+    default_index_types = {
+        DataType.INT8: "STL_SORT",
+        DataType.INT16: "STL_SORT",
+        DataType.INT32: "STL_SORT",
+        DataType.INT64: "STL_SORT",
+        DataType.FLOAT: "STL_SORT",
+        DataType.DOUBLE: "STL_SORT",
+        DataType.VARCHAR: "INVERTED",
+        DataType.BOOL: "BITMAP",
+    }
+    index_params_list = []
+    for config in fields_config:
+        if config.get("is_primary") or "dim" in config:
+            continue
+        index_type = config.get("index_type", default_index_types.get(config["dtype"]))
+        if index_type is None:
+            continue
+        index_params_list.append({
+            "field_name": config["name"],
+            "index_type": index_type,
+            "index_name": f"{config['name']}_{index_type.lower()}_index",
+        })
+    return index_params_list
+
+
+def load_all(vdb_config, data_loader: DataLoader) -> None:
+    """
+    读取 VdbConfig 中的所有数据集，创建集合并导入数据
+    
+    Args:
+        vdb_config (VdbConfig): 配置
+        data_loader (DataLoader): DataLoader 实例
+    """
+    # 按文档ID划分分区（见 Partitioning.py），查询时使用同一个划分方式
+    partition_layout = load_or_fit_layout(vdb_config)
     dataset_num = len(vdb_config.DATASET_NAME)
     for i in range(dataset_num):
         dataset_name = vdb_config.DATASET_NAME[i]
         vector_file_path = vdb_config.DATASET_VECTOR_PATH[i]
-        data_list = data_loader.read_data(vector_file_path)
-        # print(data_list[0])
 
         schema_field_config = vdb_config.SCHEMA_FIELD_CONFIG[i]
-        data_loader.create_schema(dataset_name, schema_field_config)
+        if partition_layout is None:
+            data_loader.create_schema(dataset_name, schema_field_config, mode=vdb_config.INGEST_MODE)
+        else:
+            num_partitions = partition_layout.num_partitions if partition_layout.mode == "partition_key" else None
+            data_loader.create_schema(dataset_name, partition_layout.schema_fields(schema_field_config),
+                                      mode=vdb_config.INGEST_MODE, num_partitions=num_partitions)
+            if partition_layout.explicit:
+                data_loader.create_partitions(dataset_name, partition_layout)
+
+        if vdb_config.INGEST_MODE == "bulk":
+            # 转换为列文件后由服务端导入（见 BulkImport.py），不在客户端构造逐行的数据
+            bulk_config = vdb_config.BULK_IMPORT
+            results = data_loader.bulk_import(
+                dataset_name, vector_file_path, vdb_config.VECTOR_TYPE,
+                object_store=create_object_store(bulk_config["object_store"]),
+                file_format=bulk_config.get("format", "numpy"),
+                rows_per_file=bulk_config.get("rows_per_file", 1000000),
+                staging_dir=bulk_config.get("staging_dir", "bulk_staging"),
+                partition_layout=partition_layout)
+            print(f"{dataset_name} bulk import: {results}")
+            continue
+        data_list = data_loader.read_data(vector_file_path, vdb_config.VECTOR_TYPE)
+        # print(data_list[0])
+        data_loader.load_data(dataset_name, data_list, mode=vdb_config.INGEST_MODE,
+                              source_files=[vector_file_path], partition_layout=partition_layout)
+
+
+def index_all(vdb_config, data_loader: DataLoader) -> None:
+    """
+    并发地为 VdbConfig 中的所有集合构建索引并加载（SCALAR_INDEX 开启时同时构建属性字段的标量索引）
+    
+    Args:
+        vdb_config (VdbConfig): 配置
+        data_loader (DataLoader): DataLoader 实例
+    """
+    benchmark_store = BenchmarkStore(vdb_config.BENCHMARK_STORE_FILE)
+    scalar_index_params_list = None
+    if vdb_config.SCALAR_INDEX:
+        scalar_index_params_list = [scalar_index_params(fields_config) for fields_config in vdb_config.SCHEMA_FIELD_CONFIG]
+    data_loader.build_and_load_all(vdb_config.DATASET_NAME, vdb_config.INDEX_PARAMS, benchmark_store,
+                                   scalar_index_params_list=scalar_index_params_list)
+
+
+if __name__ == "__main__":
+    from VdbConfig import vdb_config
+    if vdb_config.ENABLE_PROFILER:
+        profiler.enable()
+    configure_cache(vdb_config)
+    start_metrics(vdb_config)
+    # 初始化Milvus客户端
+    milvus_client_uri = vdb_config.VDB_URI
+    client = MilvusClient(uri = milvus_client_uri)
+    data_loader = DataLoader(client, vdb_config.CHECKPOINT_DIR)
+    
+    load_all(vdb_config, data_loader)
 
-        data_loader.load_data(dataset_name, data_list)
+    # 所有集合的索引构建与加载并发进行
+    index_all(vdb_config, data_loader)
 
-        index_params = vdb_config.INDEX_PARAMS[i]
-        # print(index_params)
-        data_loader.create_index(dataset_name, index_params)
+    if profiler.enabled:
+        profiler.export_chrome_trace(f"DataLoader_{vdb_config.PROFILE_TRACE_FILE}")
+        profiler.print_summary()
+    if metrics.enabled:
+        metrics.print_summary()
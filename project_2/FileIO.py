@@ -1,9 +1,15 @@
 import numpy as np
 import struct
-from tqdm import tqdm
 import os, sys
 from io import BytesIO
+from Profiler import profiler
+from EmbeddingCache import embedding_cache
+from LazyImport import LazyImport
 
+# tqdm 在第一次使用时才导入
+tqdm = LazyImport("tqdm", "tqdm")
+
+@profiler.trace("write_fivecs")
 def write_fivecs(file_name, data_list, chunk_size=4096):
     # First pass: validate data and collect metadata
     total_docs = len(data_list)
@@ -43,6 +49,7 @@ def write_fivecs(file_name, data_list, chunk_size=4096):
             file.write(buffer.getvalue())
 
 
+@profiler.trace("read_fivecs")
 def read_fivecs(file_name, chunk_size=4096):  
     with open(file_name, 'rb') as file:
         # Read header
@@ -80,4 +87,148 @@ def read_fivecs(file_name, chunk_size=4096):
                 # Store data
                 data.append([vector_id, doc_id, embedding])
 
-    return data
\ No newline at end of file
+    profiler.count("read_fivecs.vectors", len(data))
+    return data
+
+
+VECTOR_TYPES = ("float32", "float16", "bfloat16", "binary")
+
+
+def float32_to_bfloat16_bits(matrix):
+    """ Convert float32 matrix to bfloat16 bit patterns (round to nearest even)
+    Args:
+        :param matrix (numpy.ndarray): float32 matrix
+    Returns:
+        Array of uint16 bfloat16 bit patterns (numpy.ndarray)
+    """
+    bits = np.ascontiguousarray(matrix, dtype=np.float32).view(np.uint32)
+    rounding_bias = ((bits >> 16) & 1) + np.uint32(0x7FFF)
+    return ((bits + rounding_bias) >> 16).astype(np.uint16)
+
+
+def bfloat16_bits_to_float32(bits):
+    """ Convert uint16 bfloat16 bit patterns back to float32 """
+    return (np.asarray(bits, dtype=np.uint16).astype(np.uint32) << 16).view(np.float32)
+
+
+def binarize(matrix):
+    """ Sign-binarize float matrix into packed bits (bit = 1 if value > 0)
+    Args:
+        :param matrix (numpy.ndarray): (n, dim) float matrix, dim must be a multiple of 8
+    Returns:
+        Array of packed uint8 codes with shape (n, dim / 8) (numpy.ndarray)
+    """
+    if matrix.shape[1] % 8 != 0:
+        raise ValueError("Binary vectors require dimension to be a multiple of 8")
+    return np.packbits(matrix > 0, axis=1)
+
+
+def convert_vectors(matrix, vector_type="float32"):
+    """ Convert a float matrix into the per-row representation pymilvus expects
+    Args:
+        :param matrix (numpy.ndarray): (n, dim) float matrix
+        :param vector_type (str): one of VECTOR_TYPES
+    Returns:
+        List of vectors: float32/float16 rows (numpy.ndarray), bfloat16 rows
+        (ml_dtypes.bfloat16 numpy.ndarray if available, else bytes) or binary rows (bytes)
+    """
+    matrix = np.asarray(matrix)
+    if vector_type == "float32":
+        return list(matrix.astype(np.float32, copy=False))
+    if vector_type == "float16":
+        return list(matrix.astype(np.float16))
+    if vector_type == "bfloat16":
+        bits = float32_to_bfloat16_bits(matrix)
+        try:
+            import ml_dtypes
+            return list(bits.view(ml_dtypes.bfloat16))
+        except ImportError:
+            return [row.tobytes() for row in bits]
+    if vector_type == "binary":
+        return [row.tobytes() for row in binarize(matrix)]
+    raise ValueError(f"Unknown vector type: {vector_type}")
+
+
+def read_fivecs_matrix(file_name):
+    """ Read *.fivecs file into numpy arrays in a single vectorized pass
+        (memory-mapped from the embedding cache when it is enabled)
+    Args:
+        :param file_name (str): path to *.fivecs file
+    Returns:
+        (vector ids (numpy.ndarray int64), doc ids (numpy.ndarray int64),
+         embeddings converted from <f8 to float32 (numpy.ndarray, shape (n, dim)))
+    """
+    if embedding_cache.enabled:
+        arrays = _cached_fivecs(file_name)
+        return arrays["vids"], arrays["docs"], arrays["vectors"]
+    return _parse_fivecs_matrix(file_name)
+
+
+def _doc_offsets(docs):
+    """ Start offsets of runs of consecutive equal doc ids, followed by the total count """
+    return np.concatenate([[0], np.flatnonzero(np.diff(docs)) + 1, [len(docs)]]).astype(np.int64)
+
+
+def _cached_fivecs(file_name):
+    def build():
+        vids, docs, vectors = _parse_fivecs_matrix(file_name)
+        return {"vids": vids, "docs": docs, "vectors": vectors, "doc_offsets": _doc_offsets(docs)}
+    return embedding_cache.load(file_name, "fivecs", build)
+
+
+def read_fivecs_groups(file_name):
+    """ Read *.fivecs file grouped by document (consecutive vectors with the same doc id)
+    Args:
+        :param file_name (str): path to *.fivecs file
+    Returns:
+        (doc id of each group (numpy.ndarray int64), group offsets (numpy.ndarray int64, len = groups + 1),
+         float32 embeddings (numpy.ndarray, shape (n, dim)); group i is matrix[offsets[i]:offsets[i + 1]])
+    """
+    if embedding_cache.enabled:
+        arrays = _cached_fivecs(file_name)
+        docs, offsets, matrix = arrays["docs"], arrays["doc_offsets"], arrays["vectors"]
+    else:
+        _, docs, matrix = _parse_fivecs_matrix(file_name)
+        offsets = _doc_offsets(docs)
+    return np.asarray(docs[offsets[:-1]]), offsets, matrix
+
+
+def read_fivecs_header(file_name):
+    """ Number of vectors, number of docs and dimension of a *.fivecs file """
+    with open(file_name, 'rb') as file:
+        total_vectors, total_docs, dim = struct.unpack('<3q', file.read(24))
+    return total_vectors, total_docs, dim
+
+
+def fivecs_records(file_name):
+    """ Memory-mapped structured view (vid, doc, vec) of the records of a *.fivecs file """
+    total_vectors, _, dim = read_fivecs_header(file_name)
+    record_dtype = np.dtype([("vid", "<i8"), ("doc", "<i8"), ("vec", "<f8", (dim,))])
+    return np.memmap(file_name, dtype=record_dtype, mode="r", offset=24, shape=(total_vectors,))
+
+
+def iter_fivecs_blocks(file_name, block_rows=65536):
+    """ Stream a *.fivecs file block by block without holding the whole file in memory
+    Args:
+        :param file_name (str): path to *.fivecs file
+        :param block_rows (int): vectors per block
+    Returns:
+        Iterator of (vector ids (numpy.ndarray int64), doc ids (numpy.ndarray int64),
+        embeddings converted from <f8 to float32 (numpy.ndarray, shape (k, dim)))
+    """
+    records = fivecs_records(file_name)
+    for sid in range(0, len(records), block_rows):
+        block = records[sid:sid + block_rows]
+        profiler.count("io.bytes", block.nbytes)
+        yield np.array(block["vid"]), np.array(block["doc"]), block["vec"].astype(np.float32)
+
+
+def _parse_fivecs_matrix(file_name):
+    with open(file_name, 'rb') as file:
+        total_vectors, total_docs, dim = struct.unpack('<3q', file.read(24))
+        record_dtype = np.dtype([("vid", "<i8"), ("doc", "<i8"), ("vec", "<f8", (dim,))])
+        records = np.fromfile(file, count=total_vectors, dtype=record_dtype)
+    if len(records) != total_vectors:
+        raise EOFError("Unexpected end of file")
+    print(f"#(vectors) = {total_vectors}, #(docs) = {total_docs}, #(dim) = {dim}")
+    return records["vid"], records["doc"], records["vec"].astype(np.float32)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+class IngestCheckpoint:
+    def __init__(self, checkpoint_dir: str, collection_name: str):
+        """
+        初始化 IngestCheckpoint 类，记录某个集合已提交的批次，用于断点续传
+
+        检查点文件内容：
+            {
+                "source": 数据源描述（文件路径、大小、修改时间、总行数）,
+                "batch_size": 批量大小,
+                "batches": {起始偏移: 批次内容哈希},
+                "committed_rows": 连续提交前缀的行数,
+                "watermark": 连续提交前缀中最大的主键
+            }
+
+        Args:
+            checkpoint_dir (str): 检查点目录
+            collection_name (str): 集合名称
+        """
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.file_name = os.path.join(checkpoint_dir, f"{collection_name}.ckpt.json")
+        self.source = {}
+        self.batch_size = 0
+        self.batches = {}
+        self.committed_rows = 0
+        self.watermark = -1
+        if os.path.exists(self.file_name):
+            with open(self.file_name, "r") as fin:
+                content = json.load(fin)
+            self.source = content.get("source", {})
+            self.batch_size = content.get("batch_size", 0)
+            self.batches = {int(sid): digest for sid, digest in content.get("batches", {}).items()}
+            self.committed_rows = content.get("committed_rows", 0)
+            self.watermark = content.get("watermark", -1)
+
+    @staticmethod
+    def describe_source(file_paths: list, total_rows: int) -> dict:
+        """生成数据源描述，文件大小或修改时间变化都会使检查点失效"""
+        files = []
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            files.append([os.path.abspath(file_path), stat.st_size, int(stat.st_mtime)])
+        return {"files": files, "total_rows": total_rows}
+
+    @staticmethod
+    def batch_digest(batch_data: list) -> str:
+        """计算一个批次（主键、向量、属性）的内容哈希，用于 upsert 模式检测变化的向量"""
+        h = hashlib.sha1()
+        for row in batch_data:
+            vector = row["vector"]
+            h.update(vector if isinstance(vector, bytes) else np.asarray(vector).tobytes())
+            h.update(repr(sorted((k, v) for k, v in row.items() if k != "vector")).encode("utf-8"))
+        return h.hexdigest()
+
+    def matches(self, source: dict, batch_size: int) -> bool:
+        """检查点是否对应同一个数据源与批量大小"""
+        return self.source == source and self.batch_size == batch_size
+
+    def committed_row_count(self, total_rows: int) -> int:
+        """已提交批次包含的总行数"""
+        return sum(min(sid + self.batch_size, total_rows) - sid for sid in self.batches if sid < total_rows)
+
+    def reset(self, source: dict, batch_size: int) -> None:
+        self.source = source
+        self.batch_size = batch_size
+        self.batches = {}
+        self.committed_rows = 0
+        self.watermark = -1
+        self.save()
+
+    def commit(self, sid: int, digest: str, data_list: list) -> None:
+        """
+        记录一个已提交的批次，并推进主键水位线
+
+        Args:
+            sid (int): 批次起始偏移
+            digest (str): 批次内容哈希
+            data_list (list): 完整的数据列表（用于推进水位线）
+        """
+        self.batches[sid] = digest
+        next_sid = self.committed_rows - self.committed_rows % self.batch_size
+        while next_sid in self.batches and self.committed_rows < len(data_list):
+            eid = min(next_sid + self.batch_size, len(data_list))
+            self.watermark = data_list[eid - 1]["id"]
+            self.committed_rows = next_sid = eid
+        self.save()
+
+    def save(self) -> None:
+        """原子地写入检查点文件，进程中途崩溃也不会留下损坏的文件"""
+        tmp_file_name = self.file_name + ".tmp"
+        with open(tmp_file_name, "w") as fout:
+            json.dump({
+                "source": self.source,
+                "batch_size": self.batch_size,
+                "batches": {str(sid): digest for sid, digest in self.batches.items()},
+                "committed_rows": self.committed_rows,
+                "watermark": self.watermark,
+            }, fout)
+        os.replace(tmp_file_name, self.file_name)
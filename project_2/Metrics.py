@@ -0,0 +1,449 @@
+import atexit
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 运行时指标：每种操作的 HDR 风格延迟直方图、计数器（导入行数、RPC 错误）与仪表（进行中的请求数），
+# 通过本地 Prometheus 文本格式的 HTTP 接口与定期写出的快照文件对外提供
+
+# 直方图以微秒为单位：小于 2^SUB_BUCKET_BITS 的值精确记录，更大的值每个 2 的幂区间再等分为 2^(SUB_BUCKET_BITS-1) 个桶，
+# 相对误差不超过 2^-(SUB_BUCKET_BITS-1)（约 1.6%）；超过 2^MAX_VALUE_BITS 微秒（约 19 小时）的值记入最后一个桶
+SUB_BUCKET_BITS = 7
+MAX_VALUE_BITS = 36
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+NUM_BUCKETS = SUB_BUCKET_COUNT + (MAX_VALUE_BITS - SUB_BUCKET_BITS) * SUB_BUCKET_HALF
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+# 指标名称与说明（Prometheus 的 HELP 行）
+METRIC_HELP = {
+    "latency_seconds": "Operation latency (HDR histogram, about 1.6% relative error)",
+    "rows_ingested_total": "Rows written by insert / upsert / bulk import",
+    "rpc_errors_total": "Operations that raised an exception",
+    "inflight_requests": "Operations currently in progress",
+    "uptime_seconds": "Seconds since metrics were enabled or reset",
+}
+
+
+def bucket_index(value_us: int) -> int:
+    """微秒值所在的直方图桶"""
+    if value_us < SUB_BUCKET_COUNT:
+        return max(value_us, 0)
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    index = SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + (value_us >> shift) - SUB_BUCKET_HALF
+    return min(index, NUM_BUCKETS - 1)
+
+
+def bucket_value(index: int) -> float:
+    """桶的代表值（桶内区间的中点，微秒）"""
+    if index < SUB_BUCKET_COUNT:
+        return float(index)
+    shift, offset = divmod(index - SUB_BUCKET_COUNT, SUB_BUCKET_HALF)
+    shift += 1
+    low = (SUB_BUCKET_HALF + offset) << shift
+    return low + ((1 << shift) - 1) / 2.0
+
+
+class LatencyHistogram:
+    """
+    对数-线性分桶的延迟直方图（HDR Histogram 的简化实现）：记录一次延迟只需整数运算和一次列表自增，
+    内存固定为 NUM_BUCKETS 个计数，分位数的相对误差有界；调用方负责加锁
+    """
+    __slots__ = ("counts", "count", "sum_us", "max_us")
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.sum_us = 0
+        self.max_us = 0
+
+    def record(self, value_us: int):
+        self.counts[bucket_index(value_us)] += 1
+        self.count += 1
+        self.sum_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def copy(self):
+        histogram = LatencyHistogram()
+        histogram.counts = list(self.counts)
+        histogram.count = self.count
+        histogram.sum_us = self.sum_us
+        histogram.max_us = self.max_us
+        return histogram
+
+    def quantiles(self, quantiles=QUANTILES) -> list:
+        """
+        计算分位数
+
+        Args:
+            quantiles: 升序排列的分位点，例如 (0.5, 0.99)
+
+        Returns:
+            list: 每个分位点的延迟（微秒），没有数据时为 0
+        """
+        if self.count == 0:
+            return [0.0] * len(quantiles)
+        values = []
+        cumulative = 0
+        position = 0
+        for quantile in quantiles:
+            rank = max(1, int(round(quantile * self.count)))
+            while cumulative < rank:
+                cumulative += self.counts[position]
+                position += 1
+            values.append(min(bucket_value(position - 1), float(self.max_us)))
+        return values
+
+    def summary(self) -> dict:
+        """延迟汇总（毫秒）：count、mean、各分位数与 max"""
+        result = {"count": self.count, "mean_ms": self.sum_us / self.count / 1000.0 if self.count else 0.0}
+        for quantile, value in zip(QUANTILES, self.quantiles()):
+            result[f"p{quantile * 100:g}_ms"] = value / 1000.0
+        result["max_ms"] = self.max_us / 1000.0
+        return result
+
+
+class _NullTimer:
+    """关闭指标时返回的空计时器"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """进入时增加进行中的请求数，退出时记录延迟；以异常退出时累加该操作的 RPC 错误数"""
+    __slots__ = ("metrics", "op", "gauge_key", "start_ns")
+
+    def __init__(self, metrics, op):
+        self.metrics = metrics
+        self.op = op
+        self.gauge_key = ("inflight_requests", op)
+        self.start_ns = 0
+
+    def __enter__(self):
+        metrics = self.metrics
+        with metrics._lock:
+            metrics.gauges[self.gauge_key] = metrics.gauges.get(self.gauge_key, 0) + 1
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        latency_us = (time.perf_counter_ns() - self.start_ns) // 1000
+        metrics = self.metrics
+        with metrics._lock:
+            metrics.gauges[self.gauge_key] -= 1
+            histogram = metrics.histograms.get(self.op)
+            if histogram is None:
+                histogram = metrics.histograms[self.op] = LatencyHistogram()
+            histogram.record(latency_us)
+            if exc_type is not None:
+                error_key = ("rpc_errors_total", self.op)
+                metrics.counters[error_key] = metrics.counters.get(error_key, 0) + 1
+        return False
+
+
+class Metrics:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.init_metrics()
+        return cls._instance
+
+    def init_metrics(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._start_time = time.time()
+        self.histograms = {}
+        # (指标名称, 操作) -> 值，操作为 None 表示不带标签
+        self.counters = {}
+        self.gauges = {}
+        self._server = None
+        self._snapshot_thread = None
+        self._snapshot_stop = threading.Event()
+        self._snapshot_file = None
+        self._last_snapshot = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """清空直方图与计数器；进行中的请求数是实时值，保留"""
+        with self._lock:
+            self._start_time = time.time()
+            self.histograms = {}
+            self.counters = {}
+            self._last_snapshot = None
+
+    def time(self, op):
+        """
+        为一次操作计时，用法：with metrics.time("search"): ...
+
+        Args:
+            op (str): 操作名称（insert_batch、search、hybrid_search、maxsim_rerank 等）
+
+        Returns:
+            上下文管理器；关闭指标时返回共享的空计时器，几乎没有开销
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, op)
+
+    def timed(self, op):
+        """
+        函数装饰器，每次调用时用 metrics.time(op) 计时
+
+        Args:
+            op (str): 操作名称
+        """
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, op):
+                    return func(*args, **kwargs)
+
+            wrapper.__name__ = func.__name__
+            wrapper.__qualname__ = func.__qualname__
+            wrapper.__doc__ = func.__doc__
+            wrapper.__wrapped__ = func
+            return wrapper
+        return decorator
+
+    def observe(self, op, latency_ms: float):
+        """记录一次已测得的延迟（毫秒）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(op)
+            if histogram is None:
+                histogram = self.histograms[op] = LatencyHistogram()
+            histogram.record(int(latency_ms * 1000.0))
+
+    def inc(self, name, value=1, op=None):
+        """
+        累加计数器
+
+        Args:
+            name (str): 指标名称，例如 "rows_ingested_total"
+            value (int): 增量
+            op (str): 操作标签，None 表示不带标签
+        """
+        if not self.enabled:
+            return
+        key = (name, op)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self, track_throughput: bool = False) -> dict:
+        """
+        当前指标的快照
+
+        Args:
+            track_throughput (bool): 是否给出距上一次（同样 track_throughput=True 的）快照的吞吐量，定期写出的快照使用
+
+        Returns:
+            dict: {"timestamp", "uptime_s", "counters", "gauges", "latency"}，
+                  latency 为每种操作的延迟汇总（毫秒），track_throughput 时还有吞吐量 throughput_per_s（次/秒）
+        """
+        with self._lock:
+            histograms = {op: histogram.copy() for op, histogram in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        now = time.time()
+        last = self._last_snapshot if track_throughput else None
+        latency = {}
+        for op, histogram in sorted(histograms.items()):
+            latency[op] = histogram.summary()
+            if last is not None and now > last[0]:
+                latency[op]["throughput_per_s"] = (histogram.count - last[1].get(op, 0)) / (now - last[0])
+        if track_throughput:
+            self._last_snapshot = (now, {op: histogram.count for op, histogram in histograms.items()})
+
+        def label(name, op):
+            return name if op is None else f"{name}{{op={op}}}"
+        return {
+            "timestamp": now,
+            "uptime_s": now - self._start_time,
+            "counters": {label(name, op): value for (name, op), value in sorted(counters.items(), key=str)},
+            "gauges": {label(name, op): value for (name, op), value in sorted(gauges.items(), key=str)},
+            "latency": latency,
+        }
+
+    def prometheus_text(self, prefix: str = "vdb") -> str:
+        """
+        Prometheus 文本格式（0.0.4）的指标：延迟直方图以 summary 形式给出分位数、总和与次数
+
+        Args:
+            prefix (str): 指标名称前缀
+
+        Returns:
+            str: 指标文本
+        """
+        with self._lock:
+            histograms = {op: histogram.copy() for op, histogram in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+
+        lines = []
+
+        def header(name, metric_type):
+            lines.append(f"# HELP {prefix}_{name} {METRIC_HELP.get(name, name)}")
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+
+        def labels(op, **extra):
+            pairs = ([f'op="{op}"'] if op is not None else []) + [f'{key}="{value}"' for key, value in extra.items()]
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        if histograms:
+            header("latency_seconds", "summary")
+            for op, histogram in sorted(histograms.items()):
+                for quantile, value in zip(QUANTILES, histogram.quantiles()):
+                    lines.append(f"{prefix}_latency_seconds{labels(op, quantile=quantile)} {value / 1e6:.6g}")
+                lines.append(f"{prefix}_latency_seconds_sum{labels(op)} {histogram.sum_us / 1e6:.6f}")
+                lines.append(f"{prefix}_latency_seconds_count{labels(op)} {histogram.count}")
+        for values, metric_type in ((counters, "counter"), (gauges, "gauge")):
+            for name in sorted({name for name, _ in values}):
+                header(name, metric_type)
+                for (metric_name, op), value in sorted(values.items(), key=str):
+                    if metric_name == name:
+                        lines.append(f"{prefix}_{name}{labels(op)} {value}")
+        header("uptime_seconds", "gauge")
+        lines.append(f"{prefix}_uptime_seconds {time.time() - self._start_time:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, file_name: str):
+        """把快照写入 JSON 文件（先写临时文件再替换，读取方不会看到写了一半的文件）"""
+        snapshot = self.snapshot(track_throughput=True)
+        directory = os.path.dirname(os.path.abspath(file_name))
+        os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{file_name}.tmp"
+        with open(tmp_file, "w") as fout:
+            json.dump(snapshot, fout, indent=2)
+        os.replace(tmp_file, file_name)
+
+    def start_http_server(self, port: int, host: str = "127.0.0.1", prefix: str = "vdb"):
+        """
+        在后台线程中启动 HTTP 接口，GET /metrics 返回 Prometheus 文本格式的指标，GET /snapshot 返回 JSON 快照
+
+        Args:
+            port (int): 端口，0 表示由系统分配（实际端口见返回值）
+            host (str): 监听地址，默认只允许本机访问
+            prefix (str): 指标名称前缀
+
+        Returns:
+            int: 实际监听的端口
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/metrics":
+                    body, content_type = metrics.prometheus_text(prefix), "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/snapshot":
+                    body, content_type = json.dumps(metrics.snapshot()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        port = self._server.server_address[1]
+        print(f"Metrics endpoint: http://{host}:{port}/metrics")
+        return port
+
+    def start_snapshot_writer(self, file_name: str, interval_s: float = 10.0):
+        """
+        在后台线程中每 interval_s 秒写出一次快照，stop() 时再写出最后一次
+
+        Args:
+            file_name (str): 快照文件路径
+            interval_s (float): 写出间隔（秒）
+        """
+        self._snapshot_file = file_name
+        self._snapshot_stop.clear()
+
+        def loop():
+            while not self._snapshot_stop.wait(interval_s):
+                self.write_snapshot(file_name)
+
+        self._snapshot_thread = threading.Thread(target=loop, name="metrics-snapshot", daemon=True)
+        self._snapshot_thread.start()
+
+    def stop(self):
+        """关闭 HTTP 接口与快照线程，并写出最后一次快照"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._snapshot_thread is not None:
+            self._snapshot_stop.set()
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+            self.write_snapshot(self._snapshot_file)
+
+    def print_summary(self):
+        """打印每种操作的延迟分位数、吞吐量以及计数器"""
+        snapshot = self.snapshot()
+        uptime_s = max(snapshot["uptime_s"], 1e-9)
+        print("=" * 80)
+        print(f"{'operation':<20}{'count':>8}{'ops/s':>9}{'mean(ms)':>10}{'p50(ms)':>9}{'p99(ms)':>9}{'p99.9(ms)':>11}{'max(ms)':>9}")
+        print("-" * 80)
+        for op, item in snapshot["latency"].items():
+            print(f"{op:<20}{item['count']:>8}{item['count'] / uptime_s:>9.1f}{item['mean_ms']:>10.3f}"
+                  f"{item['p50_ms']:>9.3f}{item['p99_ms']:>9.3f}{item['p99.9_ms']:>11.3f}{item['max_ms']:>9.3f}")
+        if snapshot["counters"]:
+            print("-" * 80)
+            for name, value in snapshot["counters"].items():
+                print(f"{name:<40}{value:>12}")
+        print("=" * 80)
+
+
+# 单例模式保证全局唯一，DataLoader 与 MultiVectorSearcher 共用
+metrics = Metrics()
+
+
+def start_metrics(vdb_config) -> bool:
+    """
+    根据 VdbConfig.METRICS 开启指标：port 不为 None 时启动 HTTP 接口，snapshot_file 不为 None 时定期写出快照，
+    进程退出时关闭并写出最后一次快照
+
+    Returns:
+        bool: 是否开启了指标
+    """
+    metrics_config = vdb_config.METRICS
+    if not metrics_config.get("enabled", False) or metrics.enabled:
+        return metrics.enabled
+    metrics.enable()
+    if metrics_config.get("port") is not None:
+        metrics.start_http_server(metrics_config["port"], metrics_config.get("host", "127.0.0.1"),
+                                  metrics_config.get("prefix", "vdb"))
+    if metrics_config.get("snapshot_file"):
+        metrics.start_snapshot_writer(metrics_config["snapshot_file"], metrics_config.get("snapshot_interval_s", 10.0))
+    atexit.register(metrics.stop)
+    return True
@@ -1,20 +1,220 @@
 import numpy as np
-from pymilvus import MilvusClient
-from FileIO import read_fivecs
+from FileIO import read_fivecs_groups, read_fivecs_matrix, convert_vectors
+from EmbeddingCache import configure_cache
+from SearchResult import extract_hits, stack_hits
 import time, sys
-from pymilvus import connections, Collection, utility
-from VdbConfig import vdb_config
-from tqdm import tqdm
+from Profiler import profiler
+from Metrics import metrics, start_metrics
+from LazyImport import LazyImport, lazy_from
+from LocalEngine import LocalEngine
+from Partitioning import load_or_fit_layout
+from QueryReduction import reduce_query_tokens
+
+# pymilvus 与 tqdm 在第一次使用时才导入
+Collection, MilvusClient = lazy_from("pymilvus", "Collection", "MilvusClient")
+tqdm = LazyImport("tqdm", "tqdm")
+
+# scan：每个文档一次 doc == {id} 的过滤查询；group：每个查询一次 group_by_field="doc" 的分组查询；
+# adaptive：按代价低的代理分数依次精确计算候选文档，延迟预算用完或 top-k 稳定时提前停止（见 _adaptive_search）
+SEARCH_MODES = ("scan", "group", "adaptive")
+# adaptive 模式的代理分数：centroid 为查询向量与文档向量均值的相似度（需要本地文档向量），ann 为分组查询的近似 MaxSim
+ADAPTIVE_PROXIES = ("auto", "centroid", "ann")
+
+
+def _token_sum(token_scores, weights=None):
+    """(查询向量数, 文档数) 的逐 token 分数按查询向量的权重求和"""
+    if weights is None:
+        return token_scores.sum(axis=0)
+    return np.asarray(weights, dtype=np.float32) @ token_scores
+
 
 class MultiVectorSearcher:
-    def __init__(self, milvus_client: MilvusClient):
+    def __init__(self, milvus_client: MilvusClient, vector_type: str = "float32", rerank_factor: int = 4):
         """
         初始化 MultiVectorSearcher 类
         
         Args:
             milvus_client (MilvusClient): Milvus 客户端实例
+            vector_type (str): 集合中向量的存储类型（float32/float16/bfloat16/binary），查询向量按相同方式转换
+            rerank_factor (int): binary 模式下先按汉明距离取 top_k * rerank_factor 个文档，再用浮点 MaxSim 重排
         """
         self.client = milvus_client
+        self.vector_type = vector_type
+        self.rerank_factor = rerank_factor
+        self.rerank_docs = None
+        # 本地文档向量（按文档ID排序后连续存放），设置后 doc == {id} 的逐文档查询改为本地计算
+        self.local_docs = None
+        self.local_starts = None
+        self.local_matrix = None
+        self.local_centroids = None
+        # 最近一次 multi_vector_search 每个查询的延迟（毫秒）
+        self.latency_list = []
+        # 进程内的本地引擎（见 LocalEngine.py），设置后不再访问 Milvus
+        self.local_engine = None
+        # 集合按文档ID划分的分区（见 Partitioning.py），doc == {id} 的过滤查询只检索一个分区
+        self.partition_layout = None
+        # 多向量查询方式（见 set_search_mode）
+        self.search_mode = "scan"
+        self.group_candidate_factor = 4
+        # adaptive 模式的停止条件（见 set_adaptive_params）
+        self.latency_budget_ms = None
+        self.target_recall = None
+        self.adaptive_proxy = "auto"
+        self.refine_batch_docs = 64
+        self.stable_rounds = 2
+        # 最近一次 adaptive 模式的 multi_vector_search 每个查询的停止信息（exact、confidence、精确计算的文档数等）
+        self.search_info = []
+        # 查询 token 精简（见 set_query_reduction），以及最近一次 multi_vector_search 精简前后的 token 总数
+        self.dedup_threshold = None
+        self.min_token_norm = None
+        self.token_counts = (0, 0)
+
+    def set_rerank_vectors(self, doc_ids, matrix):
+        """
+        设置用于重排的浮点向量（binary 模式下使用）
+        
+        Args:
+            doc_ids (numpy.ndarray): 每个向量所属的文档ID
+            matrix (numpy.ndarray): (n, dim) 浮点向量
+        """
+        order = np.argsort(doc_ids, kind="stable")
+        sorted_docs = doc_ids[order]
+        boundaries = np.flatnonzero(np.diff(sorted_docs)) + 1
+        self.rerank_docs = {
+            int(group_docs[0]): np.asarray(matrix[group_order], dtype=np.float32)
+            for group_docs, group_order in zip(np.split(sorted_docs, boundaries), np.split(order, boundaries))
+        }
+
+    def set_local_engine(self, local_engine):
+        """
+        使用进程内的本地引擎代替 Milvus（集合由 LocalEngine.build_local_collections 构建）
+
+        Args:
+            local_engine (LocalEngine): 本地引擎
+        """
+        self.local_engine = local_engine
+
+    def set_partition_layout(self, partition_layout):
+        """
+        设置集合的分区划分方式，带过滤条件的查询通过 partition_names 只检索可能包含结果的分区
+
+        Args:
+            partition_layout (PartitionLayout): Partitioning.load_or_fit_layout 返回的划分方式
+        """
+        self.partition_layout = partition_layout
+
+    def set_search_mode(self, search_mode: str, group_candidate_factor: int = 4):
+        """
+        设置多向量查询方式
+
+        Args:
+            search_mode (str): "scan"（逐文档过滤查询）、"group"（分组查询，见 _group_search）或 "adaptive"（见 _adaptive_search）
+            group_candidate_factor (int): group 模式下每个查询向量返回 top_k * group_candidate_factor 个文档
+        """
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown multi-vector search mode: {search_mode}")
+        self.search_mode = search_mode
+        self.group_candidate_factor = group_candidate_factor
+
+    def set_adaptive_params(self, latency_budget_ms: float = None, target_recall: float = None, proxy: str = "auto",
+                            refine_batch_docs: int = 64, stable_rounds: int = 2):
+        """
+        设置 adaptive 模式的停止条件，两者都为 None 时精确计算全部候选文档
+
+        Args:
+            latency_budget_ms (float): 每个查询的延迟预算（毫秒），预计下一批会超出预算时停止
+            target_recall (float): 连续 stable_rounds 批精确计算后 top-k 与上一批的重合率都不低于该值时停止
+            proxy (str): 候选文档的排序依据，"centroid"、"ann" 或 "auto"（有本地文档向量时使用 centroid）
+            refine_batch_docs (int): 每批精确计算的文档数
+            stable_rounds (int): top-k 需要连续稳定的批数
+        """
+        if proxy not in ADAPTIVE_PROXIES:
+            raise ValueError(f"Unknown adaptive proxy: {proxy}")
+        self.latency_budget_ms = latency_budget_ms
+        self.target_recall = target_recall
+        self.adaptive_proxy = proxy
+        self.refine_batch_docs = refine_batch_docs
+        self.stable_rounds = stable_rounds
+
+    def set_query_reduction(self, dedup_threshold: float = None, min_norm: float = None):
+        """
+        设置查询端的 token 精简（见 QueryReduction.reduce_query_tokens），两者都为 None 时不精简
+
+        Args:
+            dedup_threshold (float): 余弦相似度不低于该值的查询 token 合并为一个带权重的 token
+            min_norm (float): 删除范数低于该值的查询 token
+        """
+        self.dedup_threshold = dedup_threshold
+        self.min_token_norm = min_norm
+
+    def _collection(self, collection_name):
+        """打开集合：本地引擎中的 LocalCollection 或 Milvus 的 Collection，二者的 load/search/query 接口相同"""
+        if self.local_engine is not None:
+            return self.local_engine.collection(collection_name)
+        return Collection(collection_name, using=self.client._using)
+
+    def enable_local_scan(self, doc_ids, matrix):
+        """
+        设置本地文档向量：_scan_all_doc 中 doc == {id} 的过滤条件只命中一个文档，选择率极低，
+        因此不再为每个文档发起一次 RPC，而是在本地一次性计算所有文档的分数
+        
+        Args:
+            doc_ids (numpy.ndarray): 每个向量所属的文档ID
+            matrix (numpy.ndarray): (n, dim) 浮点向量
+        """
+        order = np.argsort(doc_ids, kind="stable")
+        sorted_docs = doc_ids[order]
+        self.local_starts = np.concatenate([[0], np.flatnonzero(np.diff(sorted_docs)) + 1])
+        self.local_docs = sorted_docs[self.local_starts]
+        self.local_matrix = np.asarray(matrix[order], dtype=np.float32)
+        # 每个文档的向量均值，作为 adaptive 模式的代理分数
+        counts = np.diff(np.append(self.local_starts, len(sorted_docs)))
+        self.local_centroids = np.add.reduceat(self.local_matrix, self.local_starts, axis=0) / counts[:, None]
+
+    def _local_doc_scores(self, doc_list, query_vectors, metric_type, weights=None):
+        """
+        与逐文档 _hybrid_search(top_k=1) 相同的分数：每个查询向量在文档内最相似向量的距离/相似度之和
+        （weights 为查询向量的权重，见 QueryReduction.py）
+        
+        Returns:
+            numpy.ndarray: doc_list 中每个文档的分数
+        """
+        query = np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.local_matrix.shape[1])
+        if metric_type == "L2":
+            scores = (np.sum(self.local_matrix ** 2, axis=1)[None, :] - 2.0 * (query @ self.local_matrix.T)
+                      + np.sum(query ** 2, axis=1)[:, None])
+            doc_scores = _token_sum(np.minimum.reduceat(scores, self.local_starts, axis=1), weights)
+        else:
+            scores = query @ self.local_matrix.T
+            doc_scores = _token_sum(np.maximum.reduceat(scores, self.local_starts, axis=1), weights)
+        positions = np.searchsorted(self.local_docs, doc_list)
+        return doc_scores[positions]
+
+    def _local_subset_scores(self, positions, query_vectors, metric_type, weights=None):
+        """
+        与 _local_doc_scores 相同的分数，只计算 local_docs[positions] 这些文档（adaptive 模式逐批精确计算）
+
+        Returns:
+            numpy.ndarray: 每个文档的分数
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        doc_starts = self.local_starts[positions]
+        lengths = np.append(self.local_starts, len(self.local_matrix))[positions + 1] - doc_starts
+        # 选中文档的向量拼接后，第 i 个文档从 starts[i] 开始
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        rows = np.arange(lengths.sum()) + np.repeat(doc_starts - starts, lengths)
+        matrix = self.local_matrix[rows]
+        query = np.asarray(query_vectors, dtype=np.float32).reshape(-1, matrix.shape[1])
+        if metric_type == "L2":
+            scores = np.sum(matrix ** 2, axis=1)[None, :] - 2.0 * (query @ matrix.T) + np.sum(query ** 2, axis=1)[:, None]
+            return _token_sum(np.minimum.reduceat(scores, starts, axis=1), weights)
+        return _token_sum(np.maximum.reduceat(query @ matrix.T, starts, axis=1), weights)
+
+    def _prepare_queries(self, query_vector_list):
+        """把浮点查询向量转换为集合中向量的存储类型"""
+        if self.vector_type == "float32":
+            return query_vector_list
+        return convert_vectors(np.asarray(query_vector_list, dtype=np.float32), self.vector_type)
     
 
     @staticmethod
@@ -26,7 +226,9 @@ class MultiVectorSearcher:
                 return False
         return True
 
-    def _hybrid_search(self, collection, search_field_name, query_vectors, filter_expr, top_k, search_params):
+    @metrics.timed("hybrid_search")
+    @profiler.trace("_hybrid_search")
+    def _hybrid_search(self, collection, search_field_name, query_vectors, filter_expr, top_k, search_params, weights=None):
         """
         混合查询
         :param collection_name: 向量数据库
@@ -35,6 +237,7 @@ class MultiVectorSearcher:
         :param filter_expr: 关系型属性过滤条件
         :param top_k: 返回最相似的 k 个结果
         :param search_params: 搜索参数 (可选)
+        :param weights: 查询向量的权重（见 QueryReduction.py），None 表示等权
         :return: (结果列表, 耗时(毫秒))
         """
         if self._has_nested_list(query_vectors):
@@ -42,29 +245,36 @@ class MultiVectorSearcher:
         else:
             query_vector_list = [query_vectors]
 
-        result_list = collection.search(
-            data=query_vector_list,
-            anns_field=search_field_name,
-            param=search_params,
-            expr=filter_expr,
-            limit=top_k,
-            output_fields=["doc"],
-        )
-        # print(result_list)
+        with profiler.span("_hybrid_search.rpc", nq=len(query_vector_list)):
+            result_list = collection.search(
+                data=self._prepare_queries(query_vector_list),
+                anns_field=search_field_name,
+                param=search_params,
+                expr=filter_expr,
+                limit=top_k,
+                output_fields=[],
+                partition_names=self.partition_layout.route(filter_expr) if self.partition_layout is not None else None,
+            )
 
-        ret_list = []
-        for hits in result_list:
-            for hit in hits:
-                # print(f"ID: {hit.id}")  # 获取实体的 ID
-                # print(f"Distance/Score: {hit.distance}")  # 获取距离或相似度分数
-                # print(f"Doc: {hit.entity.get('doc')}")  # 获取输出字段 "doc" 的值
-                ret_list.append(hit.distance)
+        # 只需要距离：不请求输出字段，批量取出 (nq, top_k) 的距离后求和
+        with profiler.span("_hybrid_search.decode"):
+            _, distances = stack_hits(extract_hits(result_list), top_k)
+        if weights is not None:
+            distances = distances * np.asarray(weights, dtype=np.float32)[:, None]
+        return float(np.nansum(distances))
 
-        return sum(ret_list)
 
-
-    def _scan_all_doc(self, collection, doc_list, query_vectors, top_k, search_params):         
+    @profiler.trace("_scan_all_doc")
+    def _scan_all_doc(self, collection, doc_list, query_vectors, top_k, search_params, weights=None):
         search_field_name = "vector"
+        metric_type = search_params.get("metric_type", "IP")
+        if self.local_matrix is not None:
+            with profiler.span("_scan_all_doc.local", docs=len(doc_list)):
+                similarity_list = self._local_doc_scores(doc_list, query_vectors, "L2" if metric_type == "L2" else "IP", weights)
+            if metric_type == "L2":
+                return np.argsort(similarity_list)[:top_k]
+            return np.argsort(similarity_list)[::-1][:top_k]
+
         maxsim_list = []
         for doc_id in doc_list:
             filter_expr = f"doc == {doc_id}"
@@ -74,37 +284,199 @@ class MultiVectorSearcher:
                                     query_vectors=query_vectors, 
                                     filter_expr=filter_expr, 
                                     top_k=1, 
-                                    search_params=search_params)
+                                    search_params=search_params,
+                                    weights=weights)
             maxsim_list.append(similarity_score)
         
         similarity_list = np.array(maxsim_list)
-        sorted_indices = np.argsort(similarity_list)[::-1]
-        return sorted_indices[:top_k]
+        if metric_type == "L2":
+            # L2 距离越小越相似
+            return np.argsort(similarity_list)[:top_k]
+        if self.vector_type != "binary":
+            sorted_indices = np.argsort(similarity_list)[::-1]
+            return sorted_indices[:top_k]
+
+        # 汉明距离越小越相似：先取候选文档，再用浮点向量计算精确的 MaxSim 重排
+        sorted_indices = np.argsort(similarity_list)
+        if self.rerank_docs is None:
+            return sorted_indices[:top_k]
+        candidates = sorted_indices[:top_k * self.rerank_factor]
+        query = np.asarray(query_vectors, dtype=np.float32)
+        with profiler.span("maxsim.rerank", candidates=len(candidates)), metrics.time("maxsim_rerank"):
+            rerank_scores = [self._calculate_maxsim_score(query, self.rerank_docs[doc_list[idx]], weights) for idx in candidates]
+        return candidates[np.argsort(rerank_scores)[::-1]][:top_k]
         
 
-    def _process_vectors(self, vector_file_path):
-        data_list = read_fivecs(vector_file_path)
-        query_id = -1
-        queries = []
-        tmpList = []
-        for vector_id, doc_id, embedding in data_list:
-            if doc_id == query_id:
-                tmpList.append(embedding)
+    def _group_candidates(self, collection, query_vectors, top_k, search_params, weights=None):
+        """
+        一次 group_by_field="doc" 的分组查询得到候选文档与近似 MaxSim 分数（见 _group_search）
+
+        Returns:
+            tuple: (候选文档ID (numpy.ndarray), 近似分数 (numpy.ndarray), 分数是否越大越相似)
+        """
+        metric_type = search_params.get("metric_type", "IP")
+        with profiler.span("_group_search.rpc", nq=len(query_vectors)), metrics.time("group_search"):
+            result_list = collection.search(
+                data=self._prepare_queries(query_vectors),
+                anns_field="vector",
+                param=search_params,
+                limit=top_k * self.group_candidate_factor,
+                output_fields=["doc"],
+                group_by_field="doc",
+            )
+
+        with profiler.span("_group_search.aggregate"):
+            tokens, docs, distances = [], [], []
+            for token, hits in enumerate(result_list):
+                for hit in hits:
+                    tokens.append(token)
+                    docs.append(hit.entity.get("doc"))
+                    distances.append(hit.distance)
+            tokens = np.asarray(tokens, dtype=np.int64)
+            distances = np.asarray(distances, dtype=np.float32)
+            candidates, inverse = np.unique(np.asarray(docs, dtype=np.int64), return_inverse=True)
+            # IP 越大越相似，L2 / HAMMING 越小越相似；缺失的分量取该查询向量返回的最差距离
+            larger_is_better = metric_type == "IP"
+            worst = np.full(len(result_list), np.inf if larger_is_better else -np.inf, dtype=np.float32)
+            (np.minimum if larger_is_better else np.maximum).at(worst, tokens, distances)
+            worst[~np.isfinite(worst)] = 0.0
+            table = np.tile(worst, (len(candidates), 1))
+            table[inverse, tokens] = distances
+            approx_scores = _token_sum(table.T, weights)
+            profiler.count("_group_search.candidates", len(candidates))
+        return candidates, approx_scores, larger_is_better
+
+    @profiler.trace("_group_search")
+    def _group_search(self, collection, query_vectors, top_k, search_params, weights=None):
+        """
+        分组查询：一次 RPC 提交查询的所有向量，group_by_field="doc" 使每个查询向量返回
+        top_k * group_candidate_factor 个不同文档中各自最相似的向量，其距离正是该查询向量在这些文档上的 MaxSim 分量；
+        没有返回的 (查询向量, 文档) 用该查询向量返回的最差距离估计，求和得到候选文档的近似 MaxSim 分数。
+        设置了本地文档向量（enable_local_scan）时用精确的 MaxSim 重排候选文档，binary 模式下用浮点向量重排
+
+        Returns:
+            list: top_k 个文档ID
+        """
+        metric_type = search_params.get("metric_type", "IP")
+        candidates, approx_scores, larger_is_better = self._group_candidates(collection, query_vectors, top_k, search_params, weights)
+        order = np.argsort(-approx_scores if larger_is_better else approx_scores, kind="stable")
+
+        if self.local_matrix is not None:
+            with profiler.span("_group_search.rerank", candidates=len(candidates)), metrics.time("maxsim_rerank"):
+                exact_scores = self._local_doc_scores(candidates, query_vectors, "L2" if metric_type == "L2" else "IP", weights)
+            order = np.argsort(exact_scores if metric_type == "L2" else -exact_scores, kind="stable")
+        elif self.vector_type == "binary" and self.rerank_docs is not None:
+            reranked = order[:top_k * self.rerank_factor]
+            query = np.asarray(query_vectors, dtype=np.float32)
+            with profiler.span("maxsim.rerank", candidates=len(reranked)), metrics.time("maxsim_rerank"):
+                rerank_scores = [self._calculate_maxsim_score(query, self.rerank_docs[int(candidates[idx])], weights) for idx in reranked]
+            order = reranked[np.argsort(rerank_scores)[::-1]]
+        return candidates[order[:top_k]].tolist()
+
+
+    @profiler.trace("_adaptive_search")
+    def _adaptive_search(self, collection, query_vectors, top_k, search_params, weights=None):
+        """
+        自适应的多向量查询：按代理分数从高到低，每批 refine_batch_docs 个文档精确计算 MaxSim，
+        预计下一批会超出延迟预算、或 top-k 连续 stable_rounds 批与上一批的重合率不低于 target_recall 时提前停止。
+        代理分数为 centroid（查询向量与文档向量均值的相似度之和，候选为全部文档，需要 enable_local_scan）
+        或 ann（分组查询的近似 MaxSim，候选为分组查询返回的文档）；精确分数在本地计算，没有本地向量时为逐文档的 doc == {id} 查询
+
+        Returns:
+            tuple: (top_k 个文档ID, 停止信息 {"exact", "confidence", "scored_docs", "candidate_docs", "stop_reason"})
+        """
+        start_time = time.perf_counter()
+        metric_type = search_params.get("metric_type", "IP")
+        local_metric = "L2" if metric_type == "L2" else "IP"
+        proxy = self.adaptive_proxy
+        if proxy == "auto":
+            proxy = "centroid" if self.local_centroids is not None else "ann"
+        if proxy == "centroid" and self.local_centroids is None:
+            raise ValueError("The centroid proxy requires local document vectors (enable_local_scan)")
+
+        with profiler.span("_adaptive_search.proxy", proxy=proxy):
+            if proxy == "centroid":
+                query = np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.local_centroids.shape[1])
+                token_weights = np.ones(len(query), dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+                if local_metric == "L2":
+                    proxy_scores = -(np.sum(self.local_centroids ** 2, axis=1) * token_weights.sum()
+                                     - 2.0 * (self.local_centroids @ (token_weights @ query)))
+                else:
+                    proxy_scores = self.local_centroids @ (token_weights @ query)
+                candidates = self.local_docs
             else:
-                if query_id >= 0:
-                    queries.append(tmpList)
-                tmpList = [embedding]
-                query_id = doc_id
-        if len(tmpList) > 0:
-            queries.append(tmpList)
-        return queries
+                candidates, approx_scores, larger_is_better = self._group_candidates(collection, query_vectors, top_k, search_params, weights)
+                proxy_scores = approx_scores if larger_is_better else -approx_scores
+            order = np.argsort(-proxy_scores, kind="stable")
+
+        # 精确分数统一转换为越大越相似
+        if self.local_matrix is not None:
+            positions = np.searchsorted(self.local_docs, candidates)
+
+            def exact_scores(batch):
+                scores = self._local_subset_scores(positions[batch], query_vectors, local_metric, weights)
+                return -scores if local_metric == "L2" else scores
+        else:
+            sign = 1.0 if metric_type == "IP" else -1.0
+
+            def exact_scores(batch):
+                return np.asarray([sign * self._hybrid_search(collection, "vector", query_vectors, f"doc == {int(candidates[idx])}",
+                                                              1, search_params, weights) for idx in batch])
+
+        scored, scores = [], []
+        previous, confidence, stable, batch_ms = None, 0.0, 0, 0.0
+        stop_reason = "exhausted"
+        for sid in range(0, len(order), self.refine_batch_docs):
+            elapsed_ms = (time.perf_counter() - start_time) * 1000.0
+            if self.latency_budget_ms is not None and scored and elapsed_ms + batch_ms > self.latency_budget_ms:
+                stop_reason = "budget"
+                break
+            batch_start = time.perf_counter()
+            batch = order[sid:sid + self.refine_batch_docs]
+            with profiler.span("_adaptive_search.refine", docs=len(batch)), metrics.time("maxsim_rerank"):
+                scores.append(exact_scores(batch))
+            scored.append(batch)
+
+            all_scores = np.concatenate(scores)
+            current = np.concatenate(scored)[np.argsort(-all_scores, kind="stable")[:top_k]]
+            if previous is not None and len(current) == top_k:
+                confidence = len(np.intersect1d(current, previous)) / top_k
+                stable = stable + 1 if self.target_recall is not None and confidence >= self.target_recall else 0
+            previous = current
+            # 下一批的耗时按这一批（精确计算与更新 top-k）估计
+            batch_ms = (time.perf_counter() - batch_start) * 1000.0
+            if self.target_recall is not None and stable >= self.stable_rounds:
+                stop_reason = "stable"
+                break
+
+        scored_docs = sum(len(batch) for batch in scored)
+        # 只有代理分数覆盖全部文档且全部精确计算后，结果才与逐文档扫描相同
+        exact = proxy == "centroid" and scored_docs == len(candidates)
+        profiler.count("_adaptive_search.scored_docs", scored_docs)
+        info = {"exact": exact, "confidence": 1.0 if exact else confidence, "scored_docs": scored_docs,
+                "candidate_docs": len(candidates), "stop_reason": stop_reason, "proxy": proxy}
+        result = [] if previous is None else candidates[previous].tolist()
+        return result, info
+
+
+    @profiler.trace("_process_vectors")
+    def _process_vectors(self, vector_file_path):
+        """按文档分组的向量（每个文档为一个嵌套列表），开启 EmbeddingCache 时从缓存内存映射读取"""
+        return [group.tolist() for group in self._process_vector_groups(vector_file_path)]
+
+    @staticmethod
+    def _process_vector_groups(vector_file_path):
+        """按文档分组的向量（每个文档为 float32 矩阵的一个切片，不复制数据）"""
+        _, offsets, matrix = read_fivecs_groups(vector_file_path)
+        return [matrix[sid:eid] for sid, eid in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
 
     @staticmethod
-    def _calculate_maxsim_score(q_i, d_k):
+    @profiler.trace("maxsim")
+    def _calculate_maxsim_score(q_i, d_k, weights=None):
         ret = 0
-        for q_ij in q_i:
+        for j, q_ij in enumerate(q_i):
             max_score = np.max(np.dot(q_ij, d_k.T))
-            ret += max_score
+            ret += max_score if weights is None else weights[j] * max_score
         return ret
 
     def _multi_vector_search_byNumpy(self, 
@@ -113,8 +485,8 @@ class MultiVectorSearcher:
                                     top_k: int, 
                                     search_params: dict):
 
-        queries = self._process_vectors(query_file_path)
-        vectors = self._process_vectors(vector_file_path)
+        queries = self._process_vector_groups(query_file_path)
+        vectors = self._process_vector_groups(vector_file_path)
 
         result_list = []
         num_queries = len(queries)
@@ -131,7 +503,9 @@ class MultiVectorSearcher:
                 score_ij = self._calculate_maxsim_score(query, vector)
                 scores.append((j, score_ij))
             
-            scores.sort(key=lambda x: x[1], reverse=True)
+            profiler.count("maxsim.docs", num_docs)
+            with profiler.span("maxsim.topk"):
+                scores.sort(key=lambda x: x[1], reverse=True)
             top_k_docs = [doc_idx for doc_idx, _ in scores[:top_k]]
             assert len(top_k_docs) == top_k
             result_list.append(top_k_docs)
@@ -143,38 +517,99 @@ class MultiVectorSearcher:
 
 
 
+    @metrics.timed("search")
+    def _search_one(self, collection, doc_list, query_vector, top_k, search_params):
+        """
+        按 search_mode 执行一个多向量查询
+
+        Returns:
+            tuple: (top_k 个文档ID, 查询精简后的 token 数)
+        """
+        weights = None
+        if self.dedup_threshold is not None or self.min_token_norm is not None:
+            with profiler.span("query_reduction", tokens=len(query_vector)):
+                query_vector, weights = reduce_query_tokens(query_vector, self.dedup_threshold, self.min_token_norm)
+                query_vector = query_vector.tolist()
+        if self.search_mode == "group":
+            answer_doc_id = self._group_search(collection=collection, query_vectors=query_vector, top_k=top_k, search_params=search_params, weights=weights)
+        elif self.search_mode == "adaptive":
+            answer_doc_id, info = self._adaptive_search(collection=collection, query_vectors=query_vector, top_k=top_k, search_params=search_params, weights=weights)
+            self.search_info.append(info)
+        else:
+            answer_idx_list = self._scan_all_doc(collection=collection, doc_list=doc_list, query_vectors=query_vector, top_k=top_k, search_params=search_params, weights=weights)
+            answer_doc_id = [doc_list[idx] for idx in answer_idx_list]
+        return answer_doc_id, len(query_vector)
+
     def multi_vector_search(self, 
                                     collection_name: str, 
                                     query_file_path: str, 
                                     top_k: int, 
                                     search_params: dict):
 
-        queries = self._process_queries(query_file_path)
+        queries = self._process_vectors(query_file_path)
 
-        collection = Collection(collection_name, using=self.client._using)
+        collection = self._collection(collection_name)
         collection.load()
-        results = collection.query(expr="id >= 0", output_fields=["doc"])
-        doc_list = [item['doc'] for item in results]
-        doc_list = list(set(doc_list))
-        doc_list.sort()
+        doc_list = None
+        if self.search_mode == "scan":
+            results = collection.query(expr="id >= 0", output_fields=["doc"])
+            doc_list = [item['doc'] for item in results]
+            doc_list = list(set(doc_list))
+            doc_list.sort()
 
         result = []
+        self.latency_list = []
+        self.search_info = []
+        original_tokens, reduced_tokens = 0, 0
         for query_vector in tqdm(queries, total=len(queries), desc="Multi-vector search"):
             start_time = time.time()
-            answer_idx_list = self._scan_all_doc(collection=collection, doc_list=doc_list, query_vectors=query_vector, top_k=top_k, search_params=search_params)
-            answer_doc_id = [doc_list[idx] for idx in answer_idx_list]
+            original_tokens += len(query_vector)
+            answer_doc_id, num_tokens = self._search_one(collection, doc_list, query_vector, top_k, search_params)
+            reduced_tokens += num_tokens
             latency = (time.time() - start_time) * 1000.0
             print(f"Latency: {latency} ms")
+            self.latency_list.append(latency)
             result.append(answer_doc_id)
+        self.token_counts = (original_tokens, reduced_tokens)
         return result
 
 
-if __name__ == "__main__":
-    milvus_client_uri = vdb_config.VDB_URI
-    client = MilvusClient(uri = milvus_client_uri)
-    query_processor = MultiVectorSearcher(client)
-    top_k = 20 
+def create_searcher(vdb_config) -> MultiVectorSearcher:
+    """根据 VdbConfig 创建 MultiVectorSearcher（binary 模式下加载用于重排的浮点向量）"""
+    # 本地引擎不需要连接 Milvus
+    client = None if vdb_config.LOCAL_ENGINE else MilvusClient(uri = vdb_config.VDB_URI)
+    searcher = MultiVectorSearcher(client, vdb_config.VECTOR_TYPE, vdb_config.RERANK_FACTOR)
+    searcher.set_search_mode(vdb_config.MULTI_VECTOR_SEARCH_MODE, vdb_config.GROUP_CANDIDATE_FACTOR)
+    searcher.set_adaptive_params(**vdb_config.ADAPTIVE_SEARCH)
+    searcher.set_query_reduction(**vdb_config.QUERY_REDUCTION)
+    if vdb_config.LOCAL_ENGINE:
+        searcher.set_local_engine(LocalEngine(vdb_config.LOCAL_ENGINE_DIR))
+    else:
+        searcher.set_partition_layout(load_or_fit_layout(vdb_config))
+    # adaptive 模式的 centroid 代理分数需要本地文档向量
+    centroid_proxy = vdb_config.MULTI_VECTOR_SEARCH_MODE == "adaptive" and vdb_config.ADAPTIVE_SEARCH.get("proxy") == "centroid"
+    if vdb_config.VECTOR_TYPE == "binary" or vdb_config.FILTER_ACCELERATOR or centroid_proxy:
+        _, doc_ids, matrix = read_fivecs_matrix(vdb_config.DATASET_VECTOR_PATH[0])
+        if vdb_config.VECTOR_TYPE == "binary":
+            searcher.set_rerank_vectors(doc_ids, matrix)
+        if vdb_config.FILTER_ACCELERATOR or centroid_proxy:
+            searcher.enable_local_scan(doc_ids, matrix)
+    return searcher
+
 
+def run_ground_truth(vdb_config, searcher: MultiVectorSearcher, top_k: int = 20, output_file: str = "ground_truth.dat"):
+    """
+    在 EXACT 集合上执行多向量搜索，把结果写入 Ground Truth 文件
+    
+    Args:
+        vdb_config (VdbConfig): 配置
+        searcher (MultiVectorSearcher): MultiVectorSearcher 实例
+        top_k (int): 每个查询返回的文档数
+        output_file (str): 输出文件路径
+    """
+    # Ground Truth 使用完整的查询 token（不做 QUERY_REDUCTION）
+    reduction = (searcher.dedup_threshold, searcher.min_token_norm)
+    searcher.set_query_reduction(None, None)
     for idx,query_dict in enumerate(vdb_config.QUERY_WORKLOAD):
         collection_name = query_dict["collection_name"]
         if "EXACT" not in collection_name:
@@ -183,15 +618,82 @@ if __name__ == "__main__":
         search_params = vdb_config.SEARCH_PARAMS[idx]
         print(f"search_params = {search_params}")
     
-        result = query_processor.multi_vector_search(
+        result = searcher.multi_vector_search(
                     collection_name=collection_name, 
                     query_file_path=query_file_path, 
                     top_k=top_k, 
                     search_params=search_params)
         
-        with open(f"ground_truth.dat", "w") as fout:
+        with open(output_file, "w") as fout:
             fout.write(f"{len(result)}\n")
             for answer_doc_list in result:
                 line = " ".join(map(str, answer_doc_list))
                 fout.write(line)
                 fout.write("\n")
+    searcher.set_query_reduction(*reduction)
+
+
+def read_ground_truth(file_name: str = "ground_truth.dat") -> list:
+    """
+    读取 run_ground_truth 写出的 Ground Truth 文件
+
+    Returns:
+        list: 每个查询的文档ID列表（按相似度从高到低）
+    """
+    with open(file_name, "r") as fin:
+        num_queries = int(fin.readline())
+        return [[int(doc) for doc in fin.readline().split()] for _ in range(num_queries)]
+
+
+def run_search(vdb_config, searcher: MultiVectorSearcher, top_k: int = 20, truth_list: list = None):
+    """
+    在近似索引集合上执行多向量搜索，EXACT 集合的结果作为 Ground Truth
+    
+    Args:
+        vdb_config (VdbConfig): 配置
+        searcher (MultiVectorSearcher): MultiVectorSearcher 实例
+        top_k (int): 每个查询返回的文档数
+        truth_list (list): 已有的 Ground Truth，None 表示先在 EXACT 集合上搜索
+
+    Returns:
+        tuple: 近似索引每个查询的延迟（毫秒）、召回率，以及 Ground Truth
+    """
+    exact_query, approx_query = vdb_config.QUERY_WORKLOAD
+    if truth_list is None:
+        # Ground Truth 使用完整的查询 token（不做 QUERY_REDUCTION）
+        reduction = (searcher.dedup_threshold, searcher.min_token_norm)
+        searcher.set_query_reduction(None, None)
+        truth_list = searcher.multi_vector_search(
+                        collection_name=exact_query["collection_name"], 
+                        query_file_path=exact_query["query_file_path"], 
+                        top_k=top_k, 
+                        search_params=vdb_config.SEARCH_PARAMS[0])
+        searcher.set_query_reduction(*reduction)
+    result = searcher.multi_vector_search(
+                collection_name=approx_query["collection_name"], 
+                query_file_path=approx_query["query_file_path"], 
+                top_k=top_k, 
+                search_params=vdb_config.SEARCH_PARAMS[1])
+    recall_list = [
+        len(set(truth_docs).intersection(result_docs)) / len(truth_docs) if truth_docs else 0.0
+        for truth_docs, result_docs in zip(truth_list, result)
+    ]
+    return searcher.latency_list, recall_list, truth_list
+
+
+if __name__ == "__main__":
+    from VdbConfig import vdb_config
+    if vdb_config.ENABLE_PROFILER:
+        profiler.enable()
+    configure_cache(vdb_config)
+    start_metrics(vdb_config)
+    query_processor = create_searcher(vdb_config)
+    top_k = 20 
+
+    run_ground_truth(vdb_config, query_processor, top_k)
+
+    if profiler.enabled:
+        profiler.export_chrome_trace(f"MultiVectorSearch_{vdb_config.PROFILE_TRACE_FILE}")
+        profiler.print_summary()
+    if metrics.enabled:
+        metrics.print_summary()
@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import numpy as np
+
+# 按文档ID划分集合：
+#   partition_key：doc 字段设为 Milvus 的 partition key，服务端按哈希分区并根据 doc == {id} 自动裁剪分区
+#   hash / range：显式创建分区（doc 取模 / 按连续的文档ID区间），导入时按分区写入，查询时只检索过滤条件涉及的分区
+PARTITION_MODES = ("none", "partition_key", "hash", "range")
+
+# 过滤条件中的单个比较，多个比较之间用 and 连接（与 LocalEngine 支持的过滤条件相同）
+_CONDITION_PATTERN = re.compile(r"^\s*(\w+)\s*(==|!=|>=|<=|>|<|in)\s*(.+?)\s*$")
+
+
+class PartitionLayout:
+    def __init__(self, field: str = "doc", mode: str = "hash", num_partitions: int = 16, boundaries=None):
+        """
+        初始化 PartitionLayout 类
+
+        Args:
+            field (str): 划分依据的整数字段（文档ID）
+            mode (str): "partition_key"、"hash" 或 "range"
+            num_partitions (int): 分区数（range 模式下为 len(boundaries) + 1）
+            boundaries (list): range 模式下各分区的上界（含），第 i 个分区为 (boundaries[i - 1], boundaries[i]]
+        """
+        if mode not in PARTITION_MODES or mode == "none":
+            raise ValueError(f"Unknown partition mode: {mode}")
+        self.field = field
+        self.mode = mode
+        self.boundaries = np.asarray(boundaries if boundaries is not None else [], dtype=np.int64)
+        self.num_partitions = len(self.boundaries) + 1 if mode == "range" else num_partitions
+
+    @classmethod
+    def fit(cls, values, mode: str = "hash", num_partitions: int = 16, field: str = "doc"):
+        """
+        根据每行的文档ID确定划分方式：range 模式按分位数选择边界，使各分区的向量数大致相同
+
+        Args:
+            values (numpy.ndarray): 每行（每个向量）的文档ID
+            mode (str): "partition_key"、"hash" 或 "range"
+            num_partitions (int): 分区数
+            field (str): 划分依据的字段
+        """
+        boundaries = None
+        if mode == "range":
+            quantiles = np.linspace(0.0, 1.0, num_partitions + 1)[1:-1]
+            boundaries = np.unique(np.quantile(np.asarray(values), quantiles, method="lower")) if len(quantiles) else []
+        return cls(field, mode, num_partitions, boundaries)
+
+    @property
+    def explicit(self) -> bool:
+        """是否需要显式创建分区并在查询时指定 partition_names"""
+        return self.mode in ("hash", "range")
+
+    def schema_fields(self, fields_config: list) -> list:
+        """partition_key 模式下把划分字段标记为 partition key（见 DataLoader.create_schema），其余模式原样返回"""
+        if self.mode != "partition_key":
+            return fields_config
+        return [dict(config, is_partition_key=True) if config["name"] == self.field else config for config in fields_config]
+
+    def partition_names(self) -> list:
+        return [f"{self.field}_{i}" for i in range(self.num_partitions)]
+
+    def assign(self, values):
+        """
+        每行所属的分区编号
+
+        Args:
+            values: 每行的文档ID
+
+        Returns:
+            numpy.ndarray: 分区编号
+        """
+        values = np.asarray(values, dtype=np.int64)
+        if self.mode == "range":
+            return np.searchsorted(self.boundaries, values, side="left")
+        return values % self.num_partitions
+
+    def _route_condition(self, op: str, value: str) -> set:
+        """单个比较可能命中的分区编号（不确定时返回全部分区）"""
+        everything = set(range(self.num_partitions))
+        if op == "in":
+            return set(self.assign(json.loads(value)).tolist())
+        if op == "==":
+            return {int(self.assign([int(value)])[0])}
+        if self.mode != "range" or op == "!=":
+            return everything
+        # 第 i 个分区的取值范围为 (boundaries[i - 1], boundaries[i]]
+        value = int(value)
+        position = int(np.searchsorted(self.boundaries, value, side="left"))
+        if op in ("<", "<="):
+            return set(range(position + 1))
+        if op == ">":
+            return set(range(int(np.searchsorted(self.boundaries, value, side="right")), self.num_partitions))
+        return set(range(position, self.num_partitions))
+
+    def route(self, filter_expr: str):
+        """
+        过滤条件（多个比较用 and 连接）涉及的分区名称
+
+        Returns:
+            list: 分区名称；None 表示检索全部分区（partition_key 由服务端裁剪、没有过滤条件、无法解析或无法排除任何分区）
+        """
+        if not self.explicit or not filter_expr:
+            return None
+        partitions = set(range(self.num_partitions))
+        for condition in re.split(r"\s+and\s+", filter_expr.strip()):
+            match = _CONDITION_PATTERN.match(condition)
+            if match is None or re.search(r"\s(or|not)\s", f" {condition} "):
+                return None
+            field, op, value = match.groups()
+            if field == self.field:
+                partitions &= self._route_condition(op, value)
+        if len(partitions) == self.num_partitions:
+            return None
+        names = self.partition_names()
+        return [names[i] for i in sorted(partitions)]
+
+    def config(self) -> dict:
+        return {"field": self.field, "mode": self.mode, "num_partitions": self.num_partitions,
+                "boundaries": self.boundaries.tolist()}
+
+    def save(self, file_name: str, **extra) -> None:
+        """保存划分方式，extra 为额外记录的信息（例如数据来源）"""
+        with open(file_name, "w") as fout:
+            json.dump(dict(self.config(), **extra), fout)
+
+    @classmethod
+    def load(cls, file_name: str):
+        """
+        Returns:
+            tuple: (PartitionLayout, 文件中的全部内容)
+        """
+        with open(file_name, "r") as fin:
+            content = json.load(fin)
+        return cls(content["field"], content["mode"], content["num_partitions"], content["boundaries"]), content
+
+
+def load_or_fit_layout(vdb_config, doc_ids=None):
+    """
+    根据 VdbConfig.PARTITION 获取集合的划分方式：PARTITION_FILE 中保存的划分方式与配置一致时直接复用，
+    否则在 DATASET_VECTOR_PATH[0] 的文档ID上重新确定并保存，保证导入与查询使用相同的分区
+
+    Args:
+        vdb_config (VdbConfig): 配置
+        doc_ids (numpy.ndarray): 已读入的每个向量的文档ID（可选，避免重复读取）
+
+    Returns:
+        PartitionLayout: 未开启分区时返回 None
+    """
+    config = vdb_config.PARTITION
+    mode = config.get("mode", "none")
+    if mode == "none":
+        return None
+    requested = {"source": vdb_config.DATASET_VECTOR_PATH[0], "requested_partitions": config.get("num_partitions", 16)}
+    if os.path.exists(vdb_config.PARTITION_FILE):
+        layout, content = PartitionLayout.load(vdb_config.PARTITION_FILE)
+        saved = {key: content.get(key) for key in requested}
+        if layout.mode == mode and saved == requested:
+            return layout
+    if doc_ids is None and mode == "range":
+        from FileIO import read_fivecs_matrix
+        _, doc_ids, _ = read_fivecs_matrix(requested["source"])
+    layout = PartitionLayout.fit(doc_ids if doc_ids is not None else [], mode, requested["requested_partitions"])
+    layout.save(vdb_config.PARTITION_FILE, **requested)
+    print(f"Partition layout {layout.config()} written to {vdb_config.PARTITION_FILE}")
+    return layout
@@ -0,0 +1,58 @@
+import numpy as np
+
+
+def reduce_query_tokens(query, dedup_threshold: float = None, min_norm: float = None):
+    """
+    查询端的 token 精简：去掉范数低于 min_norm 的 token（padding / [MASK] 一类对 MaxSim 贡献很小的 token），
+    再把余弦相似度不低于 dedup_threshold 的 token 合并为一个带权重的 token（取均值，权重为合并的个数），
+    加权 MaxSim = sum_i w_i * max_j <q_i, d_j> 在重复 token 完全相同时与原查询的 MaxSim 相等
+
+    Args:
+        query: (n, dim) 查询 token 向量
+        dedup_threshold (float): 合并的余弦相似度阈值，None 表示不合并
+        min_norm (float): 范数阈值，None 表示不删除（至少保留范数最大的一个 token）
+
+    Returns:
+        tuple: (精简后的 token (numpy.ndarray float32, (m, dim)), 每个 token 的权重 (numpy.ndarray float32, (m,)))
+    """
+    query = np.asarray(query, dtype=np.float32)
+    norms = np.linalg.norm(query, axis=1)
+    if min_norm is not None:
+        keep = norms >= min_norm
+        if not keep.any():
+            keep[np.argmax(norms)] = True
+        query, norms = query[keep], norms[keep]
+    if dedup_threshold is None:
+        return query, np.ones(len(query), dtype=np.float32)
+
+    # 按范数从大到小贪心聚类：每个尚未归类的 token 成为新的簇，吸收与它足够相似的其余未归类 token
+    unit = query / np.maximum(norms, 1e-12)[:, None]
+    similarity = unit @ unit.T
+    clusters = np.full(len(query), -1, dtype=np.int64)
+    num_clusters = 0
+    for i in np.argsort(-norms, kind="stable"):
+        if clusters[i] >= 0:
+            continue
+        clusters[(similarity[i] >= dedup_threshold) & (clusters < 0)] = num_clusters
+        num_clusters += 1
+    weights = np.bincount(clusters, minlength=num_clusters).astype(np.float32)
+    tokens = np.zeros((num_clusters, query.shape[1]), dtype=np.float32)
+    np.add.at(tokens, clusters, query)
+    return tokens / weights[:, None], weights
+
+
+def reduce_queries(queries, dedup_threshold: float = None, min_norm: float = None):
+    """
+    对每个查询执行 reduce_query_tokens
+
+    Returns:
+        tuple: (精简后的查询列表, 权重列表, 精简前后的 token 总数)
+    """
+    reduced, weights = [], []
+    original_tokens = 0
+    for query in queries:
+        tokens, token_weights = reduce_query_tokens(query, dedup_threshold, min_norm)
+        original_tokens += len(query)
+        reduced.append(tokens)
+        weights.append(token_weights)
+    return reduced, weights, (original_tokens, sum(len(tokens) for tokens in reduced))
@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from FileIO import read_fivecs_groups
+from DataGenerator import FivecsWriter
+
+# 文档端 token 池化：离线把每个文档的 token 向量层次聚类（Ward 准则）合并为 ceil(n / factor) 个，
+# 写出新的 .fivecs，文档ID保持不变；MaxSim 计算量与集合中的向量数都约缩小为 1 / factor
+
+
+def pool_document(vectors, factor: float, normalize: bool = True):
+    """
+    对一个文档的 token 向量做凝聚式层次聚类：每一步合并 Ward 代价
+    n_a * n_b / (n_a + n_b) * ||c_a - c_b||^2 最小的两个簇，直到剩下 ceil(n / factor) 个簇，
+    每个簇用其中 token 的均值表示
+
+    Args:
+        vectors: (n, dim) 文档的 token 向量
+        factor (float): 池化倍数，1 表示不合并
+        normalize (bool): 是否把合并后的向量重新 L2 归一化（原向量已归一化、使用 IP 时保持与未池化向量同一尺度）
+
+    Returns:
+        numpy.ndarray: (ceil(n / factor), dim) float32 池化后的向量（簇按其中第一个 token 的位置排序）
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    n = len(vectors)
+    num_clusters = max(1, int(np.ceil(n / factor)))
+    if num_clusters >= n:
+        return vectors.copy()
+
+    centroids = vectors.astype(np.float64)
+    sizes = np.ones(n)
+    active = np.ones(n, dtype=bool)
+    # 初始代价为两两平方欧氏距离的一半（n_a = n_b = 1）
+    sq_norms = np.einsum("ij,ij->i", centroids, centroids)
+    cost = np.maximum(sq_norms[:, None] + sq_norms[None, :] - 2.0 * (centroids @ centroids.T), 0.0) / 2.0
+    np.fill_diagonal(cost, np.inf)
+    for _ in range(n - num_clusters):
+        a, b = divmod(int(cost.argmin()), n)
+        size = sizes[a] + sizes[b]
+        centroids[a] = (sizes[a] * centroids[a] + sizes[b] * centroids[b]) / size
+        sizes[a] = size
+        sq_norms[a] = centroids[a] @ centroids[a]
+        active[b] = False
+        # 只需更新合并后的簇与其余簇之间的代价
+        row = sizes * size / (sizes + size) * np.maximum(sq_norms + sq_norms[a] - 2.0 * (centroids @ centroids[a]), 0.0)
+        row[~active] = np.inf
+        row[a] = np.inf
+        cost[a] = row
+        cost[:, a] = row
+        cost[b] = np.inf
+        cost[:, b] = np.inf
+
+    pooled = centroids[np.flatnonzero(active)].astype(np.float32)
+    if normalize:
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+    return pooled
+
+
+def _pool_chunk(offsets, matrix, factor: float, normalize: bool):
+    """池化一批文档（offsets 相对于 matrix），返回 (每个文档池化后的向量数, 拼接后的向量)"""
+    pooled = [pool_document(matrix[offsets[i]:offsets[i + 1]], factor, normalize) for i in range(len(offsets) - 1)]
+    return np.array([len(vectors) for vectors in pooled], dtype=np.int64), np.concatenate(pooled)
+
+
+def pool_fivecs(
+    input_file: str,
+    output_file: str,
+    factor: float = 2,
+    normalize: bool = True,
+    workers: int = 0,
+    chunk_docs: int = 256
+) -> dict:
+    """
+    池化 .fivecs 文件中所有文档的 token 向量并写出新的 .fivecs（向量ID重新连续编号，文档ID不变）
+
+    文档按每 chunk_docs 个一批分给多个进程并行处理，结果按文档顺序写出
+
+    Args:
+        input_file (str): 输入 .fivecs 文件
+        output_file (str): 输出 .fivecs 文件
+        factor (float): 池化倍数，例如 2 或 4
+        normalize (bool): 是否把合并后的向量重新 L2 归一化
+        workers (int): 进程数，0 表示 CPU 核数，1 表示在当前进程中执行
+        chunk_docs (int): 每个任务的文档数
+
+    Returns:
+        dict: {"docs", "input_vectors", "output_vectors", "ratio", "pool_time"}
+    """
+    if factor < 1:
+        raise ValueError("Pooling factor must be >= 1")
+    start_time = time.time()
+    doc_list, offsets, matrix = read_fivecs_groups(input_file)
+    chunks = [(offsets[sid:sid + chunk_docs + 1] - offsets[sid], matrix[offsets[sid]:offsets[min(sid + chunk_docs, len(doc_list))]])
+              for sid in range(0, len(doc_list), chunk_docs)]
+    workers = workers or os.cpu_count() or 1
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    writer = FivecsWriter(output_file, matrix.shape[1])
+    doc_pos = 0
+    if workers == 1 or len(chunks) == 1:
+        results = (_pool_chunk(chunk_offsets, chunk_matrix, factor, normalize) for chunk_offsets, chunk_matrix in chunks)
+        for lengths, pooled in results:
+            writer.write(lengths, pooled, doc_list[doc_pos:doc_pos + len(lengths)])
+            doc_pos += len(lengths)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_pool_chunk, chunk_offsets, chunk_matrix, factor, normalize)
+                       for chunk_offsets, chunk_matrix in chunks]
+            for future in futures:
+                lengths, pooled = future.result()
+                writer.write(lengths, pooled, doc_list[doc_pos:doc_pos + len(lengths)])
+                doc_pos += len(lengths)
+    writer.close()
+
+    stats = {
+        "docs": writer.num_docs,
+        "input_vectors": len(matrix),
+        "output_vectors": writer.num_vectors,
+        "ratio": writer.num_vectors / max(len(matrix), 1),
+        "pool_time": time.time() - start_time,
+    }
+    print(f"Pooled {input_file} -> {output_file}: {stats['input_vectors']} -> {stats['output_vectors']} vectors "
+          f"in {stats['docs']} docs (x{factor:g}, {workers} workers), {stats['pool_time']:.1f} s")
+    return stats
+
+
+def add_arguments(parser):
+    """池化的命令行参数（TokenPooling.py 与 VdbCli.py pool 共用）"""
+    parser.add_argument("--input", help="输入 .fivecs 文件，默认为 VdbConfig 中的数据集（仅 VdbCli.py pool）")
+    parser.add_argument("--output", help="输出 .fivecs 文件，默认为 VdbConfig 中 APPROX 集合使用的池化文件（仅 VdbCli.py pool）")
+    parser.add_argument("--factor", type=float, help="池化倍数，例如 2 或 4，默认为 TOKEN_POOLING['factor']")
+    parser.add_argument("--workers", type=int, default=0, help="进程数，0 表示 CPU 核数")
+    parser.add_argument("--chunk-docs", type=int, default=256)
+    parser.add_argument("--no-normalize", action="store_true", help="不对合并后的向量重新归一化")
+
+
+def run(args) -> dict:
+    return pool_fivecs(args.input, args.output, args.factor, not args.no_normalize, args.workers, args.chunk_docs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="文档端 token 池化：层次聚类合并每个文档的 token 向量，写出新的 .fivecs")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.input is None or args.output is None or args.factor is None:
+        parser.error("--input, --output and --factor are required")
+    run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
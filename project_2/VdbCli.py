@@ -0,0 +1,189 @@
+import argparse
+import os
+import sys
+
+# 统一的命令行入口：所有重量级依赖（pymilvus、tqdm）以及配置都在具体命令中才导入/创建
+
+
+def _profiled(func):
+    """--profile 或 ENABLE_PROFILER 时开启性能分析，命令结束后导出 Chrome trace 与分阶段耗时汇总表；
+    同时按配置开启 EmbeddingCache 与运行时指标（METRICS）"""
+    def wrapper(args):
+        from VdbConfig import vdb_config
+        from Profiler import profiler
+        from Metrics import metrics, start_metrics
+        from EmbeddingCache import configure_cache
+        configure_cache(vdb_config)
+        if args.profile or vdb_config.ENABLE_PROFILER:
+            profiler.enable()
+        start_metrics(vdb_config)
+        func(args)
+        if profiler.enabled:
+            profiler.export_chrome_trace(f"{args.command}_{vdb_config.PROFILE_TRACE_FILE}")
+            profiler.print_summary()
+        if metrics.enabled:
+            metrics.print_summary()
+    return wrapper
+
+
+@_profiled
+def cmd_load(args):
+    from VdbConfig import vdb_config
+    if vdb_config.LOCAL_ENGINE:
+        # 本地引擎在导入时直接构建索引
+        from LocalEngine import build_local_collections
+        build_local_collections(vdb_config)
+        return
+    from DataLoader import DataLoader, MilvusClient, load_all, index_all
+    data_loader = DataLoader(MilvusClient(uri = vdb_config.VDB_URI), vdb_config.CHECKPOINT_DIR)
+    load_all(vdb_config, data_loader)
+    if args.index:
+        index_all(vdb_config, data_loader)
+
+
+@_profiled
+def cmd_index(args):
+    from VdbConfig import vdb_config
+    if vdb_config.LOCAL_ENGINE:
+        from LocalEngine import build_local_collections
+        build_local_collections(vdb_config)
+        return
+    from DataLoader import DataLoader, MilvusClient, index_all
+    data_loader = DataLoader(MilvusClient(uri = vdb_config.VDB_URI), vdb_config.CHECKPOINT_DIR)
+    index_all(vdb_config, data_loader)
+
+
+@_profiled
+def cmd_gt(args):
+    from VdbConfig import vdb_config
+    from MultiVectorSearch import create_searcher, run_ground_truth
+    run_ground_truth(vdb_config, create_searcher(vdb_config), args.top_k, args.output)
+
+
+@_profiled
+def cmd_bench(args):
+    from VdbConfig import vdb_config
+    from Benchmark import run_benchmarks
+    run_benchmarks(vdb_config, args.name)
+
+
+@_profiled
+def cmd_matrix(args):
+    from VdbConfig import vdb_config
+    from ExperimentMatrix import run_matrix
+    run_matrix(vdb_config, stages=args.stages, force=args.force, dry_run=args.dry_run)
+
+
+def cmd_generate(args):
+    # 生成器不创建 VdbConfig，也不需要 Milvus
+    from DataGenerator import run
+    run(args)
+
+
+def cmd_pool(args):
+    from TokenPooling import run
+    if args.input is None or args.output is None or args.factor is None:
+        # 默认池化 VdbConfig 中的数据集，输出到 APPROX 集合使用的路径
+        from VdbConfig import vdb_config, pooled_file_path
+        pooling = vdb_config.TOKEN_POOLING
+        args.factor = args.factor or pooling.get("factor", 1)
+        if args.factor <= 1:
+            sys.exit("Set TOKEN_POOLING['factor'] > 1 or pass --factor")
+        args.input = args.input or vdb_config.DATASET_VECTOR_PATH[0]
+        args.output = args.output or pooled_file_path(pooling.get("output_dir", "pooled"), os.path.basename(os.path.dirname(args.input)),
+                                                      args.input, args.factor)
+        args.workers = args.workers or pooling.get("workers", 0)
+        args.no_normalize = args.no_normalize or not pooling.get("normalize", True)
+    run(args)
+
+
+def cmd_micro(args):
+    # 微基准测试只使用合成数据，不创建 VdbConfig，也不需要 Milvus
+    from MicroBenchmark import run
+    sys.exit(run(args))
+
+
+def cmd_list(args):
+    from VdbConfig import vdb_config
+    if vdb_config.LOCAL_ENGINE:
+        from LocalEngine import LocalEngine
+        for name in LocalEngine(vdb_config.LOCAL_ENGINE_DIR).list_collections():
+            print(name)
+        return
+    from ListCollection import MilvusClient, vdb_list_collections
+    vdb_list_collections(MilvusClient(uri = vdb_config.VDB_URI), vdb_config.VDB_URI)
+
+
+def _command(argv):
+    """命令行中的子命令名称：只解析全局选项与第一个位置参数，不导入任何模块"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--config")
+    parser.add_argument("command", nargs="?")
+    return parser.parse_known_args(argv)[0].command
+
+
+def main(argv=None):
+    # 参数定义（choices 等）来自其他模块的子命令只在执行该命令时才注册，其他命令（包括 --help）不导入这些模块
+    command = _command(argv)
+    parser = argparse.ArgumentParser(description="Milvus 向量数据库实验命令行")
+    parser.add_argument("--profile", action="store_true", help="开启性能分析")
+    parser.add_argument("--config", help="TOML/YAML 配置文件（等价于设置环境变量 VDB_CONFIG_FILE）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sub = subparsers.add_parser("load", help="创建集合并导入数据")
+    sub.add_argument("--index", action="store_true", help="导入后构建索引并加载")
+    sub.set_defaults(func=cmd_load)
+
+    sub = subparsers.add_parser("index", help="并发构建所有集合的索引并加载")
+    sub.set_defaults(func=cmd_index)
+
+    sub = subparsers.add_parser("bench", help="运行性能对比实验")
+    if command == "bench":
+        from Benchmark import BENCHMARKS
+        sub.add_argument("--name", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    sub.set_defaults(func=cmd_bench)
+
+    sub = subparsers.add_parser("gt", aliases=["search"], help="在 EXACT 集合上执行多向量搜索并写入 Ground Truth")
+    sub.add_argument("--top-k", type=int, default=20)
+    sub.add_argument("--output", default="ground_truth.dat")
+    sub.set_defaults(func=cmd_gt)
+
+    sub = subparsers.add_parser("matrix", help="执行配置文件中的实验矩阵，已完成的作业直接使用缓存结果")
+    if command == "matrix":
+        from ExperimentMatrix import STAGES
+        sub.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    sub.add_argument("--force", action="store_true", help="忽略缓存重新执行所有作业")
+    sub.add_argument("--dry-run", action="store_true", help="只打印作业列表")
+    sub.set_defaults(func=cmd_matrix)
+
+    sub = subparsers.add_parser("generate", help="流式生成合成数据集（聚类高斯分布，规模与维度可调）")
+    if command == "generate":
+        from DataGenerator import add_arguments
+        add_arguments(sub)
+    sub.set_defaults(func=cmd_generate)
+
+    sub = subparsers.add_parser("pool", help="文档端 token 池化：层次聚类合并每个文档的 token 向量，写出新的 .fivecs")
+    if command == "pool":
+        from TokenPooling import add_arguments
+        add_arguments(sub)
+    sub.set_defaults(func=cmd_pool)
+
+    sub = subparsers.add_parser("micro", help="在合成数据上运行微基准测试，性能退化时返回非零退出码")
+    if command == "micro":
+        from MicroBenchmark import add_arguments
+        add_arguments(sub)
+    sub.set_defaults(func=cmd_micro)
+
+    sub = subparsers.add_parser("list", help="查询当前向量数据库中的集合")
+    sub.set_defaults(func=cmd_list)
+
+    args = parser.parse_args(argv)
+    if args.config:
+        # 必须在第一次访问 vdb_config 之前设置
+        os.environ["VDB_CONFIG_FILE"] = args.config
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
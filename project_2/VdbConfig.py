@@ -1,6 +1,51 @@
-from pymilvus import MilvusClient, DataType
-
 # VdbConfig.py
+import os
+import struct
+
+# dataset name -> (dim, vector file, query file)
+DATASET_FILES = {
+    "LoTTE": (128, "lotte-lifestyle-data-small.fivecs", "lotte-lifestyle-query-small.fivecs"),
+}
+
+
+def load_config_file(file_name: str) -> dict:
+    """
+    读取 TOML 或 YAML 格式的配置文件（YAML 需要安装 PyYAML）
+
+    Args:
+        file_name (str): 配置文件路径，扩展名为 .toml、.yaml 或 .yml
+
+    Returns:
+        dict: 配置内容
+    """
+    if file_name.endswith((".yaml", ".yml")):
+        import yaml
+        with open(file_name, "r") as fin:
+            return yaml.safe_load(fin) or {}
+    import tomllib
+    with open(file_name, "rb") as fin:
+        return tomllib.load(fin)
+
+
+def read_dataset_files(dataset_dir: str):
+    """
+    不在 DATASET_FILES 中的数据集（例如 DataGenerator.py 生成的合成数据集）：
+    data.fivecs / query.fivecs，维度从 data.fivecs 的文件头读取
+
+    Returns:
+        tuple: (维度, 向量文件名, 查询文件名)
+    """
+    with open(f"{dataset_dir}/data.fivecs", "rb") as fin:
+        _, _, dim = struct.unpack('<3q', fin.read(24))
+    return dim, "data.fivecs", "query.fivecs"
+
+
+def pooled_file_path(output_dir: str, dataset_name: str, vector_file: str, factor: float) -> str:
+    """池化后的向量文件路径：output_dir/<dataset>/<vector_file 去掉扩展名>.pool<factor>.fivecs"""
+    stem = os.path.splitext(os.path.basename(vector_file))[0]
+    return os.path.join(output_dir, dataset_name, f"{stem}.pool{factor:g}.fivecs")
+
+
 class VdbConfig:
     _instance = None
 
@@ -11,54 +56,165 @@ class VdbConfig:
         return cls._instance
 
     def init_config(self):
-        YOUR_PREFIX = "ZYX"             # change into your own prefix
-        dataset_name = "LoTTE"          # change into different dataset names
-        DISTANCE_TYPE = "IP"            # change between L2 and IP
-        dataset_dim = 128
+        self.YOUR_PREFIX = "ZYX"                       # change into your own prefix
+        self.DATASET_ROOT = "/home/dataset/Seminar2025Fall"
         self.VDB_URI = "http://localhost:50055"
-        self.DATASET_NAME = [
-            f"{YOUR_PREFIX}_EXACT_{dataset_name}",
-            f"{YOUR_PREFIX}_APPROX_{dataset_name}",
-        ]
+        self.RERANK_FACTOR = 4                         # binary: fetch top_k * RERANK_FACTOR, rerank with floats
+        self.ENABLE_PROFILER = False               # dump a Chrome trace and per-stage summary
+        self.PROFILE_TRACE_FILE = "trace.json"
+        self.BENCHMARK_STORE_FILE = "benchmark.jsonl"  # experiment results (JSON Lines)
+        self.INGEST_MODE = "resume"                    # "recreate", "resume" (insert missing batches), "upsert" or "bulk" (utility.do_bulk_insert)
+        self.CHECKPOINT_DIR = "checkpoints"            # ingest checkpoints for resume/upsert, bulk import job records
+        self.BULK_IMPORT = {                           # bulk mode: "numpy" or "parquet" files, one import job per rows_per_file rows
+            "format": "numpy",
+            "rows_per_file": 1000000,
+            "staging_dir": "bulk_staging",             # converted column files are written here first
+            "object_store": {"type": "local", "root": "bulk_store"},  # "local" (testing) or "minio" with endpoint/access_key/secret_key/bucket
+        }
+        self.FILTER_ACCELERATOR = False                # score "doc == id" filters locally instead of one RPC per doc
+        self.LOCAL_ENGINE = False                      # in-process IVF-Flat/FLAT engine instead of Milvus (see LocalEngine.py)
+        self.LOCAL_ENGINE_DIR = "local_engine"         # memory-mapped .npy files of local collections
+        self.EMBEDDING_CACHE_DIR = "embedding_cache"   # parsed .fivecs cache keyed by path+mtime+size, "" disables it
+        self.EMBEDDING_CACHE_QUOTA_GB = 32             # least recently used entries are evicted beyond this quota
+        self.MULTI_VECTOR_SEARCH_MODE = "scan"         # "scan" (one "doc == id" search per doc), "group" (one group_by_field="doc" search per query) or "adaptive"
+        self.GROUP_CANDIDATE_FACTOR = 4                # group mode: each query vector returns top_k * factor docs
+        self.ADAPTIVE_SEARCH = {                       # adaptive mode: score docs in proxy order, stop on budget or a stable top-k
+            "latency_budget_ms": 50,                   # per-query latency budget, None for no budget
+            "target_recall": 0.95,                     # stop when consecutive top-k overlap stays >= this, None to disable
+            "proxy": "auto",                           # "centroid" (needs local vectors), "ann" (group search scores) or "auto"
+            "refine_batch_docs": 64,                   # docs scored exactly per step
+            "stable_rounds": 2,                        # consecutive stable steps required
+        }
+        self.QUERY_REDUCTION = {                       # query-side token reduction before search (see QueryReduction.py)
+            "dedup_threshold": None,                   # merge query tokens with cosine >= this into one weighted token, None disables
+            "min_norm": None,                          # drop query tokens whose norm is below this, None disables
+        }
+        self.TOKEN_POOLING = {                         # document-side token pooling (see TokenPooling.py, python3 VdbCli.py pool)
+            "factor": 1,                               # > 1: the APPROX collection is loaded from the pooled .fivecs (ceil(n / factor) tokens per doc)
+            "output_dir": "pooled",                    # pooled files are written to output_dir/<dataset>/
+            "normalize": True,                         # re-normalize merged token vectors
+            "workers": 0,                              # pooling processes, 0 = CPU count
+        }
+        self.METRICS = {                               # runtime metrics (see Metrics.py): latency histograms, rows ingested, RPC errors, in-flight requests
+            "enabled": False,
+            "host": "127.0.0.1",
+            "port": 9108,                              # Prometheus text format at host:port/metrics, 0 = random port, None disables
+            "prefix": "vdb",                           # metric name prefix
+            "snapshot_file": "metrics_snapshot.json",  # JSON snapshot written every snapshot_interval_s seconds, None disables
+            "snapshot_interval_s": 10,
+        }
+        self.SCALAR_INDEX = True                       # STL_SORT index on "doc", built together with the vector index
+        self.PARTITION = {"mode": "none", "num_partitions": 16}  # split by "doc": "partition_key", "hash" or "range" (see Partitioning.py)
+        self.PARTITION_FILE = "partitions.json"        # partition layout shared by ingest and search
+
+        # external TOML/YAML config named by VDB_CONFIG_FILE:
+        # [settings] overrides the attributes above, [defaults] picks dataset/metric/vector_type,
+        # [matrix] describes an experiment matrix (see ExperimentMatrix.py)
+        self.CONFIG_FILE = os.environ.get("VDB_CONFIG_FILE", "")
+        content = load_config_file(self.CONFIG_FILE) if self.CONFIG_FILE else {}
+        for key, value in content.get("settings", {}).items():
+            setattr(self, key, value)
+        defaults = content.get("defaults", {})
+
+        self.configure(
+            dataset_name=defaults.get("dataset", "LoTTE"),         # change into different dataset names
+            distance_type=defaults.get("metric", "IP"),            # change between L2 and IP
+            vector_type=defaults.get("vector_type", "float32"),    # "float32", "float16", "bfloat16" or "binary" (sign-binarized, HAMMING)
+        )
+
+    def configure(
+        self,
+        dataset_name: str,
+        distance_type: str = "IP",
+        vector_type: str = "float32",
+        index_params: dict = None,
+        search_params: dict = None,
+        exact_suffix: str = "",
+        approx_suffix: str = ""
+    ):
+        """
+        根据数据集、距离与向量存储类型生成集合、索引与查询配置，实验矩阵中的每个作业都会调用一次
+
+        Args:
+            dataset_name (str): 数据集名称，见 DATASET_FILES，或 DATASET_ROOT 下的合成数据集目录名
+            distance_type (str): L2 或 IP
+            vector_type (str): 向量存储类型 ["float32", "float16", "bfloat16", "binary"]
+            index_params (dict): 近似索引，例如 {"index_type": "HNSW", "params": {"M": 32}}；None 表示默认索引
+            search_params (dict): 近似索引的查询参数，例如 {"ef": 32}；None 表示默认参数
+            exact_suffix (str): 精确索引（FLAT）集合名称的后缀
+            approx_suffix (str): 近似索引集合名称的后缀
+        """
+        # 只有在真正需要配置时才导入 pymilvus
+        from pymilvus import DataType
+        vector_dtype = {
+            "float32": DataType.FLOAT_VECTOR,
+            "float16": DataType.FLOAT16_VECTOR,
+            "bfloat16": DataType.BFLOAT16_VECTOR,
+            "binary": DataType.BINARY_VECTOR,
+        }[vector_type]
+        dataset_dir = f"{self.DATASET_ROOT}/{dataset_name}"
+        if dataset_name in DATASET_FILES:
+            dataset_dim, vector_file, query_file = DATASET_FILES[dataset_name]
+        elif os.path.exists(f"{dataset_dir}/data.fivecs"):
+            dataset_dim, vector_file, query_file = read_dataset_files(dataset_dir)
+        else:
+            raise ValueError("Unknown dataset")
+        metric_type = "HAMMING" if vector_type == "binary" else distance_type
+        exact_name = f"{self.YOUR_PREFIX}_EXACT_{dataset_name}{exact_suffix}"
+        approx_name = f"{self.YOUR_PREFIX}_APPROX_{dataset_name}{approx_suffix}"
+
+        # 池化只作用于 APPROX 集合，EXACT 集合（Ground Truth）始终使用原始向量
+        approx_vector_path = f"{dataset_dir}/{vector_file}"
+        pool_factor = self.TOKEN_POOLING.get("factor", 1)
+        if pool_factor > 1:
+            approx_name = f"{approx_name}_POOL{pool_factor:g}"
+            approx_vector_path = pooled_file_path(self.TOKEN_POOLING.get("output_dir", "pooled"), dataset_name, vector_file, pool_factor)
+
+        self.DATASET_NAME = [exact_name, approx_name]
         self.DATASET_VECTOR_PATH = [
-            f"/home/dataset/Seminar2025Fall/{dataset_name}/lotte-lifestyle-data-small.fivecs",
-            f"/home/dataset/Seminar2025Fall/{dataset_name}/lotte-lifestyle-data-small.fivecs",
+            f"{dataset_dir}/{vector_file}",
+            approx_vector_path,
         ]
         self.SCHEMA_FIELD_CONFIG = [
             [
                 {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
-                {"name": "vector", "dtype": DataType.FLOAT_VECTOR, "dim": dataset_dim, "description": "vector"},
-                {"name": "doc", "dtype": DataType.INT64, "description": "Doc id"},
-            ],
-            [
-                {"name": "id", "dtype": DataType.INT64, "is_primary": True, "description": "primary key"},
-                {"name": "vector", "dtype": DataType.FLOAT_VECTOR, "dim": dataset_dim, "description": "vector"},
+                {"name": "vector", "dtype": vector_dtype, "dim": dataset_dim, "description": "vector"},
                 {"name": "doc", "dtype": DataType.INT64, "description": "Doc id"},
-            ],
+            ]
+            for _ in self.DATASET_NAME
         ]
-        self.INDEX_PARAMS = [
-            {
-                "field_name": "vector",
-                "metric_type": DISTANCE_TYPE,
-                "index_type": "FLAT",
-                "index_name": "flat_index",
-            },
-            {
+        if vector_type == "binary":
+            exact_index = {"index_type": "BIN_FLAT"}
+            index_params = index_params or {"index_type": "BIN_IVF_FLAT", "params": {"nlist": 128}}
+            search_params = search_params or {"nprobe": 16}
+        else:
+            exact_index = {"index_type": "FLAT"}
+            index_params = index_params or {"index_type": "HNSW", "params": {"M": 32, "efConstruction": 512}}
+            search_params = search_params or {"ef": 32}
+        self.INDEX_PARAMS = []
+        for index in (exact_index, index_params):
+            index_config = {
                 "field_name": "vector",
-                "metric_type": DISTANCE_TYPE,
-                "index_type": "HNSW",
-                "index_name": "hnsw_index",
-                "params": {"M": 32, "efConstruction": 512},
-            },
-        ]
+                "metric_type": metric_type,
+                "index_type": index["index_type"],
+                "index_name": f"{index['index_type'].lower()}_index",
+            }
+            if index.get("params"):
+                index_config["params"] = dict(index["params"])
+            self.INDEX_PARAMS.append(index_config)
         self.QUERY_WORKLOAD = [
-            {"collection_name": f"{YOUR_PREFIX}_EXACT_{dataset_name}", "query_file_path": f"/home/dataset/Seminar2025Fall/{dataset_name}/lotte-lifestyle-query-small.fivecs"},
-            {"collection_name": f"{YOUR_PREFIX}_APPROX_{dataset_name}", "query_file_path": f"/home/dataset/Seminar2025Fall/{dataset_name}/lotte-lifestyle-query-small.fivecs"},
+            {"collection_name": exact_name, "query_file_path": f"{dataset_dir}/{query_file}"},
+            {"collection_name": approx_name, "query_file_path": f"{dataset_dir}/{query_file}"},
         ]
         self.SEARCH_PARAMS = [
-            {"metric_type": DISTANCE_TYPE},
-            {"metric_type": DISTANCE_TYPE, "params": {"ef": 32}},
+            {"metric_type": metric_type},
+            {"metric_type": metric_type, "params": dict(search_params)},
         ]
+        self.DISTANCE_TYPE = distance_type
+        self.VECTOR_TYPE = vector_type
 
-# 单例模式保证全局唯一
-vdb_config = VdbConfig()
\ No newline at end of file
+# 单例模式保证全局唯一，在第一次访问 vdb_config 时才创建
+def __getattr__(name):
+    if name == "vdb_config":
+        return VdbConfig()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
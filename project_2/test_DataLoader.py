@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import DataLoader as data_loader_module
+from DataLoader import DataLoader
+from IngestCheckpoint import IngestCheckpoint
+
+# 不需要 Milvus 服务器：用内存中的集合代替 pymilvus.Collection，模拟导入过程中进程退出后的断点续传
+
+
+class FakeCollection:
+    """只记录插入的主键，行为与 Milvus 一致：insert 返回即持久化，主键重复时保留多行"""
+    def __init__(self):
+        self.ids = []
+
+    def insert(self, rows, partition_name=None):
+        self.ids.extend(row["id"] for row in rows)
+
+    def upsert(self, rows, partition_name=None):
+        keys = {row["id"] for row in rows}
+        self.ids = [vid for vid in self.ids if vid not in keys] + [row["id"] for row in rows]
+
+    def flush(self):
+        pass
+
+    @property
+    def num_entities(self):
+        return len(self.ids)
+
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.checkpoint_dir = tempfile.mkdtemp()
+        self.collection = FakeCollection()
+        patcher = mock.patch.object(data_loader_module, "Collection", lambda name, using=None: self.collection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.checkpoint_dir)
+        self.data_list = [{"id": vid, "vector": [float(vid), 0.0], "doc": vid // 10} for vid in range(5000)]
+
+    def loader(self):
+        return DataLoader(mock.Mock(_using="default"), self.checkpoint_dir)
+
+    def test_crash_between_insert_and_checkpoint_save(self):
+        # 第 3 个批次 insert 成功后、检查点保存前进程退出：服务端比检查点多一个批次
+        commit = IngestCheckpoint.commit
+        calls = []
+
+        def crashing_commit(checkpoint, sid, digest, data_list):
+            calls.append(sid)
+            if len(calls) == 3:
+                raise KeyboardInterrupt("simulated crash")
+            commit(checkpoint, sid, digest, data_list)
+
+        with mock.patch.object(IngestCheckpoint, "commit", crashing_commit):
+            with self.assertRaises(KeyboardInterrupt):
+                self.loader().load_data("c", self.data_list, batch_size=1000, mode="resume")
+        self.assertEqual(self.collection.num_entities, 3000)
+        self.assertEqual(IngestCheckpoint(self.checkpoint_dir, "c").committed_rows, 2000)
+
+        self.loader().load_data("c", self.data_list, batch_size=1000, mode="resume")
+        self.assertEqual(self.collection.ids, list(range(5000)))
+
+    def test_server_lost_rows(self):
+        self.loader().load_data("c", self.data_list, batch_size=1000, mode="resume")
+        del self.collection.ids[2500:]
+        self.loader().load_data("c", self.data_list, batch_size=1000, mode="resume")
+        self.assertEqual(self.collection.ids, list(range(5000)))
+
+    def test_resume_is_idempotent(self):
+        self.loader().load_data("c", self.data_list, batch_size=1000, mode="resume")
+        self.loader().load_data("c", self.data_list, batch_size=1000, mode="resume")
+        self.assertEqual(self.collection.ids, list(range(5000)))
+
+
+if __name__ == "__main__":
+    unittest.main()